@@ -0,0 +1,125 @@
+"""
+Recall-vs-latency benchmark for the embedding inference backends (--embedding-backend).
+
+Embeds a fixed corpus with every backend and compares each against the fp32 PyTorch
+model: recall@k is the overlap of each query's top-k nearest corpus documents with the
+PyTorch top-k, and latency is measured both for single texts (the write path embeds one
+item at a time when the queue is short) and for full batches (indexing backlogs).
+Backends whose extras are not installed are reported and skipped.
+
+    python benchmarks/bench_embedding_backends.py --backends torch onnx onnx-int8
+    python benchmarks/bench_embedding_backends.py --corpus my_items.txt --min-recall 0.95
+
+Exits with status 1 if a benchmarked backend's recall@k is below --min-recall.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from context_portal_mcp.core import config, embedding_service  # noqa: E402
+
+SUBJECTS = [
+    "the SQLite writer connection", "the embedding queue", "semantic search", "the Chroma collection",
+    "markdown export", "the activity log", "context links", "custom data categories", "the FastMCP server",
+    "the workspace detector", "Alembic migrations", "the progress tracker", "system patterns", "the reader pool",
+]
+ACTIONS = [
+    "should batch writes to", "was refactored to decouple", "must never block on", "now caches results from",
+    "keeps a cursor into", "retries failed calls to", "is rebuilt nightly from", "validates input before reaching",
+    "logs slow queries against", "shares a lock with",
+]
+REASONS = [
+    "to keep tool latency under a millisecond", "because clients time out after ten seconds",
+    "so restarts do not lose queued work", "to avoid loading the model twice", "after the outage in March",
+    "since WAL mode allows concurrent readers", "because FTS5 triggers were superlinear on bulk loads",
+    "to keep memory flat as workspaces grow", "so reviews can trace every decision", "for CPU-only hosts",
+]
+
+
+def fixed_corpus(size: int):
+    """Deterministic ConPort-like decision texts."""
+    rng = random.Random(0)
+    return [
+        f"Decision {i}: {rng.choice(SUBJECTS)} {rng.choice(ACTIONS)} {rng.choice(SUBJECTS)} {rng.choice(REASONS)}."
+        for i in range(size)
+    ]
+
+
+def embed(model, texts, batch_size):
+    vectors = model.encode(texts, batch_size=batch_size, convert_to_tensor=False)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def top_k(corpus_vectors, query_vectors, k):
+    scores = query_vectors @ corpus_vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def measure(model, corpus, queries, args):
+    started = time.perf_counter()
+    corpus_vectors = embed(model, corpus, args.batch_size)
+    batch_ms = (time.perf_counter() - started) * 1000 / len(corpus)
+    single = []
+    for text in queries[:args.single_calls]:
+        started = time.perf_counter()
+        model.encode([text], batch_size=1, convert_to_tensor=False)
+        single.append((time.perf_counter() - started) * 1000)
+    return corpus_vectors, embed(model, queries, args.batch_size), statistics.median(single), batch_ms
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(config.EMBEDDING_BACKENDS), choices=config.EMBEDDING_BACKENDS)
+    parser.add_argument("--model", default=embedding_service.DEFAULT_MODEL_NAME)
+    parser.add_argument("--corpus", type=Path, help="Text file with one document per line (default: built-in corpus)")
+    parser.add_argument("--corpus-size", type=int, default=2000, help="Size of the built-in corpus (default: 2000)")
+    parser.add_argument("--queries", type=int, default=200, help="Corpus documents reused as queries (default: 200)")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours compared for recall (default: 10)")
+    parser.add_argument("--batch-size", type=int, default=embedding_service.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--single-calls", type=int, default=100, help="Timed single-text calls (default: 100)")
+    parser.add_argument("--min-recall", type=float, default=0.0, help="Fail below this recall@k (default: 0)")
+    args = parser.parse_args()
+
+    corpus = args.corpus.read_text().splitlines() if args.corpus else fixed_corpus(args.corpus_size)
+    corpus = [line for line in corpus if line.strip()]
+    queries = random.Random(1).sample(corpus, min(args.queries, len(corpus)))
+    print(f"Corpus: {len(corpus)} documents, {len(queries)} queries, model {args.model}")
+
+    print("Loading torch reference model...")
+    reference_corpus, reference_queries, *_ = measure(
+        embedding_service._create_model(args.model, "torch"), corpus, queries, args
+    )
+    reference = top_k(reference_corpus, reference_queries, args.k)
+
+    failed = False
+    print(f"{'backend':<10} {'recall@' + str(args.k):>10} {'single ms':>10} {'batch ms/doc':>13} {'load s':>7}")
+    for backend in args.backends:
+        started = time.perf_counter()
+        try:
+            model = embedding_service._create_model(args.model, backend)
+        except Exception as e:
+            print(f"{backend:<10} skipped: {type(e).__name__}: {e}")
+            continue
+        load_seconds = time.perf_counter() - started
+        corpus_vectors, query_vectors, single_ms, batch_ms = measure(model, corpus, queries, args)
+        found = top_k(corpus_vectors, query_vectors, args.k)
+        recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(found, reference)])
+        print(f"{backend:<10} {recall:>10.4f} {single_ms:>10.2f} {batch_ms:>13.3f} {load_seconds:>7.1f}")
+        if recall < args.min_recall:
+            failed = True
+    if failed:
+        print(f"FAIL: recall@{args.k} below {args.min_recall}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Relevance and latency of hybrid_search against the tools it replaces.
+
+Logs a fixed corpus of decisions into a throwaway workspace, indexes it, and runs every
+query through search_decisions_fts, semantic_search_conport and hybrid_search (the tool
+handlers, so latency includes query embedding and result assembly). Relevance is
+recall@k and MRR against the query's labeled relevant items.
+
+The built-in queries restate part of a decision in other words, so neither keyword nor
+semantic search alone finds them all. Bring your own with --queries, a JSON lines file of
+{"query": "...", "relevant": [<index into the corpus>, ...]} (with --corpus, one document
+per line).
+
+    python benchmarks/bench_hybrid_search.py
+    python benchmarks/bench_hybrid_search.py --corpus items.txt --queries queries.jsonl --k 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from context_portal_mcp.core import indexing_queue  # noqa: E402
+from context_portal_mcp.db import database as db  # noqa: E402
+from context_portal_mcp.db import models  # noqa: E402
+from context_portal_mcp.handlers import mcp_handlers  # noqa: E402
+
+SUBJECTS = [
+    "the SQLite writer connection", "the embedding queue", "semantic search", "the Chroma collection",
+    "markdown export", "the activity log", "context links", "the FastMCP server", "Alembic migrations",
+    "the reader pool",
+]
+# reason -> paraphrase used in queries
+REASONS = {
+    "to keep tool latency under a millisecond": "so calls stay fast",
+    "because clients time out after ten seconds": "to avoid client timeouts",
+    "so restarts do not lose queued work": "for crash safety",
+    "since WAL mode allows concurrent readers": "because readers should not block",
+    "to keep memory flat as workspaces grow": "to bound memory use",
+    "for CPU-only hosts": "when no GPU is available",
+}
+ACTIONS = ["should batch", "must never block", "now caches", "retries", "validates", "logs"]
+
+
+def builtin_corpus(size: int, queries: int):
+    """
+    Decisions with labeled queries. A query is a keyword of the decision's subject plus a
+    paraphrase of its reason; the decisions with that subject and reason are relevant.
+    """
+    rng = random.Random(0)
+    corpus, keys = [], []
+    for i in range(size):
+        subject, reason = rng.choice(SUBJECTS), rng.choice(list(REASONS))
+        corpus.append(f"{subject} {rng.choice(ACTIONS)} {reason} (decision {i})")
+        keys.append((subject, reason))
+    labeled = []
+    for subject, reason in rng.sample(sorted(set(keys)), min(queries, len(set(keys)))):
+        relevant = [i for i, key in enumerate(keys) if key == (subject, reason)]
+        labeled.append({"query": f"{subject.split()[-1]} {REASONS[reason]}", "relevant": relevant})
+    return corpus, labeled
+
+
+async def run_tool(name, workspace_id, query, k):
+    if name == "fts":
+        args = models.SearchDecisionsArgs(workspace_id=workspace_id, query_term=query, limit=k)
+        return [d["id"] for d in mcp_handlers.handle_search_decisions_fts(args)]
+    if name == "semantic":
+        args = models.SemanticSearchConportArgs(workspace_id=workspace_id, query_text=query, top_k=k)
+        return [int(r["metadata"]["conport_item_id"]) for r in await mcp_handlers.handle_semantic_search_conport(args)]
+    args = models.HybridSearchArgs(workspace_id=workspace_id, query_text=query, top_k=k, include_full_items=False)
+    return [r["item_id"] for r in await mcp_handlers.handle_hybrid_search(args)]
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, help="Text file with one document per line (default: built-in corpus)")
+    parser.add_argument("--queries", type=Path, help="JSON lines file of labeled queries (required with --corpus)")
+    parser.add_argument("--corpus-size", type=int, default=1000, help="Size of the built-in corpus (default: 1000)")
+    parser.add_argument("--query-count", type=int, default=50, help="Built-in queries (default: 50)")
+    parser.add_argument("--k", type=int, default=10, help="Results per query, max 25 (default: 10)")
+    args = parser.parse_args()
+
+    if args.corpus:
+        if not args.queries:
+            parser.error("--queries is required with --corpus")
+        corpus = [line for line in args.corpus.read_text().splitlines() if line.strip()]
+        labeled = [json.loads(line) for line in args.queries.read_text().splitlines() if line.strip()]
+    else:
+        corpus, labeled = builtin_corpus(args.corpus_size, args.query_count)
+
+    with tempfile.TemporaryDirectory() as workspace_id:
+        ids = [db.log_decision(workspace_id, models.Decision(summary=text)).id for text in corpus]
+        print(f"Indexing {len(corpus)} decisions...")
+        while indexing_queue.get_status(workspace_id)["pending"]:
+            if indexing_queue.process_pending(workspace_id)["failed"]:
+                print("Indexing failed; is the embedding model available?")
+                return 1
+
+        print(f"{'tool':<10} {'recall@' + str(args.k):>10} {'MRR':>7} {'median ms':>10} {'p95 ms':>8}")
+        for tool in ("fts", "semantic", "hybrid"):
+            recalls, reciprocal_ranks, latencies = [], [], []
+            for query in labeled:
+                relevant = {ids[i] for i in query["relevant"]}
+                started = time.perf_counter()
+                found = await run_tool(tool, workspace_id, query["query"], args.k)
+                latencies.append((time.perf_counter() - started) * 1000)
+                recalls.append(len(relevant & set(found)) / min(len(relevant), args.k))
+                first = next((rank for rank, item_id in enumerate(found, start=1) if item_id in relevant), None)
+                reciprocal_ranks.append(1 / first if first else 0.0)
+            p95 = sorted(latencies)[int(0.95 * (len(latencies) - 1))]
+            print(f"{tool:<10} {statistics.mean(recalls):>10.4f} {statistics.mean(reciprocal_ranks):>7.4f} "
+                  f"{statistics.median(latencies):>10.2f} {p95:>8.2f}")
+        db.close_db_connection(workspace_id)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,144 @@
+"""
+Benchmark for get_recent_activity_summary_data on a large workspace.
+
+Fills every table read by the summary with --rows rows logged evenly over the past
+year, then times repeated summary calls (default window: last 24 hours).
+Exits with status 1 if the median call exceeds --budget-ms, so it can gate CI.
+
+    python benchmarks/bench_recent_activity.py --rows 1000000 --budget-ms 1.0
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from context_portal_mcp.db import database as db  # noqa: E402
+
+SUMMARY_TABLES = [
+    "decisions",
+    "progress_entries",
+    "product_context_history",
+    "active_context_history",
+    "context_links",
+    "system_patterns",
+]
+INSERT_CHUNK = 50_000
+# table -> (activity_log item_type, op)
+ACTIVITY_ITEM_TYPES = {
+    "decisions": ("decision", "insert"),
+    "progress_entries": ("progress_entry", "insert"),
+    "product_context_history": ("product_context", "update"),
+    "active_context_history": ("active_context", "update"),
+    "context_links": ("context_link", "insert"),
+    "system_patterns": ("system_pattern", "insert"),
+}
+
+
+def _timestamps(count: int, now: datetime):
+    """Ascending timestamps over the past year, as items are logged in time order."""
+    step = 365 * 24 * 3600 / count
+    start = now - timedelta(days=365)
+    for i in range(count):
+        yield start + timedelta(seconds=step * (i + random.random()))
+
+
+def _row(table: str, i: int, ts: datetime, workspace_id: str):
+    if table == "decisions":
+        return (ts, f"Decision {i}", "rationale", None, json.dumps(["bench"]))
+    if table == "progress_entries":
+        return (ts, random.choice(["TODO", "IN_PROGRESS", "DONE"]), f"Task {i}", None)
+    if table in ("product_context_history", "active_context_history"):
+        return (ts, i + 1, json.dumps({"v": i}), "bench")
+    if table == "context_links":
+        return (workspace_id, "decision", str(i), "progress_entry", str(i), "implements", None, ts)
+    return (ts, f"pattern-{i}", "description", json.dumps(["bench"]))
+
+
+INSERT_SQL = {
+    "decisions": "INSERT INTO decisions (timestamp, summary, rationale, implementation_details, tags) VALUES (?, ?, ?, ?, ?)",
+    "progress_entries": "INSERT INTO progress_entries (timestamp, status, description, parent_id) VALUES (?, ?, ?, ?)",
+    "product_context_history": "INSERT INTO product_context_history (timestamp, version, content, change_source) VALUES (?, ?, ?, ?)",
+    "active_context_history": "INSERT INTO active_context_history (timestamp, version, content, change_source) VALUES (?, ?, ?, ?)",
+    "context_links": (
+        "INSERT INTO context_links (workspace_id, source_item_type, source_item_id, target_item_type,"
+        " target_item_id, relationship_type, description, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    ),
+    "system_patterns": "INSERT INTO system_patterns (timestamp, name, description, tags) VALUES (?, ?, ?, ?)",
+}
+
+
+def populate(workspace_id: str, rows: int) -> None:
+    conn = db.get_db_connection(workspace_id) # Runs migrations
+    now = datetime.now(timezone.utc)
+    # Synthetic rows share most of their tokens, which makes incremental FTS5 inserts
+    # superlinear, and the activity triggers would stamp every row with the load time.
+    # Detach both, then rebuild the FTS index and seed activity_log from the row timestamps.
+    detached = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger'"
+        " AND (sql LIKE '%decisions_fts%' OR sql LIKE '%INSERT INTO activity_log%')"
+    ).fetchall()
+    for trigger in detached:
+        conn.execute(f"DROP TRIGGER {trigger['name']}")
+    for table in SUMMARY_TABLES:
+        started = time.perf_counter()
+        timestamps = _timestamps(rows, now)
+        for start in range(0, rows, INSERT_CHUNK):
+            chunk = range(start, min(start + INSERT_CHUNK, rows))
+            conn.executemany(INSERT_SQL[table], [_row(table, i, next(timestamps), workspace_id) for i in chunk])
+            conn.commit()
+        print(f"  {table}: {rows} rows in {time.perf_counter() - started:.1f}s")
+    for trigger in detached:
+        conn.execute(trigger["sql"])
+    conn.execute("INSERT INTO decisions_fts (decisions_fts) VALUES ('rebuild')")
+    for table in SUMMARY_TABLES:
+        conn.execute(
+            "INSERT INTO activity_log (timestamp, item_type, item_id, op)"
+            f" SELECT timestamp, ?, id, ? FROM {table} ORDER BY timestamp, id",
+            ACTIVITY_ITEM_TYPES[table]
+        )
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows per table (default: 1,000,000)")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed summary calls (default: 200)")
+    parser.add_argument("--hours-ago", type=int, default=24, help="Summary window in hours (default: 24)")
+    parser.add_argument("--budget-ms", type=float, default=1.0, help="Median latency budget in ms (default: 1.0)")
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory(prefix="conport-bench-") as workspace_id:
+        print(f"Populating {len(SUMMARY_TABLES)} tables with {args.rows} rows each...")
+        populate(workspace_id, args.rows)
+
+        for _ in range(10): # Warm the page cache and the statement cache
+            db.get_recent_activity_summary_data(workspace_id, hours_ago=args.hours_ago)
+        timings = []
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            db.get_recent_activity_summary_data(workspace_id, hours_ago=args.hours_ago)
+            timings.append((time.perf_counter() - started) * 1000)
+        db.close_all_connections()
+
+    timings.sort()
+    median = statistics.median(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"get_recent_activity_summary_data: median {median:.3f} ms, p95 {p95:.3f} ms, max {timings[-1]:.3f} ms")
+    if median > args.budget_ms:
+        print(f"FAIL: median exceeds the {args.budget_ms} ms budget")
+        return 1
+    print(f"OK: within the {args.budget_ms} ms budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+# src/context_portal_mcp/core/chroma_embedding_function.py
+"""
+Chroma embedding function backed by embedding_service's shared model.
+
+Chroma's own SentenceTransformerEmbeddingFunction loads a separate copy of the model, so
+every server process held the model twice. This adapter embeds through
+embedding_service.get_embeddings instead: one model instance serves direct embedding calls
+and every workspace collection, and Chroma-side embedding also respects the inference
+concurrency limit.
+
+Imported lazily by embedding_service.get_chroma_embedding_function, since chromadb is slow
+to import.
+"""
+from typing import Any, Dict
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings, Space
+
+from . import embedding_service
+
+
+class SharedModelEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Embeds documents with the process-wide model loaded by embedding_service."""
+
+    def __init__(self, model_name: str = embedding_service.DEFAULT_MODEL_NAME):
+        self.model_name = model_name
+
+    def __call__(self, input: Documents) -> Embeddings:
+        vectors = embedding_service.get_embeddings(list(input), model_name=self.model_name)
+        return [np.asarray(vector, dtype=np.float32) for vector in vectors]
+
+    @staticmethod
+    def name() -> str:
+        # Existing collections persist the name of Chroma's SentenceTransformerEmbeddingFunction,
+        # and Chroma rejects opening a collection with a differently named function. The
+        # vectors are identical (same model, not normalized), so the name is kept.
+        return "sentence_transformer"
+
+    def default_space(self) -> Space:
+        return "cosine"
+
+    @staticmethod
+    def build_from_config(config: Dict[str, Any]) -> "SharedModelEmbeddingFunction":
+        return SharedModelEmbeddingFunction(config.get("model_name", embedding_service.DEFAULT_MODEL_NAME))
+
+    def get_config(self) -> Dict[str, Any]:
+        # Same keys as SentenceTransformerEmbeddingFunction, so either can open the collection
+        return {"model_name": self.model_name, "device": "cpu", "normalize_embeddings": False, "kwargs": {}}
@@ -11,6 +11,20 @@ log = logging.getLogger(__name__)
 _custom_db_path: Optional[str] = None
 _base_path: Optional[str] = None
 _db_filename: str = "context.db"
+# Number of pooled read-only SQLite connections per workspace (0 = share the writer)
+_db_reader_pool_size: int = 4
+# Worker thread limits used by core.dispatch to keep blocking work off the event loop
+_read_workers: int = 8
+_write_workers: int = 2
+_inference_workers: int = 1
+# Maximum entries kept in each workspace's embedding cache (0 = disabled)
+_embedding_cache_size: int = 50000
+# Embedding model for workspaces that have not been indexed yet (see core.embedding_models)
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+_embedding_model: str = DEFAULT_EMBEDDING_MODEL
+# Inference backend used to run the embedding model (see embedding_service)
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8", "openvino")
+_embedding_backend: str = "torch"
 
 
 def set_custom_db_path(path: Optional[str]):
@@ -33,6 +47,75 @@ def set_db_filename(filename: str):
     _db_filename = filename
     log.info(f"Database filename set to: {filename}")
 
+def set_db_reader_pool_size(size: int):
+    """Set the number of reader connections pooled per workspace database."""
+    global _db_reader_pool_size
+    if size < 0:
+        raise ValueError("Reader pool size must be greater than or equal to 0")
+    _db_reader_pool_size = size
+    log.info(f"Database reader pool size set to: {size}")
+
+def get_db_reader_pool_size() -> int:
+    """Get the number of reader connections pooled per workspace database."""
+    return _db_reader_pool_size
+
+def set_worker_limits(read_workers: int, write_workers: int, inference_workers: int):
+    """Set the thread limits for DB reads, DB writes and embedding inference."""
+    global _read_workers, _write_workers, _inference_workers
+    for name, value in (("read", read_workers), ("write", write_workers), ("inference", inference_workers)):
+        if value < 1:
+            raise ValueError(f"{name.capitalize()} worker count must be at least 1")
+    _read_workers, _write_workers, _inference_workers = read_workers, write_workers, inference_workers
+    log.info(f"Worker limits set to: read={read_workers}, write={write_workers}, inference={inference_workers}")
+
+def get_read_workers() -> int:
+    """Get the maximum number of concurrent DB read tasks."""
+    return _read_workers
+
+def get_write_workers() -> int:
+    """Get the maximum number of concurrent DB write tasks."""
+    return _write_workers
+
+def get_inference_workers() -> int:
+    """Get the maximum number of concurrent embedding model calls."""
+    return _inference_workers
+
+def set_embedding_cache_size(size: int):
+    """Set the maximum number of cached embeddings per workspace (0 disables the cache)."""
+    global _embedding_cache_size
+    if size < 0:
+        raise ValueError("Embedding cache size must be greater than or equal to 0")
+    _embedding_cache_size = size
+    log.info(f"Embedding cache size set to: {size}")
+
+def get_embedding_cache_size() -> int:
+    """Get the maximum number of cached embeddings per workspace."""
+    return _embedding_cache_size
+
+def set_embedding_model(model_name: str):
+    """Set the server's default embedding model (a sentence-transformers model name or path)."""
+    global _embedding_model
+    if not model_name.strip():
+        raise ValueError("Embedding model name must not be empty")
+    _embedding_model = model_name.strip()
+    log.info(f"Default embedding model set to: {_embedding_model}")
+
+def get_embedding_model() -> str:
+    """Get the server's default embedding model."""
+    return _embedding_model
+
+def set_embedding_backend(backend: str):
+    """Set the inference backend for the embedding model; takes effect when the model is loaded."""
+    global _embedding_backend
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Embedding backend must be one of: {', '.join(EMBEDDING_BACKENDS)}")
+    _embedding_backend = backend
+    log.info(f"Embedding backend set to: {backend}")
+
+def get_embedding_backend() -> str:
+    """Get the inference backend for the embedding model."""
+    return _embedding_backend
+
 
 def get_database_path(workspace_id: str) -> pathlib.Path:
     log.debug(f"get_database_path received workspace_id: {workspace_id}")
@@ -0,0 +1,98 @@
+# src/context_portal_mcp/core/dispatch.py
+"""
+Dispatches blocking work (SQLite access, embedding inference) off the asyncio event loop.
+
+MCP tool coroutines await ``run_read``/``run_write``/``run_inference``; each class of work
+runs on its own bounded thread pool so a slow embedding cannot starve reads, and a burst of
+reads cannot delay writes. ``inference_slot`` bounds every model forward pass, so the
+background indexing worker and search queries share the same inference limit.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+from . import config
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+READ = "read"
+WRITE = "write"
+INFERENCE = "inference"
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+_inference_semaphore: Optional[threading.BoundedSemaphore] = None
+
+
+def _worker_limit(kind: str) -> int:
+    if kind == READ:
+        return config.get_read_workers()
+    if kind == WRITE:
+        return config.get_write_workers()
+    return config.get_inference_workers()
+
+
+def _get_executor(kind: str) -> ThreadPoolExecutor:
+    executor = _executors.get(kind)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(kind)
+            if executor is None:
+                max_workers = _worker_limit(kind)
+                executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"conport-{kind}")
+                _executors[kind] = executor
+                log.debug(f"Started {kind} executor with {max_workers} worker(s)")
+    return executor
+
+
+@contextmanager
+def inference_slot() -> Iterator[None]:
+    """Hold one of the limited model-inference slots for the duration of the block."""
+    global _inference_semaphore
+    if _inference_semaphore is None:
+        with _executors_lock:
+            if _inference_semaphore is None:
+                _inference_semaphore = threading.BoundedSemaphore(config.get_inference_workers())
+    with _inference_semaphore:
+        yield
+
+
+async def _run(kind: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    loop = asyncio.get_running_loop()
+    # Carry context variables (e.g. logging/tracing context) into the worker thread
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(_get_executor(kind), call)
+
+
+async def run_read(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking read-only function (e.g. a ``get_*`` handler) on the read pool."""
+    return await _run(READ, func, *args, **kwargs)
+
+
+async def run_write(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking function that modifies the database on the write pool."""
+    return await _run(WRITE, func, *args, **kwargs)
+
+
+async def run_inference(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking embedding/model call on the inference pool."""
+    return await _run(INFERENCE, func, *args, **kwargs)
+
+
+def shutdown(wait: bool = True) -> None:
+    """Shut down all executors. They are recreated lazily if work is dispatched again."""
+    global _inference_semaphore
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+        _inference_semaphore = None
+    for executor in executors:
+        executor.shutdown(wait=wait)
@@ -0,0 +1,207 @@
+# src/context_portal_mcp/core/embedding_cache.py
+"""
+Persistent per-workspace cache of embeddings keyed by (model and backend, SHA-256 of normalized text).
+
+Items are frequently re-logged unchanged (log_custom_data and log_system_pattern replace
+rows in place), so the indexing worker looks vectors up here before running the model.
+The cache lives in `embedding_cache.db` next to the workspace's context database, holds at
+most `config.get_embedding_cache_size()` entries and evicts the least recently used ones.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import config, embedding_service
+
+log = logging.getLogger(__name__)
+
+CACHE_FILENAME = "embedding_cache.db"
+# Recency updates held in memory before they are written in one statement
+TOUCH_FLUSH_SIZE = 1000
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFC, whitespace runs collapsed, stripped."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed LRU cache of embedding vectors (stored as float32 blobs)."""
+
+    def __init__(self, path: Path, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False) # Access is serialized by _lock
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                model_name TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used INTEGER NOT NULL,
+                PRIMARY KEY (model_name, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_embedding_cache_last_used ON embedding_cache (last_used)")
+        self._conn.commit()
+        # Logical clock for LRU ordering; wall-clock time would tie within a burst of writes
+        self._clock, self._entries = self._conn.execute(
+            "SELECT COALESCE(MAX(last_used), 0), COUNT(*) FROM embedding_cache"
+        ).fetchone()
+        # last_used of entries served since the last flush, so lookups do not write
+        self._touched: Dict[Tuple[str, str], int] = {}
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def _flush_touches(self) -> None:
+        """Writes pending recency updates; the caller holds _lock and commits."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embedding_cache SET last_used = ? WHERE model_name = ? AND text_hash = ?",
+                [(tick, model_name, digest) for (model_name, digest), tick in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def get_many(self, model_name: str, hashes: List[str]) -> Dict[str, List[float]]:
+        """Returns cached vectors by hash and marks them as recently used (written with the next put_many)."""
+        if not hashes:
+            return {}
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embedding_cache WHERE model_name = ? AND text_hash IN ({placeholders})",
+                    (model_name, *chunk)
+                ).fetchall()
+                for digest, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[digest] = vector.tolist()
+            for digest in found:
+                self._touched[(model_name, digest)] = self._tick()
+            if len(self._touched) >= TOUCH_FLUSH_SIZE:
+                self._flush_touches()
+                self._conn.commit()
+            self.hits += sum(1 for digest in hashes if digest in found)
+            self.misses += sum(1 for digest in hashes if digest not in found)
+        return found
+
+    def put_many(self, model_name: str, vectors: Dict[str, List[float]]) -> None:
+        """Stores vectors by hash, then evicts least recently used entries beyond max_entries."""
+        if not vectors:
+            return
+        with self._lock:
+            # An entry that is already present holds the same vector, so it is kept as is
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO embedding_cache (model_name, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(model_name, digest, array("f", vector).tobytes(), self._tick()) for digest, vector in vectors.items()]
+            )
+            self._entries += cursor.rowcount
+            # Evict by up-to-date recency
+            self._flush_touches()
+            excess = self._entries - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM embedding_cache WHERE (model_name, text_hash) IN "
+                    "(SELECT model_name, text_hash FROM embedding_cache ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+                self._entries -= excess
+                self.evictions += excess
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": self._entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(workspace_id: str) -> Optional[EmbeddingCache]:
+    """Returns the workspace's cache, or None if caching is disabled (size 0)."""
+    max_entries = config.get_embedding_cache_size()
+    if max_entries <= 0:
+        return None
+    cache = _caches.get(workspace_id)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(workspace_id)
+            if cache is None:
+                path = config.get_database_path(workspace_id).parent / CACHE_FILENAME
+                cache = EmbeddingCache(path, max_entries)
+                _caches[workspace_id] = cache
+                log.info(f"Opened embedding cache for workspace {workspace_id} at {path} (max {max_entries} entries)")
+    return cache
+
+
+def get_embeddings(
+    workspace_id: str,
+    texts: List[str],
+    model_name: Optional[str] = None
+) -> List[List[float]]:
+    """Like embedding_service.get_embeddings, but serves unchanged texts from the workspace cache."""
+    cache = get_cache(workspace_id)
+    if cache is None or not texts:
+        return embedding_service.get_embeddings(texts, model_name=model_name)
+
+    model_key = embedding_service.get_model_key(model_name)
+    hashes = [text_hash(text) for text in texts]
+    cached = cache.get_many(model_key, hashes)
+    # Embed each distinct missing text once
+    missing: Dict[str, str] = {}
+    for digest, text in zip(hashes, texts):
+        if digest not in cached:
+            missing.setdefault(digest, text)
+    if missing:
+        vectors = embedding_service.get_embeddings(list(missing.values()), model_name=model_name)
+        computed = dict(zip(missing.keys(), vectors))
+        cache.put_many(model_key, computed)
+        cached.update(computed)
+    return [cached[digest] for digest in hashes]
+
+
+def get_stats(workspace_id: str) -> Optional[Dict[str, int]]:
+    cache = get_cache(workspace_id)
+    return cache.stats() if cache is not None else None
+
+
+def close_all() -> None:
+    with _caches_lock:
+        caches = list(_caches.values())
+        _caches.clear()
+    for cache in caches:
+        cache.close()
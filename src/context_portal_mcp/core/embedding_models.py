@@ -0,0 +1,254 @@
+# src/context_portal_mcp/core/embedding_models.py
+"""
+Embedding model per workspace, and switching a workspace to another model without downtime.
+
+Each model's vectors live in a collection of their own (vector_store_service.collection_name_for),
+and the `embedding_models` table records which model is active for the workspace. A workspace
+that has not been indexed yet uses the server default (--embedding-model); it is recorded as
+active on the first indexing batch, so restarting with another default never strands vectors.
+
+`migrate()` makes another model the workspace's 'building' model. Until it is ready, the
+indexing worker writes every queued change to both collections and backfills the new one
+between queue batches (core.indexing_queue.backfill_step). Searches keep using the active
+model; when the backfill completes the new model becomes active and the old collection is
+dropped.
+
+`reindex()` rebuilds the active model's collection from SQLite the same way (e.g. after the
+vector store was deleted or corrupted, or for items logged before semantic search existed):
+the checkpoint is kept on the active model's row, so an interrupted reindex resumes.
+
+`collect_garbage()` removes vectors of items that no longer exist and queues embeddable items
+that have no vector, without re-embedding everything.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..db import database as db
+from ..db import vector_store_service
+from . import config, embedding_cache
+
+log = logging.getLogger(__name__)
+
+
+def _default_model() -> Dict[str, Any]:
+    model_name = config.get_embedding_model()
+    return {
+        "model_name": model_name,
+        "collection_name": vector_store_service.collection_name_for(model_name),
+        "dimension": None,
+        "status": "active",
+        "backfill_item_type": None,
+        "backfill_after_id": None,
+        "recorded": False,
+    }
+
+
+def get_models(workspace_id: str) -> List[Dict[str, Any]]:
+    """The models the workspace indexes into: the active one first, then any building one."""
+    models = db.get_embedding_models(workspace_id)
+    if not any(model["status"] == "active" for model in models):
+        models.insert(0, _default_model())
+    return models
+
+
+def get_active_model(workspace_id: str) -> Dict[str, Any]:
+    """The model (and collection) that serves the workspace's semantic searches."""
+    return get_models(workspace_id)[0]
+
+
+def get_building_model(workspace_id: str) -> Optional[Dict[str, Any]]:
+    return next((model for model in db.get_embedding_models(workspace_id) if model["status"] == "building"), None)
+
+
+def get_backfill_model(workspace_id: str) -> Optional[Dict[str, Any]]:
+    """The model whose collection is being backfilled: a building model, else an active one being reindexed."""
+    models = db.get_embedding_models(workspace_id)
+    building = next((model for model in models if model["status"] == "building"), None)
+    if building is not None:
+        return building
+    return next((model for model in models if model["backfill_item_type"] is not None), None)
+
+
+def upsert_documents(
+    workspace_id: str,
+    documents: List[Tuple[str, str, str, Dict[str, Any]]],
+    models: Optional[List[Dict[str, Any]]] = None
+) -> None:
+    """
+    Embeds (item_type, item_id, text, metadata) documents with each model (default: all of the
+    workspace's models) and upserts them into the model's collection.
+    """
+    if not documents:
+        return
+    for model in models if models is not None else get_models(workspace_id):
+        if model.get("recorded") is False:
+            db.ensure_active_embedding_model(workspace_id, model["model_name"], model["collection_name"])
+        # Unchanged texts (e.g. re-logged items) are served from the cache without inference
+        vectors = embedding_cache.get_embeddings(
+            workspace_id, [text for _, _, text, _ in documents], model_name=model["model_name"]
+        )
+        vector_store_service.upsert_item_embeddings(
+            workspace_id,
+            [(item_type, item_id, vector, metadata) for (item_type, item_id, _, metadata), vector in zip(documents, vectors)],
+            collection_name=model["collection_name"],
+            model_name=model["model_name"]
+        )
+        if model["dimension"] is None:
+            db.set_embedding_model_dimension(workspace_id, model["model_name"], len(vectors[0]))
+
+
+def delete_documents(workspace_id: str, items: List[Tuple[str, str]]) -> None:
+    """Removes the (item_type, item_id) vectors from every model's collection."""
+    if not items:
+        return
+    for model in get_models(workspace_id):
+        vector_store_service.delete_item_embeddings(
+            workspace_id, items, collection_name=model["collection_name"], model_name=model["model_name"]
+        )
+
+
+def migrate(workspace_id: str, model_name: str) -> Dict[str, Any]:
+    """
+    Starts re-embedding the workspace with `model_name` into the model's own collection.
+    Replaces a switch to another model that is still in progress. The caller notifies the
+    indexing worker, which does the work in the background.
+    """
+    model_name = model_name.strip()
+    if not model_name:
+        raise ValueError("model_name must not be empty.")
+    active = get_active_model(workspace_id)
+    if model_name == active["model_name"]:
+        raise ValueError(f"'{model_name}' is already the workspace's embedding model.")
+    building = get_building_model(workspace_id)
+    if building is not None and building["model_name"] == model_name:
+        return get_status(workspace_id)
+    if not active.get("recorded", True):
+        db.ensure_active_embedding_model(workspace_id, active["model_name"], active["collection_name"])
+    if building is not None:
+        vector_store_service.delete_collection(workspace_id, building["collection_name"])
+    collection_name = vector_store_service.collection_name_for(model_name)
+    # Start from an empty collection so vectors of items deleted since an earlier use are not kept
+    vector_store_service.delete_collection(workspace_id, collection_name)
+    db.start_embedding_model_build(workspace_id, model_name, collection_name)
+    log.info(f"Started switching workspace {workspace_id} from '{active['model_name']}' to '{model_name}'.")
+    return get_status(workspace_id)
+
+
+def reindex(workspace_id: str, drop_existing: bool = False, restart: bool = False) -> Dict[str, Any]:
+    """
+    Starts re-embedding every item into the active model's collection. Resumes a reindex in
+    progress unless `restart` is set. `drop_existing` first empties the collection, removing
+    vectors of items that no longer exist; semantic search then returns partial results until
+    the reindex completes. The caller notifies the indexing worker.
+    """
+    active = get_active_model(workspace_id)
+    if not active.get("recorded", True):
+        db.ensure_active_embedding_model(workspace_id, active["model_name"], active["collection_name"])
+        active = get_active_model(workspace_id)
+    if active["backfill_item_type"] is not None and not (restart or drop_existing):
+        return get_status(workspace_id)
+    if drop_existing:
+        vector_store_service.delete_collection(workspace_id, active["collection_name"])
+    db.record_embedding_backfill_progress(workspace_id, active["model_name"], next(iter(db.ITEM_TABLES)), 0)
+    log.info(f"Started reindexing workspace {workspace_id} with embedding model '{active['model_name']}'.")
+    return get_status(workspace_id)
+
+
+def finish_backfill(workspace_id: str, model: Dict[str, Any]) -> None:
+    """Completes a backfill: activates a building model, or clears a finished reindex's checkpoint."""
+    if model["status"] == "building":
+        finish_migration(workspace_id, model)
+    else:
+        db.record_embedding_backfill_progress(workspace_id, model["model_name"], None, None)
+        log.info(f"Finished reindexing workspace {workspace_id}.")
+
+
+def finish_migration(workspace_id: str, building: Dict[str, Any]) -> None:
+    """Makes a fully backfilled model the active one and drops the previous model's collection."""
+    previous = get_active_model(workspace_id)
+    if not db.activate_embedding_model(workspace_id, building["model_name"]):
+        return # Replaced by another switch meanwhile
+    if previous["collection_name"] != building["collection_name"]:
+        vector_store_service.delete_collection(workspace_id, previous["collection_name"])
+    log.info(f"Workspace {workspace_id} now uses embedding model '{building['model_name']}'.")
+
+
+def get_backfill_progress(workspace_id: str, model: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Items already backfilled into the model's collection out of all items, or None if no backfill runs."""
+    item_types = list(db.ITEM_TABLES)
+    item_type = model["backfill_item_type"]
+    if item_type is None:
+        if model["status"] != "building":
+            return None
+        item_type = item_types[0] # Build not started yet
+    done_types = item_types[:item_types.index(item_type)]
+    total = sum(db.count_items(workspace_id, t) for t in item_types)
+    processed = sum(db.count_items(workspace_id, t) for t in done_types)
+    processed += db.count_items(workspace_id, item_type, up_to_id=model["backfill_after_id"] or 0)
+    return {
+        "item_type": item_type,
+        "after_id": model["backfill_after_id"],
+        "processed": processed,
+        "total": total,
+    }
+
+
+def get_status(workspace_id: str) -> Dict[str, Any]:
+    """Reports the active model and the progress of a model switch or reindex in progress, if any."""
+    def describe(model: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            **{key: model[key] for key in ("model_name", "collection_name", "dimension")},
+            "backfill": get_backfill_progress(workspace_id, model),
+        }
+
+    building = get_building_model(workspace_id)
+    return {
+        "active": describe(get_active_model(workspace_id)),
+        "building": describe(building) if building is not None else None,
+    }
+
+
+def collect_garbage(workspace_id: str, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Reconciles the workspace's collections with the items in SQLite: removes the vectors of
+    items that no longer exist from every collection, and queues the items the active
+    collection lacks and can embed (a building or reindexing collection is filled by its
+    backfill instead). Returns the number of vectors removed and items queued (with
+    `dry_run`, found).
+    """
+    workspace_models = get_models(workspace_id)
+    # Collections are listed before the items are read, so an item logged meanwhile is never
+    # mistaken for an orphan
+    keys_by_model = [
+        set(vector_store_service.get_item_keys(workspace_id, model["collection_name"], model["model_name"]))
+        for model in workspace_models
+    ]
+    existing = {item_type: {str(item_id) for item_id in db.get_item_ids(workspace_id, item_type)} for item_type in db.ITEM_TABLES}
+
+    orphaned = sorted({
+        (item_type, item_id) for keys in keys_by_model for item_type, item_id in keys
+        if item_id not in existing.get(item_type, ())
+    })
+    missing: Dict[str, List[int]] = {}
+    active, active_keys = workspace_models[0], keys_by_model[0]
+    if active["backfill_item_type"] is None:
+        absent = {
+            item_type: sorted(int(item_id) for item_id in item_ids if (item_type, item_id) not in active_keys)
+            for item_type, item_ids in existing.items()
+        }
+        # Items without embeddable text (e.g. numeric custom data) never get a vector; queueing
+        # them would only report them again on the next run
+        from .indexing_queue import build_embedding_document # indexing_queue imports this module
+        for item_type, items in db.get_items_by_type_and_ids(workspace_id, absent).items():
+            embeddable = sorted(
+                item_id for item_id, item in items.items() if build_embedding_document(item_type, item) is not None
+            )
+            if embeddable:
+                missing[item_type] = embeddable
+
+    if not dry_run:
+        delete_documents(workspace_id, orphaned)
+        for item_type, item_ids in missing.items():
+            db.enqueue_embeddings(workspace_id, item_type, item_ids)
+        log.info(f"Collected garbage for workspace {workspace_id}: removed {len(orphaned)} orphaned vector(s).")
+    return {"orphaned_vectors": len(orphaned), "missing_vectors": sum(len(ids) for ids in missing.values())}
@@ -1,41 +1,170 @@
 # src/context_portal_mcp/core/embedding_service.py
-from sentence_transformers import SentenceTransformer
-from typing import List, Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 import logging
+import os
+import platform
+import shutil
 import threading
-from chromadb.utils import embedding_functions # Added for Chroma EmbeddingFunction
+import time
+
+from . import config
+from .dispatch import inference_slot
+
+if TYPE_CHECKING:
+    # sentence_transformers pulls in torch and transformers (seconds of import time), so
+    # it is only imported when the model is first loaded
+    from sentence_transformers import SentenceTransformer
+    from .chroma_embedding_function import SharedModelEmbeddingFunction
 
 log = logging.getLogger(__name__)
 
-# Global variable to hold the loaded model, and a lock for thread-safe initialization
-_model: Optional[SentenceTransformer] = None
-_model_lock = threading.Lock()
-# Specify the model name from research (Design Doc ID 23)
-DEFAULT_MODEL_NAME = 'all-MiniLM-L6-v2' 
+# Loaded models by name (several only while a workspace switches models), and a lock per
+# name for thread-safe initialization, so a slow or failing load does not hold up other models
+_models: Dict[str, 'SentenceTransformer'] = {}
+_model_locks: Dict[str, threading.Lock] = {}
+_model_locks_guard = threading.Lock()
+# Built-in default model from research (Design Doc ID 23); --embedding-model changes the server default
+DEFAULT_MODEL_NAME = config.DEFAULT_EMBEDDING_MODEL
+# Texts encoded per forward pass by get_embeddings
+DEFAULT_BATCH_SIZE = 32
+
+# Lifecycle per model reported by get_model_status: not_loaded -> loading -> ready, or failed
+_model_status: Dict[str, Dict[str, Any]] = {}
+
+# SentenceTransformer arguments per config.EMBEDDING_BACKENDS entry. The ONNX and OpenVINO
+# backends need the optimum extras (pip install "sentence-transformers[onnx]" / "[openvino]").
+# "onnx-int8" is not listed: _load_quantized_model builds its model.
+BACKEND_OPTIONS: Dict[str, Dict[str, Any]] = {
+    "torch": {},
+    "onnx": {"backend": "onnx"},
+    "openvino": {"backend": "openvino"},
+}
+# Int8 ONNX exports made by the onnx-int8 backend, one directory per quantization config and model
+QUANTIZED_MODELS_DIR = Path.home() / ".cache" / "context_portal" / "onnx-int8"
+
+@lru_cache(maxsize=None)
+def _quantization_config() -> str:
+    """The export_dynamic_quantized_onnx_model config matching the host CPU's instruction set."""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "arm64"
+    try:
+        flags = set(Path("/proc/cpuinfo").read_text().split())
+    except OSError: # Not Linux; AVX2 runs on any x86-64 CPU from the last decade
+        flags = set()
+    if "avx512_vnni" in flags:
+        return "avx512_vnni"
+    if "avx512f" in flags:
+        return "avx512"
+    return "avx2"
+
+def _load_quantized_model(model_name: str) -> 'SentenceTransformer':
+    """
+    Loads the dynamically int8-quantized ONNX version of the model, quantizing it for the
+    host CPU on first use. Models rarely publish an export for every instruction set, so
+    the export is made locally and kept under QUANTIZED_MODELS_DIR.
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+    quantization = _quantization_config()
+    file_name = f"onnx/model_int8_{quantization}.onnx"
+    model_dir = QUANTIZED_MODELS_DIR / quantization / model_name.replace("/", "--")
+    if not model_dir.exists():
+        log.info(f"Quantizing embedding model '{model_name}' to int8 for {quantization} into {model_dir}...")
+        # Built in a scratch directory, so an interrupted export is never loaded
+        scratch_dir = model_dir.with_name(f"{model_dir.name}.{os.getpid()}.tmp")
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+        model = SentenceTransformer(model_name, backend="onnx")
+        model.save(str(scratch_dir))
+        export_dynamic_quantized_onnx_model(
+            model, quantization, str(scratch_dir), file_suffix=f"int8_{quantization}"
+        )
+        try:
+            scratch_dir.rename(model_dir)
+        except OSError: # Another process finished the same export first
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+    return SentenceTransformer(str(model_dir), backend="onnx", model_kwargs={"file_name": file_name})
+
+def _create_model(model_name: str, backend: Optional[str] = None) -> 'SentenceTransformer':
+    backend = backend or config.get_embedding_backend()
+    if backend == "onnx-int8":
+        return _load_quantized_model(model_name)
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name, **BACKEND_OPTIONS[backend])
+
+def _resolve(model_name: Optional[str]) -> str:
+    return model_name or config.get_embedding_model()
+
+def get_model_key(model_name: Optional[str] = None) -> str:
+    """
+    Identifies the vectors produced for `model_name` under the configured backend, for caches.
+    Quantized and converted models give slightly different vectors than the PyTorch one.
+    """
+    model_name = _resolve(model_name)
+    backend = config.get_embedding_backend()
+    if backend == "onnx-int8":
+        # Each CPU quantization config rounds differently
+        backend = f"{backend}-{_quantization_config()}"
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
 
-def _load_model(model_name: str = DEFAULT_MODEL_NAME) -> SentenceTransformer:
+def _model_lock(model_name: str) -> threading.Lock:
+    with _model_locks_guard:
+        return _model_locks.setdefault(model_name, threading.Lock())
+
+def _load_model(model_name: Optional[str] = None) -> 'SentenceTransformer':
     """
     Loads the Sentence Transformer model.
-    This function is intended to be called internally, ideally once.
+    This function is intended to be called internally, ideally once per model.
     """
-    global _model
+    model_name = _resolve(model_name)
+    model = _models.get(model_name)
     # Double-check locking pattern for thread-safe lazy initialization
-    if _model is None:
-        with _model_lock:
-            if _model is None:
-                log.info(f"Loading Sentence Transformer model: {model_name}...")
+    if model is None:
+        with _model_lock(model_name):
+            model = _models.get(model_name)
+            if model is None:
+                log.info(f"Loading Sentence Transformer model: {model_name} (backend: {config.get_embedding_backend()})...")
+                status = _model_status.setdefault(model_name, {"warmed_up": False, "load_seconds": None})
+                status.update(state="loading", error=None)
+                started = time.perf_counter()
                 try:
-                    _model = SentenceTransformer(model_name)
-                    log.info(f"Sentence Transformer model '{model_name}' loaded successfully.")
+                    model = _create_model(model_name)
                 except Exception as e:
+                    status.update(state="failed", error=f"{type(e).__name__}: {e}")
                     log.error(f"Failed to load Sentence Transformer model '{model_name}': {e}", exc_info=True)
                     # Depending on policy, could raise or return None and let caller handle
                     raise # Re-raise to make failure explicit
-    if _model is None: # Should not happen if raise is used above, but as a safeguard
-        raise RuntimeError(f"Model '{model_name}' could not be loaded.")
-    return _model
+                _models[model_name] = model
+                status.update(state="ready", load_seconds=round(time.perf_counter() - started, 3))
+                log.info(f"Sentence Transformer model '{model_name}' loaded successfully in {status['load_seconds']}s.")
+    return model
+
+def warm_up(model_name: Optional[str] = None) -> None:
+    """
+    Loads the model and runs one forward pass, so the first real embedding call pays
+    neither the model load nor the first-inference setup (weight paging, kernel selection).
+
+    Raises:
+        RuntimeError: If the model cannot be loaded or embedding fails.
+    """
+    model_name = _resolve(model_name)
+    get_embeddings(["ConPort embedding model warm-up."], batch_size=1, model_name=model_name)
+    _model_status.setdefault(model_name, {})["warmed_up"] = True
+
+def get_model_status(model_name: Optional[str] = None) -> Dict[str, Any]:
+    """Reports whether the embedding model (default: the server's) is loaded, for health checks."""
+    model_name = _resolve(model_name)
+    status = _model_status.get(model_name, {})
+    return {
+        "model_name": model_name,
+        "backend": config.get_embedding_backend(),
+        "state": status.get("state", "not_loaded"),
+        "warmed_up": status.get("warmed_up", False),
+        "load_seconds": status.get("load_seconds"),
+        "error": status.get("error"),
+    }
 
-def get_embedding(text: str, model_name: str = DEFAULT_MODEL_NAME) -> List[float]:
+def get_embedding(text: str, model_name: Optional[str] = None) -> List[float]:
     """
     Generates an embedding for the given text using the specified Sentence Transformer model.
     The model is loaded on the first call.
@@ -50,45 +179,71 @@ def get_embedding(text: str, model_name: str = DEFAULT_MODEL_NAME) -> List[float
     Raises:
         RuntimeError: If the model cannot be loaded or embedding fails.
     """
+    log.debug(f"Generating embedding for text snippet (first 50 chars): '{text[:50]}...'")
+    return get_embeddings([text], batch_size=1, model_name=model_name)[0]
+
+def get_embeddings(
+    texts: List[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    model_name: Optional[str] = None
+) -> List[List[float]]:
+    """
+    Generates embeddings for many texts, one forward pass per batch of `batch_size` texts.
+
+    Texts are bucketed by length before batching so each batch pads to a similar
+    sequence length, then results are returned in the order of `texts`. Each batch
+    takes its own inference slot, so a large request does not block other model
+    calls for its whole duration.
+
+    Raises:
+        RuntimeError: If the model cannot be loaded or embedding fails.
+    """
+    if not texts:
+        return []
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
     model = _load_model(model_name)
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    embeddings: List[Optional[List[float]]] = [None] * len(texts)
     try:
-        log.debug(f"Generating embedding for text snippet (first 50 chars): '{text[:50]}...'")
-        embedding = model.encode(text, convert_to_tensor=False) # Returns numpy array
-        # Ensure it's a standard list of floats for broader compatibility (e.g., JSON serialization)
-        return embedding.tolist() 
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            # Bound concurrent model calls so inference cannot monopolize worker threads
+            with inference_slot():
+                vectors = model.encode(
+                    [texts[i] for i in bucket],
+                    batch_size=len(bucket),
+                    convert_to_tensor=False # Returns numpy arrays
+                )
+            # Ensure they're standard lists of floats for broader compatibility (e.g., JSON serialization)
+            for i, vector in zip(bucket, vectors):
+                embeddings[i] = vector.tolist()
     except Exception as e:
-        log.error(f"Failed to generate embedding for text: {e}", exc_info=True)
+        log.error(f"Failed to generate embeddings for {len(texts)} text(s): {e}", exc_info=True)
         raise RuntimeError(f"Embedding generation failed: {e}")
+    log.debug(f"Generated {len(texts)} embedding(s) in {-(-len(texts) // batch_size)} batch(es)")
+    return embeddings
 
-def get_chroma_embedding_function(model_name: str = DEFAULT_MODEL_NAME) -> embedding_functions.SentenceTransformerEmbeddingFunction:
+def get_chroma_embedding_function(model_name: Optional[str] = None) -> 'SharedModelEmbeddingFunction':
     """
-    Returns a ChromaDB-compatible SentenceTransformerEmbeddingFunction instance
-    initialized with the specified model name.
+    Returns a ChromaDB-compatible embedding function backed by this module's model singleton,
+    so Chroma collections never load a model copy of their own.
 
     Args:
-        model_name: The name of the Sentence Transformer model to use.
+        model_name: The name of the Sentence Transformer model to use (default: the server's).
 
     Returns:
-        An instance of chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction.
+        A SharedModelEmbeddingFunction; the model is loaded on its first call.
     
     Raises:
-        ImportError: If chromadb is not installed or SentenceTransformerEmbeddingFunction cannot be imported.
-        Exception: Potentially from SentenceTransformerEmbeddingFunction initialization if model is problematic,
-                   though it usually loads lazily.
+        ImportError: If chromadb is not installed.
     """
-    log.info(f"Creating Chroma SentenceTransformerEmbeddingFunction for model: {model_name}")
     try:
-        # Note: The SentenceTransformerEmbeddingFunction itself handles model loading internally.
-        # We are just configuring it with the model name.
-        # It's important that this model_name matches what we'd use in _load_model
-        # if we were managing the SentenceTransformer instance ourselves for Chroma.
-        return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=model_name)
+        from .chroma_embedding_function import SharedModelEmbeddingFunction
     except ImportError:
-        log.error("chromadb.utils.embedding_functions could not be imported. Ensure chromadb is installed correctly.")
-        raise
-    except Exception as e:
-        log.error(f"Failed to create SentenceTransformerEmbeddingFunction for model '{model_name}': {e}", exc_info=True)
+        log.error("chromadb could not be imported. Ensure chromadb is installed correctly.")
         raise
+    return SharedModelEmbeddingFunction(model_name=_resolve(model_name))
 
 if __name__ == '__main__':
     # Example Usage (for testing this module directly)
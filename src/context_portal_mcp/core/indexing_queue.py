@@ -0,0 +1,337 @@
+# src/context_portal_mcp/core/indexing_queue.py
+"""
+Background indexing of ConPort items into the vector store.
+
+Item writes never embed inline. Triggers on the item tables record every inserted or
+deleted item in the `embedding_queue` table (same transaction as the write, so the queue
+survives restarts), and handlers call `notify()` after committing. A single daemon worker
+thread then drains each workspace's queue in micro-batches: it loads the queued items,
+embeds them, upserts the vectors in bulk and removes vectors of items that were deleted.
+A failed batch is split until the failing entries are isolated; those are retried after a
+delay, up to MAX_ATTEMPTS per entry (retry_failed() re-arms them). Failures while the model
+cannot be loaded do not count as attempts. While a workspace switches embedding models or
+is reindexed, the worker also backfills the model's collection between batches (see
+core.embedding_models).
+"""
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..db import database as db
+from . import embedding_cache, embedding_models, embedding_service
+
+log = logging.getLogger(__name__)
+
+# Queue entries per micro-batch; each is embedded in DEFAULT_BATCH_SIZE-sized forward passes
+BATCH_SIZE = 256
+MAX_ATTEMPTS = 5
+RETRY_DELAY_SECONDS = 30.0
+
+
+def build_embedding_document(item_type: str, item: Any) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Returns the (text, metadata) pair to embed for a ConPort item,
+    or None if the item has no embeddable text.
+    """
+    if item_type == "decision":
+        text = f"Decision Summary: {item.summary}\n"
+        if item.rationale:
+            text += f"Rationale: {item.rationale}\n"
+        if item.implementation_details:
+            text += f"Implementation Details: {item.implementation_details}"
+        metadata = {
+            "summary": item.summary,
+            "timestamp_created": item.timestamp.isoformat(),
+            "tags": ", ".join(item.tags) if item.tags else None
+        }
+    elif item_type == "progress_entry":
+        text = f"Progress: {item.status} - {item.description}"
+        metadata = {
+            "status": item.status,
+            "description_snippet": item.description[:100], # Snippet for quick view
+            "timestamp_created": item.timestamp.isoformat(),
+            "parent_id": str(item.parent_id) if item.parent_id else None
+        }
+    elif item_type == "system_pattern":
+        text = f"System Pattern: {item.name}\nDescription: {item.description if item.description else ''}"
+        metadata = {
+            "name": item.name,
+            "timestamp_created": item.timestamp.isoformat(),
+            "tags": ", ".join(item.tags) if item.tags else None
+        }
+    elif item_type == "custom_data":
+        # Only embed if value is string-like or can be reasonably converted to text
+        if isinstance(item.value, str):
+            value_text = item.value
+        elif isinstance(item.value, (dict, list)):
+            value_text = json.dumps(item.value)
+        else:
+            return None
+        # Add category and key to text for better contextual embedding
+        text = f"Category: {item.category}\nKey: {item.key}\nValue: {value_text}"
+        metadata = {
+            "category": item.category,
+            "key": item.key,
+            "timestamp_created": item.timestamp.isoformat(),
+        }
+    else:
+        return None
+    return text.strip(), metadata
+
+
+def _process_batch(workspace_id: str, entries: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Indexes one batch of queue entries. Raises on failure, leaving the entries queued."""
+    entries_by_type: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for entry in entries:
+        entries_by_type[entry["item_type"]].append(entry)
+
+    documents: List[Tuple[str, str, str, Dict[str, Any]]] = []
+    stale: List[Tuple[str, str]] = []
+    for item_type, group in entries_by_type.items():
+        if item_type not in db.ITEM_TABLES:
+            log.warning(f"Dropping embedding queue entries with unknown item type '{item_type}'")
+            continue
+        items = db.get_items_by_ids(workspace_id, item_type, [e["item_id"] for e in group])
+        for entry in group:
+            item = items.get(entry["item_id"])
+            document = build_embedding_document(item_type, item) if item is not None else None
+            if document is None:
+                # Deleted, or no longer embeddable: make sure no vector is left behind
+                stale.append((item_type, str(entry["item_id"])))
+            else:
+                text, metadata = document
+                documents.append((item_type, str(entry["item_id"]), text, metadata))
+
+    # Written to the active model's collection and, during a model switch, the new one's too
+    embedding_models.upsert_documents(workspace_id, documents)
+    embedding_models.delete_documents(workspace_id, stale)
+    db.delete_embedding_queue_entries(workspace_id, [e["id"] for e in entries])
+    return {"embedded": len(documents), "removed": len(stale)}
+
+
+class _ModelUnavailable(Exception):
+    """A batch failed because an embedding model of the workspace could not be loaded."""
+
+
+def _model_unavailable(workspace_id: str) -> bool:
+    """True while a model the workspace indexes into is loading or failed to load."""
+    return any(
+        embedding_service.get_model_status(model["model_name"])["state"] in ("loading", "failed")
+        for model in embedding_models.get_models(workspace_id)
+    )
+
+
+def _process_entries(
+    workspace_id: str, entries: List[Dict[str, Any]], totals: Dict[str, int], failed_ids: Set[int]
+) -> None:
+    """
+    Indexes queue entries, halving a failed batch until the entries that fail are isolated,
+    so only they use up attempts. Raises _ModelUnavailable, without recording attempts, when
+    the failure is the model's rather than the items'.
+    """
+    try:
+        result = _process_batch(workspace_id, entries)
+    except Exception as e:
+        if _model_unavailable(workspace_id):
+            raise _ModelUnavailable(f"{type(e).__name__}: {e}") from e
+        if len(entries) > 1:
+            log.debug(f"Batch of {len(entries)} queued item(s) failed for workspace {workspace_id}; splitting it: {e}")
+            middle = len(entries) // 2
+            _process_entries(workspace_id, entries[:middle], totals, failed_ids)
+            _process_entries(workspace_id, entries[middle:], totals, failed_ids)
+            return
+        entry = entries[0]
+        log.error(f"Failed to index {entry['item_type']} {entry['item_id']} for workspace {workspace_id}: {e}", exc_info=True)
+        db.record_embedding_queue_failure(workspace_id, [entry["id"]], f"{type(e).__name__}: {e}")
+        totals["failed"] += 1
+        failed_ids.add(entry["id"])
+        return
+    totals["embedded"] += result["embedded"]
+    totals["removed"] += result["removed"]
+    log.debug(f"Indexed batch for workspace {workspace_id}: {result}")
+
+
+def process_pending(workspace_id: str, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """
+    Drains the workspace's embedding queue synchronously, one batch at a time. Entries that
+    fail stay queued with an incremented attempt count, and the rest of the queue is still
+    drained. If the embedding model cannot be loaded, it stops without counting attempts.
+    """
+    totals = {"embedded": 0, "removed": 0, "failed": 0}
+    failed_ids: Set[int] = set()
+    while True:
+        # Entries that failed in this run are left for the next one
+        entries = [
+            entry for entry in db.fetch_embedding_queue_batch(workspace_id, batch_size, MAX_ATTEMPTS)
+            if entry["id"] not in failed_ids
+        ]
+        if not entries:
+            return totals
+        try:
+            _process_entries(workspace_id, entries, totals, failed_ids)
+        except _ModelUnavailable as e:
+            log.warning(f"Embedding model unavailable for workspace {workspace_id}; indexing will be retried: {e}")
+            pending = [entry["id"] for entry in entries if entry["id"] not in failed_ids]
+            db.record_embedding_queue_failure(workspace_id, pending, str(e), count_attempt=False)
+            totals["failed"] += len(pending)
+            return totals
+
+
+def backfill_step(workspace_id: str, batch_size: int = BATCH_SIZE) -> bool:
+    """
+    Embeds the next `batch_size` items into the collection being backfilled (a model the
+    workspace is switching to, or the active model during a reindex), and completes the
+    backfill once every item is in. Returns True while backfill work remains. Runs on the
+    worker thread between queue batches, so an item deleted meanwhile is removed from the
+    collection after it was backfilled.
+    """
+    model = embedding_models.get_backfill_model(workspace_id)
+    if model is None:
+        return False
+    item_types = list(db.ITEM_TABLES)
+    item_type = model["backfill_item_type"] or item_types[0]
+    after_id = model["backfill_after_id"] or 0
+    items = db.get_items_after_id(workspace_id, item_type, after_id, batch_size)
+    if items:
+        documents = []
+        for item in items:
+            document = build_embedding_document(item_type, item)
+            if document is not None:
+                documents.append((item_type, str(item.id), *document))
+        embedding_models.upsert_documents(workspace_id, documents, models=[model])
+        db.record_embedding_backfill_progress(workspace_id, model["model_name"], item_type, items[-1].id)
+        return True
+    next_index = item_types.index(item_type) + 1
+    if next_index < len(item_types):
+        db.record_embedding_backfill_progress(workspace_id, model["model_name"], item_types[next_index], 0)
+        return True
+    embedding_models.finish_backfill(workspace_id, model)
+    return False
+
+
+class _IndexingWorker:
+    """Daemon thread that drains the queues of workspaces that were notified of new work."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._due: Dict[str, float] = {} # workspace_id -> monotonic time at which to process it
+        self._last_run: Dict[str, datetime] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def notify(self, workspace_id: str) -> None:
+        with self._cond:
+            self._due[workspace_id] = 0.0
+            self._stopping = False
+            if not self.running:
+                self._thread = threading.Thread(target=self._run, name="conport-indexer", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def last_run(self, workspace_id: str) -> Optional[datetime]:
+        return self._last_run.get(workspace_id)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _next_ready(self) -> Optional[List[str]]:
+        """Blocks until some workspace is due; returns None when stopping."""
+        with self._cond:
+            while not self._stopping:
+                now = time.monotonic()
+                ready = [ws for ws, due in self._due.items() if due <= now]
+                if ready:
+                    for ws in ready:
+                        del self._due[ws]
+                    return ready
+                timeout = min(self._due.values()) - now if self._due else None
+                self._cond.wait(timeout)
+            return None
+
+    def _run(self) -> None:
+        while True:
+            ready = self._next_ready()
+            if ready is None:
+                return
+            for workspace_id in ready:
+                try:
+                    result = process_pending(workspace_id)
+                    # One backfill batch per round keeps newly logged items from waiting behind it
+                    if not result["failed"] and backfill_step(workspace_id):
+                        with self._cond:
+                            self._due[workspace_id] = 0.0
+                except Exception as e:
+                    log.error(f"Indexing worker error for workspace {workspace_id}: {e}", exc_info=True)
+                    result = {"failed": 1}
+                self._last_run[workspace_id] = datetime.now(timezone.utc)
+                if result["failed"]:
+                    with self._cond:
+                        # An explicit notify in the meantime keeps its earlier due time.
+                        self._due.setdefault(workspace_id, time.monotonic() + RETRY_DELAY_SECONDS)
+
+
+_worker = _IndexingWorker()
+# Workspaces whose leftover queue has been handed to the worker by this process
+_resumed: Set[str] = set()
+_resumed_lock = threading.Lock()
+
+
+def notify(workspace_id: str) -> None:
+    """Signals that the workspace has newly queued items; starts the worker if needed."""
+    _worker.notify(workspace_id)
+
+
+def resume(workspace_id: str) -> None:
+    """
+    Wakes the worker for items queued before this process started, the first time the
+    workspace is used. Later calls are no-ops.
+    """
+    with _resumed_lock:
+        if workspace_id in _resumed:
+            return
+        _resumed.add(workspace_id)
+    if db.get_embedding_queue_stats(workspace_id, MAX_ATTEMPTS)["pending"] or embedding_models.get_backfill_model(workspace_id):
+        notify(workspace_id)
+
+
+def get_status(workspace_id: str) -> Dict[str, Any]:
+    """Reports queue depth and indexing lag for the workspace."""
+    stats = db.get_embedding_queue_stats(workspace_id, MAX_ATTEMPTS)
+    oldest = stats.pop("oldest_pending_at")
+    last_run = _worker.last_run(workspace_id)
+    return {
+        **stats,
+        "oldest_pending_at": oldest.isoformat() if oldest else None,
+        "lag_seconds": round((datetime.now(timezone.utc) - oldest).total_seconds(), 3) if oldest else 0.0,
+        "max_attempts": MAX_ATTEMPTS,
+        "worker_running": _worker.running,
+        "last_worker_run_at": last_run.isoformat() if last_run else None,
+        "embedding_cache": embedding_cache.get_stats(workspace_id),
+        "embedding_models": embedding_models.get_status(workspace_id),
+    }
+
+
+def retry_failed(workspace_id: str) -> int:
+    """Re-arms queue entries that exhausted their attempts and wakes the worker. Returns how many."""
+    count = db.reset_failed_embedding_queue_entries(workspace_id, MAX_ATTEMPTS)
+    if count:
+        notify(workspace_id)
+    return count
+
+
+def shutdown(timeout: Optional[float] = 5.0) -> None:
+    """Stops the worker thread. Queued entries persist and are picked up on the next notify."""
+    _worker.stop(timeout)
+    embedding_cache.close_all()
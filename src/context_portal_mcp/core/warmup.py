@@ -0,0 +1,99 @@
+# src/context_portal_mcp/core/warmup.py
+"""
+Opt-in background warm-up of the semantic search stack (--warm-up-model).
+
+Loading the embedding model takes several seconds, and without warm-up it happens inside
+the first semantic search or indexing batch. `start()` instead loads the model, runs one
+forward pass and opens the workspace's Chroma collection on a daemon thread while the
+server starts accepting tool calls. Writes never wait for it: logged items are recorded
+in the embedding queue and indexed by the worker once the model is available.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ..db import vector_store_service
+from . import embedding_models, embedding_service, indexing_queue
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+# workspace_id -> "loading" | "ready" | "failed"
+_vector_store_state: Dict[str, str] = {}
+_started_at: Optional[float] = None
+_finished_at: Optional[float] = None
+
+
+def _run(workspace_id: Optional[str]) -> None:
+    global _finished_at
+    model = None
+    try:
+        model = embedding_models.get_active_model(workspace_id) if workspace_id else None
+        embedding_service.warm_up(model["model_name"] if model else None)
+        log.info("Embedding model warmed up.")
+    except Exception as e:
+        log.error(f"Embedding model warm-up failed: {e}", exc_info=True)
+    if workspace_id:
+        try:
+            if model is None:
+                raise RuntimeError("Embedding model of the workspace could not be determined.")
+            vector_store_service.get_or_create_collection(workspace_id, model["collection_name"], model["model_name"])
+            _vector_store_state[workspace_id] = "ready"
+            log.info(f"Vector store warmed up for workspace '{workspace_id}'.")
+        except Exception as e:
+            _vector_store_state[workspace_id] = "failed"
+            log.error(f"Vector store warm-up failed for workspace '{workspace_id}': {e}", exc_info=True)
+        # Index whatever was logged while the model was loading
+        indexing_queue.notify(workspace_id)
+    _finished_at = time.monotonic()
+
+
+def start(workspace_id: Optional[str] = None) -> None:
+    """Starts warming up on a daemon thread. Only the first call has any effect."""
+    global _thread, _started_at
+    with _lock:
+        if _thread is not None:
+            return
+        if workspace_id:
+            _vector_store_state[workspace_id] = "loading"
+        _started_at = time.monotonic()
+        _thread = threading.Thread(target=_run, args=(workspace_id,), name="conport-warmup", daemon=True)
+        _thread.start()
+
+
+def wait(timeout: Optional[float] = None) -> bool:
+    """Waits for a started warm-up to finish. Returns False on timeout."""
+    thread = _thread
+    if thread is not None:
+        thread.join(timeout)
+        return not thread.is_alive()
+    return True
+
+
+def get_status(workspace_id: str) -> Dict[str, Any]:
+    """Reports readiness of the embedding model and of the workspace's vector store."""
+    active = embedding_models.get_active_model(workspace_id)
+    model = embedding_service.get_model_status(active["model_name"])
+    vector_store = _vector_store_state.get(workspace_id)
+    if vector_store is None:
+        vector_store = "ready" if vector_store_service.has_collection(workspace_id, active["collection_name"]) else "not_loaded"
+    warm_up: Dict[str, Any] = {"enabled": _thread is not None}
+    if _started_at is not None:
+        warm_up["running"] = _finished_at is None
+        warm_up["elapsed_seconds"] = round((_finished_at or time.monotonic()) - _started_at, 3)
+    if "failed" in (model["state"], vector_store):
+        status = "failed"
+    elif model["state"] == "ready" and not warm_up.get("running"):
+        status = "ready" # An unopened collection only costs a ChromaDB import on first use
+    elif warm_up.get("running") or model["state"] == "loading":
+        status = "warming_up"
+    else:
+        status = "cold" # Loaded on first semantic use
+    return {
+        "status": status,
+        "model": model,
+        "vector_store": vector_store,
+        "warm_up": warm_up,
+    }
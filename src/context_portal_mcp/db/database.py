@@ -2,16 +2,21 @@
 
 import sqlite3
 import json
+import base64
 import os
+import queue
+import re
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Iterator
 from datetime import datetime, timedelta, timezone
 
-from alembic.config import Config
-from alembic import command
 import logging
 
-from ..core.config import get_database_path
+from pydantic import TypeAdapter
+
+from ..core.config import get_database_path, get_db_reader_pool_size
 from ..core.exceptions import DatabaseError, ConfigurationError
 from . import models # Import models from the same directory
 import shutil # For copying directories
@@ -42,6 +47,9 @@ sqlite3.register_adapter(datetime, _adapt_datetime)
 sqlite3.register_converter("DATETIME", _convert_datetime)
 sqlite3.register_converter("TIMESTAMP", _convert_datetime)
 
+# Serializes standalone datetimes the way model_dump(mode='json') does ('Z' for UTC)
+_DATETIME_ADAPTER = TypeAdapter(datetime)
+
 # --- Alembic File Content Constants ---
 
 ALEMBIC_INI_CONTENT = """
@@ -371,51 +379,813 @@ def downgrade() -> None:
     # ### end Alembic commands ###
 """
 
+EMBEDDING_QUEUE_SCHEMA_CONTENT = """
+\"\"\"Durable embedding queue
+
+Revision ID: 20261018
+Revises: 20250617
+Create Date: 2026-10-18 09:00:00.000000
+
+\"\"\"
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018'
+down_revision = '20250617'
+branch_labels = None
+depends_on = None
+
+# item_type -> table whose rows are embedded into the vector store
+EMBEDDED_TABLES = {
+    'decision': 'decisions',
+    'progress_entry': 'progress_entries',
+    'system_pattern': 'system_patterns',
+    'custom_data': 'custom_data',
+}
+
+
+def upgrade() -> None:
+    # One row per item whose vector needs (re)building or removing. Re-enqueueing an item
+    # replaces its row, giving it a new id, so a worker that is mid-batch never drops it.
+    op.execute('''
+    CREATE TABLE embedding_queue (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_type VARCHAR(255) NOT NULL,
+        item_id INTEGER NOT NULL,
+        enqueued_at DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%S+00:00', 'now')),
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        UNIQUE (item_type, item_id)
+    );
+    ''')
+    op.execute('CREATE INDEX ix_embedding_queue_attempts_id ON embedding_queue (attempts, id)')
+
+    for item_type, table in EMBEDDED_TABLES.items():
+        op.execute(f'''
+        CREATE TRIGGER {table}_enqueue_embedding AFTER INSERT ON {table}
+        BEGIN
+            INSERT OR REPLACE INTO embedding_queue (item_type, item_id) VALUES ('{item_type}', new.id);
+        END;
+        ''')
+        # Deleted items are queued too; the worker removes vectors of items that no longer exist.
+        op.execute(f'''
+        CREATE TRIGGER {table}_enqueue_embedding_delete AFTER DELETE ON {table}
+        BEGIN
+            INSERT OR REPLACE INTO embedding_queue (item_type, item_id) VALUES ('{item_type}', old.id);
+        END;
+        ''')
+
+    # Queue all existing items so workspaces created before the queue get indexed.
+    for item_type, table in EMBEDDED_TABLES.items():
+        op.execute(f"INSERT OR IGNORE INTO embedding_queue (item_type, item_id) SELECT '{item_type}', id FROM {table}")
+
+
+def downgrade() -> None:
+    for table in EMBEDDED_TABLES.values():
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_enqueue_embedding')
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_enqueue_embedding_delete')
+    op.drop_index('ix_embedding_queue_attempts_id', table_name='embedding_queue')
+    op.drop_table('embedding_queue')
+"""
+
+ITEM_TAGS_SCHEMA_CONTENT = """
+\"\"\"Normalized item tags
+
+Revision ID: 20261018_02
+Revises: 20261018
+Create Date: 2026-10-18 12:00:00.000000
+
+\"\"\"
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_02'
+down_revision = '20261018'
+branch_labels = None
+depends_on = None
+
+# item_type -> table with a JSON array 'tags' column
+TAGGED_TABLES = {
+    'decision': 'decisions',
+    'system_pattern': 'system_patterns',
+}
+
+
+def upgrade() -> None:
+    # (item_type, tag, item_id) as the key makes tag lookups a covering index range scan.
+    op.execute('''
+    CREATE TABLE item_tags (
+        item_type VARCHAR(255) NOT NULL,
+        tag TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        PRIMARY KEY (item_type, tag, item_id)
+    ) WITHOUT ROWID;
+    ''')
+    op.execute('CREATE INDEX ix_item_tags_item ON item_tags (item_type, item_id)')
+
+    for item_type, table in TAGGED_TABLES.items():
+        insert_tags = f'''
+            INSERT OR IGNORE INTO item_tags (item_type, tag, item_id)
+            SELECT '{item_type}', json_each.value, new.id FROM json_each(new.tags)
+            WHERE json_each.type = 'text';
+        '''
+        op.execute(f'''
+        CREATE TRIGGER {table}_tags_after_insert AFTER INSERT ON {table}
+        WHEN json_valid(new.tags) AND json_type(new.tags) = 'array'
+        BEGIN
+            {insert_tags}
+        END;
+        ''')
+        op.execute(f'''
+        CREATE TRIGGER {table}_tags_after_delete AFTER DELETE ON {table}
+        BEGIN
+            DELETE FROM item_tags WHERE item_type = '{item_type}' AND item_id = old.id;
+        END;
+        ''')
+        op.execute(f'''
+        CREATE TRIGGER {table}_tags_after_update AFTER UPDATE OF tags ON {table}
+        BEGIN
+            DELETE FROM item_tags WHERE item_type = '{item_type}' AND item_id = old.id;
+            INSERT OR IGNORE INTO item_tags (item_type, tag, item_id)
+            SELECT '{item_type}', json_each.value, new.id FROM json_each(
+                CASE WHEN json_valid(new.tags) AND json_type(new.tags) = 'array' THEN new.tags ELSE '[]' END
+            )
+            WHERE json_each.type = 'text';
+        END;
+        ''')
+        # Backfill tags of existing rows
+        op.execute(f'''
+        INSERT OR IGNORE INTO item_tags (item_type, tag, item_id)
+        SELECT '{item_type}', json_each.value, t.id
+        FROM {table} t, json_each(t.tags)
+        WHERE t.tags IS NOT NULL AND json_valid(t.tags) AND json_type(t.tags) = 'array' AND json_each.type = 'text'
+        ''')
+
+    # system_patterns is written with INSERT OR REPLACE on its unique name. Rows removed by
+    # REPLACE do not fire delete triggers, so drop their tags before the new row goes in.
+    op.execute('''
+    CREATE TRIGGER system_patterns_tags_before_insert BEFORE INSERT ON system_patterns
+    BEGIN
+        DELETE FROM item_tags WHERE item_type = 'system_pattern'
+            AND item_id IN (SELECT id FROM system_patterns WHERE name = new.name);
+    END;
+    ''')
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS system_patterns_tags_before_insert')
+    for table in TAGGED_TABLES.values():
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_tags_after_insert')
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_tags_after_delete')
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_tags_after_update')
+    op.drop_index('ix_item_tags_item', table_name='item_tags')
+    op.drop_table('item_tags')
+"""
+
+LIST_PAGINATION_INDEXES_SCHEMA_CONTENT = """
+\"\"\"Keyset pagination indexes
+
+Revision ID: 20261018_03
+Revises: 20261018_02
+Create Date: 2026-10-18 13:00:00.000000
+
+\"\"\"
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_03'
+down_revision = '20261018_02'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns): list tools page newest first on (timestamp, id),
+# so each page is an index range scan regardless of its depth.
+PAGINATION_INDEXES = [
+    ('ix_decisions_timestamp_id', 'decisions', ['timestamp', 'id']),
+    ('ix_progress_entries_timestamp_id', 'progress_entries', ['timestamp', 'id']),
+    ('ix_system_patterns_timestamp_id', 'system_patterns', ['timestamp', 'id']),
+    ('ix_custom_data_timestamp_id', 'custom_data', ['timestamp', 'id']),
+    ('ix_custom_data_category_timestamp_id', 'custom_data', ['category', 'timestamp', 'id']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in PAGINATION_INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(PAGINATION_INDEXES):
+        op.drop_index(name, table_name=table)
+"""
+
+SECONDARY_INDEXES_SCHEMA_CONTENT = """
+\"\"\"Secondary indexes for filters and recent activity
+
+Revision ID: 20261018_04
+Revises: 20261018_03
+Create Date: 2026-10-18 14:00:00.000000
+
+\"\"\"
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_04'
+down_revision = '20261018_03'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns). decisions, progress_entries and system_patterns are already
+# covered for 'timestamp >= ? ORDER BY timestamp DESC' by the (timestamp, id) indexes of 20261018_03.
+SECONDARY_INDEXES = [
+    ('ix_progress_entries_status_timestamp', 'progress_entries', ['status', 'timestamp']),
+    ('ix_progress_entries_parent_id_timestamp', 'progress_entries', ['parent_id', 'timestamp']),
+    ('ix_product_context_history_timestamp', 'product_context_history', ['timestamp']),
+    ('ix_active_context_history_timestamp', 'active_context_history', ['timestamp']),
+    ('ix_context_links_timestamp', 'context_links', ['timestamp']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in SECONDARY_INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    # Give the planner statistics for the new indexes
+    op.execute('ANALYZE')
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(SECONDARY_INDEXES):
+        op.drop_index(name, table_name=table)
+"""
+
+ACTIVITY_LOG_SCHEMA_CONTENT = """
+\"\"\"Activity log
+
+Revision ID: 20261018_05
+Revises: 20261018_04
+Create Date: 2026-10-18 15:00:00.000000
+
+\"\"\"
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_05'
+down_revision = '20261018_04'
+branch_labels = None
+depends_on = None
+
+# Same text format the application writes for timestamps (see _adapt_datetime).
+NOW = "strftime('%Y-%m-%dT%H:%M:%S+00:00', 'now')"
+
+# table -> (item_type, SQL for item_key given a row alias, logged ops)
+# item_key is the natural key of items that are replaced in place (new id on every log).
+ACTIVITY_TABLES = {
+    'decisions': ('decision', None, ('INSERT', 'UPDATE', 'DELETE')),
+    'progress_entries': ('progress_entry', None, ('INSERT', 'UPDATE', 'DELETE')),
+    'system_patterns': ('system_pattern', "json_object('name', {row}.name)", ('INSERT', 'UPDATE', 'DELETE')),
+    'custom_data': ('custom_data', "json_object('category', {row}.category, 'key', {row}.key)", ('INSERT', 'UPDATE', 'DELETE')),
+    'context_links': ('context_link', None, ('INSERT', 'DELETE')),
+    # A history row is written for every context update, so its insert is logged as an 'update'
+    'product_context_history': ('product_context', None, ('INSERT',)),
+    'active_context_history': ('active_context', None, ('INSERT',)),
+}
+LOGGED_OP = {'INSERT': 'insert', 'UPDATE': 'update', 'DELETE': 'delete'}
+
+
+def upgrade() -> None:
+    op.execute('''
+    CREATE TABLE activity_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME NOT NULL,
+        item_type VARCHAR(255) NOT NULL,
+        item_id INTEGER NOT NULL,
+        op VARCHAR(16) NOT NULL,
+        item_key TEXT
+    );
+    ''')
+    # Per-type newest-first scans, the "is there a newer entry for this item" probe,
+    # and newest-first deletions.
+    op.execute('CREATE INDEX ix_activity_log_type_timestamp ON activity_log (item_type, timestamp)')
+    op.execute('CREATE INDEX ix_activity_log_item ON activity_log (item_type, COALESCE(item_key, item_id), id)')
+    op.execute("CREATE INDEX ix_activity_log_deletions ON activity_log (timestamp) WHERE op = 'delete'")
+
+    for table, (item_type, item_key_sql, ops) in ACTIVITY_TABLES.items():
+        for sql_op in ops:
+            row = 'old' if sql_op == 'DELETE' else 'new'
+            logged_op = 'update' if table.endswith('_history') else LOGGED_OP[sql_op]
+            item_key = item_key_sql.format(row=row) if item_key_sql else 'NULL'
+            op.execute(f'''
+            CREATE TRIGGER {table}_activity_{sql_op.lower()} AFTER {sql_op} ON {table}
+            BEGIN
+                INSERT INTO activity_log (timestamp, item_type, item_id, op, item_key)
+                VALUES ({NOW}, '{item_type}', {row}.id, '{logged_op}', {item_key});
+            END;
+            ''')
+        # Seed the log with existing rows so the summary keeps covering them
+        item_key = item_key_sql.format(row='t') if item_key_sql else 'NULL'
+        seeded_op = 'update' if table.endswith('_history') else 'insert'
+        op.execute(f'''
+        INSERT INTO activity_log (timestamp, item_type, item_id, op, item_key)
+        SELECT t.timestamp, '{item_type}', t.id, '{seeded_op}', {item_key} FROM {table} t ORDER BY t.timestamp, t.id
+        ''')
+
+
+def downgrade() -> None:
+    for table, (_, _, ops) in ACTIVITY_TABLES.items():
+        for sql_op in ops:
+            op.execute(f'DROP TRIGGER IF EXISTS {table}_activity_{sql_op.lower()}')
+    op.drop_index('ix_activity_log_deletions', table_name='activity_log')
+    op.drop_index('ix_activity_log_item', table_name='activity_log')
+    op.drop_index('ix_activity_log_type_timestamp', table_name='activity_log')
+    op.drop_table('activity_log')
+"""
+
+CUSTOM_DATA_FTS_TRIGGERS_SCHEMA_CONTENT = """
+\"\"\"Fix custom_data FTS delete and update triggers
+
+Revision ID: 20261018_06
+Revises: 20261018_05
+Create Date: 2026-10-18 15:30:00.000000
+
+\"\"\"
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_06'
+down_revision = '20261018_05'
+branch_labels = None
+depends_on = None
+
+
+def _has_custom_data_fts() -> bool:
+    # The initial migration only creates custom_data_fts when FTS5 is available
+    return op.get_bind().exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'custom_data_fts'"
+    ).first() is not None
+
+
+def upgrade() -> None:
+    if not _has_custom_data_fts():
+        return
+    # custom_data_fts stores its own content, so the FTS5 'delete' command (meant for
+    # external-content tables) fails and aborts every DELETE/UPDATE on custom_data.
+    op.execute('DROP TRIGGER IF EXISTS custom_data_after_delete')
+    op.execute('DROP TRIGGER IF EXISTS custom_data_after_update')
+    op.execute('''
+    CREATE TRIGGER custom_data_after_delete AFTER DELETE ON custom_data
+    BEGIN
+        DELETE FROM custom_data_fts WHERE rowid = old.id;
+    END;
+    ''')
+    op.execute('''
+    CREATE TRIGGER custom_data_after_update AFTER UPDATE ON custom_data
+    BEGIN
+        DELETE FROM custom_data_fts WHERE rowid = old.id;
+        INSERT INTO custom_data_fts (rowid, category, key, value_text)
+        VALUES (new.id, new.category, new.key, new.value);
+    END;
+    ''')
+
+
+def downgrade() -> None:
+    if not _has_custom_data_fts():
+        return
+    op.execute('DROP TRIGGER IF EXISTS custom_data_after_delete')
+    op.execute('DROP TRIGGER IF EXISTS custom_data_after_update')
+    op.execute('''
+    CREATE TRIGGER custom_data_after_delete AFTER DELETE ON custom_data
+    BEGIN
+        INSERT INTO custom_data_fts (custom_data_fts, rowid, category, key, value_text)
+        VALUES ('delete', old.id, old.category, old.key, old.value);
+    END;
+    ''')
+    op.execute('''
+    CREATE TRIGGER custom_data_after_update AFTER UPDATE ON custom_data
+    BEGIN
+        INSERT INTO custom_data_fts (custom_data_fts, rowid, category, key, value_text)
+        VALUES ('delete', old.id, old.category, old.key, old.value);
+        INSERT INTO custom_data_fts (rowid, category, key, value_text)
+        VALUES (new.id, new.category, new.key, new.value);
+    END;
+    ''')
+"""
+
+EMBEDDING_MODELS_SCHEMA_CONTENT = """
+\"\"\"Embedding models per workspace
+
+Revision ID: 20261018_07
+Revises: 20261018_06
+Create Date: 2026-10-18 16:00:00.000000
+
+\"\"\"
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_07'
+down_revision = '20261018_06'
+branch_labels = None
+depends_on = None
+
+# Model and collection every workspace was indexed with before models became configurable
+LEGACY_MODEL = 'all-MiniLM-L6-v2'
+LEGACY_COLLECTION = 'conport_semantic_store'
+LEGACY_DIMENSION = 384
+
+
+def upgrade() -> None:
+    # One 'active' model serves searches; a 'building' model is being backfilled into its own
+    # collection and replaces the active one when done. backfill_* is the backfill's resume point.
+    op.execute('''
+    CREATE TABLE embedding_models (
+        model_name VARCHAR(255) PRIMARY KEY,
+        collection_name VARCHAR(255) NOT NULL,
+        dimension INTEGER,
+        status VARCHAR(16) NOT NULL,
+        backfill_item_type VARCHAR(255),
+        backfill_after_id INTEGER,
+        created_at DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%S+00:00', 'now')),
+        updated_at DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%S+00:00', 'now'))
+    );
+    ''')
+    op.execute("CREATE UNIQUE INDEX ix_embedding_models_active ON embedding_models (status) WHERE status = 'active'")
+    op.execute("CREATE UNIQUE INDEX ix_embedding_models_building ON embedding_models (status) WHERE status = 'building'")
+    # Workspaces with items were indexed with the legacy model; pin it so a different
+    # server default does not silently switch them to an empty collection.
+    op.execute(f'''
+    INSERT INTO embedding_models (model_name, collection_name, dimension, status)
+    SELECT '{LEGACY_MODEL}', '{LEGACY_COLLECTION}', {LEGACY_DIMENSION}, 'active'
+    WHERE EXISTS (SELECT 1 FROM decisions) OR EXISTS (SELECT 1 FROM progress_entries)
+       OR EXISTS (SELECT 1 FROM system_patterns) OR EXISTS (SELECT 1 FROM custom_data)
+    ''')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_embedding_models_building', table_name='embedding_models')
+    op.drop_index('ix_embedding_models_active', table_name='embedding_models')
+    op.drop_table('embedding_models')
+"""
+
+PROGRESS_UPDATE_EMBEDDING_SCHEMA_CONTENT = """
+\"\"\"Re-embed updated progress entries
+
+Revision ID: 20261018_08
+Revises: 20261018_07
+Create Date: 2026-10-18 17:00:00.000000
+
+\"\"\"
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_08'
+down_revision = '20261018_07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # update_progress changes the embedded text (status, description) or its metadata
+    # (parent_id); queue the entry only when one of them actually changed value.
+    op.execute('''
+    CREATE TRIGGER progress_entries_enqueue_embedding_update
+    AFTER UPDATE OF status, description, parent_id ON progress_entries
+    WHEN old.status IS NOT new.status OR old.description IS NOT new.description
+      OR old.parent_id IS NOT new.parent_id
+    BEGIN
+        INSERT OR REPLACE INTO embedding_queue (item_type, item_id) VALUES ('progress_entry', new.id);
+    END;
+    ''')
+    # Entries updated before this revision still have vectors of their logged text
+    op.execute("INSERT OR IGNORE INTO embedding_queue (item_type, item_id) SELECT 'progress_entry', id FROM progress_entries")
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS progress_entries_enqueue_embedding_update')
+"""
+
+CONTEXT_LINK_ENDPOINT_INDEXES_SCHEMA_CONTENT = """
+\"\"\"Composite indexes on context link endpoints
+
+Revision ID: 20261018_09
+Revises: 20261018_08
+Create Date: 2026-10-18 18:00:00.000000
+
+\"\"\"
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_09'
+down_revision = '20261018_08'
+branch_labels = None
+depends_on = None
+
+# Links are looked up by endpoint, (type, id), one index per end; with timestamp last each
+# endpoint's links are read newest first without a sort. They supersede the single-column
+# item_type indexes of the initial schema (a prefix of them, and too unselective to be useful).
+ENDPOINT_INDEXES = [
+    ('ix_context_links_source_item', ['source_item_type', 'source_item_id', 'timestamp']),
+    ('ix_context_links_target_item', ['target_item_type', 'target_item_id', 'timestamp']),
+]
+SUPERSEDED_INDEXES = [
+    ('ix_context_links_source_item_type', ['source_item_type']),
+    ('ix_context_links_target_item_type', ['target_item_type']),
+]
+
+
+def upgrade() -> None:
+    for name, columns in ENDPOINT_INDEXES:
+        op.create_index(name, 'context_links', columns, unique=False)
+    for name, _ in SUPERSEDED_INDEXES:
+        op.drop_index(name, table_name='context_links')
+    # Give the planner statistics for the new indexes
+    op.execute('ANALYZE context_links')
+
+
+def downgrade() -> None:
+    for name, columns in SUPERSEDED_INDEXES:
+        op.create_index(name, 'context_links', columns, unique=False)
+    for name, _ in reversed(ENDPOINT_INDEXES):
+        op.drop_index(name, table_name='context_links')
+"""
+
+LINK_CASCADE_SCHEMA_CONTENT = """
+\"\"\"Cascade deleted and replaced items to their links, vectors and FTS rows
+
+Revision ID: 20261018_10
+Revises: 20261018_09
+Create Date: 2026-10-18 19:00:00.000000
+
+\"\"\"
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_10'
+down_revision = '20261018_09'
+branch_labels = None
+depends_on = None
+
+# item_type -> table of items that context links refer to by id
+LINKED_TABLES = {
+    'decision': 'decisions',
+    'progress_entry': 'progress_entries',
+    'system_pattern': 'system_patterns',
+    'custom_data': 'custom_data',
+}
+# Tables written with INSERT OR REPLACE -> (item_type, condition matching the row a new row replaces)
+REPLACED_TABLES = {
+    'system_patterns': ('system_pattern', 'name = new.name'),
+    'custom_data': ('custom_data', 'category = new.category AND key = new.key'),
+}
+# Links of a replaced row point here until its replacement has an id
+REPLACED_ID = '(replaced)'
+
+
+def _has_custom_data_fts() -> bool:
+    # The initial migration only creates custom_data_fts when FTS5 is available
+    return op.get_bind().exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'custom_data_fts'"
+    ).first() is not None
+
+
+def upgrade() -> None:
+    for item_type, table in LINKED_TABLES.items():
+        op.execute(f'''
+        CREATE TRIGGER {table}_delete_links AFTER DELETE ON {table}
+        BEGIN
+            DELETE FROM context_links WHERE source_item_type = '{item_type}' AND source_item_id = CAST(old.id AS TEXT);
+            DELETE FROM context_links WHERE target_item_type = '{item_type}' AND target_item_id = CAST(old.id AS TEXT);
+        END;
+        ''')
+
+    # Rows removed by REPLACE do not fire delete triggers. Before the new row goes in, queue
+    # the old row so the indexing worker removes its vector, drop its FTS row and park its
+    # links; once the new row has its id, the links are moved over to it.
+    for table, (item_type, replaced_row) in REPLACED_TABLES.items():
+        replaced_ids = f"SELECT CAST(id AS TEXT) FROM {table} WHERE {replaced_row}"
+        fts_cleanup = ''
+        if table == 'custom_data' and _has_custom_data_fts():
+            fts_cleanup = f'DELETE FROM custom_data_fts WHERE rowid IN (SELECT id FROM {table} WHERE {replaced_row});'
+        op.execute(f'''
+        CREATE TRIGGER {table}_before_replace BEFORE INSERT ON {table}
+        BEGIN
+            INSERT OR REPLACE INTO embedding_queue (item_type, item_id) SELECT '{item_type}', id FROM {table} WHERE {replaced_row};
+            {fts_cleanup}
+            UPDATE context_links SET source_item_id = '{REPLACED_ID}'
+                WHERE source_item_type = '{item_type}' AND source_item_id IN ({replaced_ids});
+            UPDATE context_links SET target_item_id = '{REPLACED_ID}'
+                WHERE target_item_type = '{item_type}' AND target_item_id IN ({replaced_ids});
+        END;
+        ''')
+        op.execute(f'''
+        CREATE TRIGGER {table}_after_replace AFTER INSERT ON {table}
+        BEGIN
+            UPDATE context_links SET source_item_id = CAST(new.id AS TEXT)
+                WHERE source_item_type = '{item_type}' AND source_item_id = '{REPLACED_ID}';
+            UPDATE context_links SET target_item_id = CAST(new.id AS TEXT)
+                WHERE target_item_type = '{item_type}' AND target_item_id = '{REPLACED_ID}';
+        END;
+        ''')
+
+
+def downgrade() -> None:
+    for table in REPLACED_TABLES:
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_before_replace')
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_after_replace')
+    for table in LINKED_TABLES.values():
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_delete_links')
+"""
+
+# Migration scripts bundled with the server, in revision order: (file name, content).
+MIGRATION_SCRIPTS: List[Tuple[str, str]] = [
+    ("2025_06_17_initial_schema.py", INITIAL_SCHEMA_CONTENT),
+    ("2026_10_18_embedding_queue.py", EMBEDDING_QUEUE_SCHEMA_CONTENT),
+    ("2026_10_18_02_item_tags.py", ITEM_TAGS_SCHEMA_CONTENT),
+    ("2026_10_18_03_list_pagination_indexes.py", LIST_PAGINATION_INDEXES_SCHEMA_CONTENT),
+    ("2026_10_18_04_secondary_indexes.py", SECONDARY_INDEXES_SCHEMA_CONTENT),
+    ("2026_10_18_05_activity_log.py", ACTIVITY_LOG_SCHEMA_CONTENT),
+    ("2026_10_18_06_custom_data_fts_triggers.py", CUSTOM_DATA_FTS_TRIGGERS_SCHEMA_CONTENT),
+    ("2026_10_18_07_embedding_models.py", EMBEDDING_MODELS_SCHEMA_CONTENT),
+    ("2026_10_18_08_progress_update_embedding.py", PROGRESS_UPDATE_EMBEDDING_SCHEMA_CONTENT),
+    ("2026_10_18_09_context_link_endpoint_indexes.py", CONTEXT_LINK_ENDPOINT_INDEXES_SCHEMA_CONTENT),
+    ("2026_10_18_10_link_cascade.py", LINK_CASCADE_SCHEMA_CONTENT),
+]
+
+def _script_revision(script_content: str) -> str:
+    match = re.search(r"^revision = '([^']+)'", script_content, re.MULTILINE)
+    if match is None:
+        raise ConfigurationError("Bundled migration script has no revision identifier.")
+    return match.group(1)
+
+# Revision an up-to-date workspace database is stamped with
+HEAD_REVISION = _script_revision(MIGRATION_SCRIPTS[-1][1])
+
 # --- Connection Handling ---
 
-_connections: Dict[str, sqlite3.Connection] = {}
+# PRAGMAs applied to every connection. WAL lets readers proceed while a write is in
+# flight; synchronous=NORMAL is durable under WAL except for power loss on the last commit.
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_CACHE_SIZE_KIB = 16384 # Negative cache_size values are interpreted as KiB by SQLite
+
+def _open_connection(db_path: Path, read_only: bool = False) -> sqlite3.Connection:
+    """Opens a tuned sqlite3 connection that may be used from any worker thread."""
+    conn = sqlite3.connect(
+        db_path,
+        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+        timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False # Access is serialized by the pool, not by thread identity
+    )
+    conn.row_factory = sqlite3.Row # Access columns by name
+    if not read_only:
+        # journal_mode is persistent in the database file, so setting it once on the writer is enough.
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KIB}")
+    if read_only:
+        conn.execute("PRAGMA query_only=ON")
+    return conn
+
+class _ConnectionPool:
+    """
+    Per-workspace pool holding a single writer connection and up to `reader_pool_size`
+    reader connections. SQLite allows one writer at a time, so writes are serialized on
+    a lock, while reads check out their own connection and run concurrently under WAL.
+    """
 
-def get_db_connection(workspace_id: str) -> sqlite3.Connection:
+    def __init__(self, db_path: Path, reader_pool_size: int):
+        self.db_path = db_path
+        self.reader_pool_size = max(0, reader_pool_size)
+        self._writer = _open_connection(db_path)
+        self._writer_lock = threading.RLock()
+        self._idle_readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all_readers: List[sqlite3.Connection] = []
+        self._all_readers_lock = threading.Lock()
+        self._reader_slots = threading.BoundedSemaphore(self.reader_pool_size or 1)
+
+    @property
+    def writer(self) -> sqlite3.Connection:
+        return self._writer
+
+    @contextmanager
+    def write_connection(self) -> Iterator[sqlite3.Connection]:
+        with self._writer_lock:
+            yield self._writer
+
+    @contextmanager
+    def read_connection(self) -> Iterator[sqlite3.Connection]:
+        if self.reader_pool_size == 0:
+            # Pooling disabled: reads share the writer connection.
+            with self.write_connection() as conn:
+                yield conn
+            return
+
+        with self._reader_slots:
+            try:
+                conn = self._idle_readers.get_nowait()
+            except queue.Empty:
+                conn = _open_connection(self.db_path, read_only=True)
+                with self._all_readers_lock:
+                    self._all_readers.append(conn)
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle_readers.put(conn)
+
+    def close(self) -> None:
+        with self._writer_lock:
+            self._writer.close()
+        with self._all_readers_lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers.clear()
+
+_pools: Dict[str, _ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(workspace_id: str) -> _ConnectionPool:
     """
-    Gets or creates a database connection for the given workspace.
-    This function now orchestrates the entire workspace initialization on first call.
+    Gets or creates the connection pool for the given workspace.
+    This function orchestrates the entire workspace initialization on first call.
     """
-    if workspace_id in _connections:
-        return _connections[workspace_id]
+    pool = _pools.get(workspace_id)
+    if pool is not None:
+        return pool
 
-    # 1. Ensure all necessary directories and Alembic files are present.
-    # This is the core of the deferred initialization.
-    ensure_alembic_files_exist(workspace_id)
+    with _pools_lock:
+        # Another thread may have finished initialization while we waited for the lock.
+        if workspace_id in _pools:
+            return _pools[workspace_id]
 
-    # 2. Get the database path (which should now exist within the created directories).
-    db_path = get_database_path(workspace_id)
-    
-    # 3. Run migrations to create/update the database schema.
-    run_migrations(db_path)
+        db_path = None
+        try:
+            db_path = get_database_path(workspace_id)
+
+            if schema_is_current(db_path):
+                # Already migrated: skip Alembic (and its imports) entirely.
+                log.debug(f"Database for workspace {workspace_id} is at head revision {HEAD_REVISION}")
+            else:
+                # 1. Ensure all necessary directories and Alembic files are present.
+                # This is the core of the deferred initialization.
+                ensure_alembic_files_exist(workspace_id)
+
+                # 2. Run migrations to create/update the database schema.
+                run_migrations(db_path)
+
+            # 4. Open and cache the pool (writer connection now, readers on demand).
+            pool = _ConnectionPool(db_path, get_db_reader_pool_size())
+            _pools[workspace_id] = pool
+            log.info(
+                f"Successfully initialized and connected to database for workspace: {workspace_id} "
+                f"(WAL, reader pool size {pool.reader_pool_size})"
+            )
+            return pool
+        except ConfigurationError as e:
+            log.error(f"Configuration error during DB connection for {workspace_id}: {e}")
+            raise DatabaseError(f"Configuration error getting DB path for {workspace_id}: {e}")
+        except sqlite3.Error as e:
+            log.error(f"SQLite error during DB connection for {workspace_id} at {db_path}: {e}")
+            raise DatabaseError(f"Failed to connect to database for {workspace_id} at {db_path}: {e}")
 
-    # 4. Establish and cache the database connection.
-    try:
-        conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-        conn.row_factory = sqlite3.Row # Access columns by name
-        _connections[workspace_id] = conn
-        log.info(f"Successfully initialized and connected to database for workspace: {workspace_id}")
-        return conn
-    except ConfigurationError as e:
-        log.error(f"Configuration error during DB connection for {workspace_id}: {e}")
-        raise DatabaseError(f"Configuration error getting DB path for {workspace_id}: {e}")
-    except sqlite3.Error as e:
-        log.error(f"SQLite error during DB connection for {workspace_id} at {db_path}: {e}")
-        raise DatabaseError(f"Failed to connect to database for {workspace_id} at {db_path}: {e}")
+def get_db_connection(workspace_id: str) -> sqlite3.Connection:
+    """
+    Gets the writer connection for the given workspace, initializing the workspace on first call.
+    Prefer _read_connection/_write_connection inside this module; they coordinate access across threads.
+    """
+    return _get_pool(workspace_id).writer
+
+@contextmanager
+def _read_connection(workspace_id: str) -> Iterator[sqlite3.Connection]:
+    """Checks out a reader connection from the workspace pool for the duration of the block."""
+    with _get_pool(workspace_id).read_connection() as conn:
+        yield conn
+
+@contextmanager
+def _write_connection(workspace_id: str) -> Iterator[sqlite3.Connection]:
+    """Holds the workspace's single writer connection for the duration of the block."""
+    with _get_pool(workspace_id).write_connection() as conn:
+        yield conn
 
 def close_db_connection(workspace_id: str):
-    """Closes the database connection for the given workspace, if open."""
-    if workspace_id in _connections:
-        _connections[workspace_id].close()
-        del _connections[workspace_id]
+    """Closes all pooled database connections for the given workspace, if open."""
+    with _pools_lock:
+        pool = _pools.pop(workspace_id, None)
+    if pool is not None:
+        pool.close()
 
 def close_all_connections():
     """Closes all active database connections."""
-    for workspace_id in list(_connections.keys()):
+    for workspace_id in list(_pools.keys()):
         close_db_connection(workspace_id)
 
 # --- Alembic Migration Integration ---
@@ -458,25 +1228,49 @@ def ensure_alembic_files_exist(workspace_id: str):
             log.error(f"Failed to write env.py at {alembic_env_py_path}: {e}")
             raise DatabaseError(f"Could not create env.py: {e}")
 
-    # Check for alembic/versions directory and initial schema
+    # Check for alembic/versions directory and the bundled migration scripts.
+    # Workspaces provisioned by older versions get any newer scripts added here.
     alembic_versions_path = alembic_dir_path / "versions"
-    initial_schema_path = alembic_versions_path / "2025_06_17_initial_schema.py"
-    if not initial_schema_path.exists():
-        log.info(f"Initial schema not found. Creating at {initial_schema_path}")
+    for script_name, script_content in MIGRATION_SCRIPTS:
+        script_path = alembic_versions_path / script_name
+        if script_path.exists():
+            continue
+        log.info(f"Migration script not found. Creating at {script_path}")
         try:
             os.makedirs(alembic_versions_path, exist_ok=True)
-            with open(initial_schema_path, 'w') as f:
-                f.write(INITIAL_SCHEMA_CONTENT)
+            with open(script_path, 'w') as f:
+                f.write(script_content)
         except OSError as e:
-            log.error(f"Failed to create initial schema at {initial_schema_path}: {e}")
-            raise DatabaseError(f"Could not create initial schema: {e}")
+            log.error(f"Failed to create migration script at {script_path}: {e}")
+            raise DatabaseError(f"Could not create migration script {script_name}: {e}")
+
+def schema_is_current(db_path: Path) -> bool:
+    """
+    Returns True if the database exists and its alembic_version is HEAD_REVISION.
+    Uses plain sqlite3, so checking an up-to-date workspace never imports Alembic.
+    """
+    if not db_path.exists():
+        return False
+    try:
+        conn = sqlite3.connect(str(db_path))
+        try:
+            row = conn.execute("SELECT version_num FROM alembic_version").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error: # No alembic_version table yet (new or pre-Alembic database)
+        return False
+    return row is not None and row[0] == HEAD_REVISION
 
 def run_migrations(db_path: Path):
     """
     Runs Alembic migrations to upgrade the database to the latest version.
-    This function is called on database connection to ensure schema is up-to-date.
+    This function is called on database connection when the schema is not at HEAD_REVISION.
     Alembic files are expected to be in the same directory as the database file.
     """
+    # Imported here: Alembic and SQLAlchemy are only needed when an upgrade actually runs
+    from alembic.config import Config
+    from alembic import command
+
     # The directory where alembic.ini and alembic/ scripts are expected to be,
     # which is now the same directory as the database file.
     alembic_config_and_scripts_dir = db_path.parent
@@ -561,451 +1355,512 @@ def _add_context_history_entry(
         raise DatabaseError(f"Failed to add entry to {history_table_name}: {e}")
 
 
+# --- Keyset pagination ---
+# List functions page newest first on (timestamp, id). A cursor encodes the last item of a
+# page, so the next page is an index range scan below it rather than an OFFSET over skipped rows.
+
+KEYSET_ORDER_BY = " ORDER BY timestamp DESC, id DESC"
+
+def encode_page_cursor(timestamp: datetime, item_id: int) -> str:
+    """Returns the opaque cursor for the page that follows the item with this timestamp and id."""
+    payload = json.dumps([_adapt_datetime(timestamp), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode_page_cursor(page_cursor: str) -> Tuple[str, int]:
+    try:
+        padded = page_cursor + "=" * (-len(page_cursor) % 4)
+        timestamp, item_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError): # Covers bad base64, bad JSON and a wrong payload shape
+        raise ValueError("Invalid pagination cursor.")
+    if not isinstance(timestamp, str) or not isinstance(item_id, int):
+        raise ValueError("Invalid pagination cursor.")
+    return timestamp, item_id
+
+def _keyset_conditions(page_cursor: Optional[str]) -> Tuple[List[str], List[Any]]:
+    """WHERE condition selecting the rows after `page_cursor` in KEYSET_ORDER_BY order."""
+    if page_cursor is None:
+        return [], []
+    timestamp, item_id = _decode_page_cursor(page_cursor)
+    return ["(timestamp, id) < (?, ?)"], [timestamp, item_id]
+
 # --- CRUD Operations ---
 
 def get_product_context(workspace_id: str) -> models.ProductContext:
     """Retrieves the product context."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, content FROM product_context WHERE id = 1")
-        row = cursor.fetchone()
-        if row:
-            content_dict = json.loads(row['content'])
-            return models.ProductContext(id=row['id'], content=content_dict)
-        else:
-            # Should not happen if initialized correctly, but handle defensively
-            raise DatabaseError("Product context row not found.")
-    except (sqlite3.Error, json.JSONDecodeError) as e:
-        raise DatabaseError(f"Failed to retrieve product context: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+    with _read_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, content FROM product_context WHERE id = 1")
+            row = cursor.fetchone()
+            if row:
+                content_dict = json.loads(row['content'])
+                return models.ProductContext(id=row['id'], content=content_dict)
+            else:
+                # Should not happen if initialized correctly, but handle defensively
+                raise DatabaseError("Product context row not found.")
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            raise DatabaseError(f"Failed to retrieve product context: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def update_product_context(workspace_id: str, update_args: models.UpdateContextArgs) -> None:
     """Updates the product context using either full content or a patch."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    try:
-        cursor = conn.cursor()
-        # Fetch current content to log to history
-        cursor.execute("SELECT content FROM product_context WHERE id = 1")
-        current_row = cursor.fetchone()
-        if not current_row:
-            raise DatabaseError("Product context row not found for updating (cannot log history).")
-        current_content_dict = json.loads(current_row['content'])
-
-        # Determine new content
-        new_final_content = {}
-        if update_args.content is not None:
-            new_final_content = update_args.content
-        elif update_args.patch_content is not None:
-            # Apply patch to a copy of current_content_dict for the new state
-            new_final_content = current_content_dict.copy()
-            # Iterate over patch_content to handle __DELETE__ sentinel
-            for key, value in update_args.patch_content.items():
-                if value == "__DELETE__":
-                    new_final_content.pop(key, None)  # Remove key, do nothing if key not found
-                else:
-                    new_final_content[key] = value
-        else:
-            # This case should be prevented by Pydantic model validation, but handle defensively
-            raise ValueError("No content or patch_content provided for update.")
-
-        # Log previous version to history
-        latest_version = _get_latest_context_version(cursor, "product_context_history")
-        new_version = latest_version + 1
-        _add_context_history_entry(
-            cursor,
-            "product_context_history",
-            new_version,
-            current_content_dict, # Log the content *before* the update
-            "update_product_context" # Basic change source
-        )
-
-        # Update the main product_context table
-        new_content_json = json.dumps(new_final_content)
-        cursor.execute("UPDATE product_context SET content = ? WHERE id = 1", (new_content_json,))
+    with _write_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        try:
+            cursor = conn.cursor()
+            # Fetch current content to log to history
+            cursor.execute("SELECT content FROM product_context WHERE id = 1")
+            current_row = cursor.fetchone()
+            if not current_row:
+                raise DatabaseError("Product context row not found for updating (cannot log history).")
+            current_content_dict = json.loads(current_row['content'])
+
+            # Determine new content
+            new_final_content = {}
+            if update_args.content is not None:
+                new_final_content = update_args.content
+            elif update_args.patch_content is not None:
+                # Apply patch to a copy of current_content_dict for the new state
+                new_final_content = current_content_dict.copy()
+                # Iterate over patch_content to handle __DELETE__ sentinel
+                for key, value in update_args.patch_content.items():
+                    if value == "__DELETE__":
+                        new_final_content.pop(key, None)  # Remove key, do nothing if key not found
+                    else:
+                        new_final_content[key] = value
+            else:
+                # This case should be prevented by Pydantic model validation, but handle defensively
+                raise ValueError("No content or patch_content provided for update.")
+
+            # Log previous version to history
+            latest_version = _get_latest_context_version(cursor, "product_context_history")
+            new_version = latest_version + 1
+            _add_context_history_entry(
+                cursor,
+                "product_context_history",
+                new_version,
+                current_content_dict, # Log the content *before* the update
+                "update_product_context" # Basic change source
+            )
+
+            # Update the main product_context table
+            new_content_json = json.dumps(new_final_content)
+            cursor.execute("UPDATE product_context SET content = ? WHERE id = 1", (new_content_json,))
         
-        conn.commit()
-        # No need to check rowcount here as history is logged regardless of content identity
-    except (sqlite3.Error, TypeError, json.JSONDecodeError, DatabaseError) as e: # Added DatabaseError
-        conn.rollback()
-        raise DatabaseError(f"Failed to update product_context: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+            conn.commit()
+            # No need to check rowcount here as history is logged regardless of content identity
+        except (sqlite3.Error, TypeError, json.JSONDecodeError, DatabaseError) as e: # Added DatabaseError
+            conn.rollback()
+            raise DatabaseError(f"Failed to update product_context: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
             
 def get_active_context(workspace_id: str) -> models.ActiveContext:
     """Retrieves the active context."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, content FROM active_context WHERE id = 1")
-        row = cursor.fetchone()
-        if row:
-            content_dict = json.loads(row['content'])
-            return models.ActiveContext(id=row['id'], content=content_dict)
-        else:
-            raise DatabaseError("Active context row not found.")
-    except (sqlite3.Error, json.JSONDecodeError) as e:
-        raise DatabaseError(f"Failed to retrieve active context: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+    with _read_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, content FROM active_context WHERE id = 1")
+            row = cursor.fetchone()
+            if row:
+                content_dict = json.loads(row['content'])
+                return models.ActiveContext(id=row['id'], content=content_dict)
+            else:
+                raise DatabaseError("Active context row not found.")
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            raise DatabaseError(f"Failed to retrieve active context: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def update_active_context(workspace_id: str, update_args: models.UpdateContextArgs) -> None:
     """Updates the active context using either full content or a patch."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    try:
-        cursor = conn.cursor()
-        # Fetch current content to log to history
-        cursor.execute("SELECT content FROM active_context WHERE id = 1")
-        current_row = cursor.fetchone()
-        if not current_row:
-            raise DatabaseError("Active context row not found for updating (cannot log history).")
-        current_content_dict = json.loads(current_row['content'])
-
-        # Determine new content
-        new_final_content = {}
-        if update_args.content is not None:
-            new_final_content = update_args.content
-        elif update_args.patch_content is not None:
-            new_final_content = current_content_dict.copy()
-            # Iterate over patch_content to handle __DELETE__ sentinel
-            for key, value in update_args.patch_content.items():
-                if value == "__DELETE__":
-                    new_final_content.pop(key, None)  # Remove key, do nothing if key not found
-                else:
-                    new_final_content[key] = value
-        else:
-            # This case should be prevented by Pydantic model validation, but handle defensively
-            raise ValueError("No content or patch_content provided for update.")
-
-        # Log previous version to history
-        latest_version = _get_latest_context_version(cursor, "active_context_history")
-        new_version = latest_version + 1
-        _add_context_history_entry(
-            cursor,
-            "active_context_history",
-            new_version,
-            current_content_dict, # Log the content *before* the update
-            "update_active_context" # Basic change source
-        )
-
-        # Update the main active_context table
-        new_content_json = json.dumps(new_final_content)
-        cursor.execute("UPDATE active_context SET content = ? WHERE id = 1", (new_content_json,))
+    with _write_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        try:
+            cursor = conn.cursor()
+            # Fetch current content to log to history
+            cursor.execute("SELECT content FROM active_context WHERE id = 1")
+            current_row = cursor.fetchone()
+            if not current_row:
+                raise DatabaseError("Active context row not found for updating (cannot log history).")
+            current_content_dict = json.loads(current_row['content'])
+
+            # Determine new content
+            new_final_content = {}
+            if update_args.content is not None:
+                new_final_content = update_args.content
+            elif update_args.patch_content is not None:
+                new_final_content = current_content_dict.copy()
+                # Iterate over patch_content to handle __DELETE__ sentinel
+                for key, value in update_args.patch_content.items():
+                    if value == "__DELETE__":
+                        new_final_content.pop(key, None)  # Remove key, do nothing if key not found
+                    else:
+                        new_final_content[key] = value
+            else:
+                # This case should be prevented by Pydantic model validation, but handle defensively
+                raise ValueError("No content or patch_content provided for update.")
+
+            # Log previous version to history
+            latest_version = _get_latest_context_version(cursor, "active_context_history")
+            new_version = latest_version + 1
+            _add_context_history_entry(
+                cursor,
+                "active_context_history",
+                new_version,
+                current_content_dict, # Log the content *before* the update
+                "update_active_context" # Basic change source
+            )
+
+            # Update the main active_context table
+            new_content_json = json.dumps(new_final_content)
+            cursor.execute("UPDATE active_context SET content = ? WHERE id = 1", (new_content_json,))
         
-        conn.commit()
-    except (sqlite3.Error, TypeError, json.JSONDecodeError, DatabaseError) as e: # Added DatabaseError
-        conn.rollback()
-        raise DatabaseError(f"Failed to update active context: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+            conn.commit()
+        except (sqlite3.Error, TypeError, json.JSONDecodeError, DatabaseError) as e: # Added DatabaseError
+            conn.rollback()
+            raise DatabaseError(f"Failed to update active context: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 # --- Add more CRUD functions for other models (ActiveContext, Decision, etc.) ---
 # Example: log_decision
 def log_decision(workspace_id: str, decision_data: models.Decision) -> models.Decision:
     """Logs a new decision."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    sql = """
-        INSERT INTO decisions (timestamp, summary, rationale, implementation_details, tags)
-        VALUES (?, ?, ?, ?, ?)
+    with _write_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        sql = """
+            INSERT INTO decisions (timestamp, summary, rationale, implementation_details, tags)
+            VALUES (?, ?, ?, ?, ?)
+        """
+        tags_json = json.dumps(decision_data.tags) if decision_data.tags is not None else None
+        params = (
+            decision_data.timestamp,
+            decision_data.summary,
+            decision_data.rationale,
+            decision_data.implementation_details,
+            tags_json
+        )
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            decision_id = cursor.lastrowid
+            conn.commit()
+            # Return the full decision object including the new ID
+            decision_data.id = decision_id
+            return decision_data
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to log decision: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def _tag_filter_conditions(
+    item_type: str,
+    id_column: str,
+    tags_filter_include_all: Optional[List[str]],
+    tags_filter_include_any: Optional[List[str]]
+) -> Tuple[List[str], List[Any]]:
     """
-    tags_json = json.dumps(decision_data.tags) if decision_data.tags is not None else None
-    params = (
-        decision_data.timestamp,
-        decision_data.summary,
-        decision_data.rationale,
-        decision_data.implementation_details,
-        tags_json
-    )
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, params)
-        decision_id = cursor.lastrowid
-        conn.commit()
-        # Return the full decision object including the new ID
-        decision_data.id = decision_id
-        return decision_data
-    except sqlite3.Error as e:
-        conn.rollback()
-        raise DatabaseError(f"Failed to log decision: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+    Builds WHERE conditions restricting `id_column` to items with the given tags,
+    using the item_tags index (kept in sync by triggers) instead of decoding JSON per row.
+    """
+    conditions: List[str] = []
+    params: List[Any] = []
+    if tags_filter_include_all:
+        tags = list(dict.fromkeys(tags_filter_include_all))
+        conditions.append(
+            f"{id_column} IN (SELECT item_id FROM item_tags WHERE item_type = ? AND tag IN ({', '.join('?' * len(tags))}) "
+            "GROUP BY item_id HAVING COUNT(*) = ?)"
+        )
+        params.extend([item_type, *tags, len(tags)])
+    if tags_filter_include_any:
+        tags = list(dict.fromkeys(tags_filter_include_any))
+        conditions.append(
+            f"{id_column} IN (SELECT item_id FROM item_tags WHERE item_type = ? AND tag IN ({', '.join('?' * len(tags))}))"
+        )
+        params.extend([item_type, *tags])
+    return conditions, params
 
 def get_decisions(
     workspace_id: str,
     limit: Optional[int] = None,
     tags_filter_include_all: Optional[List[str]] = None,
-    tags_filter_include_any: Optional[List[str]] = None
+    tags_filter_include_any: Optional[List[str]] = None,
+    page_cursor: Optional[str] = None
 ) -> List[models.Decision]:
-    """Retrieves decisions, optionally limited, and filtered by tags."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
+    """Retrieves decisions newest first, optionally limited, filtered by tags and resumed after `page_cursor`."""
+    with _read_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
     
-    base_sql = "SELECT id, timestamp, summary, rationale, implementation_details, tags FROM decisions"
-    conditions = []
-    params_list: List[Any] = []
-
-    if tags_filter_include_all:
-        # For each tag in the list, we need to ensure it exists in the 'tags' JSON array.
-        # This is tricky with pure SQL LIKE on a JSON array string.
-        # A more robust way is to fetch and filter in Python, or use json_each if available and suitable.
-        # For simplicity here, we'll filter in Python after fetching.
-        # This means 'limit' will apply before this specific tag filter.
-        # A true SQL solution would be more complex, e.g., using json_tree or json_each and subqueries.
-        pass # Will be handled post-query
-
-    if tags_filter_include_any:
-        # Similar to above, this is easier to handle post-query for now.
-        pass # Will be handled post-query
+        base_sql = "SELECT id, timestamp, summary, rationale, implementation_details, tags FROM decisions"
+        # Tag filters run in SQL so that LIMIT applies to the filtered result
+        conditions, params_list = _tag_filter_conditions(
+            "decision", "id", tags_filter_include_all, tags_filter_include_any
+        )
+        keyset_conditions, keyset_params = _keyset_conditions(page_cursor)
+        conditions.extend(keyset_conditions)
+        params_list.extend(keyset_params)
 
-    # ORDER BY must come before LIMIT
-    order_by_clause = " ORDER BY timestamp DESC"
+        # ORDER BY must come before LIMIT
+        order_by_clause = KEYSET_ORDER_BY
     
-    limit_clause = ""
-    if limit is not None and limit > 0:
-        limit_clause = " LIMIT ?"
-        params_list.append(limit)
-
-    # Construct the SQL query
-    # Since tag filtering will be done in Python for now, conditions list remains empty for SQL
-    sql = base_sql
-    if conditions: # This block will not be hit with current Python-based tag filtering
-        sql += " WHERE " + " AND ".join(conditions)
+        limit_clause = ""
+        if limit is not None and limit > 0:
+            limit_clause = " LIMIT ?"
+            params_list.append(limit)
+
+        sql = base_sql
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
     
-    sql += order_by_clause + limit_clause
+        sql += order_by_clause + limit_clause
     
-    params_tuple = tuple(params_list)
+        params_tuple = tuple(params_list)
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, params_tuple)
-        rows = cursor.fetchall()
-        decisions = [
-            models.Decision(
-                id=row['id'],
-                timestamp=row['timestamp'],
-                summary=row['summary'],
-                rationale=row['rationale'],
-                implementation_details=row['implementation_details'],
-                tags=json.loads(row['tags']) if row['tags'] else None
-            ) for row in rows
-        ]
-
-        # Python-based filtering for tags
-        if tags_filter_include_all:
-            decisions = [
-                d for d in decisions if d.tags and all(tag in d.tags for tag in tags_filter_include_all)
-            ]
-        
-        if tags_filter_include_any:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params_tuple)
+            rows = cursor.fetchall()
             decisions = [
-                d for d in decisions if d.tags and any(tag in d.tags for tag in tags_filter_include_any)
+                models.Decision(
+                    id=row['id'],
+                    timestamp=row['timestamp'],
+                    summary=row['summary'],
+                    rationale=row['rationale'],
+                    implementation_details=row['implementation_details'],
+                    tags=json.loads(row['tags']) if row['tags'] else None
+                ) for row in rows
             ]
-
-        return decisions
-    except (sqlite3.Error, json.JSONDecodeError) as e: # Added JSONDecodeError
-        raise DatabaseError(f"Failed to retrieve decisions: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+            return decisions
+        except (sqlite3.Error, json.JSONDecodeError) as e: # Added JSONDecodeError
+            raise DatabaseError(f"Failed to retrieve decisions: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def search_decisions_fts(workspace_id: str, query_term: str, limit: Optional[int] = 10) -> List[models.Decision]:
     """Searches decisions using FTS5 for the given query term."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    # The MATCH operator is used for FTS queries.
-    # We join back to the original 'decisions' table to get all columns.
-    # 'rank' is an FTS5 auxiliary function that indicates relevance.
-    sql = """
-        SELECT d.id, d.timestamp, d.summary, d.rationale, d.implementation_details, d.tags
-        FROM decisions_fts f
-        JOIN decisions d ON f.rowid = d.id
-        WHERE f.decisions_fts MATCH ? ORDER BY rank
-    """
-    params_list = [query_term]
+    with _read_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        # The MATCH operator is used for FTS queries.
+        # We join back to the original 'decisions' table to get all columns.
+        # 'rank' is an FTS5 auxiliary function that indicates relevance.
+        sql = """
+            SELECT d.id, d.timestamp, d.summary, d.rationale, d.implementation_details, d.tags
+            FROM decisions_fts f
+            JOIN decisions d ON f.rowid = d.id
+            WHERE f.decisions_fts MATCH ? ORDER BY rank
+        """
+        params_list = [query_term]
+
+        if limit is not None and limit > 0:
+            sql += " LIMIT ?"
+            params_list.append(limit)
 
-    if limit is not None and limit > 0:
-        sql += " LIMIT ?"
-        params_list.append(limit)
-
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, tuple(params_list))
-        rows = cursor.fetchall()
-        decisions_found = [
-            models.Decision(
-                id=row['id'],
-                timestamp=row['timestamp'],
-                summary=row['summary'],
-                rationale=row['rationale'],
-                implementation_details=row['implementation_details'],
-                tags=json.loads(row['tags']) if row['tags'] else None
-            ) for row in rows
-        ]
-        return decisions_found
-    except sqlite3.Error as e:
-        raise DatabaseError(f"Failed FTS search on decisions for term '{query_term}': {e}")
-    finally:
-        if cursor:
-            cursor.close()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, tuple(params_list))
+            rows = cursor.fetchall()
+            decisions_found = [
+                models.Decision(
+                    id=row['id'],
+                    timestamp=row['timestamp'],
+                    summary=row['summary'],
+                    rationale=row['rationale'],
+                    implementation_details=row['implementation_details'],
+                    tags=json.loads(row['tags']) if row['tags'] else None
+                ) for row in rows
+            ]
+            return decisions_found
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed FTS search on decisions for term '{query_term}': {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def delete_decision_by_id(workspace_id: str, decision_id: int) -> bool:
     """Deletes a decision by its ID. Returns True if deleted, False otherwise."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    sql = "DELETE FROM decisions WHERE id = ?"
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, (decision_id,))
-        # The FTS table 'decisions_fts' should be updated automatically by its AFTER DELETE trigger.
-        conn.commit()
-        return cursor.rowcount > 0
-    except sqlite3.Error as e:
-        conn.rollback()
-        raise DatabaseError(f"Failed to delete decision with ID {decision_id}: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+    with _write_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        sql = "DELETE FROM decisions WHERE id = ?"
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, (decision_id,))
+            # The FTS table 'decisions_fts' should be updated automatically by its AFTER DELETE trigger.
+            conn.commit()
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to delete decision with ID {decision_id}: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def log_progress(workspace_id: str, progress_data: models.ProgressEntry) -> models.ProgressEntry:
     """Logs a new progress entry."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    sql = """
-        INSERT INTO progress_entries (timestamp, status, description, parent_id)
-        VALUES (?, ?, ?, ?)
-    """
-    params = (
-        progress_data.timestamp,
-        progress_data.status,
-        progress_data.description,
-        progress_data.parent_id
-    )
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, params)
-        progress_id = cursor.lastrowid
-        conn.commit()
-        progress_data.id = progress_id
-        return progress_data
-    except sqlite3.Error as e:
-        conn.rollback()
-        # Consider checking for foreign key constraint errors if parent_id is invalid
-        raise DatabaseError(f"Failed to log progress entry: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+    with _write_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        sql = """
+            INSERT INTO progress_entries (timestamp, status, description, parent_id)
+            VALUES (?, ?, ?, ?)
+        """
+        params = (
+            progress_data.timestamp,
+            progress_data.status,
+            progress_data.description,
+            progress_data.parent_id
+        )
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            progress_id = cursor.lastrowid
+            conn.commit()
+            progress_data.id = progress_id
+            return progress_data
+        except sqlite3.Error as e:
+            conn.rollback()
+            # Consider checking for foreign key constraint errors if parent_id is invalid
+            raise DatabaseError(f"Failed to log progress entry: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 def get_progress(
     workspace_id: str,
     status_filter: Optional[str] = None,
     parent_id_filter: Optional[int] = None,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    page_cursor: Optional[str] = None
 ) -> List[models.ProgressEntry]:
-    """Retrieves progress entries, optionally filtered and limited."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    sql = "SELECT id, timestamp, status, description, parent_id FROM progress_entries"
-    conditions = []
-    params_list = []
-
-    if status_filter:
-        conditions.append("status = ?")
-        params_list.append(status_filter)
-    if parent_id_filter is not None: # Check for None explicitly as 0 could be a valid parent_id
-        conditions.append("parent_id = ?")
-        params_list.append(parent_id_filter)
-    # Add more filters if needed (e.g., date range)
-
-    if conditions:
-        sql += " WHERE " + " AND ".join(conditions)
-
-    sql += " ORDER BY timestamp DESC" # Default order: newest first
+    """Retrieves progress entries newest first, optionally filtered, limited and resumed after `page_cursor`."""
+    with _read_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        sql = "SELECT id, timestamp, status, description, parent_id FROM progress_entries"
+        conditions = []
+        params_list = []
+
+        if status_filter:
+            conditions.append("status = ?")
+            params_list.append(status_filter)
+        if parent_id_filter is not None: # Check for None explicitly as 0 could be a valid parent_id
+            conditions.append("parent_id = ?")
+            params_list.append(parent_id_filter)
+        # Add more filters if needed (e.g., date range)
+        keyset_conditions, keyset_params = _keyset_conditions(page_cursor)
+        conditions.extend(keyset_conditions)
+        params_list.extend(keyset_params)
+
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+
+        sql += KEYSET_ORDER_BY # Default order: newest first
+
+        if limit is not None and limit > 0:
+            sql += " LIMIT ?"
+            params_list.append(limit)
+
+        params = tuple(params_list)
 
-    if limit is not None and limit > 0:
-        sql += " LIMIT ?"
-        params_list.append(limit)
-
-    params = tuple(params_list)
-
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, params)
-        rows = cursor.fetchall()
-        progress_entries = [
-            models.ProgressEntry(
-                id=row['id'],
-                timestamp=row['timestamp'],
-                status=row['status'],
-                description=row['description'],
-                parent_id=row['parent_id']
-            ) for row in rows
-        ]
-        # progress_entries.reverse() # Optional: uncomment to return oldest first
-        return progress_entries
-    except sqlite3.Error as e:
-        raise DatabaseError(f"Failed to retrieve progress entries: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            progress_entries = [
+                models.ProgressEntry(
+                    id=row['id'],
+                    timestamp=row['timestamp'],
+                    status=row['status'],
+                    description=row['description'],
+                    parent_id=row['parent_id']
+                ) for row in rows
+            ]
+            # progress_entries.reverse() # Optional: uncomment to return oldest first
+            return progress_entries
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to retrieve progress entries: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def update_progress_entry(workspace_id: str, update_args: models.UpdateProgressArgs) -> bool:
     """
     Updates an existing progress entry by its ID.
     Returns True if the entry was found and updated, False otherwise.
     """
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
+    with _write_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
     
-    sql = "UPDATE progress_entries SET"
-    updates = []
-    params_list: List[Any] = []
-
-    if update_args.status is not None:
-        updates.append("status = ?")
-        params_list.append(update_args.status)
-    if update_args.description is not None:
-        updates.append("description = ?")
-        params_list.append(update_args.description)
-    # Handle parent_id update, including setting to NULL if explicitly None is intended (though Pydantic allows Optional[int])
-    # If parent_id is provided as 0 or a positive int, update it.
-    # If parent_id is provided as None, set the DB column to NULL.
-    # If parent_id is NOT provided in args (remains default None), do not include in update.
-    # The Pydantic model check_at_least_one_field ensures at least one field is provided,
-    # so we don't need to worry about an empty updates list here.
-    if 'parent_id' in update_args.model_fields_set: # Check if parent_id was explicitly set in the input args
-         updates.append("parent_id = ?")
-         params_list.append(update_args.parent_id) # SQLite handles Python None as NULL
-
-    if not updates:
-         # This case should be prevented by Pydantic model validation, but as a safeguard
-         raise ValueError("No fields provided for update.")
-
-    sql += " " + ", ".join(updates) + " WHERE id = ?"
-    params_list.append(update_args.progress_id)
-    params = tuple(params_list)
+        sql = "UPDATE progress_entries SET"
+        updates = []
+        params_list: List[Any] = []
+
+        if update_args.status is not None:
+            updates.append("status = ?")
+            params_list.append(update_args.status)
+        if update_args.description is not None:
+            updates.append("description = ?")
+            params_list.append(update_args.description)
+        # Handle parent_id update, including setting to NULL if explicitly None is intended (though Pydantic allows Optional[int])
+        # If parent_id is provided as 0 or a positive int, update it.
+        # If parent_id is provided as None, set the DB column to NULL.
+        # If parent_id is NOT provided in args (remains default None), do not include in update.
+        # The Pydantic model check_at_least_one_field ensures at least one field is provided,
+        # so we don't need to worry about an empty updates list here.
+        if 'parent_id' in update_args.model_fields_set: # Check if parent_id was explicitly set in the input args
+             updates.append("parent_id = ?")
+             params_list.append(update_args.parent_id) # SQLite handles Python None as NULL
+
+        if not updates:
+             # This case should be prevented by Pydantic model validation, but as a safeguard
+             raise ValueError("No fields provided for update.")
+
+        sql += " " + ", ".join(updates) + " WHERE id = ?"
+        params_list.append(update_args.progress_id)
+        params = tuple(params_list)
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, params)
-        conn.commit()
-        return cursor.rowcount > 0 # Return True if one row was updated
-    except sqlite3.Error as e:
-        conn.rollback()
-        raise DatabaseError(f"Failed to update progress entry with ID {update_args.progress_id}: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            conn.commit()
+            return cursor.rowcount > 0 # Return True if one row was updated
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to update progress entry with ID {update_args.progress_id}: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def get_progress_entry_by_id(workspace_id: str, progress_id: int) -> Optional[models.ProgressEntry]:
+    """Retrieves a single progress entry by its ID, or None if it does not exist."""
+    with _read_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id, timestamp, status, description, parent_id FROM progress_entries WHERE id = ?",
+                (progress_id,)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return models.ProgressEntry(
+                id=row['id'], timestamp=row['timestamp'], status=row['status'],
+                description=row['description'], parent_id=row['parent_id']
+            )
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to retrieve progress entry with ID {progress_id}: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def delete_progress_entry_by_id(workspace_id: str, progress_id: int) -> bool:
     """
@@ -1013,276 +1868,295 @@ def delete_progress_entry_by_id(workspace_id: str, progress_id: int) -> bool:
     Note: This will also set the parent_id of any child tasks to NULL due to FOREIGN KEY ON DELETE SET NULL.
     Returns True if deleted, False otherwise.
     """
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    sql = "DELETE FROM progress_entries WHERE id = ?"
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, (progress_id,))
-        conn.commit()
-        return cursor.rowcount > 0 # Return True if one row was deleted
-    except sqlite3.Error as e:
-        conn.rollback()
-        raise DatabaseError(f"Failed to delete progress entry with ID {progress_id}: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+    with _write_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        sql = "DELETE FROM progress_entries WHERE id = ?"
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, (progress_id,))
+            conn.commit()
+            return cursor.rowcount > 0 # Return True if one row was deleted
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to delete progress entry with ID {progress_id}: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 def log_system_pattern(workspace_id: str, pattern_data: models.SystemPattern) -> models.SystemPattern:
     """Logs or updates a system pattern. Uses INSERT OR REPLACE based on unique name."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    # Use INSERT OR REPLACE to handle unique constraint on 'name'
-    # This will overwrite the description and tags if the name already exists.
-    sql = """
-        INSERT OR REPLACE INTO system_patterns (timestamp, name, description, tags)
-        VALUES (?, ?, ?, ?)
-    """
-    tags_json = json.dumps(pattern_data.tags) if pattern_data.tags is not None else None
-    params = (
-        pattern_data.timestamp,
-        pattern_data.name,
-        pattern_data.description,
-        tags_json
-    )
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, params)
-        # We might not get the correct lastrowid if it replaced,
-        # so we need to query back to get the ID if needed.
-        # For now, just commit and assume success or handle error.
-        # If returning the model with ID is critical, add a SELECT query here.
-        conn.commit()
-        # Query back to get the ID (optional, adds overhead)
-        cursor.execute("SELECT id FROM system_patterns WHERE name = ?", (pattern_data.name,))
-        row = cursor.fetchone()
-        if row:
-            pattern_data.id = row['id']
-        return pattern_data # Return original data, possibly updated with ID
-    except sqlite3.Error as e:
-        conn.rollback()
-        raise DatabaseError(f"Failed to log system pattern '{pattern_data.name}': {e}")
-    finally:
-        if cursor:
-            cursor.close()
+    with _write_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        # Use INSERT OR REPLACE to handle unique constraint on 'name'
+        # This will overwrite the description and tags if the name already exists.
+        sql = """
+            INSERT OR REPLACE INTO system_patterns (timestamp, name, description, tags)
+            VALUES (?, ?, ?, ?)
+        """
+        tags_json = json.dumps(pattern_data.tags) if pattern_data.tags is not None else None
+        params = (
+            pattern_data.timestamp,
+            pattern_data.name,
+            pattern_data.description,
+            tags_json
+        )
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            # We might not get the correct lastrowid if it replaced,
+            # so we need to query back to get the ID if needed.
+            # For now, just commit and assume success or handle error.
+            # If returning the model with ID is critical, add a SELECT query here.
+            conn.commit()
+            # Query back to get the ID (optional, adds overhead)
+            cursor.execute("SELECT id FROM system_patterns WHERE name = ?", (pattern_data.name,))
+            row = cursor.fetchone()
+            if row:
+                pattern_data.id = row['id']
+            return pattern_data # Return original data, possibly updated with ID
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to log system pattern '{pattern_data.name}': {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def get_system_patterns(
     workspace_id: str,
     tags_filter_include_all: Optional[List[str]] = None,
-    tags_filter_include_any: Optional[List[str]] = None
-    # limit: Optional[int] = None, # Add if pagination is desired
+    tags_filter_include_any: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    paginate: bool = False,
+    page_cursor: Optional[str] = None
 ) -> List[models.SystemPattern]:
-    """Retrieves system patterns, optionally filtered by tags."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
+    """
+    Retrieves system patterns ordered by name, optionally filtered by tags and limited.
+    With `paginate` (implied by `page_cursor`) they are ordered newest first and resumed after `page_cursor`.
+    """
+    with _read_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
     
-    base_sql = "SELECT id, timestamp, name, description, tags FROM system_patterns"
-    order_by_clause = " ORDER BY name ASC"
-    # params_list: List[Any] = [] # Not used for SQL filtering of tags for now
-    # limit_clause = ""
-    # if limit is not None and limit > 0:
-    #     limit_clause = " LIMIT ?"
-    #     params_list.append(limit)
-
-    sql = base_sql + order_by_clause # + limit_clause
-    # params_tuple = tuple(params_list)
+        base_sql = "SELECT id, timestamp, name, description, tags FROM system_patterns"
+        conditions, params_list = _tag_filter_conditions(
+            "system_pattern", "id", tags_filter_include_all, tags_filter_include_any
+        )
+        order_by_clause = " ORDER BY name ASC"
+        if paginate or page_cursor is not None:
+            keyset_conditions, keyset_params = _keyset_conditions(page_cursor)
+            conditions.extend(keyset_conditions)
+            params_list.extend(keyset_params)
+            order_by_clause = KEYSET_ORDER_BY
+        limit_clause = ""
+        if limit is not None and limit > 0:
+            limit_clause = " LIMIT ?"
+            params_list.append(limit)
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql) #, params_tuple)
-        rows = cursor.fetchall()
-        patterns = [
-            models.SystemPattern(
-                id=row['id'],
-                timestamp=row['timestamp'],
-                name=row['name'],
-                description=row['description'],
-                tags=json.loads(row['tags']) if row['tags'] else None
-            ) for row in rows
-        ]
+        sql = base_sql
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += order_by_clause + limit_clause
 
-        # Python-based filtering for tags
-        if tags_filter_include_all:
-            patterns = [
-                p for p in patterns if p.tags and all(tag in p.tags for tag in tags_filter_include_all)
-            ]
-        
-        if tags_filter_include_any:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, tuple(params_list))
+            rows = cursor.fetchall()
             patterns = [
-                p for p in patterns if p.tags and any(tag in p.tags for tag in tags_filter_include_any)
+                models.SystemPattern(
+                    id=row['id'],
+                    timestamp=row['timestamp'],
+                    name=row['name'],
+                    description=row['description'],
+                    tags=json.loads(row['tags']) if row['tags'] else None
+                ) for row in rows
             ]
-
-        return patterns
-    except (sqlite3.Error, json.JSONDecodeError) as e: # Added JSONDecodeError
-        raise DatabaseError(f"Failed to retrieve system patterns: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+            return patterns
+        except (sqlite3.Error, json.JSONDecodeError) as e: # Added JSONDecodeError
+            raise DatabaseError(f"Failed to retrieve system patterns: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def delete_system_pattern_by_id(workspace_id: str, pattern_id: int) -> bool:
     """Deletes a system pattern by its ID. Returns True if deleted, False otherwise."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    sql = "DELETE FROM system_patterns WHERE id = ?"
-    # Note: System patterns do not currently have an FTS table, so no trigger concerns here.
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, (pattern_id,))
-        conn.commit()
-        return cursor.rowcount > 0
-    except sqlite3.Error as e:
-        conn.rollback()
-        raise DatabaseError(f"Failed to delete system pattern with ID {pattern_id}: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+    with _write_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        sql = "DELETE FROM system_patterns WHERE id = ?"
+        # Note: System patterns do not currently have an FTS table, so no trigger concerns here.
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, (pattern_id,))
+            conn.commit()
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to delete system pattern with ID {pattern_id}: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def log_custom_data(workspace_id: str, data: models.CustomData) -> models.CustomData:
     """Logs or updates a custom data entry. Uses INSERT OR REPLACE based on unique (category, key)."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    sql = """
-        INSERT OR REPLACE INTO custom_data (timestamp, category, key, value)
-        VALUES (?, ?, ?, ?)
-    """
-    try:
-        cursor = conn.cursor()
-        # Ensure value is serialized to JSON string
-        value_json = json.dumps(data.value)
-        params = (
-            data.timestamp,
-            data.category,
-            data.key,
-            value_json
-        )
-        cursor.execute(sql, params)
-        conn.commit()
-        # Query back to get ID if needed (similar to log_system_pattern)
-        cursor.execute("SELECT id FROM custom_data WHERE category = ? AND key = ?", (data.category, data.key))
-        row = cursor.fetchone()
-        if row:
-            data.id = row['id']
-        return data
-    except (sqlite3.Error, TypeError) as e: # TypeError for json.dumps
-        conn.rollback()
-        raise DatabaseError(f"Failed to log custom data for '{data.category}/{data.key}': {e}")
-    finally:
-        if cursor:
-            cursor.close()
+    with _write_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        sql = """
+            INSERT OR REPLACE INTO custom_data (timestamp, category, key, value)
+            VALUES (?, ?, ?, ?)
+        """
+        try:
+            cursor = conn.cursor()
+            # Ensure value is serialized to JSON string
+            value_json = json.dumps(data.value)
+            params = (
+                data.timestamp,
+                data.category,
+                data.key,
+                value_json
+            )
+            cursor.execute(sql, params)
+            conn.commit()
+            # Query back to get ID if needed (similar to log_system_pattern)
+            cursor.execute("SELECT id FROM custom_data WHERE category = ? AND key = ?", (data.category, data.key))
+            row = cursor.fetchone()
+            if row:
+                data.id = row['id']
+            return data
+        except (sqlite3.Error, TypeError) as e: # TypeError for json.dumps
+            conn.rollback()
+            raise DatabaseError(f"Failed to log custom data for '{data.category}/{data.key}': {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def get_custom_data(
     workspace_id: str,
     category: Optional[str] = None,
-    key: Optional[str] = None
+    key: Optional[str] = None,
+    limit: Optional[int] = None,
+    paginate: bool = False,
+    page_cursor: Optional[str] = None
 ) -> List[models.CustomData]:
-    """Retrieves custom data entries, optionally filtered by category and/or key."""
+    """
+    Retrieves custom data entries ordered by category and key, optionally filtered by category and/or key
+    and limited. With `paginate` (implied by `page_cursor`) they are ordered newest first and resumed after
+    `page_cursor`.
+    """
     if key and not category:
         raise ValueError("Cannot filter by key without specifying a category.")
 
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    sql = "SELECT id, timestamp, category, key, value FROM custom_data"
-    conditions = []
-    params_list = []
-
-    if category:
-        conditions.append("category = ?")
-        params_list.append(category)
-    if key: # We already ensured category is present if key is
-        conditions.append("key = ?")
-        params_list.append(key)
-
-    if conditions:
-        sql += " WHERE " + " AND ".join(conditions)
-
-    sql += " ORDER BY category ASC, key ASC" # Consistent ordering
-    params = tuple(params_list)
+    with _read_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        sql = "SELECT id, timestamp, category, key, value FROM custom_data"
+        conditions = []
+        params_list = []
+
+        if category:
+            conditions.append("category = ?")
+            params_list.append(category)
+        if key: # We already ensured category is present if key is
+            conditions.append("key = ?")
+            params_list.append(key)
+
+        order_by_clause = " ORDER BY category ASC, key ASC" # Consistent ordering
+        if paginate or page_cursor is not None:
+            keyset_conditions, keyset_params = _keyset_conditions(page_cursor)
+            conditions.extend(keyset_conditions)
+            params_list.extend(keyset_params)
+            order_by_clause = KEYSET_ORDER_BY
+
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+
+        sql += order_by_clause
+        if limit is not None and limit > 0:
+            sql += " LIMIT ?"
+            params_list.append(limit)
+        params = tuple(params_list)
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, params)
-        rows = cursor.fetchall()
-        custom_data_list = []
-        for row in rows:
-            try:
-                # Deserialize value from JSON string
-                value_data = json.loads(row['value'])
-                custom_data_list.append(
-                    models.CustomData(
-                        id=row['id'],
-                        timestamp=row['timestamp'],
-                        category=row['category'],
-                        key=row['key'],
-                        value=value_data
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            custom_data_list = []
+            for row in rows:
+                try:
+                    # Deserialize value from JSON string
+                    value_data = json.loads(row['value'])
+                    custom_data_list.append(
+                        models.CustomData(
+                            id=row['id'],
+                            timestamp=row['timestamp'],
+                            category=row['category'],
+                            key=row['key'],
+                            value=value_data
+                        )
                     )
-                )
-            except json.JSONDecodeError as e:
-                # Log or handle error for specific row if JSON is invalid
-                print(f"Warning: Failed to decode JSON for custom_data id={row['id']}: {e}") # Replace with proper logging
-                continue # Skip this row
-        return custom_data_list
-    except sqlite3.Error as e:
-        raise DatabaseError(f"Failed to retrieve custom data: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+                except json.JSONDecodeError as e:
+                    # Log or handle error for specific row if JSON is invalid
+                    print(f"Warning: Failed to decode JSON for custom_data id={row['id']}: {e}") # Replace with proper logging
+                    continue # Skip this row
+            return custom_data_list
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to retrieve custom data: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def delete_custom_data(workspace_id: str, category: str, key: str) -> bool:
     """Deletes a specific custom data entry by category and key. Returns True if deleted, False otherwise."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    sql = "DELETE FROM custom_data WHERE category = ? AND key = ?"
-    params = (category, key)
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, params)
-        conn.commit()
-        return cursor.rowcount > 0 # Return True if one row was deleted
-    except sqlite3.Error as e:
-        conn.rollback()
-        raise DatabaseError(f"Failed to delete custom data for '{category}/{key}': {e}")
-    finally:
-        if cursor:
-            cursor.close()
+    with _write_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        sql = "DELETE FROM custom_data WHERE category = ? AND key = ?"
+        params = (category, key)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            conn.commit()
+            return cursor.rowcount > 0 # Return True if one row was deleted
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to delete custom data for '{category}/{key}': {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def log_context_link(workspace_id: str, link_data: models.ContextLink) -> models.ContextLink:
     """Logs a new context link."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    sql = """
-        INSERT INTO context_links (
-            workspace_id, source_item_type, source_item_id,
-            target_item_type, target_item_id, relationship_type, description, timestamp
+    with _write_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        sql = """
+            INSERT INTO context_links (
+                workspace_id, source_item_type, source_item_id,
+                target_item_type, target_item_id, relationship_type, description, timestamp
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        # Use link_data.timestamp if provided (e.g. from an import), else it defaults in DB
+        # However, our Pydantic model ContextLink has default_factory=datetime.utcnow for timestamp
+        # So, link_data.timestamp will always be populated.
+        params = (
+            workspace_id, # Storing workspace_id explicitly in the table
+            link_data.source_item_type,
+            str(link_data.source_item_id), # Ensure IDs are stored as text
+            link_data.target_item_type,
+            str(link_data.target_item_id), # Ensure IDs are stored as text
+            link_data.relationship_type,
+            link_data.description,
+            link_data.timestamp # Pydantic model ensures this is set
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """
-    # Use link_data.timestamp if provided (e.g. from an import), else it defaults in DB
-    # However, our Pydantic model ContextLink has default_factory=datetime.utcnow for timestamp
-    # So, link_data.timestamp will always be populated.
-    params = (
-        workspace_id, # Storing workspace_id explicitly in the table
-        link_data.source_item_type,
-        str(link_data.source_item_id), # Ensure IDs are stored as text
-        link_data.target_item_type,
-        str(link_data.target_item_id), # Ensure IDs are stored as text
-        link_data.relationship_type,
-        link_data.description,
-        link_data.timestamp # Pydantic model ensures this is set
-    )
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, params)
-        link_id = cursor.lastrowid
-        conn.commit()
-        link_data.id = link_id
-        # The timestamp from the DB default might be slightly different if we didn't pass it,
-        # but since our Pydantic model sets it, what we have in link_data.timestamp is accurate.
-        return link_data
-    except sqlite3.Error as e:
-        conn.rollback()
-        raise DatabaseError(f"Failed to log context link: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            link_id = cursor.lastrowid
+            conn.commit()
+            link_data.id = link_id
+            # The timestamp from the DB default might be slightly different if we didn't pass it,
+            # but since our Pydantic model sets it, what we have in link_data.timestamp is accurate.
+            return link_data
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to log context link: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def get_context_links(
     workspace_id: str,
@@ -1290,133 +2164,136 @@ def get_context_links(
     item_id: str,
     relationship_type_filter: Optional[str] = None,
     linked_item_type_filter: Optional[str] = None,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    page_cursor: Optional[str] = None
 ) -> List[models.ContextLink]:
     """
-    Retrieves links for a given item, with optional filters.
+    Retrieves links for a given item newest first, with optional filters, resumed after `page_cursor`.
     Finds links where the given item is EITHER the source OR the target.
-    """
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    
-    # Ensure item_id is treated as string for consistent querying with TEXT columns
-    str_item_id = str(item_id)
 
-    base_sql = """
-        SELECT id, timestamp, workspace_id, source_item_type, source_item_id,
-               target_item_type, target_item_id, relationship_type, description
-        FROM context_links
+    The two ends are queried separately and combined with UNION ALL, so each branch is a range
+    of the (type, id, timestamp) endpoint index read newest first, instead of an OR that the
+    planner may answer with a scan of the table.
     """
-    conditions = []
-    params_list = []
-
-    # Main condition: item is either source or target
-    conditions.append(
-        "((source_item_type = ? AND source_item_id = ?) OR (target_item_type = ? AND target_item_id = ?))"
-    )
-    params_list.extend([item_type, str_item_id, item_type, str_item_id])
-    
-    # Add workspace_id filter for safety, though connection is already workspace-specific
-    conditions.append("workspace_id = ?")
-    params_list.append(workspace_id)
-
-    if relationship_type_filter:
-        conditions.append("relationship_type = ?")
-        params_list.append(relationship_type_filter)
+    with _read_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
     
-    if linked_item_type_filter:
-        # This filter applies to the "other end" of the link
-        conditions.append(
-            "((source_item_type = ? AND source_item_id = ? AND target_item_type = ?) OR " +
-            "(target_item_type = ? AND target_item_id = ? AND source_item_type = ?))"
-        )
-        params_list.extend([item_type, str_item_id, linked_item_type_filter,
-                            item_type, str_item_id, linked_item_type_filter])
-
-    if conditions:
-        sql = base_sql + " WHERE " + " AND ".join(conditions)
-    else: # Should not happen due to main condition and workspace_id
-        sql = base_sql
-
-    sql += " ORDER BY timestamp DESC"
-
-    if limit is not None and limit > 0:
-        sql += " LIMIT ?"
-        params_list.append(limit)
+        # Ensure item_id is treated as string for consistent querying with TEXT columns
+        str_item_id = str(item_id)
+
+        base_sql = """
+            SELECT id, timestamp, workspace_id, source_item_type, source_item_id,
+                   target_item_type, target_item_id, relationship_type, description
+            FROM context_links
+        """
+        # Conditions shared by both ends; workspace_id is filtered for safety, though the
+        # connection is already workspace-specific
+        shared_conditions = ["workspace_id = ?"]
+        shared_params: List[Any] = [workspace_id]
+
+        if relationship_type_filter:
+            shared_conditions.append("relationship_type = ?")
+            shared_params.append(relationship_type_filter)
+
+        keyset_conditions, keyset_params = _keyset_conditions(page_cursor)
+        shared_conditions.extend(keyset_conditions)
+        shared_params.extend(keyset_params)
+
+        branches = []
+        params_list = []
+        for end, other_end in (("source", "target"), ("target", "source")):
+            conditions = [f"{end}_item_type = ?", f"{end}_item_id = ?"]
+            params_list.extend([item_type, str_item_id])
+            if end == "target":
+                # A link from the item to itself was already returned by the source branch
+                conditions.append("NOT (source_item_type = ? AND source_item_id = ?)")
+                params_list.extend([item_type, str_item_id])
+            if linked_item_type_filter:
+                # This filter applies to the "other end" of the link
+                conditions.append(f"{other_end}_item_type = ?")
+                params_list.append(linked_item_type_filter)
+            branches.append(base_sql + " WHERE " + " AND ".join(conditions + shared_conditions))
+            params_list.extend(shared_params)
+
+        sql = " UNION ALL ".join(branches) + KEYSET_ORDER_BY
+
+        if limit is not None and limit > 0:
+            sql += " LIMIT ?"
+            params_list.append(limit)
     
-    params = tuple(params_list)
+        params = tuple(params_list)
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, params)
-        rows = cursor.fetchall()
-        links = [
-            models.ContextLink(
-                id=row['id'],
-                timestamp=row['timestamp'],
-                # workspace_id=row['workspace_id'], # Not part of ContextLink Pydantic model
-                source_item_type=row['source_item_type'],
-                source_item_id=row['source_item_id'],
-                target_item_type=row['target_item_type'],
-                target_item_id=row['target_item_id'],
-                relationship_type=row['relationship_type'],
-                description=row['description']
-            ) for row in rows
-        ]
-        return links
-    except sqlite3.Error as e:
-        raise DatabaseError(f"Failed to retrieve context links: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            links = [
+                models.ContextLink(
+                    id=row['id'],
+                    timestamp=row['timestamp'],
+                    # workspace_id=row['workspace_id'], # Not part of ContextLink Pydantic model
+                    source_item_type=row['source_item_type'],
+                    source_item_id=row['source_item_id'],
+                    target_item_type=row['target_item_type'],
+                    target_item_id=row['target_item_id'],
+                    relationship_type=row['relationship_type'],
+                    description=row['description']
+                ) for row in rows
+            ]
+            return links
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to retrieve context links: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def search_project_glossary_fts(workspace_id: str, query_term: str, limit: Optional[int] = 10) -> List[models.CustomData]:
     """Searches ProjectGlossary entries in custom_data using FTS5."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    # Updated to use the new general custom_data_fts table structure
-    sql = """
-        SELECT cd.id, cd.category, cd.key, cd.value
-        FROM custom_data_fts fts
-        JOIN custom_data cd ON fts.rowid = cd.id
-        WHERE fts.custom_data_fts MATCH ? AND fts.category = 'ProjectGlossary'
-        ORDER BY rank
-    """
-    # The MATCH query will search category, key, and value_text.
-    # We explicitly filter for ProjectGlossary category after the FTS match.
-    # Note: The MATCH query will search across 'term' and 'definition_text' columns in custom_data_fts
-    params_list = [query_term]
-
-    if limit is not None and limit > 0:
-        sql += " LIMIT ?"
-        params_list.append(limit)
+    with _read_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        # Updated to use the new general custom_data_fts table structure
+        sql = """
+            SELECT cd.id, cd.category, cd.key, cd.value
+            FROM custom_data_fts fts
+            JOIN custom_data cd ON fts.rowid = cd.id
+            WHERE fts.custom_data_fts MATCH ? AND fts.category = 'ProjectGlossary'
+            ORDER BY rank
+        """
+        # The MATCH query will search category, key, and value_text.
+        # We explicitly filter for ProjectGlossary category after the FTS match.
+        # Note: The MATCH query will search across 'term' and 'definition_text' columns in custom_data_fts
+        params_list = [query_term]
+
+        if limit is not None and limit > 0:
+            sql += " LIMIT ?"
+            params_list.append(limit)
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, tuple(params_list))
-        rows = cursor.fetchall()
-        glossary_entries = []
-        for row in rows:
-            try:
-                value_data = json.loads(row['value'])
-                glossary_entries.append(
-                    models.CustomData(
-                        id=row['id'],
-                        category=row['category'],
-                        key=row['key'],
-                        value=value_data
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, tuple(params_list))
+            rows = cursor.fetchall()
+            glossary_entries = []
+            for row in rows:
+                try:
+                    value_data = json.loads(row['value'])
+                    glossary_entries.append(
+                        models.CustomData(
+                            id=row['id'],
+                            category=row['category'],
+                            key=row['key'],
+                            value=value_data
+                        )
                     )
-                )
-            except json.JSONDecodeError as e:
-                # Log or handle error for specific row if JSON is invalid
-                print(f"Warning: Failed to decode JSON for glossary item id={row['id']}: {e}") # Replace with proper logging
-                continue # Skip this row
-        return glossary_entries
-    except sqlite3.Error as e:
-        raise DatabaseError(f"Failed FTS search on ProjectGlossary for term '{query_term}': {e}")
-    finally:
-        if cursor:
-            cursor.close()
+                except json.JSONDecodeError as e:
+                    # Log or handle error for specific row if JSON is invalid
+                    print(f"Warning: Failed to decode JSON for glossary item id={row['id']}: {e}") # Replace with proper logging
+                    continue # Skip this row
+            return glossary_entries
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed FTS search on ProjectGlossary for term '{query_term}': {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 def search_custom_data_value_fts(
     workspace_id: str,
@@ -1426,127 +2303,281 @@ def search_custom_data_value_fts(
 ) -> List[models.CustomData]:
     """Searches all custom_data entries using FTS5 on category, key, and value.
        Optionally filters by category after FTS."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
+    with _read_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
     
-    sql = """
-        SELECT cd.id, cd.timestamp, cd.category, cd.key, cd.value
-        FROM custom_data_fts fts
-        JOIN custom_data cd ON fts.rowid = cd.id
-        WHERE fts.custom_data_fts MATCH ?
-    """
-    params_list = [query_term]
-
-    if category_filter:
-        sql += " AND fts.category = ?" # Filter by category on the FTS table
-        params_list.append(category_filter)
+        sql = """
+            SELECT cd.id, cd.timestamp, cd.category, cd.key, cd.value
+            FROM custom_data_fts fts
+            JOIN custom_data cd ON fts.rowid = cd.id
+            WHERE fts.custom_data_fts MATCH ?
+        """
+        params_list = [query_term]
+
+        if category_filter:
+            sql += " AND fts.category = ?" # Filter by category on the FTS table
+            params_list.append(category_filter)
         
-    sql += " ORDER BY rank"
+        sql += " ORDER BY rank"
 
-    if limit is not None and limit > 0:
-        sql += " LIMIT ?"
-        params_list.append(limit)
+        if limit is not None and limit > 0:
+            sql += " LIMIT ?"
+            params_list.append(limit)
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, tuple(params_list))
-        rows = cursor.fetchall()
-        results = []
-        for row in rows:
-            try:
-                cursor = conn.cursor()
-                value_data = json.loads(row['value'])
-                results.append(
-                    models.CustomData(
-                        id=row['id'],
-                        timestamp=row['timestamp'],
-                        category=row['category'],
-                        key=row['key'],
-                        value=value_data
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, tuple(params_list))
+            rows = cursor.fetchall()
+            results = []
+            for row in rows:
+                try:
+                    cursor = conn.cursor()
+                    value_data = json.loads(row['value'])
+                    results.append(
+                        models.CustomData(
+                            id=row['id'],
+                            timestamp=row['timestamp'],
+                            category=row['category'],
+                            key=row['key'],
+                            value=value_data
+                        )
                     )
+                except json.JSONDecodeError as e:
+                    print(f"Warning: Failed to decode JSON for custom_data id={row['id']} (search_custom_data_value_fts): {e}")
+                    continue
+            return results
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed FTS search on custom_data for term '{query_term}': {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+# item_type -> (FTS5 table, content table) for the item types that have a full-text index
+FTS_TABLES: Dict[str, Tuple[str, str]] = {
+    "decision": ("decisions_fts", "decisions"),
+    "custom_data": ("custom_data_fts", "custom_data"),
+}
+
+def fts_match_any(text: str) -> Optional[str]:
+    """
+    Turns free text into an FTS5 query matching any of its words, each quoted, so that
+    natural-language queries cannot trip FTS5 syntax (quotes, '-', 'NOT', column filters).
+    Returns None if the text has no words.
+    """
+    words = dict.fromkeys(word.lower() for word in re.findall(r"\w+", text))
+    return " OR ".join(f'"{word}"' for word in words) or None
+
+def search_items_fts(
+    workspace_id: str,
+    query_text: str,
+    item_types: Optional[List[str]] = None,
+    tags_filter_include_all: Optional[List[str]] = None,
+    tags_filter_include_any: Optional[List[str]] = None,
+    category_filter: Optional[List[str]] = None,
+    limit: int = 10
+) -> List[Tuple[str, int, float]]:
+    """
+    BM25-ranks items of every full-text indexed type (FTS_TABLES) against the words of
+    `query_text`, as one list: a UNION ALL of the per-table matches ordered by score.
+    Filters mirror the vector store metadata: tags only match tagged items, and categories
+    (applied when custom data is searched) only match custom data, so those filters exclude
+    the other types. Returns [(item_type, item_id, bm25), ...] best first (lower bm25 is better).
+    """
+    match = fts_match_any(query_text)
+    if match is None:
+        return []
+    # As in the vector store filters, categories are ignored when custom data is not searched
+    filter_categories = bool(category_filter) and (not item_types or "custom_data" in item_types)
+    with _read_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            cursor.execute(
+                f"SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ({', '.join('?' * len(FTS_TABLES))})",
+                tuple(fts for fts, _ in FTS_TABLES.values())
+            )
+            available = {row['name'] for row in cursor.fetchall()} # FTS5 may be missing from the SQLite build
+            branches: List[str] = []
+            params: List[Any] = []
+            for item_type, (fts_table, table) in FTS_TABLES.items():
+                if fts_table not in available or (item_types and item_type not in item_types):
+                    continue
+                conditions = [f"{fts_table} MATCH ?"]
+                branch_params: List[Any] = [match]
+                if tags_filter_include_all or tags_filter_include_any:
+                    if item_type == "custom_data": # Custom data has no tags
+                        continue
+                    tag_conditions, tag_params = _tag_filter_conditions(
+                        item_type, f"{fts_table}.rowid", tags_filter_include_all, tags_filter_include_any
+                    )
+                    conditions.extend(tag_conditions)
+                    branch_params.extend(tag_params)
+                if filter_categories:
+                    if item_type != "custom_data":
+                        continue
+                    conditions.append(f"t.category IN ({', '.join('?' * len(category_filter))})")
+                    branch_params.extend(category_filter)
+                # Each branch stops at `limit` on its own index before the branches are merged
+                branches.append(
+                    f"SELECT * FROM (SELECT '{item_type}' AS item_type, t.id, bm25({fts_table}) AS score "
+                    f"FROM {fts_table} JOIN {table} t ON t.id = {fts_table}.rowid "
+                    f"WHERE {' AND '.join(conditions)} ORDER BY score LIMIT ?)"
                 )
-            except json.JSONDecodeError as e:
-                print(f"Warning: Failed to decode JSON for custom_data id={row['id']} (search_custom_data_value_fts): {e}")
-                continue
-        return results
-    except sqlite3.Error as e:
-        raise DatabaseError(f"Failed FTS search on custom_data for term '{query_term}': {e}")
-    finally:
-        if cursor:
-            cursor.close()
+                params.extend([*branch_params, limit])
+            if not branches:
+                conn.commit()
+                return []
+            cursor.execute(f"{' UNION ALL '.join(branches)} ORDER BY score LIMIT ?", (*params, limit))
+            results = [(row['item_type'], row['id'], row['score']) for row in cursor.fetchall()]
+            conn.commit()
+            return results
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed FTS search for '{query_text}': {e}")
+        finally:
+            if cursor:
+                cursor.close()
+            if conn.in_transaction:
+                conn.rollback()
 
 def get_item_history(
     workspace_id: str,
     args: models.GetItemHistoryArgs
 ) -> List[Dict[str, Any]]: # Returning list of dicts for now, could be Pydantic models
     """Retrieves history for product_context or active_context."""
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-
-    if args.item_type == "product_context":
-        history_table_name = "product_context_history"
-        # history_model = models.ProductContextHistory # If returning Pydantic models
-    elif args.item_type == "active_context":
-        history_table_name = "active_context_history"
-        # history_model = models.ActiveContextHistory # If returning Pydantic models
-    else:
-        # This should be caught by Pydantic validation in GetItemHistoryArgs
-        raise ValueError("Invalid item_type for history retrieval.")
-
-    sql = f"SELECT id, timestamp, version, content, change_source FROM {history_table_name}"
-    conditions = []
-    params_list = []
-
-    if args.version is not None:
-        conditions.append("version = ?")
-        params_list.append(args.version)
-    if args.before_timestamp:
-        conditions.append("timestamp < ?")
-        params_list.append(args.before_timestamp)
-    if args.after_timestamp:
-        conditions.append("timestamp > ?")
-        params_list.append(args.after_timestamp)
+    with _read_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+
+        if args.item_type == "product_context":
+            history_table_name = "product_context_history"
+            # history_model = models.ProductContextHistory # If returning Pydantic models
+        elif args.item_type == "active_context":
+            history_table_name = "active_context_history"
+            # history_model = models.ActiveContextHistory # If returning Pydantic models
+        else:
+            # This should be caught by Pydantic validation in GetItemHistoryArgs
+            raise ValueError("Invalid item_type for history retrieval.")
+
+        sql = f"SELECT id, timestamp, version, content, change_source FROM {history_table_name}"
+        conditions = []
+        params_list = []
+
+        if args.version is not None:
+            conditions.append("version = ?")
+            params_list.append(args.version)
+        if args.before_timestamp:
+            conditions.append("timestamp < ?")
+            params_list.append(args.before_timestamp)
+        if args.after_timestamp:
+            conditions.append("timestamp > ?")
+            params_list.append(args.after_timestamp)
     
-    # Add workspace_id filter if it were part of the history table (it's not currently)
-    # conditions.append("workspace_id = ?")
-    # params_list.append(workspace_id)
+        # Add workspace_id filter if it were part of the history table (it's not currently)
+        # conditions.append("workspace_id = ?")
+        # params_list.append(workspace_id)
 
-    if conditions:
-        sql += " WHERE " + " AND ".join(conditions)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
 
-    sql += " ORDER BY version DESC, timestamp DESC" # Most recent version/timestamp first
+        sql += " ORDER BY version DESC, timestamp DESC" # Most recent version/timestamp first
 
-    if args.limit is not None and args.limit > 0:
-        sql += " LIMIT ?"
-        params_list.append(args.limit)
+        if args.limit is not None and args.limit > 0:
+            sql += " LIMIT ?"
+            params_list.append(args.limit)
 
-    params = tuple(params_list)
+        params = tuple(params_list)
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, params)
-        rows = cursor.fetchall()
-        history_entries = []
-        for row in rows:
-            content_dict = json.loads(row['content'])
-            history_entries.append({
-                "id": row['id'],
-                "timestamp": row['timestamp'], # Already datetime object
-                "version": row['version'],
-                "content": content_dict,
-                "change_source": row['change_source']
-            })
-            # Or if using Pydantic models:
-            # history_entries.append(history_model(id=row['id'], timestamp=row['timestamp'], ...))
-        return history_entries
-    except (sqlite3.Error, json.JSONDecodeError) as e:
-        raise DatabaseError(f"Failed to retrieve history for {args.item_type}: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            history_entries = []
+            for row in rows:
+                content_dict = json.loads(row['content'])
+                history_entries.append({
+                    "id": row['id'],
+                    "timestamp": row['timestamp'], # Already datetime object
+                    "version": row['version'],
+                    "content": content_dict,
+                    "change_source": row['change_source']
+                })
+                # Or if using Pydantic models:
+                # history_entries.append(history_model(id=row['id'], timestamp=row['timestamp'], ...))
+            return history_entries
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            raise DatabaseError(f"Failed to retrieve history for {args.item_type}: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 # --- Recent Activity Summary ---
 
+# item_type recorded in activity_log -> summary section for items changed in the period
+ACTIVITY_SUMMARY_SECTIONS: Dict[str, str] = {
+    "decision": "recent_decisions",
+    "progress_entry": "recent_progress_entries",
+    "product_context": "recent_product_context_updates",
+    "active_context": "recent_active_context_updates",
+    "context_link": "recent_links_created",
+    "system_pattern": "recent_system_patterns",
+    "custom_data": "recent_custom_data",
+}
+
+# Activity item types that are not in ITEM_TABLES -> (table, columns)
+_ACTIVITY_EXTRA_TABLES: Dict[str, Tuple[str, str]] = {
+    "product_context": ("product_context_history", "id, timestamp, version, content, change_source"),
+    "active_context": ("active_context_history", "id, timestamp, version, content, change_source"),
+    "context_link": (
+        "context_links",
+        "id, timestamp, source_item_type, source_item_id, target_item_type, target_item_id, relationship_type, description"
+    ),
+}
+
+# An activity_log entry is current when no newer entry exists for the same item
+# (items replaced in place, with a new id each time, are identified by item_key).
+_CURRENT_ACTIVITY_ENTRY = (
+    "NOT EXISTS (SELECT 1 FROM activity_log newer WHERE newer.item_type = a.item_type"
+    " AND COALESCE(newer.item_key, newer.item_id) = COALESCE(a.item_key, a.item_id) AND newer.id > a.id)"
+)
+
+def _build_recent_activity_sql() -> str:
+    """
+    One statement made of LIMITed newest-first index range scans: one per summary section,
+    plus one over deletions. Cost follows limit_per_type rather than the size of the period.
+    """
+    columns = "a.id, a.timestamp, a.item_type, a.item_id, a.op, a.item_key"
+    arms = [
+        f"SELECT * FROM (SELECT {columns} FROM activity_log a"
+        f" WHERE a.item_type = ? AND a.timestamp >= ? AND a.op != 'delete' AND {_CURRENT_ACTIVITY_ENTRY}"
+        " ORDER BY a.timestamp DESC, a.id DESC LIMIT ?)"
+        for _ in ACTIVITY_SUMMARY_SECTIONS
+    ]
+    arms.append(
+        f"SELECT * FROM (SELECT {columns} FROM activity_log a"
+        f" WHERE a.op = 'delete' AND a.timestamp >= ? AND {_CURRENT_ACTIVITY_ENTRY}"
+        " ORDER BY a.timestamp DESC, a.id DESC LIMIT ?)"
+    )
+    return "SELECT * FROM (" + " UNION ALL ".join(arms) + ") ORDER BY timestamp DESC, id DESC"
+
+_RECENT_ACTIVITY_SQL = _build_recent_activity_sql()
+
+_JSON_ITEM_COLUMNS = {"tags", "content", "value"}
+
+def _activity_row_to_json(row: sqlite3.Row) -> Dict[str, Any]:
+    """
+    Builds the model_dump(mode='json') form of an item row selected in model field order
+    directly, skipping model validation for rows that are only serialized.
+    """
+    item: Dict[str, Any] = {}
+    for column in row.keys():
+        value = row[column]
+        if column == "timestamp":
+            value = value.isoformat().replace("+00:00", "Z") # Stored timestamps convert to UTC datetimes
+        elif column in _JSON_ITEM_COLUMNS:
+            value = json.loads(value) if value else None
+        item[column] = value
+    return item
+
 def get_recent_activity_summary_data(
 workspace_id: str,
 hours_ago: Optional[int] = None,
@@ -1555,145 +2586,867 @@ limit_per_type: int = 5
 ) -> Dict[str, Any]:
     """
     Retrieves a summary of recent activity across various ConPort items.
+    Reads the latest activity_log entry (fed by triggers on every item table) of at most
+    `limit_per_type` items per section in one statement, then loads only those items.
+    Deleted items are listed in 'recent_deletions'.
     """
-    conn = get_db_connection(workspace_id)
-    cursor = None # Initialize cursor for finally block
-    summary_results: Dict[str, Any] = {
-        "recent_decisions": [],
-        "recent_progress_entries": [],
-        "recent_product_context_updates": [],
-        "recent_active_context_updates": [],
-        "recent_links_created": [],
-        "recent_system_patterns": [], # Added for System Patterns
-        "notes": []
-    }
-
-    now_utc = datetime.now(timezone.utc)
-    summary_results["summary_period_end"] = now_utc.isoformat()
-
-    if since_timestamp:
-        start_datetime = since_timestamp
-    elif hours_ago:
-        start_datetime = now_utc - timedelta(hours=hours_ago)
-    else:
-        start_datetime = now_utc - timedelta(hours=24) # Default to last 24 hours
+    with _read_connection(workspace_id) as conn:
+        cursor = None # Initialize cursor for finally block
+        summary_results: Dict[str, Any] = {section: [] for section in ACTIVITY_SUMMARY_SECTIONS.values()}
+        summary_results["recent_deletions"] = []
+        summary_results["notes"] = []
+
+        now_utc = datetime.now(timezone.utc)
+        summary_results["summary_period_end"] = now_utc.isoformat()
+
+        if since_timestamp:
+            start_datetime = since_timestamp
+        elif hours_ago:
+            start_datetime = now_utc - timedelta(hours=hours_ago)
+        else:
+            start_datetime = now_utc - timedelta(hours=24) # Default to last 24 hours
 
-    summary_results["summary_period_start"] = start_datetime.isoformat()
+        summary_results["summary_period_start"] = start_datetime.isoformat()
 
-    try:
-        cursor = conn.cursor()
-        # Recent Decisions
-        cursor.execute(
-            """
-            SELECT id, timestamp, summary, rationale, implementation_details, tags
-            FROM decisions WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT ?
-            """,
-            (start_datetime, limit_per_type)
-        )
-        rows = cursor.fetchall()
-        summary_results["recent_decisions"] = [
-            models.Decision(
-                id=row['id'], timestamp=row['timestamp'], summary=row['summary'],
-                rationale=row['rationale'], implementation_details=row['implementation_details'],
-                tags=json.loads(row['tags']) if row['tags'] else None
-            ).model_dump(mode='json') for row in rows
-        ]
+        try:
+            cursor = conn.cursor()
+            params: List[Any] = []
+            for item_type in ACTIVITY_SUMMARY_SECTIONS:
+                params.extend([item_type, start_datetime, limit_per_type])
+            params.extend([start_datetime, limit_per_type])
+            cursor.execute(_RECENT_ACTIVITY_SQL, tuple(params))
+            entries = cursor.fetchall()
+
+            ids_by_type: Dict[str, List[int]] = {}
+            for entry in entries:
+                if entry['op'] == 'delete':
+                    deleted_at = entry['timestamp']
+                    if not isinstance(deleted_at, datetime):
+                        deleted_at = _convert_datetime(str(deleted_at).encode())
+                    deletion = {
+                        "item_type": entry['item_type'],
+                        "item_id": entry['item_id'],
+                        "deleted_at": _DATETIME_ADAPTER.dump_python(deleted_at, mode='json'),
+                    }
+                    if entry['item_key']:
+                        deletion["item_key"] = json.loads(entry['item_key'])
+                    summary_results["recent_deletions"].append(deletion)
+                elif entry['item_type'] in ACTIVITY_SUMMARY_SECTIONS:
+                    ids_by_type.setdefault(entry['item_type'], []).append(entry['item_id'])
+
+            for item_type, item_ids in ids_by_type.items():
+                table, columns = ITEM_TABLES.get(item_type) or _ACTIVITY_EXTRA_TABLES[item_type]
+                cursor.execute(
+                    f"SELECT {columns} FROM {table} WHERE id IN ({', '.join('?' * len(item_ids))})",
+                    tuple(item_ids)
+                )
+                items = {row['id']: _activity_row_to_json(row) for row in cursor.fetchall()}
+                # Keep activity order; items gone since (e.g. replaced) are skipped
+                summary_results[ACTIVITY_SUMMARY_SECTIONS[item_type]] = [
+                    items[item_id] for item_id in item_ids if item_id in items
+                ]
 
-        # Recent Progress Entries
-        cursor.execute(
-            """
-            SELECT id, timestamp, status, description, parent_id
-            FROM progress_entries WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT ?
-            """,
-            (start_datetime, limit_per_type)
-        )
-        rows = cursor.fetchall()
-        summary_results["recent_progress_entries"] = [
-            models.ProgressEntry(
-                id=row['id'], timestamp=row['timestamp'], status=row['status'],
-                description=row['description'], parent_id=row['parent_id']
-            ).model_dump(mode='json') for row in rows
-        ]
+            return summary_results
+
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            raise DatabaseError(f"Failed to retrieve recent activity summary: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+# --- Bulk Logging ---
+# Each function writes its whole batch with one executemany in a single transaction
+# (one commit, one fsync). A failure rolls back the entire batch.
 
-        # Recent Product Context Updates (from history)
+def _executemany_with_ids(cursor: sqlite3.Cursor, sql: str, params: List[Tuple[Any, ...]]) -> List[int]:
+    """
+    Runs a plain INSERT for many rows and returns the new row ids in insertion order.
+    Rows of a rowid table inserted by one statement under the held writer lock get
+    consecutive ids ending at last_insert_rowid() (triggers do not change it).
+    """
+    cursor.executemany(sql, params)
+    last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return list(range(last_id - len(params) + 1, last_id + 1))
+
+def _insert_decisions(cursor: sqlite3.Cursor, decisions: List[models.Decision]) -> List[models.Decision]:
+    """Inserts decisions in the caller's transaction and sets their new IDs."""
+    sql = """
+        INSERT INTO decisions (timestamp, summary, rationale, implementation_details, tags)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    params = [
+        (d.timestamp, d.summary, d.rationale, d.implementation_details,
+         json.dumps(d.tags) if d.tags is not None else None)
+        for d in decisions
+    ]
+    for decision, decision_id in zip(decisions, _executemany_with_ids(cursor, sql, params)):
+        decision.id = decision_id
+    return decisions
+
+def log_decisions(workspace_id: str, decisions: List[models.Decision]) -> List[models.Decision]:
+    """Logs many decisions in one transaction. Returns them with their new IDs."""
+    if not decisions:
+        return []
+    with _write_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            _insert_decisions(cursor, decisions)
+            conn.commit()
+            return decisions
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to log {len(decisions)} decisions: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def _insert_progress_entries(cursor: sqlite3.Cursor, entries: List[models.ProgressEntry]) -> List[models.ProgressEntry]:
+    """Inserts progress entries in the caller's transaction and sets their new IDs."""
+    sql = """
+        INSERT INTO progress_entries (timestamp, status, description, parent_id)
+        VALUES (?, ?, ?, ?)
+    """
+    params = [(p.timestamp, p.status, p.description, p.parent_id) for p in entries]
+    for entry, entry_id in zip(entries, _executemany_with_ids(cursor, sql, params)):
+        entry.id = entry_id
+    return entries
+
+def log_progress_entries(workspace_id: str, entries: List[models.ProgressEntry]) -> List[models.ProgressEntry]:
+    """Logs many progress entries in one transaction. Returns them with their new IDs."""
+    if not entries:
+        return []
+    with _write_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            _insert_progress_entries(cursor, entries)
+            conn.commit()
+            return entries
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to log {len(entries)} progress entries: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def _insert_system_patterns(cursor: sqlite3.Cursor, patterns: List[models.SystemPattern]) -> List[models.SystemPattern]:
+    """Inserts or replaces (on name) system patterns in the caller's transaction and sets their IDs."""
+    sql = """
+        INSERT OR REPLACE INTO system_patterns (timestamp, name, description, tags)
+        VALUES (?, ?, ?, ?)
+    """
+    params = [
+        (p.timestamp, p.name, p.description, json.dumps(p.tags) if p.tags is not None else None)
+        for p in patterns
+    ]
+    cursor.executemany(sql, params)
+    # Replaced rows get new ids, so read them back by the unique name.
+    names = list({p.name for p in patterns})
+    ids_by_name: Dict[str, int] = {}
+    for start in range(0, len(names), 500):
+        chunk = names[start:start + 500]
         cursor.execute(
-            """
-            SELECT id, timestamp, version, content, change_source
-            FROM product_context_history WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT ?
-            """,
-            (start_datetime, limit_per_type)
+            f"SELECT id, name FROM system_patterns WHERE name IN ({', '.join('?' * len(chunk))})",
+            tuple(chunk)
         )
-        rows = cursor.fetchall()
-        summary_results["recent_product_context_updates"] = [
-            models.ProductContextHistory(
-                id=row['id'], timestamp=row['timestamp'], version=row['version'],
-                content=json.loads(row['content']), change_source=row['change_source']
-            ).model_dump(mode='json') for row in rows
+        ids_by_name.update({row['name']: row['id'] for row in cursor.fetchall()})
+    for pattern in patterns:
+        pattern.id = ids_by_name.get(pattern.name)
+    return patterns
+
+def log_system_patterns(workspace_id: str, patterns: List[models.SystemPattern]) -> List[models.SystemPattern]:
+    """Logs or updates many system patterns (INSERT OR REPLACE on name) in one transaction."""
+    if not patterns:
+        return []
+    with _write_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            _insert_system_patterns(cursor, patterns)
+            conn.commit()
+            return patterns
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to log {len(patterns)} system patterns: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def _insert_custom_data_entries(cursor: sqlite3.Cursor, entries: List[models.CustomData]) -> List[models.CustomData]:
+    """Inserts or replaces (on category/key) custom data in the caller's transaction and sets their IDs."""
+    sql = """
+        INSERT OR REPLACE INTO custom_data (timestamp, category, key, value)
+        VALUES (?, ?, ?, ?)
+    """
+    params = [(d.timestamp, d.category, d.key, json.dumps(d.value)) for d in entries]
+    cursor.executemany(sql, params)
+    # Replaced rows get new ids, so read them back by the unique (category, key).
+    ids_by_key: Dict[Tuple[str, str], int] = {}
+    for category, keys in _group_keys_by_category(entries).items():
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            cursor.execute(
+                f"SELECT id, key FROM custom_data WHERE category = ? AND key IN ({', '.join('?' * len(chunk))})",
+                (category, *chunk)
+            )
+            ids_by_key.update({(category, row['key']): row['id'] for row in cursor.fetchall()})
+    for entry in entries:
+        entry.id = ids_by_key.get((entry.category, entry.key))
+    return entries
+
+def log_custom_data_entries(workspace_id: str, entries: List[models.CustomData]) -> List[models.CustomData]:
+    """Logs or updates many custom data entries (INSERT OR REPLACE on category/key) in one transaction."""
+    if not entries:
+        return []
+    with _write_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            _insert_custom_data_entries(cursor, entries)
+            conn.commit()
+            return entries
+        except (sqlite3.Error, TypeError) as e: # TypeError for json.dumps
+            conn.rollback()
+            raise DatabaseError(f"Failed to log {len(entries)} custom data entries: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+CONTEXT_TABLES = ("product_context", "active_context")
+
+def _replace_context_content(cursor: sqlite3.Cursor, context_name: str, content: Dict[str, Any], change_source: str) -> None:
+    """Overwrites a context in the caller's transaction, logging the previous content to its history."""
+    if context_name not in CONTEXT_TABLES:
+        raise ValueError(f"Unknown context: {context_name}")
+    cursor.execute(f"SELECT content FROM {context_name} WHERE id = 1")
+    current_row = cursor.fetchone()
+    if not current_row:
+        raise DatabaseError(f"{context_name} row not found for updating (cannot log history).")
+    history_table = f"{context_name}_history"
+    _add_context_history_entry(
+        cursor, history_table, _get_latest_context_version(cursor, history_table) + 1,
+        json.loads(current_row['content']), change_source
+    )
+    cursor.execute(f"UPDATE {context_name} SET content = ? WHERE id = 1", (json.dumps(content),))
+
+# Cursor-level inserters by item type, for writes that span several item types.
+_ITEM_INSERTERS = {
+    "decision": _insert_decisions,
+    "progress_entry": _insert_progress_entries,
+    "system_pattern": _insert_system_patterns,
+    "custom_data": _insert_custom_data_entries,
+}
+
+def import_items(
+    workspace_id: str,
+    contexts: Dict[str, Dict[str, Any]],
+    items: Dict[str, List[models.BaseModel]],
+    dry_run: bool = False
+) -> Dict[str, int]:
+    """
+    Writes contexts (by table name) and items (by item type) in a single transaction, so an
+    import lands completely or not at all. Items are bulk inserted and get their new IDs.
+    With dry_run the writes are made, so every constraint is checked, then rolled back.
+    Returns the number of rows written per context and item type.
+    """
+    unknown = set(items) - set(_ITEM_INSERTERS)
+    if unknown:
+        raise ValueError(f"Cannot import item types: {', '.join(sorted(unknown))}")
+    with _write_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            counts = {}
+            for context_name, content in contexts.items():
+                _replace_context_content(cursor, context_name, content, "import_markdown_to_conport")
+                counts[context_name] = 1
+            for item_type, batch in items.items():
+                if batch:
+                    _ITEM_INSERTERS[item_type](cursor, batch)
+                    counts[item_type] = len(batch)
+            if dry_run:
+                conn.rollback()
+            else:
+                conn.commit()
+            return counts
+        except (sqlite3.Error, TypeError, json.JSONDecodeError, DatabaseError) as e: # TypeError for json.dumps
+            conn.rollback()
+            raise DatabaseError(f"Failed to import items: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def _group_keys_by_category(entries: List[models.CustomData]) -> Dict[str, List[str]]:
+    grouped: Dict[str, Dict[str, None]] = {} # dicts as ordered sets
+    for entry in entries:
+        grouped.setdefault(entry.category, {})[entry.key] = None
+    return {category: list(keys) for category, keys in grouped.items()}
+
+def log_context_links(workspace_id: str, links: List[models.ContextLink]) -> List[models.ContextLink]:
+    """Logs many context links in one transaction. Returns them with their new IDs."""
+    if not links:
+        return []
+    with _write_connection(workspace_id) as conn:
+        cursor = None
+        sql = """
+            INSERT INTO context_links (
+                workspace_id, source_item_type, source_item_id,
+                target_item_type, target_item_id, relationship_type, description, timestamp
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        params = [
+            (workspace_id, l.source_item_type, str(l.source_item_id), l.target_item_type,
+             str(l.target_item_id), l.relationship_type, l.description, l.timestamp)
+            for l in links
         ]
+        try:
+            cursor = conn.cursor()
+            ids = _executemany_with_ids(cursor, sql, params)
+            conn.commit()
+            for link, link_id in zip(links, ids):
+                link.id = link_id
+            return links
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to log {len(links)} context links: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def traverse_context_links(
+    workspace_id: str,
+    item_type: str,
+    item_id: str,
+    max_depth: int = 2,
+    relationship_types: Optional[List[str]] = None,
+    direction: str = "both",
+    max_visits: int = 100
+) -> Tuple[List[Dict[str, Any]], List[models.ContextLink], bool]:
+    """
+    Expands the link neighbourhood of an item breadth-first, up to `max_depth` hops, with one
+    recursive query. `direction` follows links from source to target ('outgoing'), target to
+    source ('incoming') or both. The walk stops after `max_visits` node visits (a node reached
+    through several links counts once per link), which bounds the cost on dense graphs.
 
-        # Recent Active Context Updates (from history)
-        cursor.execute(
-            """
-            SELECT id, timestamp, version, content, change_source
-            FROM active_context_history WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT ?
-            """,
-            (start_datetime, limit_per_type)
+    Returns (nodes, links, truncated): each node once with the depth it was first reached at
+    (the start node has depth 0), the links walked, and whether the visit budget cut the walk short.
+    """
+    if direction not in ("both", "outgoing", "incoming"):
+        raise ValueError(f"Unsupported direction: {direction}")
+    join_conditions = []
+    if direction in ("both", "outgoing"):
+        join_conditions.append("(l.source_item_type = w.item_type AND l.source_item_id = w.item_id)")
+    if direction in ("both", "incoming"):
+        join_conditions.append("(l.target_item_type = w.item_type AND l.target_item_id = w.item_id)")
+    where = ["w.depth < ?"]
+    params: List[Any] = [item_type, str(item_id), max_depth]
+    if relationship_types:
+        where.append(f"l.relationship_type IN ({', '.join('?' * len(relationship_types))})")
+        params.extend(relationship_types)
+    params.append(max_visits + 1) # One extra visit tells whether the budget cut the walk short
+    # The far end of the link: its target when walked from the source, else its source
+    is_source = "l.source_item_type = w.item_type AND l.source_item_id = w.item_id"
+    if direction == "incoming":
+        is_source = "0"
+    sql = f"""
+        WITH RECURSIVE walk(item_type, item_id, depth, link_id) AS (
+            SELECT ?, ?, 0, NULL
+            UNION
+            SELECT CASE WHEN {is_source} THEN l.target_item_type ELSE l.source_item_type END,
+                   CASE WHEN {is_source} THEN l.target_item_id ELSE l.source_item_id END,
+                   w.depth + 1, l.id
+            FROM walk w JOIN context_links l ON {' OR '.join(join_conditions)}
+            WHERE {' AND '.join(where)}
+            ORDER BY 3 -- Breadth-first: the queue is drained in depth order
+            LIMIT ?
         )
-        rows = cursor.fetchall()
-        summary_results["recent_active_context_updates"] = [
-            models.ActiveContextHistory(
-                id=row['id'], timestamp=row['timestamp'], version=row['version'],
-                content=json.loads(row['content']), change_source=row['change_source']
-            ).model_dump(mode='json') for row in rows
-        ]
-        
-        # Recent Links Created
-        cursor.execute(
-            """
-            SELECT id, timestamp, source_item_type, source_item_id, target_item_type, target_item_id, relationship_type, description
-            FROM context_links WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT ?
-            """,
-            (start_datetime, limit_per_type)
+        SELECT w.item_type, w.item_id, w.depth, l.id, l.timestamp, l.source_item_type, l.source_item_id,
+               l.target_item_type, l.target_item_id, l.relationship_type, l.description
+        FROM walk w LEFT JOIN context_links l ON l.id = w.link_id
+        ORDER BY w.depth
+    """
+    with _read_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, tuple(params))
+            rows = cursor.fetchall()
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to traverse context links from {item_type} {item_id}: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+    truncated = len(rows) > max_visits
+    nodes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    links: Dict[int, models.ContextLink] = {}
+    for row in rows[:max_visits]:
+        key = (row['item_type'], row['item_id'])
+        if key not in nodes or row['depth'] < nodes[key]['depth']:
+            nodes[key] = {"item_type": key[0], "item_id": key[1], "depth": row['depth']}
+        if row['id'] is not None and row['id'] not in links:
+            links[row['id']] = models.ContextLink(
+                id=row['id'], timestamp=row['timestamp'],
+                source_item_type=row['source_item_type'], source_item_id=row['source_item_id'],
+                target_item_type=row['target_item_type'], target_item_id=row['target_item_id'],
+                relationship_type=row['relationship_type'], description=row['description']
+            )
+    return sorted(nodes.values(), key=lambda node: node["depth"]), list(links.values()), truncated
+
+# --- Item lookup by ID ---
+
+# item_type (as used by the vector store and links) -> (table, columns)
+ITEM_TABLES: Dict[str, Tuple[str, str]] = {
+    "decision": ("decisions", "id, timestamp, summary, rationale, implementation_details, tags"),
+    "progress_entry": ("progress_entries", "id, timestamp, status, description, parent_id"),
+    "system_pattern": ("system_patterns", "id, timestamp, name, description, tags"),
+    "custom_data": ("custom_data", "id, timestamp, category, key, value"),
+}
+
+def _row_to_item(item_type: str, row: sqlite3.Row) -> models.BaseModel:
+    """Builds the Pydantic model for a row selected with the columns in ITEM_TABLES."""
+    if item_type == "decision":
+        return models.Decision(
+            id=row['id'], timestamp=row['timestamp'], summary=row['summary'],
+            rationale=row['rationale'], implementation_details=row['implementation_details'],
+            tags=json.loads(row['tags']) if row['tags'] else None
         )
-        rows = cursor.fetchall()
-        summary_results["recent_links_created"] = [
-            models.ContextLink(
-                id=row['id'], timestamp=row['timestamp'], source_item_type=row['source_item_type'],
-                source_item_id=row['source_item_id'], target_item_type=row['target_item_type'],
-                target_item_id=row['target_item_id'], relationship_type=row['relationship_type'],
-                description=row['description']
-            ).model_dump(mode='json') for row in rows
-        ]
-
-        # Recent System Patterns
-        cursor.execute(
-            """
-            SELECT id, timestamp, name, description, tags
-            FROM system_patterns WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT ?
-            """,
-            (start_datetime, limit_per_type)
+    if item_type == "progress_entry":
+        return models.ProgressEntry(
+            id=row['id'], timestamp=row['timestamp'], status=row['status'],
+            description=row['description'], parent_id=row['parent_id']
         )
-        rows = cursor.fetchall()
-        summary_results["recent_system_patterns"] = [
-            models.SystemPattern(
-                id=row['id'], timestamp=row['timestamp'], name=row['name'],
-                description=row['description'], tags=json.loads(row['tags']) if row['tags'] else None
-            ).model_dump(mode='json') for row in rows
-        ]
+    if item_type == "system_pattern":
+        return models.SystemPattern(
+            id=row['id'], timestamp=row['timestamp'], name=row['name'],
+            description=row['description'], tags=json.loads(row['tags']) if row['tags'] else None
+        )
+    return models.CustomData(
+        id=row['id'], timestamp=row['timestamp'], category=row['category'],
+        key=row['key'], value=json.loads(row['value'])
+    )
 
-        # Note about missing timestamps (removed as all now have timestamps)
-        # summary_results["notes"].append(
-        #     "General Custom Data entries are not included in this summary "
-        #     "as they currently do not have creation/update timestamps in the database."
-        # )
+def get_items_by_ids(workspace_id: str, item_type: str, item_ids: List[int]) -> Dict[int, models.BaseModel]:
+    """
+    Fetches items of one type by primary key with a single IN query.
+    Returns a dict keyed by id; ids that do not exist are simply absent.
+    """
+    return get_items_by_type_and_ids(workspace_id, {item_type: item_ids}).get(item_type, {})
 
-        return summary_results
+def get_items_by_type_and_ids(
+    workspace_id: str, item_ids_by_type: Dict[str, List[int]]
+) -> Dict[str, Dict[int, models.BaseModel]]:
+    """
+    Fetches items of several types by primary key: one IN query per type, all in a single
+    read transaction so the items come from the same snapshot. Returns
+    {item_type: {id: item}}; ids that do not exist are simply absent.
+    """
+    for item_type in item_ids_by_type:
+        if item_type not in ITEM_TABLES:
+            raise ValueError(f"Unsupported item type: {item_type}")
+    result: Dict[str, Dict[int, models.BaseModel]] = {item_type: {} for item_type in item_ids_by_type}
+    if not any(item_ids_by_type.values()):
+        return result
+    with _read_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            for item_type, item_ids in item_ids_by_type.items():
+                table, columns = ITEM_TABLES[item_type]
+                # Chunk to stay under SQLite's bound-parameter limit
+                for start in range(0, len(item_ids), 500):
+                    chunk = item_ids[start:start + 500]
+                    placeholders = ", ".join("?" * len(chunk))
+                    cursor.execute(f"SELECT {columns} FROM {table} WHERE id IN ({placeholders})", tuple(chunk))
+                    for row in cursor.fetchall():
+                        result[item_type][row['id']] = _row_to_item(item_type, row)
+            conn.commit()
+            return result
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            raise DatabaseError(f"Failed to retrieve items by id: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+            if conn.in_transaction:
+                conn.rollback()
+
+# --- Embedding Queue ---
+# Rows are added by triggers on the item tables (see the 20261018 migration) and
+# drained by core.indexing_queue.
+
+def fetch_embedding_queue_batch(workspace_id: str, limit: int, max_attempts: int) -> List[Dict[str, Any]]:
+    """
+    Returns up to `limit` queued entries, skipping entries that exhausted their attempts.
+    Entries that have not failed come first, oldest first, so failing ones never hold them up.
+    """
+    with _read_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id, item_type, item_id, attempts FROM embedding_queue "
+                "WHERE attempts < ? ORDER BY attempts, id LIMIT ?",
+                (max_attempts, limit)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to read embedding queue: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def delete_embedding_queue_entries(workspace_id: str, queue_ids: List[int]) -> None:
+    """Removes processed entries. Entries re-enqueued meanwhile have new ids and are kept."""
+    if not queue_ids:
+        return
+    with _write_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.executemany("DELETE FROM embedding_queue WHERE id = ?", [(qid,) for qid in queue_ids])
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to delete embedding queue entries: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def record_embedding_queue_failure(workspace_id: str, queue_ids: List[int], error: str, count_attempt: bool = True) -> None:
+    """
+    Records the error of entries whose processing failed and increments their attempt counter,
+    unless `count_attempt` is False (the failure was not the entries' fault).
+    """
+    if not queue_ids:
+        return
+    with _write_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(
+                "UPDATE embedding_queue SET attempts = attempts + ?, last_error = ? WHERE id = ?",
+                [(1 if count_attempt else 0, error[:1000], qid) for qid in queue_ids]
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to record embedding queue failure: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def reset_failed_embedding_queue_entries(workspace_id: str, max_attempts: int) -> int:
+    """Re-arms entries that exhausted their attempts so the worker tries them again. Returns how many."""
+    with _write_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE embedding_queue SET attempts = 0, last_error = NULL WHERE attempts >= ?", (max_attempts,)
+            )
+            conn.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to reset failed embedding queue entries: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def get_embedding_queue_stats(workspace_id: str, max_attempts: int) -> Dict[str, Any]:
+    """Summarizes the embedding queue: pending and failed counts, oldest pending entry and last error."""
+    with _read_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT
+                    COALESCE(SUM(attempts < :max), 0) AS pending,
+                    COALESCE(SUM(attempts > 0 AND attempts < :max), 0) AS retrying,
+                    COALESCE(SUM(attempts >= :max), 0) AS failed,
+                    MIN(CASE WHEN attempts < :max THEN enqueued_at END) AS oldest_pending
+                FROM embedding_queue
+                """,
+                {"max": max_attempts}
+            )
+            row = cursor.fetchone()
+            cursor.execute(
+                "SELECT last_error FROM embedding_queue WHERE last_error IS NOT NULL ORDER BY id DESC LIMIT 1"
+            )
+            error_row = cursor.fetchone()
+            oldest = row['oldest_pending']
+            return {
+                "pending": row['pending'],
+                "retrying": row['retrying'],
+                "failed": row['failed'],
+                # MIN() loses the column's declared type, so convert the raw ISO string here
+                "oldest_pending_at": _convert_datetime(oldest.encode()) if oldest else None,
+                "last_error": error_row['last_error'] if error_row else None,
+            }
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to read embedding queue stats: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+# --- Embedding Models ---
+# Which embedding model (and vector store collection) serves the workspace, and the
+# progress of a switch to another model; see core.embedding_models.
+
+def get_embedding_models(workspace_id: str) -> List[Dict[str, Any]]:
+    """Returns the workspace's active and building models (retired ones are omitted)."""
+    with _read_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT model_name, collection_name, dimension, status, backfill_item_type, backfill_after_id, updated_at "
+                "FROM embedding_models WHERE status IN ('active', 'building') ORDER BY status"
+            )
+            return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to read embedding models: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def _write_embedding_models(workspace_id: str, statements: List[Tuple[str, Tuple[Any, ...]]], action: str) -> int:
+    """Runs the statements in one transaction; returns the rows changed by the last one."""
+    with _write_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            for sql, params in statements:
+                cursor.execute(sql, params)
+            conn.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to {action}: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def ensure_active_embedding_model(workspace_id: str, model_name: str, collection_name: str) -> None:
+    """Records the model as active unless the workspace already has an active model."""
+    _write_embedding_models(workspace_id, [(
+        "INSERT INTO embedding_models (model_name, collection_name, status) SELECT ?, ?, 'active' "
+        "WHERE NOT EXISTS (SELECT 1 FROM embedding_models WHERE status = 'active')",
+        (model_name, collection_name)
+    )], "record the active embedding model")
+
+def start_embedding_model_build(workspace_id: str, model_name: str, collection_name: str) -> None:
+    """Makes the model the workspace's building model, replacing any build in progress."""
+    _write_embedding_models(workspace_id, [
+        ("UPDATE embedding_models SET status = 'retired', updated_at = ? WHERE status = 'building'",
+         (datetime.now(timezone.utc),)),
+        ("INSERT OR REPLACE INTO embedding_models (model_name, collection_name, status, updated_at) VALUES (?, ?, 'building', ?)",
+         (model_name, collection_name, datetime.now(timezone.utc))),
+    ], "start the embedding model build")
+
+def record_embedding_backfill_progress(
+    workspace_id: str, model_name: str, item_type: Optional[str], after_id: Optional[int]
+) -> None:
+    """
+    Stores the resume point of a backfill into the model's collection: a switch to a building
+    model, or a reindex of the active one. None clears it (reindex finished).
+    """
+    _write_embedding_models(workspace_id, [(
+        "UPDATE embedding_models SET backfill_item_type = ?, backfill_after_id = ?, updated_at = ? "
+        "WHERE model_name = ? AND status IN ('active', 'building')",
+        (item_type, after_id, datetime.now(timezone.utc), model_name)
+    )], "record embedding backfill progress")
+
+def set_embedding_model_dimension(workspace_id: str, model_name: str, dimension: int) -> None:
+    _write_embedding_models(workspace_id, [(
+        "UPDATE embedding_models SET dimension = ? WHERE model_name = ?", (dimension, model_name)
+    )], "record the embedding dimension")
+
+def activate_embedding_model(workspace_id: str, model_name: str) -> bool:
+    """Swaps a building model in as the active one. Returns False if it is no longer building."""
+    now = datetime.now(timezone.utc)
+    return _write_embedding_models(workspace_id, [
+        ("UPDATE embedding_models SET status = 'retired', updated_at = ? "
+         "WHERE status = 'active' AND EXISTS (SELECT 1 FROM embedding_models WHERE model_name = ? AND status = 'building')",
+         (now, model_name)),
+        ("UPDATE embedding_models SET status = 'active', backfill_item_type = NULL, backfill_after_id = NULL, updated_at = ? "
+         "WHERE model_name = ? AND status = 'building'",
+         (now, model_name)),
+    ], "activate the embedding model") == 1
+
+def get_items_after_id(workspace_id: str, item_type: str, after_id: int, limit: int) -> List[models.BaseModel]:
+    """Pages through all items of one type in id order (keyset on the primary key)."""
+    if item_type not in ITEM_TABLES:
+        raise ValueError(f"Unsupported item type: {item_type}")
+    table, columns = ITEM_TABLES[item_type]
+    with _read_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {columns} FROM {table} WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit))
+            return [_row_to_item(item_type, row) for row in cursor.fetchall()]
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            raise DatabaseError(f"Failed to page through {item_type} items: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def iter_items(workspace_id: str, item_type: str, order_by: str = "id", batch_size: int = 500) -> Iterator[models.BaseModel]:
+    """
+    Yields every item of one type in `order_by` order (an ORDER BY clause over the item's
+    columns), fetched from a single cursor in batches rather than loaded all at once.
+    """
+    if item_type not in ITEM_TABLES:
+        raise ValueError(f"Unsupported item type: {item_type}")
+    table, columns = ITEM_TABLES[item_type]
+    with _read_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {columns} FROM {table} ORDER BY {order_by}")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield _row_to_item(item_type, row)
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            raise DatabaseError(f"Failed to read {item_type} items: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def get_activity_watermarks(workspace_id: str, item_types: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    The latest activity_log entry of each item type, as {"activity_id", "timestamp"}, or None
+    if the type has no activity. Every insert, update and delete of an item adds an entry, so
+    an unchanged watermark means the type's items are unchanged.
+    """
+    with _read_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            watermarks: Dict[str, Optional[Dict[str, Any]]] = {}
+            for item_type in item_types:
+                cursor.execute(
+                    "SELECT id, timestamp FROM activity_log WHERE item_type = ? ORDER BY timestamp DESC, id DESC LIMIT 1",
+                    (item_type,)
+                )
+                row = cursor.fetchone()
+                watermarks[item_type] = {"activity_id": row['id'], "timestamp": row['timestamp']} if row else None
+            return watermarks
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to read activity watermarks: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def count_items(workspace_id: str, item_type: str, up_to_id: Optional[int] = None) -> int:
+    """Counts the items of one type, optionally only those with id <= up_to_id."""
+    if item_type not in ITEM_TABLES:
+        raise ValueError(f"Unsupported item type: {item_type}")
+    table, _ = ITEM_TABLES[item_type]
+    with _read_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            if up_to_id is None:
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            else:
+                cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE id <= ?", (up_to_id,))
+            return cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to count {item_type} items: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def get_item_ids(workspace_id: str, item_type: str) -> List[int]:
+    """The ids of all items of one type."""
+    if item_type not in ITEM_TABLES:
+        raise ValueError(f"Unsupported item type: {item_type}")
+    table, _ = ITEM_TABLES[item_type]
+    with _read_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT id FROM {table}")
+            return [row[0] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to list {item_type} ids: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def enqueue_embeddings(workspace_id: str, item_type: str, item_ids: List[int]) -> None:
+    """
+    Queues items for (re)embedding by the indexing worker. Items already queued keep their
+    entry, but with their attempts reset, so entries that exhausted them are tried again.
+    """
+    if not item_ids:
+        return
+    with _write_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(
+                "INSERT INTO embedding_queue (item_type, item_id) VALUES (?, ?) "
+                "ON CONFLICT (item_type, item_id) DO UPDATE SET attempts = 0, last_error = NULL",
+                [(item_type, item_id) for item_id in item_ids]
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to queue {len(item_ids)} {item_type} items for embedding: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+def _orphan_condition(table: str, type_column: str, id_column: str) -> str:
+    """SQL condition: the row refers by numeric id to an item that does not exist."""
+    return f"""
+        {type_column} = ? AND {id_column} <> '' AND {id_column} NOT GLOB '*[^0-9]*'
+        AND NOT EXISTS (SELECT 1 FROM {table} WHERE id = CAST({id_column} AS INTEGER))
+    """
 
-    except (sqlite3.Error, json.JSONDecodeError) as e:
-        raise DatabaseError(f"Failed to retrieve recent activity summary: {e}")
-    finally:
-        if cursor:
-            cursor.close()
+def delete_orphaned_rows(workspace_id: str, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Removes rows that refer to items which no longer exist, left behind by deletes and
+    replacements made before the cascade triggers of migration 20261018_10: context links with
+    a missing endpoint, item tags and custom_data FTS rows. Links that name an item by key rather than numeric id
+    are kept. Returns the number of rows removed (or, with `dry_run`, found) per kind.
+    """
+    statements: List[Tuple[str, str, List[Any]]] = [] # (kind, condition on the kind's table, params)
+    for item_type, (table, _) in ITEM_TABLES.items():
+        statements.append(("context_links", _orphan_condition(table, "source_item_type", "source_item_id"), [item_type]))
+        statements.append(("context_links", _orphan_condition(table, "target_item_type", "target_item_id"), [item_type]))
+        statements.append(("item_tags", f"item_type = ? AND item_id NOT IN (SELECT id FROM {table})", [item_type]))
+    with _write_connection(workspace_id) as conn:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'custom_data_fts'")
+            if cursor.fetchone() is not None:
+                statements.append(("custom_data_fts", "rowid NOT IN (SELECT id FROM custom_data)", []))
+            removed = {"context_links": 0, "item_tags": 0, "custom_data_fts": 0}
+            for kind, condition, params in statements:
+                if dry_run:
+                    cursor.execute(f"SELECT COUNT(*) FROM {kind} WHERE {condition}", tuple(params))
+                    removed[kind] += cursor.fetchone()[0]
+                else:
+                    cursor.execute(f"DELETE FROM {kind} WHERE {condition}", tuple(params))
+                    removed[kind] += cursor.rowcount
+            conn.commit()
+            return removed
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise DatabaseError(f"Failed to remove orphaned rows: {e}")
+        finally:
+            if cursor:
+                cursor.close()
 
 # (All planned CRUD functions implemented)
 
@@ -101,6 +101,15 @@ class IntCoercionMixin(BaseModel):
                         values[field_name] = int(s)
         return values
 
+class PaginationArgs(BaseModel):
+    """Mixin adding keyset pagination (newest first, keyed on timestamp and id) to list tools."""
+    paginate: bool = Field(False, description="Return a page {'items': [...], 'next_cursor': ...} ordered newest first, with 'limit' as the page size.")
+    cursor: Optional[str] = Field(None, description="Opaque 'next_cursor' from a previous page; implies 'paginate'.")
+
+    @property
+    def is_paginated(self) -> bool:
+        return self.paginate or self.cursor is not None
+
 # --- Context Tools ---
 
 class GetContextArgs(BaseArgs):
@@ -133,7 +142,7 @@ class LogDecisionArgs(BaseArgs):
     implementation_details: Optional[str] = Field(None, description="Details about how the decision will be/was implemented")
     tags: Optional[List[str]] = Field(None, description="Optional tags for categorization")
 
-class GetDecisionsArgs(IntCoercionMixin, BaseArgs):
+class GetDecisionsArgs(IntCoercionMixin, PaginationArgs, BaseArgs):
     """Arguments for retrieving decisions."""
     INT_FIELDS: ClassVar[Set[str]] = {"limit"}
     limit: Optional[int] = Field(None, description="Maximum number of decisions to return (most recent first)")
@@ -198,7 +207,7 @@ class LogProgressArgs(IntCoercionMixin, BaseArgs):
             raise ValueError("Both 'linked_item_type' and 'linked_item_id' must be provided together, or neither.")
         return values
 
-class GetProgressArgs(IntCoercionMixin, BaseArgs):
+class GetProgressArgs(IntCoercionMixin, PaginationArgs, BaseArgs):
     """Arguments for retrieving progress entries."""
     INT_FIELDS: ClassVar[Set[str]] = {"parent_id_filter", "limit"}
     status_filter: Optional[str] = Field(None, description="Filter entries by status")
@@ -253,7 +262,7 @@ class LogSystemPatternArgs(IntCoercionMixin, BaseArgs):
     description: Optional[str] = Field(None, description="Description of the pattern")
     tags: Optional[List[str]] = Field(None, description="Optional tags for categorization")
 
-class GetSystemPatternsArgs(IntCoercionMixin, BaseArgs):
+class GetSystemPatternsArgs(IntCoercionMixin, PaginationArgs, BaseArgs):
     """Arguments for retrieving system patterns."""
     INT_FIELDS: ClassVar[Set[str]] = {"limit"}
     limit: Optional[int] = Field(None, description="Maximum number of patterns to return (most recent first)")
@@ -292,10 +301,18 @@ class LogCustomDataArgs(BaseArgs):
     key: str = Field(..., min_length=1, description="Key for the custom data (unique within category)")
     value: Any = Field(..., description="The custom data value (JSON serializable)")
 
-class GetCustomDataArgs(BaseArgs):
+class GetCustomDataArgs(IntCoercionMixin, PaginationArgs, BaseArgs):
     """Arguments for retrieving custom data."""
+    INT_FIELDS: ClassVar[Set[str]] = {"limit"}
     category: Optional[str] = Field(None, description="Filter by category")
     key: Optional[str] = Field(None, description="Filter by key (requires category)")
+    limit: Optional[int] = Field(None, description="Maximum number of entries to return")
+
+    @model_validator(mode='after')
+    def check_limit(self) -> 'GetCustomDataArgs':
+        if self.limit is not None and self.limit < 1:
+            raise ValueError("limit must be greater than or equal to 1")
+        return self
 
 class DeleteCustomDataArgs(BaseArgs):
     """Arguments for deleting custom data."""
@@ -332,12 +349,14 @@ class SearchProjectGlossaryArgs(IntCoercionMixin, BaseArgs):
 class ExportConportToMarkdownArgs(BaseArgs):
     """Arguments for exporting ConPort data to markdown files."""
     output_path: Optional[str] = Field(None, description="Optional output directory path relative to workspace_id. Defaults to './conport_export/' if not provided.")
+    full: bool = Field(False, description="Rebuild every file, ignoring the manifest of the previous export")
 
 # --- Import Tool ---
 
 class ImportMarkdownToConportArgs(BaseArgs):
     """Arguments for importing markdown files into ConPort data."""
     input_path: Optional[str] = Field(None, description="Optional input directory path relative to workspace_id containing markdown files. Defaults to './conport_export/' if not provided.")
+    dry_run: bool = Field(False, description="Parse, validate and write in a transaction that is rolled back, without changing anything")
 
 # --- Knowledge Graph Link Tools ---
 
@@ -361,7 +380,7 @@ class LinkConportItemsArgs(BaseArgs):
     relationship_type: str = Field(..., description="Nature of the link")
     description: Optional[str] = Field(None, description="Optional description for the link")
 
-class GetLinkedItemsArgs(IntCoercionMixin, BaseArgs):
+class GetLinkedItemsArgs(IntCoercionMixin, PaginationArgs, BaseArgs):
     """Arguments for retrieving links for a ConPort item."""
     INT_FIELDS: ClassVar[Set[str]] = {"limit"}
     item_type: str = Field(..., description="Type of the item to find links for (e.g., 'decision')")
@@ -376,6 +395,31 @@ class GetLinkedItemsArgs(IntCoercionMixin, BaseArgs):
             raise ValueError("limit must be greater than or equal to 1")
         return self
 
+class TraverseLinksArgs(IntCoercionMixin, BaseArgs):
+    """Arguments for expanding the link neighbourhood of a ConPort item."""
+    INT_FIELDS: ClassVar[Set[str]] = {"max_depth", "max_nodes"}
+    item_type: str = Field(..., description="Type of the item to start from (e.g., 'decision')")
+    item_id: str = Field(..., description="ID or key of the item to start from")
+    max_depth: int = Field(2, description="Maximum number of link hops from the start item (1-5)")
+    relationship_types: Optional[List[str]] = Field(None, description="Optional: Only follow links of these relationship types")
+    direction: str = Field("both", description="Follow links 'outgoing' (source to target), 'incoming' (target to source) or 'both'")
+    max_nodes: int = Field(100, description="Budget of node visits (a node reached through several links counts once per link); bounds the cost on dense graphs (1-1000)")
+    include_full_items: bool = Field(False, description="Attach each node's full item from the database as 'full_item'")
+
+    @model_validator(mode='after')
+    def check_constraints(self) -> 'TraverseLinksArgs':
+        if not 1 <= self.max_depth <= 5:
+            raise ValueError("max_depth must be between 1 and 5")
+        if not 1 <= self.max_nodes <= 1000:
+            raise ValueError("max_nodes must be between 1 and 1000")
+        if self.direction not in ("both", "outgoing", "incoming"):
+            raise ValueError("direction must be 'both', 'outgoing' or 'incoming'")
+        return self
+
+class BatchLinkItemsArgs(BaseArgs):
+    """Arguments for creating many links between ConPort items at once."""
+    links: List[Dict[str, Any]] = Field(..., min_length=1, description="A list of dictionaries, each with the arguments of a single link_conport_items call.")
+
 # --- Batch Logging Tool ---
 
 class BatchLogItemsArgs(BaseArgs):
@@ -451,6 +495,7 @@ class SemanticSearchConportArgs(IntCoercionMixin, BaseArgs):
     filter_tags_include_any: Optional[List[str]] = Field(default=None, description="Optional list of tags; results will include items matching any of these tags.")
     filter_tags_include_all: Optional[List[str]] = Field(default=None, description="Optional list of tags; results will include only items matching all of these tags.")
     filter_custom_data_categories: Optional[List[str]] = Field(default=None, description="Optional list of categories to filter by if 'custom_data' is in filter_item_types.")
+    include_full_items: bool = Field(default=False, description="Attach each hit's full item from the database as 'full_item'.")
 
     @model_validator(mode='after')
     def check_numerical_constraints(self) -> 'SemanticSearchConportArgs':
@@ -476,6 +521,43 @@ class SemanticSearchConportArgs(IntCoercionMixin, BaseArgs):
             raise ValueError("'filter_custom_data_categories' can only be used if 'custom_data' is included in 'filter_item_types'.")
         return values
 
+# --- Hybrid Search Tool Args ---
+
+class HybridSearchArgs(SemanticSearchConportArgs):
+    """Arguments for a combined full-text and semantic search; same filters as semantic search."""
+    pass
+
+# --- Indexing Status Tool Args ---
+
+class GetIndexingStatusArgs(BaseArgs):
+    """Arguments for reporting the background embedding queue status."""
+    pass
+
+class RetryFailedIndexingArgs(BaseArgs):
+    """Arguments for re-queueing items whose embedding failed too many times."""
+    pass
+
+# --- Server Health Tool Args ---
+
+class GetServerHealthArgs(BaseArgs):
+    """Arguments for reporting embedding model and vector store readiness."""
+    pass
+
+# --- Embedding Model Tool Args ---
+
+class MigrateEmbeddingModelArgs(BaseArgs):
+    """Arguments for switching a workspace to another embedding model."""
+    model_name: str = Field(..., min_length=1, description="sentence-transformers model name or path to re-embed the workspace with")
+
+class ReindexSemanticStoreArgs(BaseArgs):
+    """Arguments for rebuilding the workspace's vector store from the database."""
+    drop_existing: bool = Field(False, description="Empty the collection first, removing vectors of items that no longer exist")
+    restart: bool = Field(False, description="Start over instead of resuming a reindex in progress")
+
+class CollectGarbageArgs(BaseArgs):
+    """Arguments for removing data left behind by deleted items."""
+    dry_run: bool = Field(False, description="Only report what would be removed")
+
 # Dictionary mapping tool names to their expected argument models (for potential future use/validation)
 TOOL_ARG_MODELS = {
     "get_product_context": GetContextArgs,
@@ -500,11 +582,20 @@ TOOL_ARG_MODELS = {
     "import_markdown_to_conport": ImportMarkdownToConportArgs,
     "link_conport_items": LinkConportItemsArgs,
     "get_linked_items": GetLinkedItemsArgs,
+    "traverse_links": TraverseLinksArgs,
+    "batch_link_items": BatchLinkItemsArgs,
     "batch_log_items": BatchLogItemsArgs,
     "get_item_history": GetItemHistoryArgs,
     "get_conport_schema": GetConportSchemaArgs,
     "get_recent_activity_summary": GetRecentActivitySummaryArgs,
     "semantic_search_conport": SemanticSearchConportArgs,
+    "hybrid_search": HybridSearchArgs,
     "update_progress": UpdateProgressArgs,
     "delete_progress_by_id": DeleteProgressByIdArgs,
+    "get_indexing_status": GetIndexingStatusArgs,
+    "retry_failed_indexing": RetryFailedIndexingArgs,
+    "get_server_health": GetServerHealthArgs,
+    "migrate_embedding_model": MigrateEmbeddingModelArgs,
+    "reindex_semantic_store": ReindexSemanticStoreArgs,
+    "collect_garbage": CollectGarbageArgs,
 }
\ No newline at end of file
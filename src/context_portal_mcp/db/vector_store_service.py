@@ -1,18 +1,21 @@
 # src/context_portal_mcp/db/vector_store_service.py
-import chromadb
-from chromadb.config import Settings as ChromaSettings
-from typing import List, Dict, Optional, Any
+from typing import TYPE_CHECKING, List, Dict, Optional, Any, Tuple
+import hashlib
 import logging
 import os
+import re
 import shutil # For deleting workspace vector store
 
 from ..core import embedding_service # Use our embedding service
 
+if TYPE_CHECKING:
+    import chromadb # Imported on first use: chromadb is slow to import
+
 log = logging.getLogger(__name__)
 
 # Global cache for ChromaDB clients per workspace_id to avoid reinitialization
-_chroma_clients: Dict[str, chromadb.PersistentClient] = {}
-_chroma_collections: Dict[str, Dict[str, chromadb.Collection]] = {} # workspace_id -> {collection_name: Collection}
+_chroma_clients: Dict[str, 'chromadb.PersistentClient'] = {}
+_chroma_collections: Dict[str, Dict[str, 'chromadb.Collection']] = {} # workspace_id -> {collection_name: Collection}
 
 DEFAULT_COLLECTION_NAME = "conport_semantic_store"
 
@@ -65,7 +68,7 @@ def _get_vector_store_path(workspace_id: str) -> str:
     return vector_db_path
 
 
-def get_chroma_client(workspace_id: str) -> chromadb.PersistentClient:
+def get_chroma_client(workspace_id: str) -> 'chromadb.PersistentClient':
     """
     Gets or initializes a persistent ChromaDB client for the given workspace_id.
     Clients are cached globally.
@@ -74,6 +77,8 @@ def get_chroma_client(workspace_id: str) -> chromadb.PersistentClient:
         vector_store_path = _get_vector_store_path(workspace_id)
         log.info(f"Initializing ChromaDB client for workspace '{workspace_id}' at path: {vector_store_path}")
         try:
+            import chromadb
+            from chromadb.config import Settings as ChromaSettings
             # Settings for on-disk persistence.
             # allow_reset=True can be useful during development if schema changes.
             client = chromadb.PersistentClient(path=vector_store_path, settings=ChromaSettings(allow_reset=True, anonymized_telemetry=False))
@@ -83,10 +88,29 @@ def get_chroma_client(workspace_id: str) -> chromadb.PersistentClient:
             raise
     return _chroma_clients[workspace_id]
 
-def get_or_create_collection(workspace_id: str, collection_name: str = DEFAULT_COLLECTION_NAME) -> chromadb.Collection:
+def collection_name_for(model_name: str) -> str:
+    """
+    Name of the collection holding one embedding model's vectors, so models with different
+    dimensions never share a collection. The original default model keeps the original name.
+    """
+    if model_name == embedding_service.DEFAULT_MODEL_NAME:
+        return DEFAULT_COLLECTION_NAME
+    # Chroma names allow [a-zA-Z0-9._-] and must start and end with a letter or digit. The slug
+    # is lossy ('Org/Model' and 'org-model' give the same one), so a hash of the exact name follows.
+    slug = re.sub(r"[^a-z0-9._-]+", "-", model_name.lower()).strip("-._")
+    digest = hashlib.sha256(model_name.encode("utf-8")).hexdigest()[:10]
+    prefix = f"{DEFAULT_COLLECTION_NAME}__{slug}"[:488].rstrip("-._")
+    return f"{prefix}-{digest}"
+
+def get_or_create_collection(
+    workspace_id: str,
+    collection_name: str = DEFAULT_COLLECTION_NAME,
+    model_name: Optional[str] = None
+) -> 'chromadb.Collection':
     """
     Gets or creates a ChromaDB collection for the given workspace_id and collection_name.
-    Collections are cached globally.
+    Collections are cached globally. `model_name` (default: the server's model) is the model
+    whose vectors the collection holds; it is recorded in the metadata of new collections.
     """
     if workspace_id not in _chroma_collections:
         _chroma_collections[workspace_id] = {}
@@ -96,7 +120,7 @@ def get_or_create_collection(workspace_id: str, collection_name: str = DEFAULT_C
         log.info(f"Getting or creating ChromaDB collection '{collection_name}' for workspace '{workspace_id}'.")
         try:
             # Get the embedding function from our service to ensure consistency
-            chroma_ef = embedding_service.get_chroma_embedding_function()
+            chroma_ef = embedding_service.get_chroma_embedding_function(model_name)
             
             # When providing pre-calculated embeddings (as we do in upsert_item_embedding),
             # ChromaDB does not strictly need an embedding_function at the collection level
@@ -108,7 +132,8 @@ def get_or_create_collection(workspace_id: str, collection_name: str = DEFAULT_C
             # and needs to know how to handle future text additions.
             collection = client.get_or_create_collection(
                 name=collection_name,
-                embedding_function=chroma_ef
+                embedding_function=chroma_ef,
+                metadata={"embedding_model": chroma_ef.model_name}
             )
             _chroma_collections[workspace_id][collection_name] = collection
         except Exception as e:
@@ -117,13 +142,54 @@ def get_or_create_collection(workspace_id: str, collection_name: str = DEFAULT_C
             
     return _chroma_collections[workspace_id][collection_name]
 
+def has_collection(workspace_id: str, collection_name: str = DEFAULT_COLLECTION_NAME) -> bool:
+    """Whether the collection is already open in this process (no ChromaDB import or I/O)."""
+    return collection_name in _chroma_collections.get(workspace_id, {})
+
+def _check_dimension(collection: 'chromadb.Collection', vectors: List[List[float]]) -> None:
+    """
+    Rejects vectors whose dimension differs from the collection's, instead of letting a
+    model change mix vector spaces. The dimension is recorded in the collection metadata
+    on the first write.
+    """
+    dimension = len(vectors[0])
+    if any(len(vector) != dimension for vector in vectors):
+        raise ValueError("Embedding vectors in one upsert must have the same dimension.")
+    metadata = dict(collection.metadata or {})
+    recorded = metadata.get("embedding_dimension")
+    if recorded is None:
+        metadata["embedding_dimension"] = dimension
+        collection.modify(metadata=metadata)
+    elif recorded != dimension:
+        raise ValueError(
+            f"Collection '{collection.name}' holds {recorded}-dimensional vectors of model "
+            f"'{metadata.get('embedding_model')}', got {dimension}-dimensional ones."
+        )
+
+
+def _prepare_metadata(item_type: str, item_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Makes metadata suitable for ChromaDB (str, int, float, bool, or None values)."""
+    final_metadata = {}
+    for key, value in metadata.items():
+        # Convert any list values to strings.
+        if isinstance(value, list):
+            final_metadata[key] = ", ".join(map(str, value))
+        else:
+            final_metadata[key] = value
+
+    # Add item_type and item_id to metadata if not already present, for easier filtering.
+    final_metadata['conport_item_type'] = item_type
+    final_metadata['conport_item_id'] = str(item_id)
+    return final_metadata
+
 def upsert_item_embedding(
     workspace_id: str,
     item_type: str,
     item_id: str, # This is the original ConPort item's ID (e.g., decision_id, custom_data primary key)
     vector: List[float],
     metadata: Dict[str, Any], # Should include original_field, category, tags, timestamps etc.
-    collection_name: str = DEFAULT_COLLECTION_NAME
+    collection_name: str = DEFAULT_COLLECTION_NAME,
+    model_name: Optional[str] = None
 ):
     """
     Adds or updates an embedding in ChromaDB.
@@ -132,24 +198,13 @@ def upsert_item_embedding(
     or that the caller manages separate calls for separate field embeddings with distinct doc_ids.
     Design doc: "ChromaDB documents will use an ID like itemType_itemId" - implies one vector per item.
     """
-    collection = get_or_create_collection(workspace_id, collection_name)
+    collection = get_or_create_collection(workspace_id, collection_name, model_name)
     doc_id = f"{item_type}_{item_id}"
-    
-    # Ensure metadata is suitable for ChromaDB (str, int, float, bool, or None)
-    # Convert any list values to strings.
-    final_metadata = {}
-    for key, value in metadata.items():
-        if isinstance(value, list):
-            final_metadata[key] = ", ".join(map(str, value))
-        else:
-            final_metadata[key] = value
-    
-    # Add item_type and item_id to metadata if not already present, for easier filtering.
-    final_metadata['conport_item_type'] = item_type
-    final_metadata['conport_item_id'] = str(item_id)
+    final_metadata = _prepare_metadata(item_type, item_id, metadata)
 
     log.debug(f"Upserting embedding for doc_id '{doc_id}' in collection '{collection_name}' for workspace '{workspace_id}'.")
     try:
+        _check_dimension(collection, [vector])
         collection.upsert(
             ids=[doc_id],
             embeddings=[vector],
@@ -161,17 +216,44 @@ def upsert_item_embedding(
         # Decide on error handling: raise, or return status
         raise
 
+def upsert_item_embeddings(
+    workspace_id: str,
+    items: List[Tuple[str, str, List[float], Dict[str, Any]]],
+    collection_name: str = DEFAULT_COLLECTION_NAME,
+    model_name: Optional[str] = None
+):
+    """
+    Adds or updates many embeddings with a single ChromaDB upsert.
+    Each item is an (item_type, item_id, vector, metadata) tuple; document IDs follow upsert_item_embedding.
+    """
+    if not items:
+        return
+    collection = get_or_create_collection(workspace_id, collection_name, model_name)
+    ids = [f"{item_type}_{item_id}" for item_type, item_id, _, _ in items]
+    try:
+        _check_dimension(collection, [vector for _, _, vector, _ in items])
+        collection.upsert(
+            ids=ids,
+            embeddings=[vector for _, _, vector, _ in items],
+            metadatas=[_prepare_metadata(item_type, item_id, metadata) for item_type, item_id, _, metadata in items]
+        )
+        log.info(f"Successfully upserted {len(ids)} embeddings in collection '{collection_name}' for workspace '{workspace_id}'.")
+    except Exception as e:
+        log.error(f"Failed to upsert {len(ids)} embeddings: {e}", exc_info=True)
+        raise
+
 def query_vector_store(
     workspace_id: str,
     query_vector: List[float],
     top_k: int = 5,
     filters: Optional[Dict[str, Any]] = None, # ChromaDB 'where' clause
-    collection_name: str = DEFAULT_COLLECTION_NAME
+    collection_name: str = DEFAULT_COLLECTION_NAME,
+    model_name: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
     Queries the ChromaDB collection for similar embeddings.
     """
-    collection = get_or_create_collection(workspace_id, collection_name)
+    collection = get_or_create_collection(workspace_id, collection_name, model_name)
     log.debug(f"Querying collection '{collection_name}' in workspace '{workspace_id}' with top_k={top_k}, filters={filters}.")
     try:
         results = collection.query(
@@ -206,12 +288,13 @@ def delete_item_embedding(
     workspace_id: str,
     item_type: str,
     item_id: str,
-    collection_name: str = DEFAULT_COLLECTION_NAME
+    collection_name: str = DEFAULT_COLLECTION_NAME,
+    model_name: Optional[str] = None
 ):
     """
     Deletes an embedding from ChromaDB based on its ConPort item_type and item_id.
     """
-    collection = get_or_create_collection(workspace_id, collection_name)
+    collection = get_or_create_collection(workspace_id, collection_name, model_name)
     doc_id = f"{item_type}_{item_id}"
     log.debug(f"Attempting to delete embedding for doc_id '{doc_id}' from collection '{collection_name}' for workspace '{workspace_id}'.")
     try:
@@ -223,6 +306,57 @@ def delete_item_embedding(
         log.error(f"Failed to delete embedding for doc_id '{doc_id}': {e}", exc_info=True)
         raise
 
+def delete_item_embeddings(
+    workspace_id: str,
+    items: List[Tuple[str, str]],
+    collection_name: str = DEFAULT_COLLECTION_NAME,
+    model_name: Optional[str] = None
+):
+    """
+    Deletes many embeddings, given as (item_type, item_id) pairs, in one ChromaDB call.
+    IDs that are not in the collection are ignored.
+    """
+    if not items:
+        return
+    collection = get_or_create_collection(workspace_id, collection_name, model_name)
+    ids = [f"{item_type}_{item_id}" for item_type, item_id in items]
+    try:
+        collection.delete(ids=ids)
+        log.info(f"Deleted up to {len(ids)} embeddings from collection '{collection_name}' for workspace '{workspace_id}'.")
+    except Exception as e:
+        log.error(f"Failed to delete {len(ids)} embeddings: {e}", exc_info=True)
+        raise
+
+def get_item_keys(
+    workspace_id: str,
+    collection_name: str = DEFAULT_COLLECTION_NAME,
+    model_name: Optional[str] = None,
+    batch_size: int = 5000
+) -> List[Tuple[str, str]]:
+    """Lists the (item_type, item_id) of every embedding in the collection, without loading vectors."""
+    collection = get_or_create_collection(workspace_id, collection_name, model_name)
+    keys = []
+    offset = 0
+    while True:
+        ids = collection.get(include=[], limit=batch_size, offset=offset)["ids"]
+        for doc_id in ids:
+            item_type, _, item_id = doc_id.rpartition("_") # Item types contain underscores, ids do not
+            keys.append((item_type, item_id))
+        if len(ids) < batch_size:
+            return keys
+        offset += batch_size
+
+def delete_collection(workspace_id: str, collection_name: str) -> None:
+    """Drops one collection of the workspace (e.g. the vectors of a replaced embedding model)."""
+    client = get_chroma_client(workspace_id)
+    _chroma_collections.get(workspace_id, {}).pop(collection_name, None)
+    try:
+        client.delete_collection(name=collection_name)
+        log.info(f"Deleted collection '{collection_name}' for workspace '{workspace_id}'.")
+    except Exception as e:
+        # Chroma raises if the collection never existed, which is fine here
+        log.warning(f"Could not delete collection '{collection_name}' for workspace '{workspace_id}': {e}")
+
 def delete_workspace_vector_store(workspace_id: str):
     """
     Deletes the entire vector store directory for a given workspace.
@@ -1,11 +1,15 @@
 """Functions implementing the logic for each MCP tool."""
 
+import asyncio
+import hashlib
+import itertools
 import logging
 import os
 from pathlib import Path
 import json
 import re # For markdown parsing
-from typing import Dict, Any, List, Optional
+import time
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
 from datetime import datetime # Added missing import
 
 from pydantic import ValidationError
@@ -14,10 +18,18 @@ from ..db import database as db
 from ..db import models
 from ..core.exceptions import ToolArgumentError, DatabaseError, ContextPortalError
 from ..core import embedding_service # Added for semantic search
+from ..core import dispatch
+from ..core import embedding_models
+from ..core import indexing_queue
+from ..core import warmup
 from ..db import vector_store_service # Added for semantic search
 
 log = logging.getLogger(__name__)
 
+# hybrid_search: reciprocal rank fusion constant, and candidates fetched per ranker per result
+HYBRID_RRF_K = 60
+HYBRID_CANDIDATES_PER_RESULT = 4
+
 # --- Tool Handler Functions ---
 
 # --- FTS Query Utilities (handler layer) ---
@@ -57,6 +69,29 @@ def _prepare_fts_query(query: str, allowed_columns: Optional[List[str]] = None,
 
     return q
 
+# --- Pagination Utilities (handler layer) ---
+DEFAULT_PAGE_SIZE = 50
+
+def _fetch_limit(args: models.PaginationArgs, limit: Optional[int]) -> Optional[int]:
+    """Rows to fetch: the plain limit, or one more than the page size when paginating."""
+    if not args.is_paginated:
+        return limit
+    return (limit or DEFAULT_PAGE_SIZE) + 1
+
+def _list_response(args: models.PaginationArgs, limit: Optional[int], items: List[Any]) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Returns the plain list of item dictionaries, or when paginating a page
+    {'items': [...], 'next_cursor': ...}. 'next_cursor' is None on the last page.
+    """
+    if not args.is_paginated:
+        return [item.model_dump(mode='json') for item in items]
+    page_size = limit or DEFAULT_PAGE_SIZE
+    page = items[:page_size]
+    next_cursor = None
+    if len(items) > page_size:
+        next_cursor = db.encode_page_cursor(page[-1].timestamp, page[-1].id)
+    return {"items": [item.model_dump(mode='json') for item in page], "next_cursor": next_cursor}
+
 def handle_get_product_context(args: models.GetContextArgs) -> Dict[str, Any]:
     """
     Handles the 'get_product_context' MCP tool.
@@ -109,35 +144,8 @@ def handle_log_decision(args: models.LogDecisionArgs) -> Dict[str, Any]:
         )
         logged_decision = db.log_decision(args.workspace_id, decision_to_log)
 
-        # --- Add to Vector Store ---
-        if logged_decision and logged_decision.id is not None:
-            try:
-                text_to_embed = f"Decision Summary: {logged_decision.summary}\n"
-                if logged_decision.rationale:
-                    text_to_embed += f"Rationale: {logged_decision.rationale}\n"
-                if logged_decision.implementation_details:
-                    text_to_embed += f"Implementation Details: {logged_decision.implementation_details}"
-                
-                vector = embedding_service.get_embedding(text_to_embed.strip())
-                
-                metadata_for_vector = {
-                    "conport_item_id": str(logged_decision.id),
-                    "conport_item_type": "decision",
-                    "summary": logged_decision.summary,
-                    "timestamp_created": logged_decision.timestamp.isoformat(),
-                    "tags": ", ".join(logged_decision.tags) if logged_decision.tags else None
-                }
-                vector_store_service.upsert_item_embedding(
-                    workspace_id=args.workspace_id,
-                    item_type="decision",
-                    item_id=str(logged_decision.id),
-                    vector=vector,
-                    metadata=metadata_for_vector
-                )
-                log.info(f"Successfully generated and stored embedding for decision ID {logged_decision.id}")
-            except Exception as e_embed:
-                log.error(f"Failed to generate/store embedding for decision ID {logged_decision.id}: {e_embed}", exc_info=True)
-        # --- End Add to Vector Store ---
+        # Embedding happens in the background indexing queue (fed by DB triggers)
+        indexing_queue.notify(args.workspace_id)
         
         return logged_decision.model_dump(mode='json')
     except DatabaseError as e:
@@ -148,20 +156,23 @@ def handle_log_decision(args: models.LogDecisionArgs) -> Dict[str, Any]:
 
 # --- Added handlers --- # This comment might be outdated, these are just more handlers
 
-def handle_get_decisions(args: models.GetDecisionsArgs) -> List[Dict[str, Any]]:
+def handle_get_decisions(args: models.GetDecisionsArgs) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Handles the 'get_decisions' MCP tool.
     Assumes 'args' is an already validated Pydantic model instance.
-    Returns a list of decision dictionaries.
+    Returns a list of decision dictionaries, or a page of them when paginating.
     """
     try:
         decisions_list = db.get_decisions(
             args.workspace_id,
-            limit=args.limit,
+            limit=_fetch_limit(args, args.limit),
             tags_filter_include_all=args.tags_filter_include_all,
-            tags_filter_include_any=args.tags_filter_include_any
+            tags_filter_include_any=args.tags_filter_include_any,
+            page_cursor=args.cursor
         )
-        return [d.model_dump(mode='json') for d in decisions_list]
+        return _list_response(args, args.limit, decisions_list)
+    except ValueError as e: # Invalid pagination cursor
+        raise ToolArgumentError(str(e))
     except DatabaseError as e:
         raise ContextPortalError(f"Database error getting decisions: {e}")
     except Exception as e:
@@ -259,32 +270,8 @@ def handle_log_progress(args: models.LogProgressArgs) -> Dict[str, Any]:
                 log.error(f"Failed to automatically link progress entry ID {logged_progress.id} for workspace {args.workspace_id}: {link_e}")
                 # Optionally, add this error to the response if the MCP tool schema supports it
 
-        # --- Add to Vector Store ---
-        if logged_progress and logged_progress.id is not None:
-            try:
-                text_to_embed = f"Progress: {logged_progress.status} - {logged_progress.description}"
-                
-                vector = embedding_service.get_embedding(text_to_embed.strip())
-                
-                metadata_for_vector = {
-                    "conport_item_id": str(logged_progress.id),
-                    "conport_item_type": "progress_entry",
-                    "status": logged_progress.status,
-                    "description_snippet": logged_progress.description[:100], # Snippet for quick view
-                    "timestamp_created": logged_progress.timestamp.isoformat(),
-                    "parent_id": str(logged_progress.parent_id) if logged_progress.parent_id else None
-                }
-                vector_store_service.upsert_item_embedding(
-                    workspace_id=args.workspace_id,
-                    item_type="progress_entry",
-                    item_id=str(logged_progress.id),
-                    vector=vector,
-                    metadata=metadata_for_vector
-                )
-                log.info(f"Successfully generated and stored embedding for progress entry ID {logged_progress.id}")
-            except Exception as e_embed:
-                log.error(f"Failed to generate/store embedding for progress entry ID {logged_progress.id}: {e_embed}", exc_info=True)
-        # --- End Add to Vector Store ---
+        # Embedding happens in the background indexing queue (fed by DB triggers)
+        indexing_queue.notify(args.workspace_id)
 
         return logged_progress.model_dump(mode='json')
     except DatabaseError as e:
@@ -293,20 +280,23 @@ def handle_log_progress(args: models.LogProgressArgs) -> Dict[str, Any]:
         log.exception(f"Unexpected error in log_progress for workspace {args.workspace_id}")
         raise ContextPortalError(f"Unexpected error in log_progress: {e}")
 
-def handle_get_progress(args: models.GetProgressArgs) -> List[Dict[str, Any]]:
+def handle_get_progress(args: models.GetProgressArgs) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Handles the 'get_progress' MCP tool.
     Assumes 'args' is an already validated Pydantic model instance.
-    Returns a list of progress entry dictionaries.
+    Returns a list of progress entry dictionaries, or a page of them when paginating.
     """
     try:
         progress_list = db.get_progress(
             args.workspace_id,
             status_filter=args.status_filter,
             parent_id_filter=args.parent_id_filter,
-            limit=args.limit
+            limit=_fetch_limit(args, args.limit),
+            page_cursor=args.cursor
         )
-        return [p.model_dump(mode='json') for p in progress_list]
+        return _list_response(args, args.limit, progress_list)
+    except ValueError as e: # Invalid pagination cursor
+        raise ToolArgumentError(str(e))
     except DatabaseError as e:
         raise ContextPortalError(f"Database error getting progress: {e}")
     except Exception as e:
@@ -323,17 +313,15 @@ def handle_update_progress(args: models.UpdateProgressArgs) -> Dict[str, Any]:
         updated = db.update_progress_entry(args.workspace_id, args)
 
         if updated:
-            # --- Update Vector Store ---
-            # Re-embedding on update requires fetching the full, updated entry from the DB
-            # to get the complete description and status for the vector.
-            # This requires a db.get_progress_entry_by_id function, which is not yet implemented.
-            # For now, we will skip re-embedding on update and log a warning.
-            # A future enhancement would be to implement db.get_progress_entry_by_id
-            # and then call vector_store_service.upsert_item_embedding here.
-            log.warning(f"Vector store update skipped for progress entry ID {args.progress_id} on update. Requires db.get_progress_entry_by_id for accurate re-embedding.")
-            # --- End Update Vector Store ---
-
-            return {"status": "success", "message": f"Progress entry ID {args.progress_id} updated successfully."}
+            # A trigger queued the entry if its status, description or parent changed;
+            # the indexing worker re-embeds it like a newly logged entry.
+            indexing_queue.notify(args.workspace_id)
+            entry = db.get_progress_entry_by_id(args.workspace_id, args.progress_id)
+            return {
+                "status": "success",
+                "message": f"Progress entry ID {args.progress_id} updated successfully.",
+                "progress_entry": entry.model_dump(mode='json') if entry else None,
+            }
         else:
             return {"status": "success", "message": f"Progress entry ID {args.progress_id} not found for update."}
     except ValueError as e: # Catch validation errors from the handler/db call
@@ -350,30 +338,13 @@ def handle_delete_progress_by_id(args: models.DeleteProgressByIdArgs) -> Dict[st
     Deletes a progress entry by its ID.
     """
     try:
-        deleted_from_db = db.delete_progress_entry_by_id(args.workspace_id, args.progress_id)
-
-        if deleted_from_db:
-            try:
-                # --- Delete from Vector Store ---
-                vector_store_service.delete_item_embedding(
-                    workspace_id=args.workspace_id,
-                    item_type="progress_entry",
-                    item_id=str(args.progress_id)
-                )
-                log.info(f"Successfully deleted embedding for progress entry ID {args.progress_id}")
-                # --- End Delete from Vector Store ---
-                return {"status": "success", "message": f"Progress entry ID {args.progress_id} and its embedding deleted successfully."}
-            except Exception as e_vec_del:
-                log.error(f"Failed to delete embedding for progress entry ID {args.progress_id} (DB record was deleted): {e_vec_del}", exc_info=True)
-                # Return success for DB deletion but acknowledge embedding deletion failure.
-                return {
-                    "status": "partial_success",
-                    "message": f"Progress entry ID {args.progress_id} deleted from database, but failed to delete its embedding: {e_vec_del}"
-                }
+        deleted = db.delete_progress_entry_by_id(args.workspace_id, args.progress_id)
+        if deleted:
+            # The delete trigger queued the item; the indexing worker removes its vector.
+            indexing_queue.notify(args.workspace_id)
+            return {"status": "success", "message": f"Progress entry ID {args.progress_id} deleted."}
         else:
-            # This case means the ID was valid (e.g. integer) but not found in DB.
-            # No need to attempt vector deletion if not found in DB.
-            return {"status": "success", "message": f"Progress entry ID {args.progress_id} not found in database."}
+            return {"status": "success", "message": f"Progress entry ID {args.progress_id} not found for deletion."}
     except DatabaseError as e:
         raise ContextPortalError(f"Database error deleting progress entry ID {args.progress_id}: {e}")
     except Exception as e:
@@ -390,31 +361,8 @@ def handle_log_system_pattern(args: models.LogSystemPatternArgs) -> Dict[str, An
         pattern_to_log = models.SystemPattern(name=args.name, description=args.description, tags=args.tags)
         logged_pattern = db.log_system_pattern(args.workspace_id, pattern_to_log)
 
-        # --- Add to Vector Store ---
-        if logged_pattern and logged_pattern.id is not None:
-            try:
-                text_to_embed = f"System Pattern: {logged_pattern.name}\nDescription: {logged_pattern.description if logged_pattern.description else ''}"
-                
-                vector = embedding_service.get_embedding(text_to_embed.strip())
-                
-                metadata_for_vector = {
-                    "conport_item_id": str(logged_pattern.id),
-                    "conport_item_type": "system_pattern",
-                    "name": logged_pattern.name,
-                    "timestamp_created": logged_pattern.timestamp.isoformat(), # Assuming SystemPattern has a timestamp
-                    "tags": ", ".join(logged_pattern.tags) if logged_pattern.tags else None
-                }
-                vector_store_service.upsert_item_embedding(
-                    workspace_id=args.workspace_id,
-                    item_type="system_pattern",
-                    item_id=str(logged_pattern.id),
-                    vector=vector,
-                    metadata=metadata_for_vector
-                )
-                log.info(f"Successfully generated and stored embedding for system pattern ID {logged_pattern.id}")
-            except Exception as e_embed:
-                log.error(f"Failed to generate/store embedding for system pattern ID {logged_pattern.id}: {e_embed}", exc_info=True)
-        # --- End Add to Vector Store ---
+        # Embedding happens in the background indexing queue (fed by DB triggers)
+        indexing_queue.notify(args.workspace_id)
 
         return logged_pattern.model_dump(mode='json')
     except DatabaseError as e:
@@ -423,19 +371,24 @@ def handle_log_system_pattern(args: models.LogSystemPatternArgs) -> Dict[str, An
         log.exception(f"Unexpected error in log_system_pattern for workspace {args.workspace_id}")
         raise ContextPortalError(f"Unexpected error in log_system_pattern: {e}")
 
-def handle_get_system_patterns(args: models.GetSystemPatternsArgs) -> List[Dict[str, Any]]:
+def handle_get_system_patterns(args: models.GetSystemPatternsArgs) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Handles the 'get_system_patterns' MCP tool.
     Assumes 'args' is an already validated Pydantic model instance.
-    Returns a list of system pattern dictionaries.
+    Returns a list of system pattern dictionaries, or a page of them when paginating.
     """
     try:
         patterns_list = db.get_system_patterns(
             args.workspace_id,
             tags_filter_include_all=args.tags_filter_include_all,
-            tags_filter_include_any=args.tags_filter_include_any
+            tags_filter_include_any=args.tags_filter_include_any,
+            limit=_fetch_limit(args, args.limit),
+            paginate=args.is_paginated,
+            page_cursor=args.cursor
         )
-        return [p.model_dump(mode='json') for p in patterns_list]
+        return _list_response(args, args.limit, patterns_list)
+    except ValueError as e: # Invalid pagination cursor
+        raise ToolArgumentError(str(e))
     except DatabaseError as e:
         raise ContextPortalError(f"Database error getting system patterns: {e}")
     except Exception as e:
@@ -466,6 +419,109 @@ def handle_get_conport_schema(args: models.GetConportSchemaArgs) -> Dict[str, Di
         # Return a more structured error if possible, or a generic one
         raise ContextPortalError(f"Unexpected error retrieving ConPort schema: {e}")
 
+def handle_get_indexing_status(args: models.GetIndexingStatusArgs) -> Dict[str, Any]:
+    """
+    Handles the 'get_indexing_status' MCP tool.
+    Reports the depth and lag of the background embedding queue.
+    """
+    try:
+        status = indexing_queue.get_status(args.workspace_id)
+        embedding_status = status["embedding_models"]
+        if status["pending"] or embedding_status["building"] or embedding_status["active"]["backfill"]:
+            # Work may have been queued before a restart; make sure the worker is on it.
+            indexing_queue.notify(args.workspace_id)
+        return status
+    except DatabaseError as e:
+        raise ContextPortalError(f"Database error retrieving indexing status: {e}")
+    except Exception as e:
+        log.exception(f"Unexpected error in get_indexing_status for workspace {args.workspace_id}")
+        raise ContextPortalError(f"Unexpected error retrieving indexing status: {e}")
+
+def handle_retry_failed_indexing(args: models.RetryFailedIndexingArgs) -> Dict[str, Any]:
+    """
+    Handles the 'retry_failed_indexing' MCP tool.
+    Re-queues items whose embedding exhausted its attempts, e.g. after fixing the model setup.
+    """
+    try:
+        requeued = indexing_queue.retry_failed(args.workspace_id)
+        return {"status": "success", "requeued": requeued, "indexing": indexing_queue.get_status(args.workspace_id)}
+    except DatabaseError as e:
+        raise ContextPortalError(f"Database error re-queueing failed indexing: {e}")
+    except Exception as e:
+        log.exception(f"Unexpected error in retry_failed_indexing for workspace {args.workspace_id}")
+        raise ContextPortalError(f"Unexpected error re-queueing failed indexing: {e}")
+
+def handle_get_server_health(args: models.GetServerHealthArgs) -> Dict[str, Any]:
+    """
+    Handles the 'get_server_health' MCP tool.
+    Reports whether semantic search is ready and how much indexing is waiting on the model.
+    """
+    try:
+        health = warmup.get_status(args.workspace_id)
+        queue = indexing_queue.get_status(args.workspace_id)
+        health["indexing"] = {key: queue[key] for key in ("pending", "failed", "lag_seconds")}
+        return health
+    except DatabaseError as e:
+        raise ContextPortalError(f"Database error retrieving server health: {e}")
+    except Exception as e:
+        log.exception(f"Unexpected error in get_server_health for workspace {args.workspace_id}")
+        raise ContextPortalError(f"Unexpected error retrieving server health: {e}")
+
+def handle_migrate_embedding_model(args: models.MigrateEmbeddingModelArgs) -> Dict[str, Any]:
+    """
+    Handles the 'migrate_embedding_model' MCP tool.
+    Starts re-embedding the workspace with another model in the background; searches keep
+    using the current model until the new collection is complete.
+    """
+    try:
+        status = embedding_models.migrate(args.workspace_id, args.model_name)
+        indexing_queue.notify(args.workspace_id)
+        return status
+    except ValueError as e:
+        raise ToolArgumentError(str(e))
+    except DatabaseError as e:
+        raise ContextPortalError(f"Database error starting embedding model migration: {e}")
+    except Exception as e:
+        log.exception(f"Unexpected error in migrate_embedding_model for workspace {args.workspace_id}")
+        raise ContextPortalError(f"Unexpected error starting embedding model migration: {e}")
+
+def handle_reindex_semantic_store(args: models.ReindexSemanticStoreArgs) -> Dict[str, Any]:
+    """
+    Handles the 'reindex_semantic_store' MCP tool.
+    Starts re-embedding every item into the active model's collection in the background,
+    resuming from the last checkpoint of an interrupted reindex.
+    """
+    try:
+        status = embedding_models.reindex(args.workspace_id, drop_existing=args.drop_existing, restart=args.restart)
+        indexing_queue.notify(args.workspace_id)
+        return status
+    except DatabaseError as e:
+        raise ContextPortalError(f"Database error starting reindex: {e}")
+    except Exception as e:
+        log.exception(f"Unexpected error in reindex_semantic_store for workspace {args.workspace_id}")
+        raise ContextPortalError(f"Unexpected error starting reindex: {e}")
+
+def handle_collect_garbage(args: models.CollectGarbageArgs) -> Dict[str, Any]:
+    """
+    Handles the 'collect_garbage' MCP tool.
+    Removes links, tags, FTS rows and vectors of items that no longer exist, and queues items
+    without a vector for embedding. Reports what was reclaimed.
+    """
+    try:
+        removed = db.delete_orphaned_rows(args.workspace_id, dry_run=args.dry_run)
+    except DatabaseError as e:
+        raise ContextPortalError(f"Database error collecting garbage: {e}")
+    result = {"status": "success", "dry_run": args.dry_run, "database": removed}
+    try:
+        result["vector_store"] = embedding_models.collect_garbage(args.workspace_id, dry_run=args.dry_run)
+        if not args.dry_run and result["vector_store"]["missing_vectors"]:
+            indexing_queue.notify(args.workspace_id)
+    except Exception as e:
+        log.error(f"Failed to collect vector store garbage for workspace {args.workspace_id}: {e}", exc_info=True)
+        result["status"] = "partial_success"
+        result["message"] = f"Database cleaned up, but the vector store could not be reconciled: {e}"
+    return result
+
 def handle_get_recent_activity_summary(args: models.GetRecentActivitySummaryArgs) -> Dict[str, Any]:
     """
     Handles the 'get_recent_activity_summary' MCP tool.
@@ -501,53 +557,8 @@ def handle_log_custom_data(args: models.LogCustomDataArgs) -> Dict[str, Any]:
         
         logged_data = db.log_custom_data(args.workspace_id, data_to_log)
 
-        # --- Add to Vector Store ---
-        if logged_data and logged_data.id is not None:
-            # Only embed if value is string-like or can be reasonably converted to text
-            text_to_embed = None
-            if isinstance(logged_data.value, str):
-                text_to_embed = logged_data.value
-            elif isinstance(logged_data.value, (dict, list)):
-                try:
-                    # Simple JSON string representation for dict/list
-                    text_to_embed = json.dumps(logged_data.value)
-                except TypeError:
-                    log.warning(f"Custom data value for {logged_data.category}/{logged_data.key} is not JSON serializable for embedding.")
-            
-            if text_to_embed:
-                # Add category and key to text for better contextual embedding
-                contextual_text_to_embed = f"Category: {logged_data.category}\nKey: {logged_data.key}\nValue: {text_to_embed}"
-                try:
-                    vector = embedding_service.get_embedding(contextual_text_to_embed.strip())
-                    
-                    metadata_for_vector = {
-                        "conport_item_id": str(logged_data.id),
-                        "conport_item_type": "custom_data",
-                        "category": logged_data.category,
-                        "key": logged_data.key,
-                        "timestamp_created": logged_data.timestamp.isoformat(),
-                        # "value_type": str(type(logged_data.value).__name__) # Could be useful metadata
-                    }
-                    # Add metadata from CustomData if it exists and is simple
-                    if hasattr(logged_data, 'metadata') and isinstance(logged_data.metadata, dict):
-                         for k, v in logged_data.metadata.items():
-                            if isinstance(v, (str, int, float, bool)): # Only simple types for Chroma metadata
-                                metadata_for_vector[f"custom_meta_{k}"] = v
-
-
-                    vector_store_service.upsert_item_embedding(
-                        workspace_id=args.workspace_id,
-                        item_type="custom_data",
-                        item_id=str(logged_data.id), # Using internal DB ID as part of Chroma ID
-                        vector=vector,
-                        metadata=metadata_for_vector
-                    )
-                    log.info(f"Successfully generated and stored embedding for custom_data ID {logged_data.id} ({logged_data.category}/{logged_data.key})")
-                except Exception as e_embed:
-                    log.error(f"Failed to generate/store embedding for custom_data ID {logged_data.id} ({logged_data.category}/{logged_data.key}): {e_embed}", exc_info=True)
-            else:
-                log.debug(f"Skipping embedding for custom_data ID {logged_data.id} ({logged_data.category}/{logged_data.key}) as value is not text-like.")
-        # --- End Add to Vector Store ---
+        # Embedding happens in the background indexing queue (fed by DB triggers)
+        indexing_queue.notify(args.workspace_id)
         
         return logged_data.model_dump(mode='json')
     except DatabaseError as e:
@@ -556,16 +567,23 @@ def handle_log_custom_data(args: models.LogCustomDataArgs) -> Dict[str, Any]:
         log.exception(f"Unexpected error in log_custom_data for workspace {args.workspace_id}")
         raise ContextPortalError(f"Unexpected error in log_custom_data: {e}")
 
-def handle_get_custom_data(args: models.GetCustomDataArgs) -> List[Dict[str, Any]]:
+def handle_get_custom_data(args: models.GetCustomDataArgs) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Handles the 'get_custom_data' MCP tool.
     Assumes 'args' is an already validated Pydantic model instance.
-    Returns a list of custom data entry dictionaries.
+    Returns a list of custom data entry dictionaries, or a page of them when paginating.
     """
     try:
-        data_list = db.get_custom_data(args.workspace_id, category=args.category, key=args.key)
-        return [d.model_dump(mode='json') for d in data_list]
-    except ValueError as e: # From db function if key w/o category, or other validation
+        data_list = db.get_custom_data(
+            args.workspace_id,
+            category=args.category,
+            key=args.key,
+            limit=_fetch_limit(args, args.limit),
+            paginate=args.is_paginated,
+            page_cursor=args.cursor
+        )
+        return _list_response(args, args.limit, data_list)
+    except ValueError as e: # From db function if key w/o category, invalid cursor, or other validation
          raise ToolArgumentError(str(e)) # Pass specific error message
     except DatabaseError as e:
         raise ContextPortalError(f"Database error getting custom data: {e}")
@@ -582,6 +600,8 @@ def handle_delete_custom_data(args: models.DeleteCustomDataArgs) -> Dict[str, An
     try:
         deleted = db.delete_custom_data(args.workspace_id, category=args.category, key=args.key)
         if deleted:
+            # The delete trigger queued the item; the indexing worker removes its vector.
+            indexing_queue.notify(args.workspace_id)
             return {"status": "success", "message": f"Custom data '{args.category}/{args.key}' deleted."}
         else:
             return {"status": "success", "message": f"Custom data '{args.category}/{args.key}' not found for deletion."}
@@ -641,6 +661,62 @@ def handle_search_custom_data_value_fts(args: models.SearchCustomDataValueArgs)
 
 # --- Semantic Search Handler ---
 
+def _chroma_filters(args: models.SemanticSearchConportArgs) -> Optional[Dict[str, Any]]:
+    """Builds the ChromaDB 'where' clause for the search's item type, tag and category filters."""
+    and_conditions = []
+
+    if args.filter_item_types:
+        and_conditions.append({"conport_item_type": {"$in": args.filter_item_types}})
+    
+    if args.filter_tags_include_all:
+        # For $all behavior with $contains, we need an $and for each tag
+        tag_all_conditions = [{"tags": {"$contains": tag}} for tag in args.filter_tags_include_all]
+        if tag_all_conditions:
+            and_conditions.append({"$and": tag_all_conditions})
+    
+    if args.filter_tags_include_any:
+        # For $or behavior with $contains
+        tag_any_conditions = [{"tags": {"$contains": tag}} for tag in args.filter_tags_include_any]
+        if tag_any_conditions:
+            and_conditions.append({"$or": tag_any_conditions})
+    
+    if args.filter_custom_data_categories:
+        # This filter is only meaningful if 'custom_data' is in item_types or no item_types are specified
+        category_condition = {"category": {"$in": args.filter_custom_data_categories}}
+        if args.filter_item_types and 'custom_data' in args.filter_item_types:
+            and_conditions.append(category_condition)
+        elif not args.filter_item_types: # If no item_type filter, apply category filter broadly (might hit non-custom_data items if they had 'category' metadata)
+             and_conditions.append(category_condition)
+
+    if not and_conditions:
+        return None
+    if len(and_conditions) == 1:
+        return and_conditions[0]
+    return {"$and": and_conditions}
+
+def _attach_full_items(workspace_id: str, search_results: List[Dict[str, Any]]) -> None:
+    """
+    Sets each search hit's 'full_item' to the item from SQLite, fetched with one IN query per
+    item type in a single read transaction. Hits whose item no longer exists get None.
+    """
+    keys = []
+    for res in search_results:
+        meta = res.get("metadata") or {}
+        item_type, item_id = meta.get("conport_item_type"), str(meta.get("conport_item_id"))
+        keys.append((item_type, int(item_id)) if item_type in db.ITEM_TABLES and item_id.isdigit() else None)
+    ids_by_type: Dict[str, List[int]] = {}
+    for key in filter(None, keys):
+        ids_by_type.setdefault(key[0], []).append(key[1])
+    items = db.get_items_by_type_and_ids(workspace_id, ids_by_type)
+    for res, key in zip(search_results, keys):
+        item = items[key[0]].get(key[1]) if key else None
+        res["full_item"] = item.model_dump(mode='json') if item else None
+
+def _search_model(workspace_id: str) -> Dict[str, Any]:
+    """The model to query with; also resumes indexing left over from a previous run."""
+    indexing_queue.resume(workspace_id)
+    return embedding_models.get_active_model(workspace_id)
+
 async def handle_semantic_search_conport(args: models.SemanticSearchConportArgs) -> List[Dict[str, Any]]:
     """
     Handles the 'semantic_search_conport' MCP tool.
@@ -649,89 +725,124 @@ async def handle_semantic_search_conport(args: models.SemanticSearchConportArgs)
     try:
         log.info(f"Handling semantic_search_conport for workspace {args.workspace_id} with query: '{args.query_text[:50]}...'")
 
-        query_vector = embedding_service.get_embedding(args.query_text)
-
-        # Construct ChromaDB filters
-        chroma_filters = {}
-        and_conditions = []
+        # This handler runs on the event loop, so the blocking steps are dispatched to worker pools
+        model = await dispatch.run_read(_search_model, args.workspace_id)
+        query_vector = await dispatch.run_inference(embedding_service.get_embedding, args.query_text, model["model_name"])
 
-        if args.filter_item_types:
-            and_conditions.append({"conport_item_type": {"$in": args.filter_item_types}})
-        
-        if args.filter_tags_include_all:
-            # For $all behavior with $contains, we need an $and for each tag
-            tag_all_conditions = [{"tags": {"$contains": tag}} for tag in args.filter_tags_include_all]
-            if tag_all_conditions:
-                and_conditions.append({"$and": tag_all_conditions})
-        
-        if args.filter_tags_include_any:
-            # For $or behavior with $contains
-            tag_any_conditions = [{"tags": {"$contains": tag}} for tag in args.filter_tags_include_any]
-            if tag_any_conditions:
-                and_conditions.append({"$or": tag_any_conditions})
-        
-        if args.filter_custom_data_categories:
-            # This filter is only meaningful if 'custom_data' is in item_types or no item_types are specified
-            category_condition = {"category": {"$in": args.filter_custom_data_categories}}
-            if args.filter_item_types and 'custom_data' in args.filter_item_types:
-                and_conditions.append(category_condition)
-            elif not args.filter_item_types: # If no item_type filter, apply category filter broadly (might hit non-custom_data items if they had 'category' metadata)
-                 and_conditions.append(category_condition)
-
-
-        if and_conditions:
-            if len(and_conditions) == 1:
-                chroma_filters = and_conditions[0]
-            else:
-                chroma_filters = {"$and": and_conditions}
-        
+        chroma_filters = _chroma_filters(args)
         log.debug(f"ChromaDB query filters: {chroma_filters}")
 
-        search_results = vector_store_service.query_vector_store(
+        search_results = await dispatch.run_read(
+            vector_store_service.query_vector_store,
             workspace_id=args.workspace_id,
             query_vector=query_vector,
             top_k=args.top_k,
-            filters=chroma_filters if chroma_filters else None
+            filters=chroma_filters,
+            collection_name=model["collection_name"],
+            model_name=model["model_name"]
         )
 
-        # Process results: search_results is List[Dict] with 'chroma_doc_id', 'distance', 'metadata'
-        # We need to potentially fetch full items from SQLite based on metadata.conport_item_id and conport_item_type
-        # For now, just return the direct results from vector store, which includes metadata.
-        # A more advanced version would re-hydrate with full SQLite objects.
-        
-        # Example of enriching results (conceptual, actual DB calls would be needed)
-        enriched_results = []
-        for res in search_results:
-            meta = res.get("metadata", {})
-            item_id = meta.get("conport_item_id")
-            item_type = meta.get("conport_item_type")
-            
-            # Here you could fetch the full item from SQLite using item_id and item_type
-            # For example:
-            # if item_type == "decision" and item_id:
-            #     full_item = db.get_decision_by_id(args.workspace_id, int(item_id)) # Assuming get_decision_by_id exists
-            #     res["full_item_data"] = full_item.model_dump(mode='json') if full_item else None
-            # else if item_type == "custom_data" and item_id:
-            #     # For custom_data, ID is internal. Key and Category are in metadata.
-            #     full_item_list = db.get_custom_data(args.workspace_id, category=meta.get("category"), key=meta.get("key"))
-            #     if full_item_list:
-            #         res["full_item_data"] = full_item_list[0].model_dump(mode='json')
-
-
-            enriched_results.append(res) # For now, just pass through
-
-        return enriched_results
+        # search_results is List[Dict] with 'chroma_doc_id', 'distance', 'metadata'
+        if args.include_full_items:
+            await dispatch.run_read(_attach_full_items, args.workspace_id, search_results)
+        return search_results
 
     except RuntimeError as re: # Catch errors from embedding or vector store service
         log.error(f"Runtime error during semantic search: {re}", exc_info=True)
         raise ContextPortalError(f"Error during semantic search operation: {re}")
-    except DatabaseError as dbe: # Catch errors from SQLite if enriching results
+    except DatabaseError as dbe: # Catch errors from SQLite while looking up the model or full items
         log.error(f"Database error during semantic search result enrichment: {dbe}", exc_info=True)
         raise ContextPortalError(f"Database error processing semantic search results: {dbe}")
     except Exception as e:
         log.exception(f"Unexpected error in handle_semantic_search_conport for workspace {args.workspace_id}")
         raise ContextPortalError(f"Unexpected error during semantic search: {type(e).__name__}")
 
+def _reciprocal_rank_fusion(ranked_lists: List[List[Any]], k: int) -> List[Any]:
+    """
+    Merges ranked lists of keys by reciprocal rank fusion: each key scores the sum of
+    1 / (k + rank) over the lists it appears in. Returns (key, score) pairs, best first.
+    """
+    scores: Dict[Any, float] = {}
+    for ranked in ranked_lists:
+        for rank, key in enumerate(ranked, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
+
+async def handle_hybrid_search(args: models.HybridSearchArgs) -> List[Dict[str, Any]]:
+    """
+    Handles the 'hybrid_search' MCP tool.
+    Runs the FTS5 (BM25) query and the vector store kNN query concurrently and merges their
+    two ranked lists with reciprocal rank fusion. Item types without a full-text index (progress entries,
+    system patterns) are found by the vector query alone. If the embedding model or vector
+    store is unavailable, results come from full-text search only.
+    """
+    try:
+        candidates = args.top_k * HYBRID_CANDIDATES_PER_RESULT
+
+        async def vector_search() -> List[Dict[str, Any]]:
+            model = await dispatch.run_read(_search_model, args.workspace_id)
+            query_vector = await dispatch.run_inference(embedding_service.get_embedding, args.query_text, model["model_name"])
+            return await dispatch.run_read(
+                vector_store_service.query_vector_store,
+                workspace_id=args.workspace_id,
+                query_vector=query_vector,
+                top_k=candidates,
+                filters=_chroma_filters(args),
+                collection_name=model["collection_name"],
+                model_name=model["model_name"]
+            )
+
+        fts_results, vector_results = await asyncio.gather(
+            dispatch.run_read(
+                db.search_items_fts, args.workspace_id, args.query_text,
+                item_types=args.filter_item_types,
+                tags_filter_include_all=args.filter_tags_include_all,
+                tags_filter_include_any=args.filter_tags_include_any,
+                category_filter=args.filter_custom_data_categories,
+                limit=candidates
+            ),
+            vector_search(),
+            return_exceptions=True
+        )
+        if isinstance(fts_results, BaseException):
+            raise fts_results
+        if isinstance(vector_results, BaseException):
+            log.warning(f"hybrid_search falling back to full-text results only: {vector_results}")
+            vector_results = []
+
+        vector_hits: Dict[Any, Dict[str, Any]] = {}
+        for hit in vector_results:
+            meta = hit.get("metadata") or {}
+            item_id = str(meta.get("conport_item_id"))
+            if meta.get("conport_item_type") in db.ITEM_TABLES and item_id.isdigit():
+                vector_hits.setdefault((meta["conport_item_type"], int(item_id)), hit)
+        # One ranked list per ranker, so full text and vectors get an equal vote
+        fts_ranked = [(item_type, item_id) for item_type, item_id, _ in fts_results]
+        ranked_lists = [fts_ranked, list(vector_hits)]
+        fts_ranks = {key: rank for rank, key in enumerate(fts_ranked, start=1)}
+        vector_ranks = {key: rank for rank, key in enumerate(vector_hits, start=1)}
+
+        results = []
+        for (item_type, item_id), score in _reciprocal_rank_fusion(ranked_lists, HYBRID_RRF_K)[:args.top_k]:
+            hit = vector_hits.get((item_type, item_id))
+            results.append({
+                "item_type": item_type,
+                "item_id": item_id,
+                "score": round(score, 6),
+                "fts_rank": fts_ranks.get((item_type, item_id)),
+                "vector_rank": vector_ranks.get((item_type, item_id)),
+                "distance": hit["distance"] if hit else None,
+                "metadata": {"conport_item_type": item_type, "conport_item_id": str(item_id), **((hit or {}).get("metadata") or {})},
+            })
+        if args.include_full_items:
+            await dispatch.run_read(_attach_full_items, args.workspace_id, results)
+        return results
+    except DatabaseError as e:
+        raise ContextPortalError(f"Database error during hybrid search: {e}")
+    except Exception as e:
+        log.exception(f"Unexpected error in handle_hybrid_search for workspace {args.workspace_id}")
+        raise ContextPortalError(f"Unexpected error during hybrid search: {type(e).__name__}")
+
 # --- Export Tool Handler ---
 
 def _format_product_context_md(data: Dict[str, Any]) -> str:
@@ -764,60 +875,121 @@ def _format_active_context_md(data: Dict[str, Any]) -> str:
         lines.append("\n")
     return "".join(lines)
 
-def _format_decisions_md(decisions: List[models.Decision]) -> str:
-    lines = ["# Decision Log\n"]
-    for dec in sorted(decisions, key=lambda x: x.timestamp, reverse=True):
-        lines.append("\n---\n")
-        lines.append("## Decision\n")
-        lines.append(f"*   [{dec.timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {dec.summary}\n")
+def _timestamp_md(timestamp: datetime) -> str:
+    return timestamp.strftime('%Y-%m-%d %H:%M:%S')
+
+def _iter_decisions_md(decisions: Iterable[models.Decision]) -> Iterator[str]:
+    """decision_log.md, for decisions given newest first; yields nothing if there are none."""
+    for i, dec in enumerate(decisions):
+        if i == 0:
+            yield "# Decision Log\n"
+        lines = ["\n---\n", "## Decision\n", f"*   [{_timestamp_md(dec.timestamp)}] {dec.summary}\n"]
         if dec.rationale:
             lines.append("\n## Rationale\n")
             lines.append(f"*   {dec.rationale}\n")
         if dec.implementation_details:
             lines.append("\n## Implementation Details\n")
             lines.append(f"*   {dec.implementation_details}\n")
-    return "".join(lines)
-
-def _format_progress_md(progress_entries: List[models.ProgressEntry]) -> str:
-    lines = ["# Progress Log\n"]
-    status_map = {"DONE": [], "IN_PROGRESS": [], "TODO": []}
-    for entry in sorted(progress_entries, key=lambda x: x.timestamp, reverse=True):
-        status_map.get(entry.status, status_map["TODO"]).append(entry)
-
-    if status_map["DONE"]:
-        lines.append("\n## Completed Tasks\n")
-        for entry in status_map["DONE"]:
-            lines.append(f"*   [{entry.timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {entry.description}\n")
-    if status_map["IN_PROGRESS"]:
-        lines.append("\n## In Progress Tasks\n")
-        for entry in status_map["IN_PROGRESS"]:
-            lines.append(f"*   [{entry.timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {entry.description}\n")
-    if status_map["TODO"]:
-        lines.append("\n## TODO Tasks\n")
-        for entry in status_map["TODO"]:
-            lines.append(f"*   [{entry.timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {entry.description}\n")
-    return "".join(lines)
-
-def _format_system_patterns_md(patterns: List[models.SystemPattern]) -> str:
-    from datetime import timezone
-
-    def _to_aware_utc(dt):
-        # Treat naive as UTC for export consistency
-        return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
-
-    lines = ["# System Patterns\n"]
-    for pattern in sorted(patterns, key=lambda x: _to_aware_utc(x.timestamp), reverse=True): # Sort by timestamp
-        lines.append("\n---\n")
-        lines.append(f"## {pattern.name}\n")
-        lines.append(f"*   [{pattern.timestamp.strftime('%Y-%m-%d %H:%M:%S')}]\n") # Add timestamp
+        yield "".join(lines)
+
+# Sections of progress_log.md in file order; entries with any other status are listed as TODO
+PROGRESS_MD_SECTIONS = {"DONE": "Completed Tasks", "IN_PROGRESS": "In Progress Tasks", "TODO": "TODO Tasks"}
+
+def _iter_progress_md(progress_entries: Iterable[models.ProgressEntry]) -> Iterator[str]:
+    """progress_log.md, for entries given in PROGRESS_MD_SECTIONS order, newest first within each."""
+    section = None
+    for entry in progress_entries:
+        if section is None:
+            yield "# Progress Log\n"
+        entry_section = entry.status if entry.status in PROGRESS_MD_SECTIONS else "TODO"
+        if entry_section != section:
+            section = entry_section
+            yield f"\n## {PROGRESS_MD_SECTIONS[section]}\n"
+        yield f"*   [{_timestamp_md(entry.timestamp)}] {entry.description}\n"
+
+def _iter_system_patterns_md(patterns: Iterable[models.SystemPattern]) -> Iterator[str]:
+    """system_patterns.md, for patterns given newest first."""
+    for i, pattern in enumerate(patterns):
+        if i == 0:
+            yield "# System Patterns\n"
+        yield f"\n---\n## {pattern.name}\n*   [{_timestamp_md(pattern.timestamp)}]\n"
         if pattern.description:
-            lines.append(f"{pattern.description}\n")
-    return "".join(lines)
+            yield f"{pattern.description}\n"
+
+def _format_custom_data_entry_md(item: models.CustomData) -> str:
+    value_str = json.dumps(item.value, indent=2) if not isinstance(item.value, str) else item.value
+    return f"### {item.key}\n\n*   [{_timestamp_md(item.timestamp)}]\n\n```json\n{value_str}\n```\n"
+
+def _custom_data_file_name(category: str) -> str:
+    return "custom_data/" + "".join(c if c.isalnum() else "_" for c in category) + ".md"
+
+def _iter_custom_data_md(category: str, entries: Iterable[models.CustomData]) -> Iterator[str]:
+    """A custom_data/<category>.md file, for the category's entries in key order."""
+    for i, item in enumerate(entries):
+        yield f"# Custom Data: {category}\n\n" if i == 0 else "\n---\n"
+        yield _format_custom_data_entry_md(item)
+
+# Export file (or, for custom data, directory) -> activity_log item type its content comes from
+EXPORT_SOURCES = {
+    "product_context.md": "product_context",
+    "active_context.md": "active_context",
+    "decision_log.md": "decision",
+    "progress_log.md": "progress_entry",
+    "system_patterns.md": "system_pattern",
+    "custom_data/": "custom_data",
+}
+EXPORT_MANIFEST_NAME = ".conport_export_manifest.json"
+EXPORT_MANIFEST_VERSION = 1
+
+def _read_export_manifest(output_path: Path) -> Dict[str, Any]:
+    """The manifest of the previous export to `output_path`, or an empty one."""
+    try:
+        manifest = json.loads((output_path / EXPORT_MANIFEST_NAME).read_text(encoding="utf-8"))
+        if manifest.get("version") == EXPORT_MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError, AttributeError):
+        pass # Missing or unreadable: export everything
+    return {"version": EXPORT_MANIFEST_VERSION, "sources": {}, "files": {}}
+
+def _write_export_file(
+    output_path: Path, file_name: str, chunks: Iterable[str], previous_sha256: Optional[str]
+) -> Tuple[Optional[str], bool]:
+    """
+    Streams `chunks` into a temporary file next to `file_name`, hashing them as they are written,
+    then moves it into place unless the content is unchanged. Returns the content's SHA-256 (None
+    if there were no chunks; the file is not created) and whether the file was written.
+    """
+    path = output_path / file_name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    digest = hashlib.sha256()
+    empty = True
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                digest.update(chunk.encode("utf-8"))
+                empty = False
+        sha256 = digest.hexdigest()
+        if empty or (sha256 == previous_sha256 and path.is_file()):
+            tmp_path.unlink()
+            return (None if empty else sha256), False
+        os.replace(tmp_path, path)
+        return sha256, True
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 def handle_export_conport_to_markdown(args: models.ExportConportToMarkdownArgs) -> Dict[str, Any]:
     """
     Exports all ConPort data for a workspace to markdown files.
     Assumes 'args' is an already validated Pydantic model instance.
+
+    Export is incremental: a manifest in the output directory records, per file, the content
+    hash and the latest activity (see db.get_activity_watermarks) of the items it was built
+    from. Files whose items have not changed since are skipped without reading them from the
+    database; the others are streamed row by row from a cursor and only replaced if their
+    content differs. Files of items that no longer exist are removed.
     """
     workspace_path = Path(args.workspace_id)
     output_dir_name = args.output_path if args.output_path else "conport_export"
@@ -827,63 +999,80 @@ def handle_export_conport_to_markdown(args: models.ExportConportToMarkdownArgs)
         output_path.mkdir(parents=True, exist_ok=True)
         log.info(f"Exporting ConPort data for workspace '{args.workspace_id}' to '{output_path}'")
 
-        files_created = []
-
-        # Product Context
-        product_ctx_data = db.get_product_context(args.workspace_id).content
-        if product_ctx_data:
-            with open(output_path / "product_context.md", "w", encoding="utf-8") as f:
-                f.write(_format_product_context_md(product_ctx_data))
-            files_created.append("product_context.md")
-
-        # Active Context
-        active_ctx_data = db.get_active_context(args.workspace_id).content
-        if active_ctx_data:
-            with open(output_path / "active_context.md", "w", encoding="utf-8") as f:
-                f.write(_format_active_context_md(active_ctx_data))
-            files_created.append("active_context.md")
-        
-        # Decisions
-        decisions = db.get_decisions(args.workspace_id, limit=None) # Get all
-        if decisions:
-            with open(output_path / "decision_log.md", "w", encoding="utf-8") as f:
-                f.write(_format_decisions_md(decisions))
-            files_created.append("decision_log.md")
-
-        # Progress
-        progress_entries = db.get_progress(args.workspace_id, limit=None) # Get all
-        if progress_entries:
-            with open(output_path / "progress_log.md", "w", encoding="utf-8") as f:
-                f.write(_format_progress_md(progress_entries))
-            files_created.append("progress_log.md")
-
-        # System Patterns
-        system_patterns = db.get_system_patterns(args.workspace_id)
-        if system_patterns:
-            with open(output_path / "system_patterns.md", "w", encoding="utf-8") as f:
-                f.write(_format_system_patterns_md(system_patterns))
-            files_created.append("system_patterns.md")
-
-        # Custom Data
-        custom_data_entries = db.get_custom_data(args.workspace_id)
-        if custom_data_entries:
-            custom_data_path = output_path / "custom_data"
-            custom_data_path.mkdir(exist_ok=True)
-            categories: Dict[str, List[str]] = {}
-            for item in custom_data_entries:
-                if item.category not in categories:
-                    categories[item.category] = []
-                value_str = json.dumps(item.value, indent=2) if not isinstance(item.value, str) else item.value
-                categories[item.category].append(f"### {item.key}\n\n*   [{item.timestamp.strftime('%Y-%m-%d %H:%M:%S')}]\n\n```json\n{value_str}\n```\n")
-            
-            
-            for category_name_from_loop, items_md in categories.items(): # Renamed category to avoid clash
-                cat_file_name = "".join(c if c.isalnum() else "_" for c in category_name_from_loop) + ".md"
-                with open(custom_data_path / cat_file_name, "w", encoding="utf-8") as f:
-                    f.write(f"# Custom Data: {category_name_from_loop}\n\n" + "\n---\n".join(items_md))
-                files_created.append(f"custom_data/{cat_file_name}")
-        
-        return {"status": "success", "message": f"ConPort data exported to '{output_path}'. Files created: {', '.join(files_created)}"}
+        manifest = _read_export_manifest(output_path)
+        if args.full:
+            manifest = {**manifest, "sources": {}}
+        previous_files: Dict[str, str] = manifest["files"]
+        watermarks = {
+            # Timestamps as stored in the manifest
+            item_type: None if watermark is None else {**watermark, "timestamp": watermark["timestamp"].isoformat()}
+            for item_type, watermark in db.get_activity_watermarks(args.workspace_id, list(EXPORT_SOURCES.values())).items()
+        }
+        files: Dict[str, str] = {} # file name -> SHA-256 of its content
+        files_written = []
+        unchanged_sources = []
+
+        def export_file(file_name: str, chunks: Iterable[str]) -> None:
+            sha256, written = _write_export_file(output_path, file_name, chunks, previous_files.get(file_name))
+            if sha256 is not None:
+                files[file_name] = sha256
+            if written:
+                files_written.append(file_name)
+
+        for source_file, item_type in EXPORT_SOURCES.items():
+            source_files = [f for f in previous_files if f == source_file or f.startswith(source_file)]
+            if (
+                item_type in manifest["sources"]
+                and manifest["sources"][item_type] == watermarks[item_type]
+                and all((output_path / f).is_file() for f in source_files)
+            ):
+                files.update({f: previous_files[f] for f in source_files})
+                unchanged_sources.append(source_file)
+                continue
+
+            if item_type == "product_context":
+                content = db.get_product_context(args.workspace_id).content
+                export_file(source_file, [_format_product_context_md(content)] if content else [])
+            elif item_type == "active_context":
+                content = db.get_active_context(args.workspace_id).content
+                export_file(source_file, [_format_active_context_md(content)] if content else [])
+            elif item_type == "decision":
+                export_file(source_file, _iter_decisions_md(
+                    db.iter_items(args.workspace_id, "decision", order_by="timestamp DESC, id DESC")
+                ))
+            elif item_type == "progress_entry":
+                section_order = "CASE status WHEN 'DONE' THEN 0 WHEN 'IN_PROGRESS' THEN 1 ELSE 2 END"
+                export_file(source_file, _iter_progress_md(
+                    db.iter_items(args.workspace_id, "progress_entry", order_by=f"{section_order}, timestamp DESC, id DESC")
+                ))
+            elif item_type == "system_pattern":
+                export_file(source_file, _iter_system_patterns_md(
+                    db.iter_items(args.workspace_id, "system_pattern", order_by="timestamp DESC, id DESC")
+                ))
+            else:
+                entries = db.iter_items(args.workspace_id, "custom_data", order_by="category ASC, key ASC")
+                for category, category_entries in itertools.groupby(entries, key=lambda item: item.category):
+                    export_file(_custom_data_file_name(category), _iter_custom_data_md(category, category_entries))
+
+        # Files of sources that are now empty (e.g. a deleted custom data category)
+        files_removed = sorted(set(previous_files) - set(files))
+        for file_name in files_removed:
+            (output_path / file_name).unlink(missing_ok=True)
+
+        manifest = {"version": EXPORT_MANIFEST_VERSION, "sources": watermarks, "files": files}
+        (output_path / EXPORT_MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+        files_written.sort()
+        message = f"ConPort data exported to '{output_path}'. Files written: {', '.join(files_written) or 'none'}"
+        if unchanged_sources:
+            message += f"; unchanged since the last export: {', '.join(unchanged_sources)}"
+        return {
+            "status": "success",
+            "message": message,
+            "files_written": files_written,
+            "files_unchanged": sorted(f for f in files if f not in files_written),
+            "files_removed": files_removed,
+        }
 
     except DatabaseError as e:
         raise ContextPortalError(f"Database error during export: {e}")
@@ -939,17 +1128,17 @@ def _parse_decisions_md(content: str) -> List[Dict[str, str]]:
         if not block.strip() or "## Decision" not in block :
             continue
         
-        summary_match = re.search(r"## Decision\n\*\s*\[.*?\]\s*(.+)", block, re.DOTALL)
+        summary_match = re.search(r"## Decision\n\*\s*\[.*?\]\s*(.+?)(?=\n## |\Z)", block, re.DOTALL)
         summary = summary_match.group(1).strip() if summary_match else "N/A"
         
-        rationale_match = re.search(r"## Rationale\n\*\s*(.+)", block, re.DOTALL)
+        rationale_match = re.search(r"## Rationale\n\*\s*(.+?)(?=\n## |\Z)", block, re.DOTALL)
         rationale = rationale_match.group(1).strip() if rationale_match else None
         # Handle multi-line rationale
         if rationale_match and '\n*' in rationale: # crude check for multi-bullet rationale
             rationale = "\n".join([line.strip().lstrip('*').strip() for line in rationale.split('\n')])
 
 
-        impl_details_match = re.search(r"## Implementation Details\n\*\s*(.+)", block, re.DOTALL)
+        impl_details_match = re.search(r"## Implementation Details\n\*\s*(.+?)(?=\n## |\Z)", block, re.DOTALL)
         impl_details = impl_details_match.group(1).strip() if impl_details_match else None
         if impl_details_match and '\n*' in impl_details: # crude check for multi-bullet details
             impl_details = "\n".join([line.strip().lstrip('*').strip() for line in impl_details.split('\n')])
@@ -1021,10 +1210,42 @@ def _parse_custom_data_category_md(content: str, category_name: str) -> List[Dic
     return items
 
 
+# Markdown files holding item lists: file name -> (item type, parser, args model, item builder).
+IMPORT_ITEM_FILES = {
+    "decision_log.md": ("decision", _parse_decisions_md, models.LogDecisionArgs, lambda a: models.Decision(
+        summary=a.summary, rationale=a.rationale, implementation_details=a.implementation_details, tags=a.tags)),
+    "progress_log.md": ("progress_entry", _parse_progress_md, models.LogProgressArgs, lambda a: models.ProgressEntry(
+        status=a.status, description=a.description, parent_id=a.parent_id)),
+    "system_patterns.md": ("system_pattern", _parse_system_patterns_md, models.LogSystemPatternArgs, lambda a: models.SystemPattern(
+        name=a.name, description=a.description, tags=a.tags)),
+}
+
+def _read_import_file(
+    path: Path, display_name: str, parse, workspace_id: str, args_model, build, errors: List[str]
+) -> List[models.BaseModel]:
+    """Parses one markdown file and validates each item, collecting problems in `errors`."""
+    try:
+        parsed_items = parse(path.read_text(encoding="utf-8"))
+    except Exception as e:
+        errors.append(f"Error parsing {display_name}: {e}")
+        return []
+    items = []
+    for index, item_data in enumerate(parsed_items):
+        try:
+            items.append(build(args_model(workspace_id=workspace_id, **item_data)))
+        except ValidationError as e:
+            errors.append(f"Invalid item {index} in {display_name}: {e}")
+    return items
+
 def handle_import_markdown_to_conport(args: models.ImportMarkdownToConportArgs) -> Dict[str, Any]:
     """
     Imports data from markdown files into ConPort for a workspace.
     Assumes 'args' is an already validated Pydantic model instance.
+
+    Every file is parsed and validated before anything is written; any error aborts the
+    import. The items are then written in one transaction of bulk inserts and embedded
+    by the background indexing queue. A dry run validates and writes inside a transaction
+    that is rolled back.
     """
     workspace_path = Path(args.workspace_id)
     input_dir_name = args.input_path if args.input_path else "conport_export"
@@ -1034,68 +1255,76 @@ def handle_import_markdown_to_conport(args: models.ImportMarkdownToConportArgs)
         raise ToolArgumentError(f"Input directory not found: {input_path}")
 
     log.info(f"Importing ConPort data for workspace '{args.workspace_id}' from '{input_path}'")
-    summary_report = {"status": "success", "message": "Import process initiated.", "files_processed": [], "items_logged": {}, "errors": []}
-
-    # This handler will be called by a tool wrapper in main.py.
-    # It calls other refactored handlers in this file.
-    
-    # Define which handler and Pydantic model to use for each file type
-    file_processing_map = {
-        "product_context.md": (_parse_product_or_active_context_md, handle_update_product_context, models.UpdateContextArgs),
-        "active_context.md": (_parse_product_or_active_context_md, handle_update_active_context, models.UpdateContextArgs),
-        "decision_log.md": (_parse_decisions_md, handle_log_decision, models.LogDecisionArgs),
-        "progress_log.md": (_parse_progress_md, handle_log_progress, models.LogProgressArgs),
-        "system_patterns.md": (_parse_system_patterns_md, handle_log_system_pattern, models.LogSystemPatternArgs),
+    summary_report = {
+        "status": "success", "message": "", "dry_run": args.dry_run,
+        "files_processed": [], "files_skipped": [], "items_logged": {}, "errors": [],
     }
+    started = time.perf_counter()
 
-    for filename, (parser_func, target_handler_func, pydantic_arg_model) in file_processing_map.items():
+    contexts: Dict[str, Dict[str, Any]] = {}
+    for context_name in db.CONTEXT_TABLES:
+        filename = f"{context_name}.md"
         file_to_import = input_path / filename
-        if file_to_import.is_file():
-            try:
-                with open(file_to_import, "r", encoding="utf-8") as f:
-                    content_str = f.read()
-                parsed_data = parser_func(content_str)
-                summary_report["files_processed"].append(filename)
-                
-                item_type_key = filename.split('.')[0] # Define item_type_key
-
-                if item_type_key in ["product_context", "active_context"]:
-                    # For these, parsed_data is the content dict itself
-                    handler_call_args = pydantic_arg_model(workspace_id=args.workspace_id, content=parsed_data)
-                    target_handler_func(handler_call_args)
-                    summary_report["items_logged"][item_type_key] = summary_report["items_logged"].get(item_type_key, 0) + 1
-                else: # List based items (decisions, progress, system_patterns)
-                    for item_data in parsed_data: # parsed_data is a list of dicts
-                        handler_call_args = pydantic_arg_model(workspace_id=args.workspace_id, **item_data)
-                        target_handler_func(handler_call_args)
-                        summary_report["items_logged"][item_type_key] = summary_report["items_logged"].get(item_type_key, 0) + 1
-            except Exception as e:
-                log.error(f"Error processing file {filename}: {e}")
-                summary_report["errors"].append(f"Error processing {filename}: {str(e)}")
-        else:
-            log.warning(f"File not found for import: {file_to_import}")
-            summary_report["errors"].append(f"File not found: {filename}")
-            
-    # Custom Data
+        if not file_to_import.is_file():
+            summary_report["files_skipped"].append(filename)
+            continue
+        summary_report["files_processed"].append(filename)
+        try:
+            content = _parse_product_or_active_context_md(file_to_import.read_text(encoding="utf-8"))
+            contexts[context_name] = models.UpdateContextArgs(workspace_id=args.workspace_id, content=content).content
+        except Exception as e:
+            summary_report["errors"].append(f"Error parsing {filename}: {e}")
+
+    items: Dict[str, List[models.BaseModel]] = {}
+    for filename, (item_type, parse, args_model, build) in IMPORT_ITEM_FILES.items():
+        file_to_import = input_path / filename
+        if not file_to_import.is_file():
+            summary_report["files_skipped"].append(filename)
+            continue
+        summary_report["files_processed"].append(filename)
+        items[item_type] = _read_import_file(
+            file_to_import, filename, parse, args.workspace_id, args_model, build, summary_report["errors"]
+        )
+
     custom_data_dir = input_path / "custom_data"
     if custom_data_dir.is_dir():
-        summary_report["files_processed"].append("custom_data/*")
-        for category_md_file in custom_data_dir.glob("*.md"): # Renamed variable
-            try:
-                category_name = category_md_file.stem.replace("_", " ")
-                with open(category_md_file, "r", encoding="utf-8") as f:
-                    content_str = f.read()
-                parsed_custom_items = _parse_custom_data_category_md(content_str, category_name)
-                for item_data in parsed_custom_items:
-                    # item_data already contains 'category', 'key', 'value'
-                    handler_args = models.LogCustomDataArgs(workspace_id=args.workspace_id, **item_data)
-                    handle_log_custom_data(handler_args)
-                    summary_report["items_logged"]["custom_data"] = summary_report["items_logged"].get("custom_data", 0) + 1
-            except Exception as e:
-                log.error(f"Error processing custom data file {category_md_file.name}: {e}")
-                summary_report["errors"].append(f"Error processing {category_md_file.name}: {str(e)}")
-    
-    summary_report["message"] = f"ConPort data import from '{input_path}' complete. See details."
+        items["custom_data"] = []
+        for category_md_file in sorted(custom_data_dir.glob("*.md")):
+            display_name = f"custom_data/{category_md_file.name}"
+            summary_report["files_processed"].append(display_name)
+            category_name = category_md_file.stem.replace("_", " ")
+            items["custom_data"].extend(_read_import_file(
+                category_md_file, display_name, lambda content: _parse_custom_data_category_md(content, category_name),
+                args.workspace_id, models.LogCustomDataArgs,
+                lambda a: models.CustomData(category=a.category, key=a.key, value=a.value), summary_report["errors"]
+            ))
+    parsed = time.perf_counter()
+
+    if summary_report["errors"]:
+        for error in summary_report["errors"]:
+            log.error(error)
+        summary_report["status"] = "failure"
+        summary_report["message"] = f"Nothing imported from '{input_path}': {len(summary_report['errors'])} file(s) or item(s) failed validation."
+        return summary_report
+
+    try:
+        summary_report["items_logged"] = db.import_items(args.workspace_id, contexts, items, dry_run=args.dry_run)
+    except DatabaseError as e:
+        raise ContextPortalError(f"Database error importing markdown: {e}")
+    written = time.perf_counter()
+
+    if not args.dry_run:
+        # Embedding happens in the background indexing queue (fed by DB triggers), in batches
+        indexing_queue.notify(args.workspace_id)
+
+    item_count = sum(summary_report["items_logged"].values())
+    summary_report["throughput"] = {
+        "parse_seconds": round(parsed - started, 4),
+        "write_seconds": round(written - parsed, 4),
+        "items_per_second": round(item_count / (written - started), 1) if written > started else None,
+    }
+    verb = "Validated" if args.dry_run else "Imported"
+    summary_report["message"] = f"{verb} {item_count} items from '{input_path}'."
     return summary_report
 
 def handle_link_conport_items(args: models.LinkConportItemsArgs) -> Dict[str, Any]:
@@ -1122,10 +1351,10 @@ def handle_link_conport_items(args: models.LinkConportItemsArgs) -> Dict[str, An
         log.exception(f"Unexpected error in link_conport_items for workspace {args.workspace_id}")
         raise ContextPortalError(f"Unexpected error linking ConPort items: {e}")
 
-def handle_get_linked_items(args: models.GetLinkedItemsArgs) -> List[Dict[str, Any]]:
+def handle_get_linked_items(args: models.GetLinkedItemsArgs) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Handles the 'get_linked_items' MCP tool.
-    Retrieves links for a given ConPort item, with optional filters.
+    Retrieves links for a given ConPort item, with optional filters, as a list or a page.
     """
     try:
         links_list = db.get_context_links(
@@ -1134,15 +1363,105 @@ def handle_get_linked_items(args: models.GetLinkedItemsArgs) -> List[Dict[str, A
             item_id=args.item_id,
             relationship_type_filter=args.relationship_type_filter,
             linked_item_type_filter=args.linked_item_type_filter,
-            limit=args.limit
+            limit=_fetch_limit(args, args.limit),
+            page_cursor=args.cursor
         )
-        return [link.model_dump(mode='json') for link in links_list]
+        return _list_response(args, args.limit, links_list)
+    except ValueError as e: # Invalid pagination cursor
+        raise ToolArgumentError(str(e))
     except DatabaseError as e:
         raise ContextPortalError(f"Database error retrieving context links: {e}")
     except Exception as e:
         log.exception(f"Unexpected error in get_linked_items for workspace {args.workspace_id}")
         raise ContextPortalError(f"Unexpected error retrieving context links: {e}")
 
+def handle_traverse_links(args: models.TraverseLinksArgs) -> Dict[str, Any]:
+    """
+    Handles the 'traverse_links' MCP tool.
+    Returns the items within `max_depth` link hops of an item, and the links between them,
+    from one recursive query.
+    """
+    try:
+        nodes, links, truncated = db.traverse_context_links(
+            args.workspace_id,
+            args.item_type,
+            args.item_id,
+            max_depth=args.max_depth,
+            relationship_types=args.relationship_types,
+            direction=args.direction,
+            max_visits=args.max_nodes
+        )
+        if args.include_full_items:
+            ids_by_type: Dict[str, List[int]] = {}
+            for node in nodes:
+                if node["item_type"] in db.ITEM_TABLES and str(node["item_id"]).isdigit():
+                    ids_by_type.setdefault(node["item_type"], []).append(int(node["item_id"]))
+            items = db.get_items_by_type_and_ids(args.workspace_id, ids_by_type)
+            for node in nodes:
+                item = items.get(node["item_type"], {}).get(int(node["item_id"])) if str(node["item_id"]).isdigit() else None
+                node["full_item"] = item.model_dump(mode='json') if item else None
+        return {
+            "nodes": nodes,
+            "links": [link.model_dump(mode='json') for link in links],
+            "truncated": truncated,
+        }
+    except ValueError as e:
+        raise ToolArgumentError(str(e))
+    except DatabaseError as e:
+        raise ContextPortalError(f"Database error traversing context links: {e}")
+    except Exception as e:
+        log.exception(f"Unexpected error in traverse_links for workspace {args.workspace_id}")
+        raise ContextPortalError(f"Unexpected error traversing context links: {e}")
+
+def handle_batch_link_items(args: models.BatchLinkItemsArgs) -> Dict[str, Any]:
+    """
+    Handles the 'batch_link_items' MCP tool.
+    Creates many links between ConPort items.
+
+    Links are validated individually (as for link_conport_items), then all valid links are
+    written with a single bulk insert (one transaction). If the bulk insert fails, the links
+    are retried one by one so each failure is reported.
+    """
+    results = []
+    errors = []
+    validated = [] # (item_index, validated args)
+
+    for i, link_data in enumerate(args.links):
+        try:
+            link_args = {"workspace_id": args.workspace_id, **link_data}
+            for key in ("source_item_id", "target_item_id"):
+                if isinstance(link_args.get(key), int): # Integer IDs are accepted, as by the single-link tool
+                    link_args[key] = str(link_args[key])
+            validated.append((i, models.LinkConportItemsArgs(**link_args)))
+        except ValidationError as ve:
+            log.error(f"Validation error for link {i} in batch_link_items: {ve}")
+            errors.append({"item_index": i, "error": str(ve), "data": link_data})
+
+    try:
+        links = [
+            models.ContextLink(**link_args.model_dump(exclude={"workspace_id"}))
+            for _, link_args in validated
+        ]
+        results = [link.model_dump(mode='json') for link in db.log_context_links(args.workspace_id, links)]
+    except DatabaseError as e:
+        log.warning(f"Bulk insert failed in batch_link_items, retrying link by link: {e}")
+        for i, link_args in validated:
+            try:
+                results.append(handle_link_conport_items(link_args))
+            except ContextPortalError as cpe:
+                log.error(f"ContextPortalError for link {i} in batch_link_items: {cpe}")
+                errors.append({"item_index": i, "error": str(cpe), "data": args.links[i]})
+        errors.sort(key=lambda err: err["item_index"])
+
+    success_count = len(results)
+    failure_count = len(errors)
+    return {
+        "status": "partial_success" if success_count > 0 and failure_count > 0 else ("success" if failure_count == 0 else "failure"),
+        "message": f"Batch link: {success_count} succeeded, {failure_count} failed.",
+        "successful_items": results,
+        "failed_items": errors
+    }
+
 def handle_get_item_history(args: models.GetItemHistoryArgs) -> List[Dict[str, Any]]:
     """
     Handles the 'get_item_history' MCP tool.
@@ -1181,42 +1500,98 @@ _SINGLE_ITEM_HANDLERS_MAP = {
     # Add other loggable item types here if needed
 }
 
+# Bulk path for batch_log_items: item_type -> (build the DB model from validated args, bulk DB insert)
+_BULK_ITEM_LOGGERS = {
+    "decision": (
+        lambda a: models.Decision(summary=a.summary, rationale=a.rationale, implementation_details=a.implementation_details, tags=a.tags),
+        db.log_decisions,
+    ),
+    "progress_entry": (
+        lambda a: models.ProgressEntry(status=a.status, description=a.description, parent_id=a.parent_id),
+        db.log_progress_entries,
+    ),
+    "system_pattern": (
+        lambda a: models.SystemPattern(name=a.name, description=a.description, tags=a.tags),
+        db.log_system_patterns,
+    ),
+    "custom_data": (
+        lambda a: models.CustomData(category=a.category, key=a.key, value=a.value),
+        db.log_custom_data_entries,
+    ),
+}
+
+def _link_batch_logged_progress(workspace_id: str, item_args: List[models.LogProgressArgs], logged: List[models.ProgressEntry]) -> None:
+    """Creates the automatic links requested by batch-logged progress entries, in one insert."""
+    links = [
+        models.ContextLink(
+            source_item_type="progress_entry",
+            source_item_id=str(entry.id),
+            target_item_type=a.linked_item_type,
+            target_item_id=a.linked_item_id,
+            relationship_type=a.link_relationship_type,
+            description=f"Progress entry '{entry.description[:30]}...' automatically linked."
+        )
+        for a, entry in zip(item_args, logged)
+        if a.linked_item_type and a.linked_item_id and entry.id is not None
+    ]
+    try:
+        db.log_context_links(workspace_id, links)
+    except Exception as link_e:
+        # As in handle_log_progress, linking errors don't fail the progress logging
+        log.error(f"Failed to automatically link {len(links)} batch-logged progress entries for workspace {workspace_id}: {link_e}")
+
 def handle_batch_log_items(args: models.BatchLogItemsArgs) -> Dict[str, Any]:
     """
     Handles the 'batch_log_items' MCP tool.
     Logs multiple items of a specified type.
+
+    Items are validated individually, then all valid items are written with a single
+    bulk insert (one transaction) and embedded later as one batch by the indexing queue.
+    If the bulk insert fails, the items are retried one by one so each failure is reported.
     """
     if args.item_type not in _SINGLE_ITEM_HANDLERS_MAP:
         raise ToolArgumentError(f"Unsupported item_type for batch logging: {args.item_type}. Supported types: {list(_SINGLE_ITEM_HANDLERS_MAP.keys())}")
 
     handler_func, pydantic_model = _SINGLE_ITEM_HANDLERS_MAP[args.item_type]
-    
+    build_item, bulk_log = _BULK_ITEM_LOGGERS[args.item_type]
+
     results = []
     errors = []
-    success_count = 0
-    failure_count = 0
+    validated = [] # (item_index, validated args)
 
     for i, item_data_dict in enumerate(args.items):
         try:
             # Each item_data_dict needs workspace_id for the Pydantic model
             item_args_with_ws = {"workspace_id": args.workspace_id, **item_data_dict}
-            validated_item_args = pydantic_model(**item_args_with_ws)
-            result = handler_func(validated_item_args)
-            results.append(result)
-            success_count += 1
+            validated.append((i, pydantic_model(**item_args_with_ws)))
         except ValidationError as ve:
             log.error(f"Validation error for item {i} in batch_log_items ({args.item_type}): {ve}")
             errors.append({"item_index": i, "error": str(ve), "data": item_data_dict})
-            failure_count += 1
-        except ContextPortalError as cpe:
-            log.error(f"ContextPortalError for item {i} in batch_log_items ({args.item_type}): {cpe}")
-            errors.append({"item_index": i, "error": str(cpe), "data": item_data_dict})
-            failure_count += 1
-        except Exception as e:
-            log.exception(f"Unexpected error for item {i} in batch_log_items ({args.item_type})")
-            errors.append({"item_index": i, "error": f"Unexpected server error: {type(e).__name__}", "data": item_data_dict})
-            failure_count += 1
-            
+
+    try:
+        item_args = [a for _, a in validated]
+        logged_items = bulk_log(args.workspace_id, [build_item(a) for a in item_args])
+        if args.item_type == "progress_entry":
+            _link_batch_logged_progress(args.workspace_id, item_args, logged_items)
+        results = [item.model_dump(mode='json') for item in logged_items]
+        # Embedding happens in the background indexing queue (fed by DB triggers)
+        indexing_queue.notify(args.workspace_id)
+    except DatabaseError as e:
+        log.warning(f"Bulk insert failed in batch_log_items ({args.item_type}), retrying item by item: {e}")
+        for i, validated_item_args in validated:
+            item_data_dict = args.items[i]
+            try:
+                results.append(handler_func(validated_item_args))
+            except ContextPortalError as cpe:
+                log.error(f"ContextPortalError for item {i} in batch_log_items ({args.item_type}): {cpe}")
+                errors.append({"item_index": i, "error": str(cpe), "data": item_data_dict})
+            except Exception as e_item:
+                log.exception(f"Unexpected error for item {i} in batch_log_items ({args.item_type})")
+                errors.append({"item_index": i, "error": f"Unexpected server error: {type(e_item).__name__}", "data": item_data_dict})
+        errors.sort(key=lambda err: err["item_index"])
+
+    success_count = len(results)
+    failure_count = len(errors)
     return {
         "status": "partial_success" if success_count > 0 and failure_count > 0 else ("success" if failure_count == 0 else "failure"),
         "message": f"Batch log for '{args.item_type}': {success_count} succeeded, {failure_count} failed.",
@@ -1232,28 +1607,13 @@ def handle_delete_decision_by_id(args: models.DeleteDecisionByIdArgs) -> Dict[st
     Deletes a decision by its ID.
     """
     try:
-        deleted_from_db = db.delete_decision_by_id(args.workspace_id, args.decision_id)
-        
-        if deleted_from_db:
-            try:
-                vector_store_service.delete_item_embedding(
-                    workspace_id=args.workspace_id,
-                    item_type="decision",
-                    item_id=str(args.decision_id)
-                )
-                log.info(f"Successfully deleted embedding for decision ID {args.decision_id}")
-                return {"status": "success", "message": f"Decision ID {args.decision_id} and its embedding deleted successfully."}
-            except Exception as e_vec_del:
-                log.error(f"Failed to delete embedding for decision ID {args.decision_id} (DB record was deleted): {e_vec_del}", exc_info=True)
-                # Return success for DB deletion but acknowledge embedding deletion failure.
-                return {
-                    "status": "partial_success",
-                    "message": f"Decision ID {args.decision_id} deleted from database, but failed to delete its embedding: {e_vec_del}"
-                }
+        deleted = db.delete_decision_by_id(args.workspace_id, args.decision_id)
+        if deleted:
+            # The delete trigger queued the item; the indexing worker removes its vector.
+            indexing_queue.notify(args.workspace_id)
+            return {"status": "success", "message": f"Decision ID {args.decision_id} deleted."}
         else:
-            # This case means the ID was valid (e.g. integer) but not found in DB.
-            # No need to attempt vector deletion if not found in DB.
-            return {"status": "success", "message": f"Decision ID {args.decision_id} not found in database."}
+            return {"status": "success", "message": f"Decision ID {args.decision_id} not found for deletion."}
     except DatabaseError as e:
         raise ContextPortalError(f"Database error deleting decision ID {args.decision_id}: {e}")
     except Exception as e:
@@ -1266,25 +1626,13 @@ def handle_delete_system_pattern_by_id(args: models.DeleteSystemPatternByIdArgs)
     Deletes a system pattern by its ID.
     """
     try:
-        deleted_from_db = db.delete_system_pattern_by_id(args.workspace_id, args.pattern_id)
-        
-        if deleted_from_db:
-            try:
-                vector_store_service.delete_item_embedding(
-                    workspace_id=args.workspace_id,
-                    item_type="system_pattern",
-                    item_id=str(args.pattern_id)
-                )
-                log.info(f"Successfully deleted embedding for system pattern ID {args.pattern_id}")
-                return {"status": "success", "message": f"System pattern ID {args.pattern_id} and its embedding deleted successfully."}
-            except Exception as e_vec_del:
-                log.error(f"Failed to delete embedding for system pattern ID {args.pattern_id} (DB record was deleted): {e_vec_del}", exc_info=True)
-                return {
-                    "status": "partial_success",
-                    "message": f"System pattern ID {args.pattern_id} deleted from database, but failed to delete its embedding: {e_vec_del}"
-                }
+        deleted = db.delete_system_pattern_by_id(args.workspace_id, args.pattern_id)
+        if deleted:
+            # The delete trigger queued the item; the indexing worker removes its vector.
+            indexing_queue.notify(args.workspace_id)
+            return {"status": "success", "message": f"System pattern ID {args.pattern_id} deleted."}
         else:
-            return {"status": "success", "message": f"System pattern ID {args.pattern_id} not found in database."}
+            return {"status": "success", "message": f"System pattern ID {args.pattern_id} not found for deletion."}
     except DatabaseError as e:
         raise ContextPortalError(f"Database error deleting system pattern ID {args.pattern_id}: {e}")
     except Exception as e:
@@ -1,5 +1,4 @@
 import sys
-import uvicorn
 from fastapi import FastAPI
 import logging.handlers
 import argparse
@@ -24,6 +23,10 @@ try:
     from .db import database, models # models for tool argument types
     from .db.database import ensure_alembic_files_exist # Import the provisioning function
     from .core import exceptions # For custom exceptions if FastMCP doesn't map them
+    from .core import dispatch # Runs blocking handler work off the event loop
+    from .core import indexing_queue # Background embedding of logged items
+    from .core import embedding_models # Embedding model and vector store collection per workspace
+    from .core import warmup # Opt-in background model warm-up
     from .core.workspace_detector import resolve_workspace_id, WorkspaceDetector # Import workspace detection
 except ImportError:
     import os
@@ -32,6 +35,10 @@ except ImportError:
     from src.context_portal_mcp.db import database, models
     from src.context_portal_mcp.db.database import ensure_alembic_files_exist
     from src.context_portal_mcp.core import exceptions
+    from src.context_portal_mcp.core import dispatch
+    from src.context_portal_mcp.core import indexing_queue
+    from src.context_portal_mcp.core import embedding_models
+    from src.context_portal_mcp.core import warmup
     from src.context_portal_mcp.core.workspace_detector import resolve_workspace_id, WorkspaceDetector
 
 log = logging.getLogger(__name__)
@@ -99,6 +106,8 @@ async def conport_lifespan(server: FastMCP) -> AsyncIterator[None]:
         yield None  # Server runs
     finally:
         log.info("ConPort FastMCP server lifespan shutting down. Closing all DB connections.")
+        indexing_queue.shutdown()
+        dispatch.shutdown()
         database.close_all_connections()
 
 # --- FastMCP Server Instance ---
@@ -126,7 +135,7 @@ async def tool_get_product_context(
     try:
         # Construct the Pydantic model for the handler
         pydantic_args = models.GetContextArgs(workspace_id=workspace_id)
-        return mcp_handlers.handle_get_product_context(pydantic_args)
+        return await dispatch.run_read(mcp_handlers.handle_get_product_context, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in get_product_context handler: {e}")
         raise
@@ -169,7 +178,7 @@ async def tool_update_product_context(
             content=parsed_content,
             patch_content=parsed_patch_content
         )
-        return mcp_handlers.handle_update_product_context(pydantic_args)
+        return await dispatch.run_write(mcp_handlers.handle_update_product_context, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in update_product_context handler: {e}")
         raise
@@ -187,7 +196,7 @@ async def tool_get_active_context(
 ) -> Dict[str, Any]:
     try:
         pydantic_args = models.GetContextArgs(workspace_id=workspace_id)
-        return mcp_handlers.handle_get_active_context(pydantic_args)
+        return await dispatch.run_read(mcp_handlers.handle_get_active_context, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in get_active_context handler: {e}")
         raise
@@ -227,7 +236,7 @@ async def tool_update_active_context(
             content=parsed_content,
             patch_content=parsed_patch_content
         )
-        return mcp_handlers.handle_update_active_context(pydantic_args)
+        return await dispatch.run_write(mcp_handlers.handle_update_active_context, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in update_active_context handler: {e}")
         raise
@@ -255,7 +264,7 @@ async def tool_log_decision(
             implementation_details=implementation_details,
             tags=tags
         )
-        return mcp_handlers.handle_log_decision(pydantic_args)
+        return await dispatch.run_write(mcp_handlers.handle_log_decision, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in log_decision handler: {e}")
         raise
@@ -269,17 +278,21 @@ async def tool_get_decisions(
     ctx: Context,
     limit: Annotated[Optional[Union[int, str]], Field(description="Maximum number of decisions to return (most recent first)")] = None,
     tags_filter_include_all: Annotated[Optional[List[str]], Field(description="Filter: items must include ALL of these tags.")] = None,
-    tags_filter_include_any: Annotated[Optional[List[str]], Field(description="Filter: items must include AT LEAST ONE of these tags.")] = None
-) -> List[Dict[str, Any]]:
+    tags_filter_include_any: Annotated[Optional[List[str]], Field(description="Filter: items must include AT LEAST ONE of these tags.")] = None,
+    paginate: Annotated[bool, Field(description="Return a page {'items': [...], 'next_cursor': ...} ordered newest first, with 'limit' as the page size.")] = False,
+    cursor: Annotated[Optional[str], Field(description="Opaque 'next_cursor' from a previous page; implies 'paginate'.")] = None
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     try:
         # The model's own validator will check tag filter exclusivity.
         pydantic_args = models.GetDecisionsArgs(
             workspace_id=workspace_id,
             limit=limit,
             tags_filter_include_all=tags_filter_include_all,
-            tags_filter_include_any=tags_filter_include_any
+            tags_filter_include_any=tags_filter_include_any,
+            paginate=paginate,
+            cursor=cursor
         )
-        return mcp_handlers.handle_get_decisions(pydantic_args)
+        return await dispatch.run_read(mcp_handlers.handle_get_decisions, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in get_decisions handler: {e}")
         raise
@@ -303,7 +316,7 @@ async def tool_search_decisions_fts(
             query_term=query_term,
             limit=limit
         )
-        return mcp_handlers.handle_search_decisions_fts(pydantic_args)
+        return await dispatch.run_read(mcp_handlers.handle_search_decisions_fts, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in search_decisions_fts handler: {e}")
         raise
@@ -333,7 +346,7 @@ async def tool_log_progress(
             linked_item_id=linked_item_id,
             link_relationship_type=link_relationship_type
         )
-        return mcp_handlers.handle_log_progress(pydantic_args)
+        return await dispatch.run_write(mcp_handlers.handle_log_progress, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in log_progress handler: {e}")
         raise
@@ -350,16 +363,20 @@ async def tool_get_progress(
     ctx: Context,
     status_filter: Annotated[Optional[str], Field(description="Filter entries by status")] = None,
     parent_id_filter: Annotated[Optional[Union[int, str]], Field(description="Filter entries by parent task ID")] = None,
-    limit: Annotated[Optional[Union[int, str]], Field(description="Maximum number of entries to return (most recent first)")] = None
-) -> List[Dict[str, Any]]:
+    limit: Annotated[Optional[Union[int, str]], Field(description="Maximum number of entries to return (most recent first)")] = None,
+    paginate: Annotated[bool, Field(description="Return a page {'items': [...], 'next_cursor': ...} ordered newest first, with 'limit' as the page size.")] = False,
+    cursor: Annotated[Optional[str], Field(description="Opaque 'next_cursor' from a previous page; implies 'paginate'.")] = None
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     try:
         pydantic_args = models.GetProgressArgs(
             workspace_id=workspace_id,
             status_filter=status_filter,
             parent_id_filter=parent_id_filter,
-            limit=limit
+            limit=limit,
+            paginate=paginate,
+            cursor=cursor
         )
-        return mcp_handlers.handle_get_progress(pydantic_args)
+        return await dispatch.run_read(mcp_handlers.handle_get_progress, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in get_progress handler: {e}")
         raise
@@ -389,7 +406,7 @@ async def tool_update_progress(
             description=description,
             parent_id=parent_id
         )
-        return mcp_handlers.handle_update_progress(pydantic_args)
+        return await dispatch.run_write(mcp_handlers.handle_update_progress, pydantic_args)
     except exceptions.ContextPortalError as e: # Specific app errors
         log.error(f"Error in update_progress handler: {e}")
         raise
@@ -415,7 +432,7 @@ async def tool_delete_progress_by_id(
             workspace_id=workspace_id,
             progress_id=progress_id
         )
-        return mcp_handlers.handle_delete_progress_by_id(pydantic_args)
+        return await dispatch.run_write(mcp_handlers.handle_delete_progress_by_id, pydantic_args)
     except exceptions.ContextPortalError as e: # Specific app errors
         log.error(f"Error in delete_progress_by_id handler: {e}")
         raise
@@ -439,7 +456,7 @@ async def tool_log_system_pattern(
             description=description,
             tags=tags
         )
-        return mcp_handlers.handle_log_system_pattern(pydantic_args)
+        return await dispatch.run_write(mcp_handlers.handle_log_system_pattern, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in log_system_pattern handler: {e}")
         raise
@@ -453,17 +470,21 @@ async def tool_get_system_patterns(
     ctx: Context,
     limit: Annotated[Optional[Union[int, str]], Field(description="Maximum number of patterns to return")] = None,
     tags_filter_include_all: Annotated[Optional[List[str]], Field(description="Filter: items must include ALL of these tags.")] = None,
-    tags_filter_include_any: Annotated[Optional[List[str]], Field(description="Filter: items must include AT LEAST ONE of these tags.")] = None
-) -> List[Dict[str, Any]]:
+    tags_filter_include_any: Annotated[Optional[List[str]], Field(description="Filter: items must include AT LEAST ONE of these tags.")] = None,
+    paginate: Annotated[bool, Field(description="Return a page {'items': [...], 'next_cursor': ...} ordered newest first, with 'limit' as the page size.")] = False,
+    cursor: Annotated[Optional[str], Field(description="Opaque 'next_cursor' from a previous page; implies 'paginate'.")] = None
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     try:
         # The model's own validator will check tag filter exclusivity.
         pydantic_args = models.GetSystemPatternsArgs(
             workspace_id=workspace_id,
             limit=limit,
             tags_filter_include_all=tags_filter_include_all,
-            tags_filter_include_any=tags_filter_include_any
+            tags_filter_include_any=tags_filter_include_any,
+            paginate=paginate,
+            cursor=cursor
         )
-        return mcp_handlers.handle_get_system_patterns(pydantic_args)
+        return await dispatch.run_read(mcp_handlers.handle_get_system_patterns, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in get_system_patterns handler: {e}")
         raise
@@ -489,7 +510,7 @@ async def tool_log_custom_data(
             key=key,
             value=value
         )
-        return mcp_handlers.handle_log_custom_data(pydantic_args)
+        return await dispatch.run_write(mcp_handlers.handle_log_custom_data, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in log_custom_data handler: {e}")
         raise
@@ -502,15 +523,21 @@ async def tool_get_custom_data(
     workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
     ctx: Context,
     category: Annotated[Optional[str], Field(description="Filter by category")] = None,
-    key: Annotated[Optional[str], Field(description="Filter by key (requires category)")] = None
-) -> List[Dict[str, Any]]:
+    key: Annotated[Optional[str], Field(description="Filter by key (requires category)")] = None,
+    limit: Annotated[Optional[Union[int, str]], Field(description="Maximum number of entries to return")] = None,
+    paginate: Annotated[bool, Field(description="Return a page {'items': [...], 'next_cursor': ...} ordered newest first, with 'limit' as the page size.")] = False,
+    cursor: Annotated[Optional[str], Field(description="Opaque 'next_cursor' from a previous page; implies 'paginate'.")] = None
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     try:
         pydantic_args = models.GetCustomDataArgs(
             workspace_id=workspace_id,
             category=category,
-            key=key
+            key=key,
+            limit=limit,
+            paginate=paginate,
+            cursor=cursor
         )
-        return mcp_handlers.handle_get_custom_data(pydantic_args)
+        return await dispatch.run_read(mcp_handlers.handle_get_custom_data, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in get_custom_data handler: {e}")
         raise
@@ -531,7 +558,7 @@ async def tool_delete_custom_data(
             category=category,
             key=key
         )
-        return mcp_handlers.handle_delete_custom_data(pydantic_args)
+        return await dispatch.run_write(mcp_handlers.handle_delete_custom_data, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in delete_custom_data handler: {e}")
         raise
@@ -551,7 +578,7 @@ async def tool_search_project_glossary_fts(
             query_term=query_term,
             limit=limit
         )
-        return mcp_handlers.handle_search_project_glossary_fts(pydantic_args)
+        return await dispatch.run_read(mcp_handlers.handle_search_project_glossary_fts, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in search_project_glossary_fts handler: {e}")
         raise
@@ -559,18 +586,20 @@ async def tool_search_project_glossary_fts(
         log.error(f"Error processing args for search_project_glossary_fts: {e}. Args: workspace_id={workspace_id}, query_term='{query_term}', limit={limit}")
         raise exceptions.ContextPortalError(f"Server error processing search_project_glossary_fts: {type(e).__name__}")
 
-@conport_mcp.tool(name="export_conport_to_markdown", description="Exports ConPort data to markdown files.")
+@conport_mcp.tool(name="export_conport_to_markdown", description="Exports ConPort data to markdown files. Only files whose items changed since the previous export are rewritten.")
 async def tool_export_conport_to_markdown(
     workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
     ctx: Context,
-    output_path: Annotated[Optional[str], Field(description="Optional output directory path relative to workspace_id. Defaults to './conport_export/' if not provided.")] = None
+    output_path: Annotated[Optional[str], Field(description="Optional output directory path relative to workspace_id. Defaults to './conport_export/' if not provided.")] = None,
+    full: Annotated[bool, Field(description="Rebuild every file, ignoring the manifest of the previous export")] = False
 ) -> Dict[str, Any]:
     try:
         pydantic_args = models.ExportConportToMarkdownArgs(
             workspace_id=workspace_id,
-            output_path=output_path
+            output_path=output_path,
+            full=full
         )
-        return mcp_handlers.handle_export_conport_to_markdown(pydantic_args)
+        return await dispatch.run_read(mcp_handlers.handle_export_conport_to_markdown, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in export_conport_to_markdown handler: {e}")
         raise
@@ -578,23 +607,25 @@ async def tool_export_conport_to_markdown(
         log.error(f"Error processing args for export_conport_to_markdown: {e}. Args: workspace_id={workspace_id}, output_path='{output_path}'")
         raise exceptions.ContextPortalError(f"Server error processing export_conport_to_markdown: {type(e).__name__}")
 
-@conport_mcp.tool(name="import_markdown_to_conport", description="Imports data from markdown files into ConPort.")
+@conport_mcp.tool(name="import_markdown_to_conport", description="Imports data from markdown files into ConPort. All files are validated first and written in one transaction, so an import lands completely or not at all.")
 async def tool_import_markdown_to_conport(
     workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
     ctx: Context,
-    input_path: Annotated[Optional[str], Field(description="Optional input directory path relative to workspace_id containing markdown files. Defaults to './conport_export/' if not provided.")] = None
+    input_path: Annotated[Optional[str], Field(description="Optional input directory path relative to workspace_id containing markdown files. Defaults to './conport_export/' if not provided.")] = None,
+    dry_run: Annotated[bool, Field(description="Parse, validate and write in a transaction that is rolled back, without changing anything")] = False
 ) -> Dict[str, Any]:
     try:
         pydantic_args = models.ImportMarkdownToConportArgs(
             workspace_id=workspace_id,
-            input_path=input_path
+            input_path=input_path,
+            dry_run=dry_run
         )
-        return mcp_handlers.handle_import_markdown_to_conport(pydantic_args)
+        return await dispatch.run_write(mcp_handlers.handle_import_markdown_to_conport, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in import_markdown_to_conport handler: {e}")
         raise
     except Exception as e:
-        log.error(f"Error processing args for import_markdown_to_conport: {e}. Args: workspace_id={workspace_id}, input_path='{input_path}'")
+        log.error(f"Error processing args for import_markdown_to_conport: {e}. Args: workspace_id={workspace_id}, input_path='{input_path}', dry_run={dry_run}")
         raise exceptions.ContextPortalError(f"Server error processing import_markdown_to_conport: {type(e).__name__}")
 
 @conport_mcp.tool(name="link_conport_items", description="Creates a relationship link between two ConPort items, explicitly building out the project knowledge graph.")
@@ -618,7 +649,7 @@ async def tool_link_conport_items(
             relationship_type=relationship_type,
             description=description
         )
-        return mcp_handlers.handle_link_conport_items(pydantic_args)
+        return await dispatch.run_write(mcp_handlers.handle_link_conport_items, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in link_conport_items handler: {e}")
         raise
@@ -634,8 +665,10 @@ async def tool_get_linked_items(
     ctx: Context,
     relationship_type_filter: Annotated[Optional[str], Field(description="Optional: Filter by relationship type")] = None,
     linked_item_type_filter: Annotated[Optional[str], Field(description="Optional: Filter by the type of the linked items")] = None,
-    limit: Annotated[Optional[Union[int, str]], Field(description="Maximum number of links to return")] = None
-) -> List[Dict[str, Any]]:
+    limit: Annotated[Optional[Union[int, str]], Field(description="Maximum number of links to return")] = None,
+    paginate: Annotated[bool, Field(description="Return a page {'items': [...], 'next_cursor': ...} ordered newest first, with 'limit' as the page size.")] = False,
+    cursor: Annotated[Optional[str], Field(description="Opaque 'next_cursor' from a previous page; implies 'paginate'.")] = None
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     try:
         pydantic_args = models.GetLinkedItemsArgs(
             workspace_id=workspace_id,
@@ -643,9 +676,11 @@ async def tool_get_linked_items(
             item_id=str(item_id), # Ensure string as per model
             relationship_type_filter=relationship_type_filter,
             linked_item_type_filter=linked_item_type_filter,
-            limit=limit
+            limit=limit,
+            paginate=paginate,
+            cursor=cursor
         )
-        return mcp_handlers.handle_get_linked_items(pydantic_args)
+        return await dispatch.run_read(mcp_handlers.handle_get_linked_items, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in get_linked_items handler: {e}")
         raise
@@ -653,6 +688,53 @@ async def tool_get_linked_items(
         log.error(f"Error processing args for get_linked_items: {e}. Args: workspace_id={workspace_id}, item_type='{item_type}', item_id='{item_id}'")
         raise exceptions.ContextPortalError(f"Server error processing get_linked_items: {type(e).__name__}")
 
+@conport_mcp.tool(name="traverse_links", description="Expands the link neighbourhood of an item: every item within a number of link hops, and the links between them, in one call.")
+async def tool_traverse_links(
+    workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
+    item_type: Annotated[str, Field(description="Type of the item to start from (e.g., 'decision')")],
+    item_id: Annotated[str, Field(description="ID or key of the item to start from")],
+    ctx: Context,
+    max_depth: Annotated[Union[int, str], Field(description="Maximum number of link hops from the start item (1-5)")] = 2,
+    relationship_types: Annotated[Optional[List[str]], Field(description="Optional: Only follow links of these relationship types")] = None,
+    direction: Annotated[str, Field(description="Follow links 'outgoing' (source to target), 'incoming' (target to source) or 'both'")] = "both",
+    max_nodes: Annotated[Union[int, str], Field(description="Budget of node visits, bounding the cost on dense graphs (1-1000); 'truncated' is set when it runs out")] = 100,
+    include_full_items: Annotated[bool, Field(description="Attach each node's full item from the database as 'full_item'")] = False
+) -> Dict[str, Any]:
+    try:
+        pydantic_args = models.TraverseLinksArgs(
+            workspace_id=workspace_id,
+            item_type=item_type,
+            item_id=str(item_id), # Ensure string as per model
+            max_depth=max_depth,
+            relationship_types=relationship_types,
+            direction=direction,
+            max_nodes=max_nodes,
+            include_full_items=include_full_items
+        )
+        return await dispatch.run_read(mcp_handlers.handle_traverse_links, pydantic_args)
+    except exceptions.ContextPortalError as e:
+        log.error(f"Error in traverse_links handler: {e}")
+        raise
+    except Exception as e:
+        log.error(f"Error processing args for traverse_links: {e}. Args: workspace_id={workspace_id}, item_type='{item_type}', item_id='{item_id}'")
+        raise exceptions.ContextPortalError(f"Server error processing traverse_links: {type(e).__name__}")
+
+@conport_mcp.tool(name="batch_link_items", description="Creates multiple links between ConPort items in a single call.")
+async def tool_batch_link_items(
+    workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
+    links: Annotated[List[Dict[str, Any]], Field(description="A list of dictionaries, each with the arguments of a single link_conport_items call (source_item_type, source_item_id, target_item_type, target_item_id, relationship_type, description).")],
+    ctx: Context
+) -> Dict[str, Any]:
+    try:
+        pydantic_args = models.BatchLinkItemsArgs(workspace_id=workspace_id, links=links)
+        return await dispatch.run_write(mcp_handlers.handle_batch_link_items, pydantic_args)
+    except exceptions.ContextPortalError as e:
+        log.error(f"Error in batch_link_items handler: {e}")
+        raise
+    except Exception as e:
+        log.error(f"Error processing args for batch_link_items: {e}. Args: workspace_id={workspace_id}, num_links={len(links) if isinstance(links, list) else 'N/A'}")
+        raise exceptions.ContextPortalError(f"Server error processing batch_link_items: {type(e).__name__}")
+
 @conport_mcp.tool(name="search_custom_data_value_fts", description="Full-text search across all custom data values, categories, and keys.")
 async def tool_search_custom_data_value_fts(
     workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
@@ -668,7 +750,7 @@ async def tool_search_custom_data_value_fts(
             category_filter=category_filter,
             limit=limit
         )
-        return mcp_handlers.handle_search_custom_data_value_fts(pydantic_args)
+        return await dispatch.run_read(mcp_handlers.handle_search_custom_data_value_fts, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in search_custom_data_value_fts handler: {e}")
         raise
@@ -691,7 +773,7 @@ async def tool_batch_log_items(
             item_type=item_type,
             items=items
         )
-        return mcp_handlers.handle_batch_log_items(pydantic_args)
+        return await dispatch.run_write(mcp_handlers.handle_batch_log_items, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in batch_log_items handler: {e}")
         raise
@@ -719,7 +801,7 @@ async def tool_get_item_history(
             after_timestamp=after_timestamp,
             version=version
         )
-        return mcp_handlers.handle_get_item_history(pydantic_args)
+        return await dispatch.run_read(mcp_handlers.handle_get_item_history, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in get_item_history handler: {e}")
         raise
@@ -738,7 +820,7 @@ async def tool_delete_decision_by_id(
 ) -> Dict[str, Any]:
     try:
         pydantic_args = models.DeleteDecisionByIdArgs(workspace_id=workspace_id, decision_id=decision_id)
-        return mcp_handlers.handle_delete_decision_by_id(pydantic_args)
+        return await dispatch.run_write(mcp_handlers.handle_delete_decision_by_id, pydantic_args)
     except Exception as e:
         log.error(f"Error processing args for delete_decision_by_id: {e}. Args: workspace_id={workspace_id}, decision_id={decision_id}")
         raise exceptions.ContextPortalError(f"Server error processing delete_decision_by_id: {type(e).__name__}")
@@ -751,7 +833,7 @@ async def tool_delete_system_pattern_by_id(
 ) -> Dict[str, Any]:
     try:
         pydantic_args = models.DeleteSystemPatternByIdArgs(workspace_id=workspace_id, pattern_id=pattern_id)
-        return mcp_handlers.handle_delete_system_pattern_by_id(pydantic_args)
+        return await dispatch.run_write(mcp_handlers.handle_delete_system_pattern_by_id, pydantic_args)
     except Exception as e:
         log.error(f"Error processing args for delete_system_pattern_by_id: {e}. Args: workspace_id={workspace_id}, pattern_id={pattern_id}")
         raise exceptions.ContextPortalError(f"Server error processing delete_system_pattern_by_id: {type(e).__name__}")
@@ -763,7 +845,7 @@ async def tool_get_conport_schema(
 ) -> Dict[str, Dict[str, Any]]:
     try:
         pydantic_args = models.GetConportSchemaArgs(workspace_id=workspace_id)
-        return mcp_handlers.handle_get_conport_schema(pydantic_args)
+        return await dispatch.run_read(mcp_handlers.handle_get_conport_schema, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in get_conport_schema handler: {e}")
         raise
@@ -771,6 +853,100 @@ async def tool_get_conport_schema(
         log.error(f"Error processing args for get_conport_schema: {e}. Args: workspace_id={workspace_id}")
         raise exceptions.ContextPortalError(f"Server error processing get_conport_schema: {type(e).__name__}")
 
+@conport_mcp.tool(name="get_indexing_status", description="Reports the background semantic indexing queue: pending and failed items, and how far indexing lags behind writes.")
+async def tool_get_indexing_status(
+    workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
+    ctx: Context
+) -> Dict[str, Any]:
+    try:
+        pydantic_args = models.GetIndexingStatusArgs(workspace_id=workspace_id)
+        return await dispatch.run_read(mcp_handlers.handle_get_indexing_status, pydantic_args)
+    except exceptions.ContextPortalError as e:
+        log.error(f"Error in get_indexing_status handler: {e}")
+        raise
+    except Exception as e:
+        log.error(f"Error processing args for get_indexing_status: {e}. Args: workspace_id={workspace_id}")
+        raise exceptions.ContextPortalError(f"Server error processing get_indexing_status: {type(e).__name__}")
+
+@conport_mcp.tool(name="retry_failed_indexing", description="Re-queues items whose embedding failed too many times (reported as 'failed' by get_indexing_status), e.g. after the embedding model setup was fixed.")
+async def tool_retry_failed_indexing(
+    workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
+    ctx: Context
+) -> Dict[str, Any]:
+    try:
+        pydantic_args = models.RetryFailedIndexingArgs(workspace_id=workspace_id)
+        return await dispatch.run_write(mcp_handlers.handle_retry_failed_indexing, pydantic_args)
+    except exceptions.ContextPortalError as e:
+        log.error(f"Error in retry_failed_indexing handler: {e}")
+        raise
+    except Exception as e:
+        log.error(f"Error processing args for retry_failed_indexing: {e}. Args: workspace_id={workspace_id}")
+        raise exceptions.ContextPortalError(f"Server error processing retry_failed_indexing: {type(e).__name__}")
+
+@conport_mcp.tool(name="get_server_health", description="Reports whether semantic search is ready: embedding model load/warm-up state, vector store state, and items waiting to be indexed.")
+async def tool_get_server_health(
+    workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
+    ctx: Context
+) -> Dict[str, Any]:
+    try:
+        pydantic_args = models.GetServerHealthArgs(workspace_id=workspace_id)
+        return await dispatch.run_read(mcp_handlers.handle_get_server_health, pydantic_args)
+    except exceptions.ContextPortalError as e:
+        log.error(f"Error in get_server_health handler: {e}")
+        raise
+    except Exception as e:
+        log.error(f"Error processing args for get_server_health: {e}. Args: workspace_id={workspace_id}")
+        raise exceptions.ContextPortalError(f"Server error processing get_server_health: {type(e).__name__}")
+
+@conport_mcp.tool(name="migrate_embedding_model", description="Switches the workspace to another sentence-transformers embedding model. Items are re-embedded into the model's own collection in the background; semantic search keeps using the current model until the switch completes. Progress is reported by get_indexing_status.")
+async def tool_migrate_embedding_model(
+    workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
+    model_name: Annotated[str, Field(description="sentence-transformers model name or path, e.g. 'BAAI/bge-small-en-v1.5'")],
+    ctx: Context
+) -> Dict[str, Any]:
+    try:
+        pydantic_args = models.MigrateEmbeddingModelArgs(workspace_id=workspace_id, model_name=model_name)
+        return await dispatch.run_write(mcp_handlers.handle_migrate_embedding_model, pydantic_args)
+    except exceptions.ContextPortalError as e:
+        log.error(f"Error in migrate_embedding_model handler: {e}")
+        raise
+    except Exception as e:
+        log.error(f"Error processing args for migrate_embedding_model: {e}. Args: workspace_id={workspace_id}, model_name={model_name}")
+        raise exceptions.ContextPortalError(f"Server error processing migrate_embedding_model: {type(e).__name__}")
+
+@conport_mcp.tool(name="reindex_semantic_store", description="Rebuilds the workspace's vector store from the database: every decision, progress entry, system pattern and custom data entry is re-embedded into the active model's collection in the background. Use after the vector store was deleted or corrupted, or to index items logged before semantic search was available. An interrupted reindex resumes from its checkpoint. Progress is reported by get_indexing_status.")
+async def tool_reindex_semantic_store(
+    workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
+    ctx: Context,
+    drop_existing: Annotated[bool, Field(description="Empty the collection first, removing vectors of items that no longer exist. Semantic search returns partial results until the reindex completes.")] = False,
+    restart: Annotated[bool, Field(description="Start over instead of resuming a reindex in progress")] = False
+) -> Dict[str, Any]:
+    try:
+        pydantic_args = models.ReindexSemanticStoreArgs(workspace_id=workspace_id, drop_existing=drop_existing, restart=restart)
+        return await dispatch.run_write(mcp_handlers.handle_reindex_semantic_store, pydantic_args)
+    except exceptions.ContextPortalError as e:
+        log.error(f"Error in reindex_semantic_store handler: {e}")
+        raise
+    except Exception as e:
+        log.error(f"Error processing args for reindex_semantic_store: {e}. Args: workspace_id={workspace_id}, drop_existing={drop_existing}, restart={restart}")
+        raise exceptions.ContextPortalError(f"Server error processing reindex_semantic_store: {type(e).__name__}")
+
+@conport_mcp.tool(name="collect_garbage", description="Removes data left behind by deleted items: context links, tags and full-text rows whose item no longer exists, and vectors of deleted items. Items that have no vector are queued for embedding. Reports what was reclaimed.")
+async def tool_collect_garbage(
+    workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
+    ctx: Context,
+    dry_run: Annotated[bool, Field(description="Only report what would be removed")] = False
+) -> Dict[str, Any]:
+    try:
+        pydantic_args = models.CollectGarbageArgs(workspace_id=workspace_id, dry_run=dry_run)
+        return await dispatch.run_write(mcp_handlers.handle_collect_garbage, pydantic_args)
+    except exceptions.ContextPortalError as e:
+        log.error(f"Error in collect_garbage handler: {e}")
+        raise
+    except Exception as e:
+        log.error(f"Error processing args for collect_garbage: {e}. Args: workspace_id={workspace_id}, dry_run={dry_run}")
+        raise exceptions.ContextPortalError(f"Server error processing collect_garbage: {type(e).__name__}")
+
 @conport_mcp.tool(name="get_recent_activity_summary", description="Provides a summary of recent ConPort activity (new/updated items).")
 async def tool_get_recent_activity_summary(
     workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
@@ -787,7 +963,7 @@ async def tool_get_recent_activity_summary(
             since_timestamp=since_timestamp,
             limit_per_type=limit_per_type
         )
-        return mcp_handlers.handle_get_recent_activity_summary(pydantic_args)
+        return await dispatch.run_read(mcp_handlers.handle_get_recent_activity_summary, pydantic_args)
     except exceptions.ContextPortalError as e:
         log.error(f"Error in get_recent_activity_summary handler: {e}")
         raise
@@ -807,7 +983,8 @@ async def tool_semantic_search_conport(
     filter_item_types: Annotated[Optional[List[str]], Field(description="Optional list of item types to filter by (e.g., ['decision', 'custom_data']). Valid types: 'decision', 'system_pattern', 'custom_data', 'progress_entry'.")] = None,
     filter_tags_include_any: Annotated[Optional[List[str]], Field(description="Optional list of tags; results will include items matching any of these tags.")] = None,
     filter_tags_include_all: Annotated[Optional[List[str]], Field(description="Optional list of tags; results will include only items matching all of these tags.")] = None,
-    filter_custom_data_categories: Annotated[Optional[List[str]], Field(description="Optional list of categories to filter by if 'custom_data' is in filter_item_types.")] = None
+    filter_custom_data_categories: Annotated[Optional[List[str]], Field(description="Optional list of categories to filter by if 'custom_data' is in filter_item_types.")] = None,
+    include_full_items: Annotated[bool, Field(description="Attach each hit's full item from the database as 'full_item' (null if the item was deleted since it was indexed), so no follow-up lookups are needed.")] = False
 ) -> List[Dict[str, Any]]:
     """
     MCP tool wrapper for semantic_search_conport.
@@ -822,7 +999,8 @@ async def tool_semantic_search_conport(
             filter_item_types=filter_item_types,
             filter_tags_include_any=filter_tags_include_any,
             filter_tags_include_all=filter_tags_include_all,
-            filter_custom_data_categories=filter_custom_data_categories
+            filter_custom_data_categories=filter_custom_data_categories,
+            include_full_items=include_full_items
         )
         # Ensure the handler is awaited if it's async
         return await mcp_handlers.handle_semantic_search_conport(pydantic_args)
@@ -836,6 +1014,40 @@ async def tool_semantic_search_conport(
         log.error(f"Unexpected error processing args for semantic_search_conport: {e}. Args: workspace_id={workspace_id}, query_text='{query_text}'")
         raise exceptions.ContextPortalError(f"Server error processing semantic_search_conport: {type(e).__name__} - {e}")
 
+@conport_mcp.tool(name="hybrid_search", description="Searches ConPort data by keywords and meaning at once: full-text (BM25) matches on decisions and custom data and semantic matches on all item types are merged by reciprocal rank fusion. Prefer this over calling the full-text and semantic search tools separately.")
+async def tool_hybrid_search(
+    workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
+    query_text: Annotated[str, Field(min_length=1, description="The natural language query text.")],
+    ctx: Context,
+    top_k: Annotated[Union[int, str], Field(default=5, description="Number of top results to return.")] = 5,
+    filter_item_types: Annotated[Optional[List[str]], Field(description="Optional list of item types to filter by (e.g., ['decision', 'custom_data']). Valid types: 'decision', 'system_pattern', 'custom_data', 'progress_entry'.")] = None,
+    filter_tags_include_any: Annotated[Optional[List[str]], Field(description="Optional list of tags; results will include items matching any of these tags.")] = None,
+    filter_tags_include_all: Annotated[Optional[List[str]], Field(description="Optional list of tags; results will include only items matching all of these tags.")] = None,
+    filter_custom_data_categories: Annotated[Optional[List[str]], Field(description="Optional list of categories to filter by if 'custom_data' is in filter_item_types.")] = None,
+    include_full_items: Annotated[bool, Field(description="Attach each hit's full item from the database as 'full_item' (null if the item was deleted since it was indexed), so no follow-up lookups are needed.")] = False
+) -> List[Dict[str, Any]]:
+    try:
+        pydantic_args = models.HybridSearchArgs(
+            workspace_id=workspace_id,
+            query_text=query_text,
+            top_k=top_k,
+            filter_item_types=filter_item_types,
+            filter_tags_include_any=filter_tags_include_any,
+            filter_tags_include_all=filter_tags_include_all,
+            filter_custom_data_categories=filter_custom_data_categories,
+            include_full_items=include_full_items
+        )
+        return await mcp_handlers.handle_hybrid_search(pydantic_args)
+    except exceptions.ContextPortalError as e:
+        log.error(f"Error in hybrid_search handler: {e}")
+        raise
+    except ValueError as e: # Catch Pydantic validation errors
+        log.error(f"Validation error for hybrid_search: {e}. Args: workspace_id={workspace_id}, query_text='{query_text}'")
+        raise exceptions.ContextPortalError(f"Invalid arguments for hybrid_search: {e}")
+    except Exception as e:
+        log.error(f"Unexpected error processing args for hybrid_search: {e}. Args: workspace_id={workspace_id}, query_text='{query_text}'")
+        raise exceptions.ContextPortalError(f"Server error processing hybrid_search: {type(e).__name__} - {e}")
+
 @conport_mcp.tool(name="get_workspace_detection_info", description="Provides detailed information about workspace detection for debugging and verification.")
 async def tool_get_workspace_detection_info(
     workspace_id: Annotated[str, Field(description="Identifier for the workspace (e.g., absolute path)")],
@@ -883,6 +1095,7 @@ def main_logic(sys_args=None):
     Configures and runs the ConPort server (HTTP mode via Uvicorn).
     The actual MCP logic is handled by the FastMCP instance mounted on the FastAPI app.
     """
+    from .core import config
     parser = argparse.ArgumentParser(description="ConPort MCP Server (FastMCP/HTTP)")
     parser.add_argument(
         "--host",
@@ -926,9 +1139,20 @@ def main_logic(sys_args=None):
     # or we add a condition here to call conport_mcp.run(transport="stdio")
     parser.add_argument(
         "--mode",
-        choices=["http", "stdio"], # Add http, stdio might be handled by FastMCP directly
+        choices=["http", "stdio", "reindex"], # Add http, stdio might be handled by FastMCP directly
         default="http",
-        help="Server communication mode (default: http for FastMCP mounted app)"
+        help="Server communication mode (default: http for FastMCP mounted app). 'reindex' does not start a "
+             "server: it rebuilds the workspace's vector store from the database in the foreground and exits."
+    )
+    parser.add_argument(
+        "--reindex-drop-existing",
+        action="store_true",
+        help="With --mode reindex: empty the vector store collection first, removing vectors of deleted items."
+    )
+    parser.add_argument(
+        "--reindex-restart",
+        action="store_true",
+        help="With --mode reindex: start over instead of resuming an interrupted reindex."
     )
     parser.add_argument(
         "--log-file",
@@ -955,6 +1179,63 @@ def main_logic(sys_args=None):
         default="context.db",
         help="The name of the context database file. Defaults to 'context.db'."
     )
+    parser.add_argument(
+        "--db-reader-pool-size",
+        type=int,
+        default=4,
+        help="Number of read-only SQLite connections pooled per workspace, allowing concurrent reads "
+             "alongside the single writer connection (WAL mode). Set to 0 to route reads through the writer. Defaults to 4."
+    )
+    parser.add_argument(
+        "--read-workers",
+        type=int,
+        default=8,
+        help="Maximum number of tool calls reading the database concurrently, off the event loop. Defaults to 8."
+    )
+    parser.add_argument(
+        "--write-workers",
+        type=int,
+        default=2,
+        help="Maximum number of tool calls writing to the database concurrently, off the event loop. Defaults to 2."
+    )
+    parser.add_argument(
+        "--inference-workers",
+        type=int,
+        default=1,
+        help="Maximum number of concurrent embedding model calls. Defaults to 1."
+    )
+    parser.add_argument(
+        "--embedding-cache-size",
+        type=int,
+        default=50000,
+        help="Maximum number of embeddings cached per workspace (in embedding_cache.db next to the database), "
+             "so unchanged text is never re-encoded. Least recently used entries are evicted. 0 disables the cache. Defaults to 50000."
+    )
+    parser.add_argument(
+        "--embedding-model",
+        type=str,
+        default=config.DEFAULT_EMBEDDING_MODEL,
+        help="sentence-transformers model used for workspaces that have not been indexed yet. Indexed "
+             "workspaces keep their model until switched with the migrate_embedding_model tool. "
+             f"Defaults to '{config.DEFAULT_EMBEDDING_MODEL}'."
+    )
+    parser.add_argument(
+        "--embedding-backend",
+        type=str,
+        default="torch",
+        choices=config.EMBEDDING_BACKENDS,
+        help="Inference backend for the embedding model. 'onnx' and 'openvino' run the same weights through "
+             "ONNX Runtime or OpenVINO; 'onnx-int8' runs a dynamically int8-quantized ONNX export made for the host CPU "
+             "on first use, the fastest option on CPU-only hosts at a small recall cost (see benchmarks/bench_embedding_backends.py). "
+             "Non-torch backends need the sentence-transformers onnx/openvino extras. Defaults to 'torch'."
+    )
+    parser.add_argument(
+        "--warm-up-model",
+        action="store_true",
+        help="Load and warm up the embedding model (and, in stdio mode, the workspace's vector store) on a "
+             "background thread at startup, so the first semantic search does not wait for it. "
+             "Readiness is reported by get_server_health. Off by default."
+    )
     parser.add_argument(
         "--log-level",
         type=str,
@@ -970,20 +1251,26 @@ def main_logic(sys_args=None):
 
     # Set custom database path if provided
     if args.db_path:
-        from .core import config
         config.set_custom_db_path(args.db_path)
         log.info(f"Using custom database path: {args.db_path}")
 
     if args.base_path:
-        from .core import config
         config.set_base_path(args.base_path)
         log.info(f"Using base path: {args.base_path}")
 
     if args.db_filename:
-        from .core import config
         config.set_db_filename(args.db_filename)
         log.info(f"Using database filename: {args.db_filename}")
 
+    try:
+        config.set_db_reader_pool_size(args.db_reader_pool_size)
+        config.set_worker_limits(args.read_workers, args.write_workers, args.inference_workers)
+        config.set_embedding_cache_size(args.embedding_cache_size)
+        config.set_embedding_model(args.embedding_model)
+        config.set_embedding_backend(args.embedding_backend)
+    except ValueError as e:
+        parser.error(str(e))
+
     log.info(f"Parsed CLI args: {args}")
 
     # In stdio mode, we should not configure the console handler, as it can interfere with MCP communication.
@@ -991,6 +1278,9 @@ def main_logic(sys_args=None):
     if args.mode == "http":
         log.info(f"Starting ConPort HTTP server (via FastMCP) on {args.host}:{args.port}")
         # The FastAPI `app` (with FastMCP mounted) is run by Uvicorn
+        if args.warm_up_model:
+            warmup.start()
+        import uvicorn # Only needed in HTTP mode
         uvicorn.run(app, host=args.host, port=args.port)
     elif args.mode == "stdio":
         log.info(f"Starting ConPort in STDIO mode with workspace detection enabled")
@@ -1018,6 +1308,9 @@ def main_logic(sys_args=None):
                 log.info(f"Pre-warming database connection for workspace: {effective_workspace_id}")
                 database.get_db_connection(effective_workspace_id)
                 log.info("Database connection pre-warmed successfully.")
+                # Resume indexing of items queued before the last shutdown; in HTTP mode
+                # the search handlers do this the first time each workspace is used
+                indexing_queue.resume(effective_workspace_id)
             except Exception as e:
                 log.error(f"Failed to pre-warm database connection for workspace '{effective_workspace_id}': {e}")
                 # If the DB is essential, exiting is safer than continuing in a broken state.
@@ -1025,6 +1318,9 @@ def main_logic(sys_args=None):
         else:
             log.warning("No effective_workspace_id available at startup. Database initialization will be deferred to the first tool call.")
 
+        if args.warm_up_model:
+            warmup.start(effective_workspace_id)
+
         # Note: The `FastMCP.run()` method is synchronous and will block until the server stops.
         # It requires the `mcp[cli]` extra to be installed for `mcp.server.stdio.run_server_stdio`.
         try:
@@ -1037,10 +1333,49 @@ def main_logic(sys_args=None):
             log.exception("Error running FastMCP in STDIO mode")
             sys.exit(1)
 
+    elif args.mode == "reindex":
+        auto_detect_enabled = args.auto_detect_workspace and not args.no_auto_detect
+        effective_workspace_id = resolve_workspace_id(
+            provided_workspace_id=args.workspace_id,
+            auto_detect=auto_detect_enabled,
+            start_path=args.workspace_search_start
+        )
+        try:
+            run_reindex(effective_workspace_id, args.reindex_drop_existing, args.reindex_restart)
+        except Exception:
+            log.exception(f"Reindexing workspace '{effective_workspace_id}' failed")
+            sys.exit(1)
+
     else:
         log.error(f"Unsupported mode: {args.mode}")
         sys.exit(1)
 
+def run_reindex(workspace_id: str, drop_existing: bool = False, restart: bool = False) -> None:
+    """
+    Rebuilds the workspace's vector store in the foreground (--mode reindex), printing progress.
+    Uses the same checkpoint as the reindex_semantic_store tool, so an interrupted run resumes.
+    """
+    def progress() -> Optional[Dict[str, Any]]:
+        model = embedding_models.get_backfill_model(workspace_id)
+        return embedding_models.get_backfill_progress(workspace_id, model) if model else None
+
+    indexing_queue.process_pending(workspace_id)
+    embedding_models.reindex(workspace_id, drop_existing=drop_existing, restart=restart)
+    started = last_report = time.monotonic()
+    initial = progress()
+    resumed_from = initial["processed"] if initial else 0
+    while indexing_queue.backfill_step(workspace_id):
+        if time.monotonic() - last_report < 1.0:
+            continue
+        last_report = time.monotonic()
+        current = progress()
+        if current is not None:
+            rate = (current["processed"] - resumed_from) / (last_report - started)
+            print(f"Reindexed {current['processed']}/{current['total']} items ({rate:.0f} items/s)", flush=True)
+    active = embedding_models.get_status(workspace_id)["active"]
+    print(f"Reindex complete: model '{active['model_name']}', collection '{active['collection_name']}', "
+          f"{time.monotonic() - started:.1f}s", flush=True)
+
 def cli_entry_point():
     """Entry point for the 'conport-server' command-line script."""
     log.info("ConPort MCP Server CLI entry point called.")
@@ -1,7 +1,31 @@
 import os
 import sys
 
+import pytest
+
 REPO_ROOT = os.path.dirname(os.path.dirname(__file__))
 SRC_PATH = os.path.join(REPO_ROOT, "src")
 if SRC_PATH not in sys.path:
-    sys.path.insert(0, SRC_PATH)
\ No newline at end of file
+    sys.path.insert(0, SRC_PATH)
+
+from context_portal_mcp.core import indexing_queue  # noqa: E402
+from context_portal_mcp.db import database as db  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def notified(monkeypatch):
+    """
+    Keeps the background indexer out of tests, which drain the queue with process_pending.
+    Records the workspaces that would have been handed to it.
+    """
+    calls = []
+    monkeypatch.setattr(indexing_queue, "notify", calls.append)
+    yield calls
+    indexing_queue.shutdown()
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    workspace_id = str(tmp_path)
+    yield workspace_id
+    db.close_db_connection(workspace_id)
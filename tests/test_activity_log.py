@@ -0,0 +1,66 @@
+from context_portal_mcp.db import database as db
+from context_portal_mcp.db import models
+
+
+def test_summary_reports_latest_state_per_item(workspace):
+    decision = db.log_decision(workspace, models.Decision(summary="Use SQLite"))
+    task = db.log_progress(workspace, models.ProgressEntry(status="TODO", description="Write docs"))
+    db.update_progress_entry(workspace, models.UpdateProgressArgs(workspace_id=workspace, progress_id=task.id, status="DONE"))
+    db.log_system_pattern(workspace, models.SystemPattern(name="p", description="v1"))
+    db.log_system_pattern(workspace, models.SystemPattern(name="p", description="v2"))
+    db.log_custom_data(workspace, models.CustomData(category="c", key="k", value=1))
+    db.log_context_link(workspace, models.ContextLink(
+        source_item_type="decision", source_item_id=str(decision.id),
+        target_item_type="progress_entry", target_item_id=str(task.id), relationship_type="tracks"
+    ))
+
+    summary = db.get_recent_activity_summary_data(workspace)
+
+    assert [d["summary"] for d in summary["recent_decisions"]] == ["Use SQLite"]
+    assert [(p["id"], p["status"]) for p in summary["recent_progress_entries"]] == [(task.id, "DONE")]
+    assert [p["description"] for p in summary["recent_system_patterns"]] == ["v2"]
+    assert [(d["category"], d["key"]) for d in summary["recent_custom_data"]] == [("c", "k")]
+    assert [l["relationship_type"] for l in summary["recent_links_created"]] == ["tracks"]
+    assert summary["recent_deletions"] == []
+
+
+def test_summary_lists_deletions_including_custom_data(workspace):
+    decision = db.log_decision(workspace, models.Decision(summary="Temporary"))
+    db.log_custom_data(workspace, models.CustomData(category="c", key="gone", value="x"))
+    db.log_custom_data(workspace, models.CustomData(category="c", key="kept", value="y"))
+
+    assert db.delete_decision_by_id(workspace, decision.id)
+    assert db.delete_custom_data(workspace, "c", "gone")
+
+    summary = db.get_recent_activity_summary_data(workspace)
+
+    assert summary["recent_decisions"] == []
+    assert [d["key"] for d in summary["recent_custom_data"]] == ["kept"]
+    deletions = {(d["item_type"], d["item_id"]): d for d in summary["recent_deletions"]}
+    assert ("decision", decision.id) in deletions
+    # Same timestamp format as the items in the other lists
+    assert deletions[("decision", decision.id)]["deleted_at"].endswith("Z")
+    assert summary["recent_custom_data"][0]["timestamp"].endswith("Z")
+    custom = [d for d in summary["recent_deletions"] if d["item_type"] == "custom_data"]
+    assert [d["item_key"] for d in custom] == [{"category": "c", "key": "gone"}]
+
+
+def test_limit_per_type_applies_to_distinct_items(workspace):
+    for i in range(4):
+        db.log_decision(workspace, models.Decision(summary=f"d{i}"))
+
+    summary = db.get_recent_activity_summary_data(workspace, limit_per_type=2)
+
+    assert [d["summary"] for d in summary["recent_decisions"]] == ["d3", "d2"]
+
+
+def test_summary_items_match_model_serialization(workspace):
+    db.log_decision(workspace, models.Decision(summary="Tagged", rationale="r", tags=["a", "b"]))
+    db.log_custom_data(workspace, models.CustomData(category="c", key="k", value={"nested": [1, 2]}))
+    db.update_product_context(workspace, models.UpdateContextArgs(workspace_id=workspace, content={"goal": "x"}))
+
+    summary = db.get_recent_activity_summary_data(workspace)
+
+    assert summary["recent_decisions"] == [d.model_dump(mode='json') for d in db.get_decisions(workspace)]
+    assert summary["recent_custom_data"] == [d.model_dump(mode='json') for d in db.get_custom_data(workspace)]
+    assert [u["version"] for u in summary["recent_product_context_updates"]] == [1]
@@ -0,0 +1,64 @@
+from context_portal_mcp.core import indexing_queue
+from context_portal_mcp.core.exceptions import DatabaseError
+from context_portal_mcp.db import database as db
+from context_portal_mcp.db import models
+from context_portal_mcp.handlers import mcp_handlers
+
+
+def _batch(workspace_id, item_type, items):
+    return mcp_handlers.handle_batch_log_items(
+        models.BatchLogItemsArgs(workspace_id=workspace_id, item_type=item_type, items=items)
+    )
+
+
+def test_bulk_insert_assigns_ids_and_reports_invalid_items(workspace):
+    items = [{"summary": f"Decision {i}", "tags": ["bulk"]} for i in range(50)]
+    items.insert(10, {"rationale": "missing summary"})
+
+    result = _batch(workspace, "decision", items)
+
+    assert result["status"] == "partial_success"
+    assert [e["item_index"] for e in result["failed_items"]] == [10]
+    logged = result["successful_items"]
+    assert len(logged) == 50
+    stored = {d.id: d.summary for d in db.get_decisions(workspace)}
+    assert all(stored[item["id"]] == item["summary"] for item in logged)
+    assert indexing_queue.get_status(workspace)["pending"] == 50
+
+
+def test_bulk_progress_entries_create_requested_links(workspace):
+    result = _batch(workspace, "progress_entry", [
+        {"status": "TODO", "description": "Linked", "linked_item_type": "decision", "linked_item_id": "7"},
+        {"status": "DONE", "description": "Unlinked"},
+    ])
+
+    linked_id = str(result["successful_items"][0]["id"])
+    links = db.get_context_links(workspace, "progress_entry", linked_id)
+    assert [(l.target_item_type, l.target_item_id) for l in links] == [("decision", "7")]
+
+
+def test_bulk_replace_returns_current_ids(workspace):
+    db.log_custom_data(workspace, models.CustomData(category="c", key="a", value=1))
+
+    result = _batch(workspace, "custom_data", [
+        {"category": "c", "key": "a", "value": {"v": 2}},
+        {"category": "c", "key": "b", "value": "new"},
+    ])
+
+    current = {d.key: (d.id, d.value) for d in db.get_custom_data(workspace, "c")}
+    assert [(i["key"], i["id"]) for i in result["successful_items"]] == [("a", current["a"][0]), ("b", current["b"][0])]
+    assert current["a"][1] == {"v": 2}
+
+
+def test_failed_bulk_insert_falls_back_to_per_item_logging(workspace, monkeypatch):
+    def failing_bulk(workspace_id, decisions):
+        raise DatabaseError("simulated")
+
+    monkeypatch.setitem(mcp_handlers._BULK_ITEM_LOGGERS, "decision", (
+        mcp_handlers._BULK_ITEM_LOGGERS["decision"][0], failing_bulk
+    ))
+
+    result = _batch(workspace, "decision", [{"summary": "one"}, {"summary": "two"}])
+
+    assert result["status"] == "success"
+    assert sorted(d.summary for d in db.get_decisions(workspace)) == ["one", "two"]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from context_portal_mcp.core import embedding_service
+from context_portal_mcp.db import vector_store_service
+
+
+class _FakeModel:
+    def encode(self, texts, batch_size=32, convert_to_tensor=False):
+        return np.array([[float(len(t)), 1.0] for t in texts])
+
+
+@pytest.fixture
+def shared_model(monkeypatch):
+    created = []
+
+    def create_model(model_name):
+        created.append(model_name)
+        return _FakeModel()
+
+    monkeypatch.setattr(embedding_service, "_models", {})
+    monkeypatch.setattr(embedding_service, "_model_status", {})
+    monkeypatch.setattr(embedding_service, "_create_model", create_model)
+    monkeypatch.setattr(vector_store_service, "_chroma_clients", {})
+    monkeypatch.setattr(vector_store_service, "_chroma_collections", {})
+    return created
+
+
+def test_collections_share_the_embedding_service_model(tmp_path, shared_model):
+    for name in ("one", "two", "three"):
+        (tmp_path / name).mkdir()
+        workspace_id = str(tmp_path / name)
+        collection = vector_store_service.get_or_create_collection(workspace_id)
+        collection.add(ids=["doc"], documents=[f"text for {workspace_id}"])
+
+    assert shared_model == [embedding_service.DEFAULT_MODEL_NAME]
+    assert embedding_service.get_embedding("abc") == [3.0, 1.0]
+
+
+def test_collection_config_matches_chroma_sentence_transformer(tmp_path, shared_model):
+    collection = vector_store_service.get_or_create_collection(str(tmp_path))
+
+    config = collection.configuration_json
+    assert config["embedding_function"]["name"] == "sentence_transformer"
+    assert config["embedding_function"]["config"]["model_name"] == embedding_service.DEFAULT_MODEL_NAME
+    assert config["hnsw"]["space"] == "cosine"
+    assert shared_model == [] # Opening a collection does not load the model
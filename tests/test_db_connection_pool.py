@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from context_portal_mcp.core import config
+from context_portal_mcp.db import database as db
+from context_portal_mcp.db import models
+
+
+def test_connections_use_wal_and_tuned_pragmas(workspace):
+    writer = db.get_db_connection(workspace)
+    assert writer.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert writer.execute("PRAGMA busy_timeout").fetchone()[0] == db.SQLITE_BUSY_TIMEOUT_MS
+
+    with db._read_connection(workspace) as reader:
+        assert reader is not writer
+        assert reader.execute("PRAGMA query_only").fetchone()[0] == 1
+        assert reader.execute("PRAGMA cache_size").fetchone()[0] == -db.SQLITE_CACHE_SIZE_KIB
+
+
+def test_concurrent_reads_use_separate_connections(workspace):
+    db.log_decision(workspace, models.Decision(summary="pooled read"))
+    pool_size = db._get_pool(workspace).reader_pool_size
+    barrier = threading.Barrier(pool_size)
+    seen = set()
+    errors = []
+
+    def reader():
+        try:
+            with db._read_connection(workspace) as conn:
+                seen.add(id(conn))
+                # Hold the connection until every reader has one checked out.
+                barrier.wait(timeout=5)
+                assert conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0] == 1
+        except Exception as e:  # pragma: no cover - surfaced via the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=reader) for _ in range(pool_size)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert len(seen) == pool_size
+
+
+def test_reads_see_writes_committed_through_writer(workspace):
+    with db._read_connection(workspace):
+        pass  # Warm a reader before the write to make sure it is not holding a stale snapshot
+    db.log_decision(workspace, models.Decision(summary="visible to readers", tags=["pool"]))
+    decisions = db.get_decisions(workspace)
+    assert [d.summary for d in decisions] == ["visible to readers"]
+
+
+def test_zero_reader_pool_size_routes_reads_through_writer(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "_db_reader_pool_size", 0)
+    workspace_id = str(tmp_path)
+    try:
+        writer = db.get_db_connection(workspace_id)
+        with db._read_connection(workspace_id) as conn:
+            assert conn is writer
+    finally:
+        db.close_db_connection(workspace_id)
+
+
+def test_negative_reader_pool_size_rejected():
+    with pytest.raises(ValueError):
+        config.set_db_reader_pool_size(-1)
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from context_portal_mcp.core import config, dispatch
+
+
+@pytest.fixture(autouse=True)
+def fresh_executors():
+    dispatch.shutdown()
+    yield
+    dispatch.shutdown()
+
+
+async def test_blocking_write_does_not_stall_event_loop():
+    release = threading.Event()
+
+    def slow_write():
+        release.wait(timeout=5)
+        return "written"
+
+    write_task = asyncio.create_task(dispatch.run_write(slow_write))
+
+    # The loop keeps servicing other coroutines while the write blocks its worker thread.
+    started = time.monotonic()
+    await asyncio.sleep(0.05)
+    assert time.monotonic() - started < 1
+    assert await dispatch.run_read(lambda: "read") == "read"
+    assert not write_task.done()
+
+    release.set()
+    assert await write_task == "written"
+
+
+async def test_inference_concurrency_is_bounded(monkeypatch):
+    monkeypatch.setattr(config, "_inference_workers", 2)
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_inference():
+        nonlocal active, peak
+        with dispatch.inference_slot():
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+    # Model calls made from read/write workers share the same limit as the inference pool.
+    await asyncio.gather(
+        *[dispatch.run_inference(fake_inference) for _ in range(3)],
+        *[dispatch.run_write(fake_inference) for _ in range(2)],
+        *[dispatch.run_read(fake_inference) for _ in range(3)],
+    )
+    assert peak == 2
+
+
+def test_worker_limits_must_be_positive():
+    with pytest.raises(ValueError):
+        config.set_worker_limits(read_workers=1, write_workers=0, inference_workers=1)
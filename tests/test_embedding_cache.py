@@ -0,0 +1,75 @@
+import pytest
+
+from context_portal_mcp.core import config, embedding_cache, embedding_service
+
+
+@pytest.fixture
+def encoded(monkeypatch):
+    """Records every text that reaches the model."""
+    calls = []
+
+    def fake_get_embeddings(texts, *args, **kwargs):
+        calls.append(list(texts))
+        return [[float(len(t)), 0.5] for t in texts]
+
+    monkeypatch.setattr(embedding_service, "get_embeddings", fake_get_embeddings)
+    return calls
+
+
+def test_unchanged_text_skips_inference(workspace, encoded):
+    first = embedding_cache.get_embeddings(workspace, ["Category: c\nKey: k\nValue: v", "other"])
+    # Whitespace-only differences normalize to the same cache key.
+    second = embedding_cache.get_embeddings(workspace, ["Category: c Key: k  Value: v", "other", "new"])
+
+    assert encoded == [["Category: c\nKey: k\nValue: v", "other"], ["new"]]
+    assert second[:2] == first
+    stats = embedding_cache.get_stats(workspace)
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 3, 3)
+
+
+def test_cache_persists_across_reopen(workspace, encoded):
+    embedding_cache.get_embeddings(workspace, ["persisted"])
+    embedding_cache.close_all()
+
+    assert embedding_cache.get_embeddings(workspace, ["persisted"]) == [[9.0, 0.5]]
+    assert len(encoded) == 1
+
+
+def test_least_recently_used_entries_are_evicted(workspace, encoded, monkeypatch):
+    monkeypatch.setattr(config, "_embedding_cache_size", 2)
+    embedding_cache.get_embeddings(workspace, ["a"])
+    embedding_cache.get_embeddings(workspace, ["bb"])
+    embedding_cache.get_embeddings(workspace, ["a"]) # refresh "a"
+    embedding_cache.get_embeddings(workspace, ["ccc"]) # evicts "bb"
+    encoded.clear()
+
+    embedding_cache.get_embeddings(workspace, ["a", "ccc", "bb"])
+
+    assert encoded == [["bb"]]
+    assert embedding_cache.get_stats(workspace)["evictions"] >= 1
+
+
+def test_lookups_defer_recency_updates_to_the_next_write(workspace, encoded, monkeypatch):
+    monkeypatch.setattr(config, "_embedding_cache_size", 2)
+    embedding_cache.get_embeddings(workspace, ["a", "bb"])
+    cache = embedding_cache.get_cache(workspace)
+    changes = cache._conn.total_changes
+
+    embedding_cache.get_embeddings(workspace, ["a"])
+    assert cache._conn.total_changes == changes
+    embedding_cache.close_all() # Keeps the pending refresh of "a"
+    embedding_cache.get_embeddings(workspace, ["ccc"]) # evicts "bb"
+    encoded.clear()
+
+    embedding_cache.get_embeddings(workspace, ["a", "ccc", "bb"])
+    assert encoded == [["bb"]]
+    assert embedding_cache.get_stats(workspace)["entries"] == 2
+
+
+def test_zero_size_disables_cache(workspace, encoded, monkeypatch):
+    monkeypatch.setattr(config, "_embedding_cache_size", 0)
+    embedding_cache.get_embeddings(workspace, ["x"])
+    embedding_cache.get_embeddings(workspace, ["x"])
+
+    assert encoded == [["x"], ["x"]]
+    assert embedding_cache.get_stats(workspace) is None
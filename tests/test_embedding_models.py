@@ -0,0 +1,118 @@
+import pytest
+
+from context_portal_mcp.core import config, embedding_models, embedding_service, indexing_queue
+from context_portal_mcp.db import database as db
+from context_portal_mcp.db import models, vector_store_service
+
+
+@pytest.fixture
+def fake_collections(monkeypatch):
+    """In-memory collections keyed by name; each fake model embeds into its own dimension."""
+    collections = {}
+    dimensions = {config.DEFAULT_EMBEDDING_MODEL: 2, "bigger-model": 3}
+
+    def get_embeddings(texts, model_name=None, **kwargs):
+        return [[float(len(t))] * dimensions[model_name] for t in texts]
+
+    def upsert(workspace_id, items, collection_name=None, model_name=None):
+        collection = collections.setdefault(collection_name, {})
+        for item_type, item_id, vector, metadata in items:
+            collection[(item_type, item_id)] = vector
+
+    def delete(workspace_id, items, collection_name=None, model_name=None):
+        for item in items:
+            collections.get(collection_name, {}).pop(item, None)
+
+    monkeypatch.setattr(embedding_service, "get_embeddings", get_embeddings)
+    monkeypatch.setattr(vector_store_service, "upsert_item_embeddings", upsert)
+    monkeypatch.setattr(vector_store_service, "delete_item_embeddings", delete)
+    monkeypatch.setattr(vector_store_service, "delete_collection", lambda ws, name: collections.pop(name, None))
+    return collections
+
+
+def test_default_model_is_recorded_on_first_indexing(workspace, fake_collections):
+    assert embedding_models.get_status(workspace)["active"]["dimension"] is None
+
+    db.log_decision(workspace, models.Decision(summary="Use WAL"))
+    indexing_queue.process_pending(workspace)
+
+    active = embedding_models.get_status(workspace)["active"]
+    assert active == {
+        "model_name": config.DEFAULT_EMBEDDING_MODEL,
+        "collection_name": vector_store_service.DEFAULT_COLLECTION_NAME,
+        "dimension": 2,
+        "backfill": None,
+    }
+    assert db.get_embedding_models(workspace)[0]["status"] == "active"
+
+
+def test_migration_backfills_dual_writes_and_switches(workspace, fake_collections):
+    decisions = [db.log_decision(workspace, models.Decision(summary=f"Decision {i}")) for i in range(3)]
+    db.log_progress(workspace, models.ProgressEntry(status="TODO", description="Ship it"))
+    indexing_queue.process_pending(workspace)
+    old_collection = vector_store_service.DEFAULT_COLLECTION_NAME
+    new_collection = vector_store_service.collection_name_for("bigger-model")
+    assert new_collection != old_collection
+
+    status = embedding_models.migrate(workspace, "bigger-model")
+    assert status["building"]["collection_name"] == new_collection
+    with pytest.raises(ValueError):
+        embedding_models.migrate(workspace, config.DEFAULT_EMBEDDING_MODEL)
+
+    assert indexing_queue.backfill_step(workspace, batch_size=2)
+    # Changes made during the backfill go to both collections
+    late = db.log_decision(workspace, models.Decision(summary="Logged mid-migration"))
+    indexing_queue.process_pending(workspace)
+    assert ("decision", str(late.id)) in fake_collections[old_collection]
+    assert len(fake_collections[new_collection][("decision", str(late.id))]) == 3
+
+    while indexing_queue.backfill_step(workspace, batch_size=2):
+        pass
+
+    status = embedding_models.get_status(workspace)
+    assert status == {
+        "active": {"model_name": "bigger-model", "collection_name": new_collection, "dimension": 3, "backfill": None},
+        "building": None,
+    }
+    assert old_collection not in fake_collections
+    assert {("decision", str(d.id)) for d in decisions} <= set(fake_collections[new_collection])
+    assert len(fake_collections[new_collection]) == 5
+
+
+def test_collection_names_are_distinct_per_model():
+    names = [vector_store_service.collection_name_for(name) for name in ("Org/Model", "org-model", "org_model")]
+
+    assert len(set(names)) == 3
+    assert all(name.startswith(vector_store_service.DEFAULT_COLLECTION_NAME + "__org") for name in names)
+    assert vector_store_service.collection_name_for(config.DEFAULT_EMBEDDING_MODEL) == vector_store_service.DEFAULT_COLLECTION_NAME
+
+
+def test_collection_rejects_vectors_of_another_dimension():
+    class _Collection:
+        name = "conport_semantic_store"
+        metadata = {"embedding_dimension": 384}
+
+    with pytest.raises(ValueError, match="384"):
+        vector_store_service._check_dimension(_Collection(), [[0.1, 0.2]])
+
+
+def test_reindex_rebuilds_a_lost_collection_and_resumes(workspace, fake_collections):
+    decisions = [db.log_decision(workspace, models.Decision(summary=f"Decision {i}")) for i in range(5)]
+    db.log_custom_data(workspace, models.CustomData(category="Glossary", key="WAL", value="Write-ahead log"))
+    indexing_queue.process_pending(workspace)
+    collection = vector_store_service.DEFAULT_COLLECTION_NAME
+    fake_collections.pop(collection) # Vector store deleted
+
+    embedding_models.reindex(workspace)
+    assert indexing_queue.backfill_step(workspace, batch_size=2)
+    backfill = embedding_models.get_status(workspace)["active"]["backfill"]
+    assert backfill == {"item_type": "decision", "after_id": decisions[1].id, "processed": 2, "total": 6}
+
+    # Reindexing again resumes from the checkpoint instead of starting over
+    embedding_models.reindex(workspace)
+    assert embedding_models.get_status(workspace)["active"]["backfill"]["processed"] == 2
+
+    while indexing_queue.backfill_step(workspace, batch_size=2):
+        pass
+    assert len(fake_collections[collection]) == 6
+    assert embedding_models.get_status(workspace)["active"]["backfill"] is None
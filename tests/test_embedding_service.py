@@ -0,0 +1,117 @@
+import os
+import sys
+import threading
+import types
+
+import numpy as np
+import pytest
+
+from context_portal_mcp.core import config, embedding_service
+
+
+class _RecordingModel:
+    """Stands in for SentenceTransformer: embeds each text as [len(text)] and records batches."""
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, batch_size=32, convert_to_tensor=False):
+        self.batches.append(list(texts))
+        return np.array([[float(len(t))] for t in texts])
+
+
+@pytest.fixture
+def model(monkeypatch):
+    recording_model = _RecordingModel()
+    monkeypatch.setattr(embedding_service, "_load_model", lambda model_name=None: recording_model)
+    return recording_model
+
+
+def test_get_embeddings_buckets_by_length_and_preserves_order(model):
+    texts = ["a" * 9, "a", "a" * 5, "a" * 3, "a" * 7]
+
+    vectors = embedding_service.get_embeddings(texts, batch_size=2)
+
+    assert vectors == [[9.0], [1.0], [5.0], [3.0], [7.0]]
+    assert [[len(t) for t in batch] for batch in model.batches] == [[1, 3], [5, 7], [9]]
+
+
+def test_get_embedding_is_a_single_item_batch(model):
+    assert embedding_service.get_embedding("abcd") == [4.0]
+    assert embedding_service.get_embeddings([]) == []
+    assert model.batches == [["abcd"]]
+
+
+def test_backend_selects_sentence_transformer_options(monkeypatch):
+    created = []
+    fake_module = types.SimpleNamespace(SentenceTransformer=lambda name, **kwargs: created.append((name, kwargs)))
+    monkeypatch.setitem(sys.modules, "sentence_transformers", fake_module)
+    monkeypatch.setattr(config, "_embedding_backend", "onnx")
+
+    embedding_service._create_model("m")
+
+    assert created == [("m", {"backend": "onnx"})]
+    assert embedding_service.get_model_key("m") == "m@onnx"
+    with pytest.raises(ValueError):
+        config.set_embedding_backend("tensorrt")
+
+
+def test_onnx_int8_quantizes_the_model_for_the_host_cpu_once(monkeypatch, tmp_path):
+    created, exports = [], []
+
+    class FakeSentenceTransformer:
+        def __init__(self, name, **kwargs):
+            created.append((name, kwargs))
+
+        def save(self, path):
+            os.makedirs(path)
+
+    def export(model, quantization_config, path, file_suffix=None):
+        exports.append((quantization_config, file_suffix))
+        os.makedirs(os.path.join(path, "onnx"))
+        open(os.path.join(path, "onnx", f"model_{file_suffix}.onnx"), "w").close()
+
+    fake_module = types.SimpleNamespace(
+        SentenceTransformer=FakeSentenceTransformer, export_dynamic_quantized_onnx_model=export
+    )
+    monkeypatch.setitem(sys.modules, "sentence_transformers", fake_module)
+    monkeypatch.setattr(config, "_embedding_backend", "onnx-int8")
+    monkeypatch.setattr(embedding_service, "QUANTIZED_MODELS_DIR", tmp_path)
+    monkeypatch.setattr(embedding_service, "_quantization_config", lambda: "avx512_vnni")
+
+    embedding_service._create_model("org/m")
+    embedding_service._create_model("org/m")
+
+    model_dir = str(tmp_path / "avx512_vnni" / "org--m")
+    quantized = {"backend": "onnx", "model_kwargs": {"file_name": "onnx/model_int8_avx512_vnni.onnx"}}
+    assert created == [("org/m", {"backend": "onnx"}), (model_dir, quantized), (model_dir, quantized)]
+    assert exports == [("avx512_vnni", "int8_avx512_vnni")]
+    assert os.listdir(tmp_path / "avx512_vnni") == ["org--m"]
+    # Quantized vectors are cached apart from the PyTorch ones, per quantization config
+    assert embedding_service.get_model_key("org/m") == "org/m@onnx-int8-avx512_vnni"
+
+
+def test_a_slow_model_load_does_not_block_other_models(monkeypatch):
+    monkeypatch.setattr(embedding_service, "_models", {})
+    monkeypatch.setattr(embedding_service, "_model_status", {})
+    monkeypatch.setattr(embedding_service, "_model_locks", {})
+    loading, release = threading.Event(), threading.Event()
+
+    def create_model(model_name):
+        if model_name == "slow":
+            loading.set()
+            assert release.wait(timeout=5)
+        return _RecordingModel()
+
+    monkeypatch.setattr(embedding_service, "_create_model", create_model)
+    slow = threading.Thread(target=embedding_service._load_model, args=("slow",))
+    slow.start()
+    assert loading.wait(timeout=5)
+
+    try:
+        assert isinstance(embedding_service._load_model("fast"), _RecordingModel)
+        assert embedding_service.get_model_status("slow")["state"] == "loading"
+    finally:
+        release.set()
+        slow.join(timeout=5)
+    assert embedding_service.get_model_status("slow")["state"] == "ready"
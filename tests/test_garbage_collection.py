@@ -0,0 +1,118 @@
+import sqlite3
+
+import pytest
+
+from context_portal_mcp.core.config import get_database_path
+from context_portal_mcp.db import database as db
+from context_portal_mcp.db import models, vector_store_service
+from context_portal_mcp.handlers import mcp_handlers
+
+
+@pytest.fixture
+def vectors(monkeypatch):
+    """An in-memory vector collection of (item_type, item_id) keys."""
+    keys = set()
+    monkeypatch.setattr(vector_store_service, "get_item_keys", lambda *args, **kwargs: list(keys))
+    monkeypatch.setattr(
+        vector_store_service, "delete_item_embeddings", lambda workspace_id, items, **kwargs: keys.difference_update(items)
+    )
+    return keys
+
+
+def _link(source_type, source_id, target_type, target_id):
+    return models.ContextLink(
+        source_item_type=source_type, source_item_id=str(source_id),
+        target_item_type=target_type, target_item_id=str(target_id), relationship_type="relates_to",
+    )
+
+
+def _link_count(workspace):
+    with sqlite3.connect(get_database_path(workspace)) as conn:
+        return conn.execute("SELECT COUNT(*) FROM context_links").fetchone()[0]
+
+
+def test_deleting_an_item_deletes_its_links(workspace):
+    decision = db.log_decision(workspace, models.Decision(summary="Use WAL"))
+    progress = db.log_progress(workspace, models.ProgressEntry(status="TODO", description="Enable WAL"))
+    db.log_context_links(workspace, [
+        _link("decision", decision.id, "progress_entry", progress.id),
+        _link("progress_entry", progress.id, "decision", decision.id),
+        _link("progress_entry", progress.id, "progress_entry", progress.id),
+    ])
+
+    db.delete_decision_by_id(workspace, decision.id)
+
+    assert [l.target_item_id for l in db.get_context_links(workspace, "progress_entry", str(progress.id))] == [str(progress.id)]
+
+
+def test_replacing_custom_data_keeps_its_links(workspace):
+    decision = db.log_decision(workspace, models.Decision(summary="Use WAL"))
+    entry = db.log_custom_data(workspace, models.CustomData(category="Glossary", key="WAL", value="Write-ahead log"))
+    db.log_context_links(workspace, [_link("decision", decision.id, "custom_data", entry.id)])
+
+    replaced = db.log_custom_data(workspace, models.CustomData(category="Glossary", key="WAL", value="Write-ahead logging"))
+
+    assert replaced.id != entry.id
+    links = db.get_context_links(workspace, "decision", str(decision.id))
+    assert [(l.target_item_type, l.target_item_id) for l in links] == [("custom_data", str(replaced.id))]
+    # The old row is queued so its vector is removed
+    queued = {(e["item_type"], e["item_id"]) for e in db.fetch_embedding_queue_batch(workspace, 100, 5)}
+    assert ("custom_data", entry.id) in queued
+    assert db.delete_orphaned_rows(workspace, dry_run=True) == {"context_links": 0, "item_tags": 0, "custom_data_fts": 0}
+
+
+def test_collect_garbage_reclaims_orphans(workspace, vectors):
+    decision = db.log_decision(workspace, models.Decision(summary="Use WAL", tags=["db"]))
+    kept = db.log_decision(workspace, models.Decision(summary="Cache embeddings"))
+    db.log_context_links(workspace, [
+        _link("decision", decision.id, "decision", 999), # Endpoint deleted before links cascaded
+        _link("decision", decision.id, "system_pattern", "Repository pattern"), # Named by key: kept
+        _link("decision", decision.id, "decision", kept.id),
+    ])
+    vectors.update({("decision", str(decision.id)), ("decision", "999"), ("custom_data", "5")})
+    with sqlite3.connect(get_database_path(workspace)) as conn:
+        conn.execute("DELETE FROM embedding_queue") # Indexed already
+
+    args = models.CollectGarbageArgs(workspace_id=workspace, dry_run=True)
+    report = mcp_handlers.handle_collect_garbage(args)
+    assert report["database"] == {"context_links": 1, "item_tags": 0, "custom_data_fts": 0}
+    assert report["vector_store"] == {"orphaned_vectors": 2, "missing_vectors": 1}
+    assert _link_count(workspace) == 3 and len(vectors) == 3
+
+    report = mcp_handlers.handle_collect_garbage(models.CollectGarbageArgs(workspace_id=workspace))
+    assert report["status"] == "success"
+    assert report["database"]["context_links"] == 1
+    assert _link_count(workspace) == 2
+    assert vectors == {("decision", str(decision.id))}
+    queued = db.fetch_embedding_queue_batch(workspace, 100, 5)
+    assert [(e["item_type"], e["item_id"]) for e in queued] == [("decision", kept.id)]
+
+
+def test_collect_garbage_skips_items_without_embeddable_text(workspace, vectors):
+    counter = db.log_custom_data(workspace, models.CustomData(category="Stats", key="builds", value=42))
+    text = db.log_custom_data(workspace, models.CustomData(category="Glossary", key="WAL", value="Write-ahead log"))
+    vectors.add(("custom_data", str(text.id)))
+    with sqlite3.connect(get_database_path(workspace)) as conn:
+        conn.execute("DELETE FROM embedding_queue") # Indexed already; the counter has no vector by design
+
+    for _ in range(2): # Converges: nothing is queued, so nothing is reported again
+        report = mcp_handlers.handle_collect_garbage(models.CollectGarbageArgs(workspace_id=workspace))
+        assert report["vector_store"] == {"orphaned_vectors": 0, "missing_vectors": 0}
+    assert ("custom_data", counter.id) not in {
+        (e["item_type"], e["item_id"]) for e in db.fetch_embedding_queue_batch(workspace, 100, 5)
+    }
+
+
+def test_collect_garbage_rearms_items_whose_embedding_failed(workspace, vectors):
+    decision = db.log_decision(workspace, models.Decision(summary="Use WAL"))
+    queue_ids = [e["id"] for e in db.fetch_embedding_queue_batch(workspace, 100, 5)]
+    for _ in range(5):
+        db.record_embedding_queue_failure(workspace, queue_ids, "RuntimeError: model unavailable")
+    assert db.fetch_embedding_queue_batch(workspace, 100, 5) == []
+
+    report = mcp_handlers.handle_collect_garbage(models.CollectGarbageArgs(workspace_id=workspace))
+
+    assert report["vector_store"]["missing_vectors"] == 1
+    queued = db.fetch_embedding_queue_batch(workspace, 100, 5)
+    assert [(e["item_type"], e["item_id"], e["attempts"]) for e in queued] == [("decision", decision.id, 0)]
+    assert db.get_embedding_queue_stats(workspace, 5)["failed"] == 0
@@ -0,0 +1,21 @@
+import pytest
+
+from context_portal_mcp.db import database as db
+
+
+@pytest.mark.parametrize("sql, params", [
+    ("SELECT * FROM decisions WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT 5", ("2026",)),
+    ("SELECT * FROM progress_entries WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT 5", ("2026",)),
+    ("SELECT * FROM product_context_history WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT 5", ("2026",)),
+    ("SELECT * FROM active_context_history WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT 5", ("2026",)),
+    ("SELECT * FROM context_links WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT 5", ("2026",)),
+    ("SELECT * FROM system_patterns WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT 5", ("2026",)),
+    ("SELECT * FROM progress_entries WHERE status = ? ORDER BY timestamp DESC, id DESC LIMIT 5", ("DONE",)),
+    ("SELECT * FROM progress_entries WHERE parent_id = ? ORDER BY timestamp DESC, id DESC LIMIT 5", (1,)),
+])
+def test_recent_and_filtered_queries_avoid_scans_and_sorts(workspace, sql, params):
+    conn = db.get_db_connection(workspace)
+    plan = " ".join(row["detail"] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+    assert "USING INDEX" in plan or "USING COVERING INDEX" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
@@ -0,0 +1,133 @@
+import pytest
+
+from context_portal_mcp.core import embedding_service, indexing_queue
+from context_portal_mcp.db import database as db
+from context_portal_mcp.db import models, vector_store_service
+from context_portal_mcp.handlers import mcp_handlers
+
+real_get_embeddings = embedding_service.get_embeddings
+
+
+@pytest.fixture
+def fake_vector_store(monkeypatch):
+    """Replaces the model and Chroma with in-memory fakes and records what they were asked to do."""
+    store = {"upserted": {}, "deleted": []}
+    monkeypatch.setattr(
+        embedding_service, "get_embeddings", lambda texts, *a, **k: [[float(len(t)), 1.0] for t in texts]
+    )
+
+    def upsert(workspace_id, items, **kwargs):
+        for item_type, item_id, vector, metadata in items:
+            store["upserted"][(item_type, item_id)] = (vector, metadata)
+
+    def delete(workspace_id, items, **kwargs):
+        store["deleted"].extend(items)
+
+    monkeypatch.setattr(vector_store_service, "upsert_item_embeddings", upsert)
+    monkeypatch.setattr(vector_store_service, "delete_item_embeddings", delete)
+    return store
+
+
+def test_writes_are_queued_and_drained_in_batches(workspace, fake_vector_store):
+    decision = db.log_decision(workspace, models.Decision(summary="Use WAL", tags=["db"]))
+    progress = db.log_progress(workspace, models.ProgressEntry(status="TODO", description="Ship it"))
+    db.log_custom_data(workspace, models.CustomData(category="Glossary", key="WAL", value="Write-ahead log"))
+
+    status = indexing_queue.get_status(workspace)
+    assert status["pending"] == 3
+    assert status["lag_seconds"] >= 0
+
+    result = indexing_queue.process_pending(workspace, batch_size=2)
+    assert result == {"embedded": 3, "removed": 0, "failed": 0}
+    assert ("decision", str(decision.id)) in fake_vector_store["upserted"]
+    assert fake_vector_store["upserted"][("progress_entry", str(progress.id))][1]["status"] == "TODO"
+    assert indexing_queue.get_status(workspace)["pending"] == 0
+
+
+def test_deleted_items_have_their_vectors_removed(workspace, fake_vector_store, notified):
+    pattern = db.log_system_pattern(workspace, models.SystemPattern(name="Queue", description="Outbox"))
+    indexing_queue.process_pending(workspace)
+
+    args = models.DeleteSystemPatternByIdArgs(workspace_id=workspace, pattern_id=pattern.id)
+    assert mcp_handlers.handle_delete_system_pattern_by_id(args)["status"] == "success"
+    assert notified == [workspace]
+    assert fake_vector_store["deleted"] == [] # Left to the indexing worker
+    result = indexing_queue.process_pending(workspace)
+
+    assert result["removed"] == 1
+    assert fake_vector_store["deleted"] == [("system_pattern", str(pattern.id))]
+
+
+def test_failed_batches_stay_queued_until_attempts_run_out(workspace, monkeypatch, fake_vector_store):
+    def broken_embeddings(texts, *args, **kwargs):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(embedding_service, "get_embeddings", broken_embeddings)
+    db.log_decision(workspace, models.Decision(summary="Not yet indexed"))
+
+    for _ in range(indexing_queue.MAX_ATTEMPTS):
+        assert indexing_queue.process_pending(workspace)["failed"] == 1
+
+    status = indexing_queue.get_status(workspace)
+    assert status["pending"] == 0
+    assert status["failed"] == 1
+    assert "model unavailable" in status["last_error"]
+    assert indexing_queue.process_pending(workspace)["failed"] == 0
+
+    # Re-armed once the cause is fixed
+    monkeypatch.setattr(embedding_service, "get_embeddings", lambda texts, *a, **k: [[1.0, 1.0] for t in texts])
+    assert indexing_queue.retry_failed(workspace) == 1
+    assert indexing_queue.process_pending(workspace)["embedded"] == 1
+    assert indexing_queue.get_status(workspace)["failed"] == 0
+
+
+def test_progress_updates_are_reembedded_only_when_changed(workspace, fake_vector_store):
+    entry = db.log_progress(workspace, models.ProgressEntry(status="TODO", description="Ship it"))
+    indexing_queue.process_pending(workspace)
+
+    db.update_progress_entry(workspace, models.UpdateProgressArgs(workspace_id=workspace, progress_id=entry.id, status="TODO"))
+    assert indexing_queue.get_status(workspace)["pending"] == 0
+
+    db.update_progress_entry(workspace, models.UpdateProgressArgs(workspace_id=workspace, progress_id=entry.id, status="DONE"))
+    assert indexing_queue.process_pending(workspace)["embedded"] == 1
+    assert fake_vector_store["upserted"][("progress_entry", str(entry.id))][1]["status"] == "DONE"
+    assert db.get_progress_entry_by_id(workspace, entry.id).status == "DONE"
+    assert db.get_progress_entry_by_id(workspace, entry.id + 1) is None
+
+
+def test_a_failing_item_does_not_hold_up_the_rest_of_its_batch(workspace, monkeypatch, fake_vector_store):
+    def embeddings(texts, *args, **kwargs):
+        if any("poison" in text for text in texts):
+            raise ValueError("cannot embed")
+        return [[float(len(t)), 1.0] for t in texts]
+
+    monkeypatch.setattr(embedding_service, "get_embeddings", embeddings)
+    decisions = db.log_decisions(workspace, [models.Decision(summary=f"Decision {i}") for i in range(6)])
+    poisoned = db.log_decision(workspace, models.Decision(summary="poison"))
+    later = db.log_decision(workspace, models.Decision(summary="Logged after it"))
+
+    result = indexing_queue.process_pending(workspace, batch_size=4)
+
+    assert result == {"embedded": 7, "removed": 0, "failed": 1}
+    assert {("decision", str(d.id)) for d in [*decisions, later]} == set(fake_vector_store["upserted"])
+    status = indexing_queue.get_status(workspace)
+    assert (status["pending"], status["retrying"]) == (1, 1)
+    assert ("decision", str(poisoned.id)) not in fake_vector_store["upserted"]
+
+
+def test_attempts_are_not_counted_while_the_model_cannot_load(workspace, monkeypatch, fake_vector_store):
+    def unloadable(model_name):
+        raise OSError("offline")
+
+    monkeypatch.setattr(embedding_service, "get_embeddings", real_get_embeddings)
+    monkeypatch.setattr(embedding_service, "_models", {})
+    monkeypatch.setattr(embedding_service, "_model_status", {})
+    monkeypatch.setattr(embedding_service, "_create_model", unloadable)
+    db.log_decisions(workspace, [models.Decision(summary=f"Decision {i}") for i in range(3)])
+
+    for _ in range(indexing_queue.MAX_ATTEMPTS + 1):
+        assert indexing_queue.process_pending(workspace)["failed"] == 3
+
+    status = indexing_queue.get_status(workspace)
+    assert (status["pending"], status["retrying"], status["failed"]) == (3, 0, 0)
+    assert "offline" in status["last_error"]
@@ -0,0 +1,79 @@
+import pytest
+
+from context_portal_mcp.db import database as db
+from context_portal_mcp.db import models
+from context_portal_mcp.handlers import mcp_handlers
+
+
+def _link(source, target, relationship_type="relates_to"):
+    return {
+        "source_item_type": "decision", "source_item_id": source,
+        "target_item_type": "decision", "target_item_id": target,
+        "relationship_type": relationship_type,
+    }
+
+
+@pytest.fixture
+def chain(workspace):
+    """Decisions 1 -> 2 -> 3 -> 4, plus 5 -> 1 ('blocks')."""
+    decisions = [db.log_decision(workspace, models.Decision(summary=f"Decision {i}")) for i in range(1, 6)]
+    ids = [d.id for d in decisions]
+    result = mcp_handlers.handle_batch_link_items(models.BatchLinkItemsArgs(
+        workspace_id=workspace,
+        links=[_link(ids[0], ids[1]), _link(ids[1], ids[2]), _link(ids[2], ids[3]), _link(ids[4], ids[0], "blocks")],
+    ))
+    assert result["status"] == "success"
+    return ids
+
+
+def _traverse(workspace, item_id, **kwargs):
+    args = models.TraverseLinksArgs(workspace_id=workspace, item_type="decision", item_id=str(item_id), **kwargs)
+    return mcp_handlers.handle_traverse_links(args)
+
+
+def _depths(result):
+    return {int(node["item_id"]): node["depth"] for node in result["nodes"]}
+
+
+def test_traversal_follows_links_up_to_max_depth(workspace, chain):
+    result = _traverse(workspace, chain[0])
+
+    assert _depths(result) == {chain[0]: 0, chain[1]: 1, chain[4]: 1, chain[2]: 2}
+    assert len(result["links"]) == 3
+    assert result["truncated"] is False
+
+    assert _depths(_traverse(workspace, chain[0], max_depth=5)) == {
+        chain[0]: 0, chain[1]: 1, chain[4]: 1, chain[2]: 2, chain[3]: 3,
+    }
+
+
+def test_traversal_direction_and_relationship_filters(workspace, chain):
+    assert _depths(_traverse(workspace, chain[1], direction="incoming")) == {chain[1]: 0, chain[0]: 1, chain[4]: 2}
+    assert _depths(_traverse(workspace, chain[1], direction="outgoing")) == {chain[1]: 0, chain[2]: 1, chain[3]: 2}
+    assert _depths(_traverse(workspace, chain[0], relationship_types=["blocks"])) == {chain[0]: 0, chain[4]: 1}
+
+
+def test_traversal_stops_at_the_node_budget(workspace, chain):
+    result = _traverse(workspace, chain[0], max_depth=5, max_nodes=2)
+
+    assert result["truncated"] is True
+    assert len(result["nodes"]) <= 2
+
+
+def test_traversal_attaches_full_items(workspace, chain):
+    result = _traverse(workspace, chain[0], max_depth=1, include_full_items=True)
+
+    summaries = {node["full_item"]["summary"] for node in result["nodes"]}
+    assert summaries == {"Decision 1", "Decision 2", "Decision 5"}
+
+
+def test_batch_link_reports_invalid_links(workspace):
+    result = mcp_handlers.handle_batch_link_items(models.BatchLinkItemsArgs(
+        workspace_id=workspace,
+        links=[_link(1, 2), {"source_item_type": "decision", "source_item_id": "1"}, _link("2", "3", "implements")],
+    ))
+
+    assert result["status"] == "partial_success"
+    assert [link["relationship_type"] for link in result["successful_items"]] == ["relates_to", "implements"]
+    assert [failure["item_index"] for failure in result["failed_items"]] == [1]
+    assert len(db.get_context_links(workspace, "decision", "2")) == 2
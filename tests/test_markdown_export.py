@@ -0,0 +1,65 @@
+from context_portal_mcp.db import database as db
+from context_portal_mcp.db import models
+from context_portal_mcp.handlers import mcp_handlers
+
+
+def _export(workspace, **kwargs):
+    return mcp_handlers.handle_export_conport_to_markdown(models.ExportConportToMarkdownArgs(workspace_id=workspace, **kwargs))
+
+
+def test_export_writes_the_markdown_format(workspace, tmp_path):
+    db.log_decision(workspace, models.Decision(summary="Use WAL", rationale="Readers never block"))
+    db.log_progress(workspace, models.ProgressEntry(status="TODO", description="Tune checkpoints"))
+    db.log_progress(workspace, models.ProgressEntry(status="DONE", description="Enable WAL"))
+    db.log_progress(workspace, models.ProgressEntry(status="BLOCKED", description="Benchmark"))
+    db.log_custom_data(workspace, models.CustomData(category="Glossary", key="WAL", value={"meaning": "Write-ahead log"}))
+
+    result = _export(workspace)
+
+    assert result["files_written"] == ["custom_data/Glossary.md", "decision_log.md", "progress_log.md"]
+    export_dir = tmp_path / "conport_export"
+    decision_log = (export_dir / "decision_log.md").read_text()
+    assert decision_log.startswith("# Decision Log\n\n---\n## Decision\n*   [")
+    assert decision_log.endswith("] Use WAL\n\n## Rationale\n*   Readers never block\n")
+    progress_log = (export_dir / "progress_log.md").read_text()
+    assert progress_log.index("## Completed Tasks") < progress_log.index("Enable WAL") < progress_log.index("## TODO Tasks")
+    assert progress_log.index("Benchmark") > progress_log.index("## TODO Tasks") # Unknown statuses are listed as TODO
+    glossary = (export_dir / "custom_data" / "Glossary.md").read_text()
+    assert glossary.startswith("# Custom Data: Glossary\n\n### WAL\n\n*   [")
+    assert '"meaning": "Write-ahead log"' in glossary
+    assert not list(export_dir.rglob("*.tmp"))
+
+
+def test_export_only_rewrites_files_whose_items_changed(workspace, tmp_path, monkeypatch):
+    db.log_decision(workspace, models.Decision(summary="Use WAL"))
+    db.log_progress(workspace, models.ProgressEntry(status="TODO", description="Tune checkpoints"))
+    db.log_custom_data(workspace, models.CustomData(category="Glossary", key="WAL", value="Write-ahead log"))
+    db.log_custom_data(workspace, models.CustomData(category="Notes", key="n1", value="Temporary"))
+    _export(workspace)
+    progress_log = tmp_path / "conport_export" / "progress_log.md"
+    progress_mtime = progress_log.stat().st_mtime_ns
+
+    read = []
+    iter_items = db.iter_items
+    monkeypatch.setattr(db, "iter_items", lambda ws, item_type, **kwargs: (read.append(item_type), iter_items(ws, item_type, **kwargs))[1])
+    result = _export(workspace)
+    assert read == [] # Nothing changed: no table is read
+    assert result["files_written"] == []
+
+    db.log_decision(workspace, models.Decision(summary="Cache embeddings"))
+    db.delete_custom_data(workspace, "Notes", "n1")
+    result = _export(workspace)
+
+    assert read == ["decision", "custom_data"]
+    assert result["files_written"] == ["decision_log.md"]
+    assert result["files_removed"] == ["custom_data/Notes.md"]
+    assert not (tmp_path / "conport_export" / "custom_data" / "Notes.md").exists()
+    assert progress_log.stat().st_mtime_ns == progress_mtime
+    assert "Cache embeddings" in (tmp_path / "conport_export" / "decision_log.md").read_text()
+
+    # A deleted export file is written again, and 'full' rebuilds everything
+    (tmp_path / "conport_export" / "decision_log.md").unlink()
+    assert _export(workspace)["files_written"] == ["decision_log.md"]
+    read.clear()
+    _export(workspace, full=True)
+    assert read == ["decision", "progress_entry", "system_pattern", "custom_data"]
@@ -0,0 +1,83 @@
+import sqlite3
+
+import pytest
+
+from context_portal_mcp.core.config import get_database_path
+from context_portal_mcp.db import database as db
+from context_portal_mcp.db import models
+from context_portal_mcp.handlers import mcp_handlers
+
+
+@pytest.fixture
+def export_dir(tmp_path):
+    export_dir = tmp_path / "conport_export"
+    (export_dir / "custom_data").mkdir(parents=True)
+    (export_dir / "product_context.md").write_text("# Product Context\n\n## Project Goal\n*   Fast context\n")
+    (export_dir / "decision_log.md").write_text(
+        "# Decision Log\n\n---\n## Decision\n*   [2026-10-18] Use WAL\n\n## Rationale\n*   Readers never block\n"
+        "\n---\n## Decision\n*   [2026-10-18] Batch writes\n"
+    )
+    (export_dir / "progress_log.md").write_text(
+        "# Progress Log\n\n## Completed Tasks\n*   [2026-10-18] Enable WAL\n\n## TODO Tasks\n*   Tune checkpoints\n"
+    )
+    (export_dir / "custom_data" / "Project_Glossary.md").write_text(
+        '# Custom Data: Project Glossary\n\n### WAL\n\n```json\n"Write-ahead log"\n```\n'
+    )
+    return export_dir
+
+
+def _import(workspace, **kwargs):
+    return mcp_handlers.handle_import_markdown_to_conport(
+        models.ImportMarkdownToConportArgs(workspace_id=workspace, **kwargs)
+    )
+
+
+def _item_count(workspace):
+    with sqlite3.connect(get_database_path(workspace)) as conn:
+        return sum(
+            conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("decisions", "progress_entries", "system_patterns", "custom_data")
+        )
+
+
+def test_import_writes_every_file_and_queues_embeddings(workspace, export_dir, notified):
+    result = _import(workspace)
+
+    assert result["status"] == "success"
+    assert result["items_logged"] == {"product_context": 1, "decision": 2, "progress_entry": 2, "custom_data": 1}
+    assert result["files_skipped"] == ["active_context.md", "system_patterns.md"]
+    assert result["throughput"]["items_per_second"] > 0
+    assert notified == [workspace]
+    assert db.get_product_context(workspace).content["projectGoal"] == "Fast context"
+    decisions = {d.summary: d for d in db.get_decisions(workspace)}
+    assert decisions["Use WAL"].rationale == "Readers never block"
+    assert {p.status for p in db.get_progress(workspace)} == {"DONE", "TODO"}
+    assert db.get_custom_data(workspace, "Project Glossary", "WAL")[0].value == "Write-ahead log"
+    queued = {(e["item_type"], e["item_id"]) for e in db.fetch_embedding_queue_batch(workspace, 100, 5)}
+    assert {("decision", d.id) for d in decisions.values()} <= queued
+
+
+def test_dry_run_validates_without_writing(workspace, export_dir, notified):
+    result = _import(workspace, dry_run=True)
+
+    assert result["status"] == "success" and result["dry_run"] is True
+    assert result["items_logged"]["decision"] == 2
+    assert notified == []
+    assert _item_count(workspace) == 0
+    assert db.get_product_context(workspace).content == {}
+
+
+def test_an_invalid_item_aborts_the_whole_import(workspace, export_dir, notified, monkeypatch):
+    db.log_custom_data(workspace, models.CustomData(category="Project Glossary", key="WAL", value="Old"))
+    item_type, _, args_model, build = mcp_handlers.IMPORT_ITEM_FILES["progress_log.md"]
+    parse = lambda content: [{"status": "TODO", "description": "Tune checkpoints"}, {"status": "TODO", "description": ""}]
+    monkeypatch.setitem(mcp_handlers.IMPORT_ITEM_FILES, "progress_log.md", (item_type, parse, args_model, build))
+
+    result = _import(workspace)
+
+    assert result["status"] == "failure"
+    assert len(result["errors"]) == 1 and result["errors"][0].startswith("Invalid item 1 in progress_log.md")
+    assert notified == []
+    assert _item_count(workspace) == 1
+    assert db.get_custom_data(workspace, "Project Glossary", "WAL")[0].value == "Old"
+    assert db.get_product_context(workspace).content == {}
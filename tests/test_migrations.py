@@ -0,0 +1,62 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+from context_portal_mcp.core.config import get_database_path
+from context_portal_mcp.db import database as db
+
+
+def test_new_workspace_is_migrated_to_head(workspace):
+    db.get_db_connection(workspace)
+
+    with sqlite3.connect(get_database_path(workspace)) as conn:
+        (version,) = conn.execute("SELECT version_num FROM alembic_version").fetchone()
+    assert version == db.HEAD_REVISION
+    assert db.schema_is_current(get_database_path(workspace))
+
+
+def test_current_workspace_skips_alembic(workspace, monkeypatch):
+    db.get_db_connection(workspace)
+    db.close_db_connection(workspace)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Alembic should not run for an up-to-date database")
+
+    monkeypatch.setattr(db, "ensure_alembic_files_exist", fail)
+    monkeypatch.setattr(db, "run_migrations", fail)
+    db.get_db_connection(workspace)
+
+
+def _downgrade(db_path, revision):
+    from alembic import command
+    from alembic.config import Config
+
+    alembic_cfg = Config(str(db_path.parent / "alembic.ini"))
+    alembic_cfg.set_main_option("script_location", (db_path.parent / "alembic").as_posix())
+    alembic_cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db_path.as_posix()}")
+    command.downgrade(alembic_cfg, revision)
+
+
+def test_outdated_workspace_is_upgraded(workspace, monkeypatch):
+    db.get_db_connection(workspace)
+    db.close_db_connection(workspace)
+    db_path = get_database_path(workspace)
+    _downgrade(db_path, "20261018_05")
+    assert not db.schema_is_current(db_path)
+
+    calls = []
+    run_migrations = db.run_migrations
+    monkeypatch.setattr(db, "run_migrations", lambda path: (calls.append(path), run_migrations(path)))
+    db.get_db_connection(workspace)
+
+    assert calls == [db_path]
+    assert db.schema_is_current(db_path)
+
+
+def test_importing_database_module_does_not_import_alembic():
+    code = "import sys; import context_portal_mcp.db.database; print('alembic' in sys.modules, 'sqlalchemy' in sys.modules)"
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parent.parent / "src"))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+    assert result.stdout.split() == ["False", "False"]
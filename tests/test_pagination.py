@@ -0,0 +1,71 @@
+import pytest
+
+from context_portal_mcp.core.exceptions import ToolArgumentError
+from context_portal_mcp.db import database as db
+from context_portal_mcp.db import models
+from context_portal_mcp.handlers import mcp_handlers
+
+
+def _collect_pages(handler, args_model, **kwargs):
+    pages = []
+    cursor = None
+    while True:
+        page = handler(args_model(paginate=True, cursor=cursor, **kwargs))
+        pages.append([item["id"] for item in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_pages_cover_every_item_once_newest_first(workspace):
+    # Logged in one batch, most rows share a timestamp, so the id tie-break decides the order.
+    decisions = db.log_decisions(workspace, [models.Decision(summary=f"d{i}") for i in range(7)])
+
+    pages = _collect_pages(
+        mcp_handlers.handle_get_decisions, models.GetDecisionsArgs, workspace_id=workspace, limit=3
+    )
+
+    assert [len(p) for p in pages] == [3, 3, 1]
+    assert [i for p in pages for i in p] == sorted((d.id for d in decisions), reverse=True)
+
+
+def test_custom_data_pages_by_recency_within_category(workspace):
+    entries = db.log_custom_data_entries(workspace, [
+        models.CustomData(category="c" if i % 2 else "other", key=f"k{i}", value=i) for i in range(6)
+    ])
+
+    pages = _collect_pages(
+        mcp_handlers.handle_get_custom_data, models.GetCustomDataArgs, workspace_id=workspace, category="c", limit=2
+    )
+
+    assert pages == [[entries[5].id, entries[3].id], [entries[1].id]]
+    # Without pagination the existing ordering and plain list shape are kept.
+    plain = mcp_handlers.handle_get_custom_data(models.GetCustomDataArgs(workspace_id=workspace, category="c"))
+    assert [d["key"] for d in plain] == ["k1", "k3", "k5"]
+
+
+def test_invalid_cursor_is_an_argument_error(workspace):
+    with pytest.raises(ToolArgumentError):
+        mcp_handlers.handle_get_progress(models.GetProgressArgs(workspace_id=workspace, cursor="not-a-cursor"))
+
+
+def test_link_pages_merge_both_ends_of_the_item(workspace):
+    def link(source, target, target_type="decision"):
+        return models.ContextLink(
+            source_item_type="decision", source_item_id=source,
+            target_item_type=target_type, target_item_id=target, relationship_type="relates_to",
+        )
+
+    links = db.log_context_links(workspace, [
+        link("1", "2"), link("3", "1"), link("1", "1"), link("4", "5"), link("1", "7", "progress_entry"), link("6", "1"),
+    ])
+
+    pages = _collect_pages(
+        mcp_handlers.handle_get_linked_items, models.GetLinkedItemsArgs,
+        workspace_id=workspace, item_type="decision", item_id="1", limit=2
+    )
+
+    # The link from the item to itself is returned once
+    assert pages == [[links[5].id, links[4].id], [links[2].id, links[1].id], [links[0].id]]
+    filtered = db.get_context_links(workspace, "decision", "1", linked_item_type_filter="decision")
+    assert [l.id for l in filtered] == [links[5].id, links[2].id, links[1].id, links[0].id]
@@ -0,0 +1,116 @@
+import pytest
+
+from context_portal_mcp.core import dispatch, embedding_service
+from context_portal_mcp.db import database as db
+from context_portal_mcp.db import models, vector_store_service
+from context_portal_mcp.handlers import mcp_handlers
+
+
+@pytest.fixture(autouse=True)
+def inference_pool():
+    yield
+    dispatch.shutdown()
+
+
+@pytest.fixture
+def search_hits(monkeypatch):
+    """Makes the vector store return the given hits, in order, for any query."""
+    hits = []
+    monkeypatch.setattr(embedding_service, "get_embedding", lambda text, *args, **kwargs: [1.0, 0.0])
+    monkeypatch.setattr(vector_store_service, "query_vector_store", lambda **kwargs: [dict(hit) for hit in hits])
+    return hits
+
+
+def _hit(item_type, item_id):
+    return {
+        "chroma_doc_id": f"{item_type}_{item_id}",
+        "distance": 0.1,
+        "metadata": {"conport_item_type": item_type, "conport_item_id": str(item_id)},
+    }
+
+
+async def test_full_items_are_fetched_in_one_batch_per_type(workspace, search_hits, monkeypatch):
+    decision = db.log_decision(workspace, models.Decision(summary="Use WAL", rationale="Readers never block"))
+    progress = db.log_progress(workspace, models.ProgressEntry(status="DONE", description="Enable WAL"))
+    search_hits.extend([_hit("progress_entry", progress.id), _hit("decision", decision.id), _hit("decision", 999)])
+
+    lookups = []
+    get_items = db.get_items_by_type_and_ids
+    monkeypatch.setattr(db, "get_items_by_type_and_ids", lambda ws, ids: (lookups.append(ids), get_items(ws, ids))[1])
+    args = models.SemanticSearchConportArgs(workspace_id=workspace, query_text="wal", include_full_items=True)
+    results = await mcp_handlers.handle_semantic_search_conport(args)
+
+    assert lookups == [{"progress_entry": [progress.id], "decision": [decision.id, 999]}]
+    assert [r["chroma_doc_id"] for r in results] == [f"progress_entry_{progress.id}", f"decision_{decision.id}", "decision_999"]
+    assert results[0]["full_item"]["description"] == "Enable WAL"
+    assert results[1]["full_item"]["rationale"] == "Readers never block"
+    assert results[2]["full_item"] is None # Deleted since it was indexed
+
+
+async def test_full_items_are_opt_in(workspace, search_hits):
+    decision = db.log_decision(workspace, models.Decision(summary="Use WAL"))
+    search_hits.append(_hit("decision", decision.id))
+
+    args = models.SemanticSearchConportArgs(workspace_id=workspace, query_text="wal")
+    results = await mcp_handlers.handle_semantic_search_conport(args)
+
+    assert "full_item" not in results[0]
+
+
+async def test_first_search_resumes_indexing_left_from_a_previous_run(workspace, search_hits, notified):
+    db.log_decision(workspace, models.Decision(summary="Use WAL"))
+    args = models.SemanticSearchConportArgs(workspace_id=workspace, query_text="wal")
+
+    await mcp_handlers.handle_semantic_search_conport(args)
+    await mcp_handlers.handle_hybrid_search(models.HybridSearchArgs(workspace_id=workspace, query_text="wal"))
+
+    assert notified == [workspace]
+
+
+async def test_hybrid_search_fuses_full_text_and_vector_ranks(workspace, search_hits):
+    wal = db.log_decision(workspace, models.Decision(summary="Use WAL journal mode", tags=["db"]))
+    cache = db.log_decision(workspace, models.Decision(summary="Cache query embeddings", tags=["perf"]))
+    glossary = db.log_custom_data(workspace, models.CustomData(category="Glossary", key="WAL", value="Write-ahead log"))
+    task = db.log_progress(workspace, models.ProgressEntry(status="TODO", description="Tune the journal"))
+    search_hits.extend([_hit("progress_entry", task.id), _hit("decision", wal.id), _hit("decision", cache.id)])
+
+    args = models.HybridSearchArgs(workspace_id=workspace, query_text="WAL journal", include_full_items=True)
+    results = await mcp_handlers.handle_hybrid_search(args)
+
+    keys = [(r["item_type"], r["item_id"]) for r in results]
+    # Found by both rankers, then the rest by rank: the full-text hits of both tables form one
+    # ranked list, so the weaker custom data match does not tie with the top vector hit
+    assert keys == [("decision", wal.id), ("progress_entry", task.id), ("custom_data", glossary.id), ("decision", cache.id)]
+    assert [(r["fts_rank"], r["vector_rank"]) for r in results] == [(1, 2), (None, 1), (2, None), (None, 3)]
+    assert results[0]["full_item"]["summary"] == "Use WAL journal mode"
+
+    filtered = await mcp_handlers.handle_hybrid_search(
+        models.HybridSearchArgs(workspace_id=workspace, query_text="WAL journal", filter_tags_include_any=["db"])
+    )
+    assert ("custom_data", glossary.id) not in [(r["item_type"], r["item_id"]) for r in filtered]
+    assert "full_item" not in filtered[0] # Opt-in, as in semantic search
+
+
+def test_full_text_categories_apply_only_when_custom_data_is_searched(workspace):
+    decision = db.log_decision(workspace, models.Decision(summary="Use WAL journal mode"))
+    glossary = db.log_custom_data(workspace, models.CustomData(category="Glossary", key="WAL", value="Write-ahead log"))
+
+    # Like the vector store filters: ignored when only decisions are searched, otherwise custom data only
+    hits = db.search_items_fts(workspace, "WAL", item_types=["decision"], category_filter=["Glossary"])
+    assert [(item_type, item_id) for item_type, item_id, _ in hits] == [("decision", decision.id)]
+    hits = db.search_items_fts(workspace, "WAL", category_filter=["Glossary"])
+    assert [(item_type, item_id) for item_type, item_id, _ in hits] == [("custom_data", glossary.id)]
+
+
+async def test_hybrid_search_falls_back_to_full_text(workspace, monkeypatch):
+    decision = db.log_decision(workspace, models.Decision(summary="Use WAL journal mode"))
+
+    def unavailable(*args, **kwargs):
+        raise RuntimeError("model not available")
+
+    monkeypatch.setattr(embedding_service, "get_embedding", unavailable)
+    results = await mcp_handlers.handle_hybrid_search(
+        models.HybridSearchArgs(workspace_id=workspace, query_text="what's the WAL mode?")
+    )
+
+    assert [(r["item_type"], r["item_id"], r["vector_rank"]) for r in results] == [("decision", decision.id, None)]
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parent.parent / "src"
+
+# CPU seconds, so the check holds on loaded machines; loading the embedding stack at startup took ~10 s
+STARTUP_BUDGET_SECONDS = 4.0
+# Only needed for semantic search and indexing, so they must not load before the first such call
+HEAVY_MODULES = ["torch", "transformers", "sentence_transformers", "chromadb"]
+
+FIRST_TOOL_CALL = """
+import asyncio, sys, time
+from fastmcp import Client
+from context_portal_mcp import main
+
+async def first_call():
+    async with Client(main.conport_mcp) as client:
+        await client.call_tool("get_product_context", {"workspace_id": sys.argv[1]})
+
+asyncio.run(first_call())
+print(time.process_time())
+"""
+
+
+def _run_first_tool_call(workspace_id: str):
+    env = dict(os.environ, PYTHONPATH=str(SRC_PATH), HF_HUB_OFFLINE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", FIRST_TOOL_CALL, workspace_id],
+        capture_output=True, text=True, env=env, timeout=120, check=True
+    )
+    imported = {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines() if line.startswith("import time:")
+    }
+    return float(result.stdout.split()[-1]), imported
+
+
+def test_first_tool_call_does_not_load_embedding_stack(tmp_path):
+    cpu_seconds, imported = _run_first_tool_call(str(tmp_path))
+
+    assert [m for m in HEAVY_MODULES if m in imported] == []
+    assert cpu_seconds < STARTUP_BUDGET_SECONDS, f"CPU time to first tool call regressed: {cpu_seconds:.2f}s"
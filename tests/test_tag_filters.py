@@ -0,0 +1,26 @@
+from context_portal_mcp.db import database as db
+from context_portal_mcp.db import models
+
+
+def _log_decisions(workspace_id, summaries, tags=None):
+    return db.log_decisions(workspace_id, [models.Decision(summary=s, tags=tags) for s in summaries])
+
+
+def test_tag_filters_apply_before_limit(workspace):
+    _log_decisions(workspace, [f"untagged {i}" for i in range(5)])
+    tagged = _log_decisions(workspace, ["tagged"], tags=["api", "perf"])
+    _log_decisions(workspace, [f"later {i}" for i in range(3)], tags=["api"])
+
+    both = db.get_decisions(workspace, limit=1, tags_filter_include_all=["api", "perf"])
+    assert [d.id for d in both] == [tagged[0].id]
+    assert len(db.get_decisions(workspace, limit=10, tags_filter_include_any=["perf", "api"])) == 4
+
+
+def test_replaced_system_pattern_tags_are_reindexed(workspace):
+    db.log_system_pattern(workspace, models.SystemPattern(name="p", tags=["old"]))
+    db.log_system_pattern(workspace, models.SystemPattern(name="p", tags=["new"]))
+    db.log_system_patterns(workspace, [models.SystemPattern(name="q", tags=["new"])])
+
+    assert db.get_system_patterns(workspace, tags_filter_include_any=["old"]) == []
+    assert [p.name for p in db.get_system_patterns(workspace, tags_filter_include_any=["new"])] == ["p", "q"]
+    assert [p.name for p in db.get_system_patterns(workspace, tags_filter_include_any=["new"], limit=1)] == ["p"]
@@ -0,0 +1,76 @@
+import threading
+
+import numpy as np
+import pytest
+
+from context_portal_mcp.core import embedding_service, indexing_queue, warmup
+from context_portal_mcp.db import models, vector_store_service
+from context_portal_mcp.handlers import mcp_handlers as H
+
+
+class _SlowModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, convert_to_tensor=False):
+        self.encoded.extend(texts)
+        return np.array([[1.0] for _ in texts])
+
+
+@pytest.fixture
+def cold_server(monkeypatch, notified):
+    """Fresh warm-up and model state; the model loads only once `release` is set."""
+    indexing_queue.shutdown()
+    monkeypatch.setattr(embedding_service, "_models", {})
+    monkeypatch.setattr(embedding_service, "_model_locks", {})
+    monkeypatch.setattr(embedding_service, "_model_status", {})
+    for name, value in [("_thread", None), ("_vector_store_state", {}), ("_started_at", None), ("_finished_at", None)]:
+        monkeypatch.setattr(warmup, name, value)
+
+    state = {"release": threading.Event(), "model": _SlowModel(), "collections": [], "notified": notified}
+
+    def create_model(model_name):
+        assert state["release"].wait(timeout=5)
+        return state["model"]
+
+    monkeypatch.setattr(embedding_service, "_create_model", create_model)
+    monkeypatch.setattr(
+        vector_store_service, "get_or_create_collection", lambda ws, *args: state["collections"].append(ws)
+    )
+    return state
+
+
+def test_writes_are_queued_while_the_model_warms_up(workspace, cold_server):
+    assert H.handle_get_server_health(models.GetServerHealthArgs(workspace_id=workspace))["status"] == "cold"
+
+    warmup.start(workspace)
+    H.handle_log_decision(models.LogDecisionArgs(workspace_id=workspace, summary="Logged during warm-up"))
+
+    health = H.handle_get_server_health(models.GetServerHealthArgs(workspace_id=workspace))
+    assert health["status"] == "warming_up"
+    assert health["warm_up"]["running"]
+    assert health["indexing"]["pending"] == 1
+
+    cold_server["release"].set()
+    assert warmup.wait(timeout=5)
+
+    health = H.handle_get_server_health(models.GetServerHealthArgs(workspace_id=workspace))
+    assert health["status"] == "ready"
+    assert health["model"]["warmed_up"] and health["vector_store"] == "ready"
+    assert cold_server["model"].encoded # One warm-up forward pass
+    assert cold_server["collections"] == [workspace]
+    # The queued decision is handed to the indexing worker once the model is ready
+    assert cold_server["notified"][-1] == workspace
+
+
+def test_failed_model_load_is_reported(workspace, cold_server, monkeypatch):
+    def broken(model_name):
+        raise OSError("model files not found")
+
+    monkeypatch.setattr(embedding_service, "_create_model", broken)
+    warmup.start(workspace)
+    assert warmup.wait(timeout=5)
+
+    health = warmup.get_status(workspace)
+    assert health["status"] == "failed"
+    assert health["model"]["error"] == "OSError: model files not found"